@@ -1,3 +1,8 @@
+import time
+
+# Taken before the remaining imports so the startup profile includes them.
+_BOOT_STARTED = time.perf_counter()
+
 import configparser
 import os
 import socket
@@ -10,12 +15,14 @@ import contextlib
 from typing import Optional
 from wom import Client as BaseClient
 
-from weeklyupdater import start_monthly_reporter, start_weekly_reporter, start_yearly_reporter
-from gainstracker import start_gains_snapshotter
+from gainstracker import gains_snapshot_job, history_compaction_job
 from utils.database import (
     count_players,
     import_csv_history,
     init_database,
+    migrate_legacy_history,
+    read_data_versions,
+    record_data_freshness,
     upsert_players,
     log_ehp_history,
 )
@@ -24,26 +31,32 @@ from utils.rank_utils import (
     save_ranks,
     get_rank_for_value,
     get_ehp_rank,
-    compute_member_update,
     EHB_SECTION,
 )
 from utils.log_csv import log_ehb_to_csv
+from utils.membership import MembershipTracker
+from utils.player_identity import PlayerIdentityRecorder
+from utils.player_status import PlayerStatusCollector
 from utils.commands import setup_commands
-from utils.api_usage import tracker as api_usage_tracker, create_tracked_session
-import uvicorn
-from web import create_app
+from utils.api_usage import api_caller, tracker as api_usage_tracker
+from utils.http_pool import pool as http_pool
+from utils.group_roster import fetch_group_roster
+from utils.job_scheduler import IntervalSchedule, Job, JobScheduler
+from utils.startup_profile import StartupProfile
+# Only the shared state container; FastAPI, uvicorn and the routers are
+# imported in main() when the web UI is enabled.
 from web.services.bot_state import BotState
 
+startup_profile = StartupProfile(started_at=_BOOT_STARTED)
+startup_profile.record_since("imports", _BOOT_STARTED)
+
 
 class Client(BaseClient):
     async def start(self):
         http = self._http
         if not hasattr(http, "_session") or http._session.closed:
-            # Prefer IPv4 inside containers where IPv6 DNS answers exist but
-            # outbound IPv6 connectivity is not actually configured.
-            connector = aiohttp.TCPConnector(family=socket.AF_INET)
-            http._session = create_tracked_session(
-                connector=connector,
+            # The shared pool's connector is IPv4-only, keep-alive and DNS-cached.
+            http._session = http_pool.tracked_session(
                 json_serialize=lambda o: http._encoder.encode(o).decode(),
             )
             http._method_mapping = {
@@ -92,6 +105,7 @@ def _trim_response_preview(body: str, limit: int = 220) -> str:
     return preview
 
 
+@api_caller("diagnostics")
 async def diagnose_group_details_fetch() -> str:
     """Fetch group details directly to expose HTTP status/body on client decode errors."""
     url = f"https://api.wiseoldman.net/v2/groups/{group_id}"
@@ -104,16 +118,14 @@ async def diagnose_group_details_fetch() -> str:
         headers["x-api-key"] = api_key
 
     try:
-        connector = aiohttp.TCPConnector(family=socket.AF_INET)
-        async with create_tracked_session(connector=connector) as session:
-            async with session.get(url, headers=headers) as response:
-                body = await response.text(errors="replace")
-                content_type = response.headers.get("content-type", "unknown")
-                preview = _trim_response_preview(body)
-                return (
-                    f"WOM group details HTTP {response.status} ({content_type}); "
-                    f"body starts with: {preview!r}"
-                )
+        async with http_pool.session().get(url, headers=headers) as response:
+            body = await response.text(errors="replace")
+            content_type = response.headers.get("content-type", "unknown")
+            preview = _trim_response_preview(body)
+            return (
+                f"WOM group details HTTP {response.status} ({content_type}); "
+                f"body starts with: {preview!r}"
+            )
     except Exception as diagnostic_error:
         return f"WOM group details diagnostic request failed: {diagnostic_error}"
 
@@ -141,6 +153,7 @@ weekly_channel_id   = int(config['discord'].get('weekly_channel_id', 0) or 0)
 monthly_channel_id  = int(config['discord'].get('monthly_channel_id', weekly_channel_id) or 0)
 yearly_channel_id   = int(config['discord'].get('yearly_channel_id', weekly_channel_id) or 0)
 gains_channel_id    = int(config['discord'].get('gains_channel_id', 0) or 0)
+competition_channel_id = int(config['discord'].get('competition_channel_id', 0) or 0)
 group_id            = int(config['wiseoldman']['group_id'])
 group_passcode      = config['wiseoldman']['group_passcode']
 api_key             = config['wiseoldman'].get('api_key', '').strip() or None
@@ -156,6 +169,25 @@ track_ehp           = config['settings'].getboolean('track_ehp', False)
 gains_snapshot_interval = int(config['settings'].get('gains_snapshot_interval', 86400) or 86400)
 gains_window_days   = int(config['settings'].get('gains_window_days', 7) or 7)
 gains_metrics       = [m.strip() for m in config['settings'].get('gains_metrics', 'overall,ehb').split(',') if m.strip()]
+# 0 disables snapshot compaction; otherwise keep full resolution this long,
+# then one row per day until the daily window ends, then one per week.
+gains_raw_retention_days   = int(config['settings'].get('gains_raw_retention_days', '14') or 0)
+gains_daily_retention_days = int(config['settings'].get('gains_daily_retention_days', '90') or 0)
+# Boss leaderboards are collected round-robin, a few per interval, within a
+# fixed per-hour share of the WOM request budget. Empty list disables it.
+boss_metrics        = [b.strip() for b in config['settings'].get('boss_metrics', '').split(',') if b.strip()]
+boss_collect_interval   = int(config['settings'].get('boss_collect_interval', 900) or 900)
+boss_requests_per_hour  = int(config['settings'].get('boss_requests_per_hour', 12) or 12)
+# Operator-requested achievement backfill (admin panel or
+# `python -m weeklyupdater.achievement_backfill`); off unless enabled here.
+achievement_backfill_enabled  = config['settings'].getboolean('achievement_backfill', False)
+achievement_backfill_interval = int(config['settings'].get('achievement_backfill_interval', 600) or 600)
+achievement_backfill_pages    = int(config['settings'].get('achievement_backfill_pages_per_run', 4) or 4)
+# Group competition standings and overtake posts (competitiontracker); off unless enabled here.
+competition_tracking_enabled  = config['settings'].getboolean('competition_tracking', False)
+competition_poll_interval     = int(config['settings'].get('competition_poll_interval', 300) or 300)
+competition_requests_per_run  = int(config['settings'].get('competition_requests_per_run', 6) or 6)
+competition_announce_top      = int(config['settings'].get('competition_announce_top', 3) or 0)
 api_rate_limit_per_minute      = int(config['settings'].get('api_rate_limit_per_minute', 30) or 30)
 api_circuit_breaker_cooldown   = int(config['settings'].get('api_circuit_breaker_cooldown_seconds', 300) or 300)
 
@@ -163,6 +195,9 @@ api_circuit_breaker_cooldown   = int(config['settings'].get('api_circuit_breaker
 web_enabled = config['web'].getboolean('enabled', False) if config.has_section('web') else False
 web_host = config['web'].get('host', '0.0.0.0') if config.has_section('web') else '0.0.0.0'
 web_port = int(config['web'].get('port', '8080')) if config.has_section('web') else 8080
+# "embedded" serves the dashboard from this process; "split" leaves it to
+# ``python -m web`` and publishes live state to SQLite for it instead.
+web_mode = (config['web'].get('mode', 'embedded') if config.has_section('web') else 'embedded').strip().lower()
 
 if api_key:
     log("Wise Old Man API key loaded.")
@@ -202,11 +237,17 @@ intents.message_content = True  # Enable message content intent
 discord_client = IPv4Bot(command_prefix=commands.when_mentioned, intents=intents)
 
 wom_client = Client(api_key=api_key, user_agent=wom_user_agent)
+membership_tracker = MembershipTracker(group_id)
+status_collector = PlayerStatusCollector()
+identity_recorder = PlayerIdentityRecorder()
 
-weekly_report_task = None
-monthly_report_task = None
-yearly_report_task = None
-gains_snapshot_task = None
+# Runs the gains snapshot, the scheduled reports and the legacy history
+# migration (utils.job_scheduler).
+job_scheduler_task = None
+boss_collector_task = None
+shared_state_task = None
+# Set just before discord_client.start(); on_ready turns it into a profile phase.
+discord_login_started = None
 
 
 # Utility Functions
@@ -227,7 +268,11 @@ def get_rank(ehb, ranks_file=os.path.join(os.path.dirname(os.path.abspath(__file
 
 @discord_client.event
 async def on_ready():
+    global discord_login_started
     log(f"Logged in as {discord_client.user}")
+    if discord_login_started is not None:
+        startup_profile.record_since("discord login", discord_login_started)
+        discord_login_started = None
 
     # Register slash commands with Discord
     await discord_client.tree.sync()
@@ -235,13 +280,13 @@ async def on_ready():
     # Start Wise Old Man client session
     await wom_client.start()
 
-    global weekly_report_task
-    global monthly_report_task
-    global yearly_report_task
-    global gains_snapshot_task
-    if gains_snapshot_task is None:
+    global job_scheduler_task
+    global boss_collector_task
+    if job_scheduler_task is None:
+        scheduler = JobScheduler(log=log)
+        scheduler.add(history_migration_job())
         if gains_channel_id or gains_metrics:
-            gains_snapshot_task = start_gains_snapshotter(
+            scheduler.add(gains_snapshot_job(
                 wom_client=wom_client,
                 discord_client=discord_client,
                 group_id=group_id,
@@ -253,54 +298,86 @@ async def on_ready():
                 log=log,
                 on_snapshot=lambda: setattr(bot_state, "last_gains_snapshot", datetime.now()),
                 debug=debug,
-            )
-            log("Gains snapshot task started.")
+            ))
+            log("Gains snapshot job scheduled.")
         else:
             log("gains snapshot disabled (no metrics/channel configured).")
+        if gains_raw_retention_days > 0:
+            scheduler.add(history_compaction_job(
+                raw_retention_days=gains_raw_retention_days,
+                daily_retention_days=gains_daily_retention_days,
+                log=log,
+            ))
 
-    if not REPORTS_ENABLED:
-        log("Weekly/monthly/yearly reports disabled (REPORTS_ENABLED = False).")
-    elif weekly_report_task is None:
-        if weekly_channel_id:
-            weekly_report_task = start_weekly_reporter(
+        if not REPORTS_ENABLED:
+            log("Weekly/monthly/yearly reports disabled (REPORTS_ENABLED = False).")
+        else:
+            from weeklyupdater import monthly_report_job, weekly_report_job, yearly_report_job
+
+            for label, channel, make_job in (
+                ("weekly", weekly_channel_id, weekly_report_job),
+                ("monthly", monthly_channel_id, monthly_report_job),
+                ("yearly", yearly_channel_id, yearly_report_job),
+            ):
+                if channel:
+                    scheduler.add(make_job(
+                        wom_client=wom_client,
+                        discord_client=discord_client,
+                        group_id=group_id,
+                        channel_id=channel,
+                        log=log,
+                    ))
+                    log(f"{label.capitalize()} report job scheduled.")
+                else:
+                    log(f"{label}_channel_id not configured; {label} report disabled.")
+
+        if achievement_backfill_enabled:
+            from weeklyupdater.achievement_backfill import achievement_backfill_job
+
+            scheduler.add(achievement_backfill_job(
                 wom_client=wom_client,
-                discord_client=discord_client,
                 group_id=group_id,
-                channel_id=weekly_channel_id,
+                interval_seconds=achievement_backfill_interval,
+                pages_per_run=achievement_backfill_pages,
                 log=log,
-                debug=debug,
-            )
-            log("Weekly report task started.")
-        else:
-            log("weekly_channel_id not configured; weekly report disabled.")
+            ))
+            log("Achievement backfill job scheduled.")
+
+        if competition_tracking_enabled:
+            from competitiontracker import competition_tracker_job
 
-    if REPORTS_ENABLED and monthly_report_task is None:
-        if monthly_channel_id:
-            monthly_report_task = start_monthly_reporter(
+            scheduler.add(competition_tracker_job(
                 wom_client=wom_client,
                 discord_client=discord_client,
                 group_id=group_id,
-                channel_id=monthly_channel_id,
+                channel_id=competition_channel_id,
+                interval_seconds=competition_poll_interval,
+                requests_per_run=competition_requests_per_run,
+                announce_top=competition_announce_top,
                 log=log,
                 debug=debug,
-            )
-            log("Monthly report task started.")
-        else:
-            log("monthly_channel_id not configured; monthly report disabled.")
+            ))
+            log("Competition tracker job scheduled.")
 
-    if REPORTS_ENABLED and yearly_report_task is None:
-        if yearly_channel_id:
-            yearly_report_task = start_yearly_reporter(
+        job_scheduler_task = scheduler.start()
+
+    if boss_collector_task is None:
+        if boss_metrics:
+            from bosstracker import start_boss_collector
+
+            boss_collector_task = start_boss_collector(
                 wom_client=wom_client,
-                discord_client=discord_client,
                 group_id=group_id,
-                channel_id=yearly_channel_id,
+                bosses=boss_metrics,
+                requests_per_hour=boss_requests_per_hour,
+                interval_seconds=boss_collect_interval,
+                initial_delay_seconds=120,
                 log=log,
                 debug=debug,
             )
-            log("Yearly report task started.")
+            log("Boss collector task started.")
         else:
-            log("yearly_channel_id not configured; yearly report disabled.")
+            log("Boss collector disabled (no boss_metrics configured).")
 
     # Run initial member and ranks listing if enabled
     if run_at_startup:
@@ -323,24 +400,114 @@ async def on_ready():
     else:
         log("refresh_group_task is already running.")
 
+# Legacy username-keyed history rows moved per migration run (5000 rows per batch).
+HISTORY_MIGRATION_BATCHES = 20
+
+
+def history_migration_job() -> Job:
+    """Scheduler job moving a bounded slice of legacy history into the player-ID keyed tables.
+
+    The SQLite work runs in a worker thread. Once a full pass resolves nothing,
+    ``migrate_legacy_history`` skips the tables until a new alias is recorded.
+    """
+
+    async def run(_period: datetime) -> None:
+        report = await asyncio.to_thread(migrate_legacy_history, max_batches=HISTORY_MIGRATION_BATCHES)
+        moved = {family: stats["migrated"] for family, stats in report.items() if stats["migrated"]}
+        if moved:
+            summary = ", ".join(f"{family}: {count}" for family, count in moved.items())
+            log(f"Migrated legacy history rows to player-ID tables ({summary}).")
+
+    return Job(
+        name="history_migration",
+        schedule=IntervalSchedule(check_interval),
+        run=run,
+        retry_seconds=check_interval,
+        initial_delay_seconds=120,
+        run_on_first_start=True,
+    )
+
+
+def record_identities(group):
+    """Persist new player IDs and renames seen in the fetched roster."""
+    try:
+        written = identity_recorder.record(group.memberships)
+    except Exception as e:
+        log(f"Error recording player identities: {e}")
+        return
+    if debug and written:
+        log(f"Recorded identities for {written} players.")
+
+
+def record_membership_changes(group):
+    """Persist joins, leaves and role changes since the previous rank check."""
+    try:
+        changes = membership_tracker.observe(group)
+    except Exception as e:
+        log(f"Error recording group memberships: {e}")
+        return
+    if changes.changed:
+        log(
+            f"Membership changes: {len(changes.joined)} joined, {len(changes.left)} left, "
+            f"{len(changes.role_changes)} role changes."
+        )
+    if not changes.complete:
+        log("Group roster was incomplete; no members were marked as left.")
+
+
+def record_player_status(group):
+    """Persist changed WOM status/activity fields from the fetched roster."""
+    try:
+        written = status_collector.collect(group.memberships)
+    except Exception as e:
+        log(f"Error recording player status: {e}")
+        return
+    if debug and written:
+        log(f"Updated status for {written} players.")
+
+
+def players_version():
+    """Return the ``players`` data version the in-memory roster is compared against."""
+    return read_data_versions(["players"])["players"]
+
+
+def current_roster():
+    """Return the rank check's in-memory roster.
+
+    SQLite is only read again when another writer (e.g. ``/update``) changed
+    ``players`` since the rank check last saved.
+    """
+    if bot_state.roster is None or bot_state.roster_version != players_version():
+        bot_state.roster = load_ranks()
+        bot_state.roster_version = players_version()
+    return bot_state.roster
+
+
 @tasks.loop(seconds=check_interval)
+@api_caller("rank_check")
 async def check_for_rank_changes():
+    tick_started = time.perf_counter()
     try:
         if debug:
             log("debug mode on ")
             log("Starting player comparison...")
-        ranks_data = load_ranks()
+        ranks_data = current_roster()
         try:
-            result = await wom_client.groups.get_details(group_id)
+            # Only the roster fields the rank check uses are decoded.
+            result = await fetch_group_roster(wom_client, group_id)
         except Exception as fetch_error:
             diagnostic = await diagnose_group_details_fetch()
             log(f"Failed to fetch group details: {fetch_error}. {diagnostic}")
+            membership_tracker.record_failure(str(fetch_error))
             return
 
         if result.is_ok:
             group = result.unwrap()
             if not silent:
                 log(f"Fetched group details successfully. Next comparison in {check_interval / 60:.0f} minutes.")
+            record_identities(group)
+            record_membership_changes(group)
+            record_player_status(group)
             for membership in group.memberships:
                 try:
                     player = membership.player
@@ -350,17 +517,15 @@ async def check_for_rank_changes():
                     player_exp = getattr(player, "exp", None)
                     total_xp = int(player_exp) if player_exp is not None else None
 
-                    last_data = ranks_data.get(username, {})
-
                     ehp = None
                     ehp_rank = None
                     if track_ehp:
                         ehp = round(getattr(player, "ehp", 0) or 0, 2)
                         ehp_rank = get_ehp_rank(ehp)
 
-                    # Independent EHB / EHP evaluation merged into one entry.
-                    result = compute_member_update(
-                        last_data,
+                    # Independent EHB / EHP evaluation, merged into the roster row in place.
+                    result = ranks_data.update_member(
+                        username,
                         ehb,
                         rank,
                         ehp=ehp,
@@ -370,45 +535,49 @@ async def check_for_rank_changes():
                     )
 
                     # --- EHB side effects ---
-                    if result["ehb_increase"]:
-                        last_ehb = last_data.get("last_ehb", 0)
-                        log(f"Player {username} EHB increased from {last_ehb:.2f} to {ehb:.2f}")
-                        await send_rank_up_message(username, rank, result["ehb_old_rank"], ehb)
+                    if result.ehb_increase:
+                        log(f"Player {username} EHB increased from {result.last_ehb:.2f} to {ehb:.2f}")
+                        await send_rank_up_message(username, rank, result.ehb_old_rank, ehb)
                         if debug:
                             log(f"Sent rank up message for {username} with {ehb} EHB for comparison in function.")
                         if print_to_csv:
-                            log_ehb_to_csv(username, ehb)
-                    elif rank != result["ehb_old_rank"]:
-                        log(f"Correcting stale rank for {username}: '{result['ehb_old_rank']}' -> '{rank}'")
+                            log_ehb_to_csv(username, ehb, player_id=player.id)
+                    elif rank != result.ehb_old_rank:
+                        log(f"Correcting stale rank for {username}: '{result.ehb_old_rank}' -> '{rank}'")
 
                     # --- EHP side effects ---
-                    if track_ehp and result["ehp_increase"] and ehp is not None:
+                    if track_ehp and result.ehp_increase and ehp is not None:
                         log(f"Player {username} EHP increased to {ehp:.2f}")
                         await send_rank_up_message(
-                            username, ehp_rank, result["ehp_old_rank"], ehp, metric_label="EHP"
+                            username, ehp_rank, result.ehp_old_rank, ehp, metric_label="EHP"
                         )
-                        log_ehp_history(username, ehp)
-
-                    ranks_data[username] = result["entry"]
+                        log_ehp_history(username, ehp, player_id=player.id)
 
                 except Exception as e:
                     player_name = getattr(membership.player, "display_name", "Unknown")
                     log(f"Error processing player data for {player_name}: {e}")
 
             save_ranks(ranks_data)
+            bot_state.roster_version = players_version()
+            record_data_freshness("players")
             log("Rank check completed successfully!")
             bot_state.last_rank_check = datetime.now()
 
         else:
             log(f"Failed to fetch group details: {result.unwrap_err()}")
+            membership_tracker.record_failure(str(result.unwrap_err()))
     except Exception as e:
         log(f"Error occurred during rank check: {e}")
+    finally:
+        if not startup_profile.reported:
+            startup_profile.record_since("first tick", tick_started)
+            log(startup_profile.report())
 
 async def list_all_members_and_ranks():
     try:
         await wom_client.start()
         try:
-            result = await wom_client.groups.get_details(group_id)
+            result = await fetch_group_roster(wom_client, group_id)
         except Exception as fetch_error:
             diagnostic = await diagnose_group_details_fetch()
             log(f"Failed to fetch group details: {fetch_error}. {diagnostic}")
@@ -481,25 +650,23 @@ async def refresh_group_data():
     msg = "❌ Failed to refresh group: unknown error."
 
     try:
-        connector = aiohttp.TCPConnector(family=socket.AF_INET)
-        async with create_tracked_session(connector=connector) as session:
-            async with session.post(url, headers=headers, json=payload) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    updated_count = data.get("count", 0)
-                    if updated_count > 0:
-                        msg = f"✅ Successfully refreshed group data. {updated_count} members updated."
-                    else:
-                        msg = "ℹ️ Group data is already up to date."
-                elif response.status == 400:
-                    error_message = await response.json()
-                    if error_message.get("message") == "Nothing to update.":
-                        msg = "ℹ️ The API reported 'Nothing to update'."
-                    else:
-                        msg = f"❌ Failed to refresh group: {error_message}"
+        async with http_pool.session().post(url, headers=headers, json=payload) as response:
+            if response.status == 200:
+                data = await response.json()
+                updated_count = data.get("count", 0)
+                if updated_count > 0:
+                    msg = f"✅ Successfully refreshed group data. {updated_count} members updated."
+                else:
+                    msg = "ℹ️ Group data is already up to date."
+            elif response.status == 400:
+                error_message = await response.json()
+                if error_message.get("message") == "Nothing to update.":
+                    msg = "ℹ️ The API reported 'Nothing to update'."
                 else:
-                    error_message = await response.text()
                     msg = f"❌ Failed to refresh group: {error_message}"
+            else:
+                error_message = await response.text()
+                msg = f"❌ Failed to refresh group: {error_message}"
     except Exception as e:
         msg = f"❌ Error refreshing WiseOldMan group: {e}"
 
@@ -587,34 +754,52 @@ if __name__ == "__main__":
         asyncio.set_event_loop(loop)
         
         async def main():
-            async with wom_client, contextlib.AsyncExitStack() as stack:
+            global discord_login_started
+            global shared_state_task
+            # Exits in reverse: the wom.py session closes before the shared pool.
+            async with http_pool, wom_client, contextlib.AsyncExitStack() as stack:
                 bot_state.list_all_members_and_ranks = list_all_members_and_ranks
                 bot_state.check_for_rank_changes = check_for_rank_changes
                 bot_state.refresh_group_data = refresh_group_data
                 bot_state.log_func = log
                 bot_state.bot_started_at = datetime.now()
-                db_path = init_database()
+                with startup_profile.phase("database init"):
+                    db_path = init_database()
                 log(f"SQLite database ready at {db_path}")
 
-                ranks_snapshot = load_ranks()
-                if ranks_snapshot:
-                    upsert_players(ranks_snapshot, db_path=db_path)
-                imported_rows = import_csv_history(db_path=db_path)
+                with startup_profile.phase("legacy import"):
+                    ranks_snapshot = load_ranks()
+                    if ranks_snapshot:
+                        upsert_players(ranks_snapshot, db_path=db_path)
+                    imported_rows = import_csv_history(db_path=db_path)
+                    bot_state.roster, bot_state.roster_version = ranks_snapshot, players_version()
                 if imported_rows:
                     log(f"Imported {imported_rows} EHB history rows into SQLite.")
                 elif count_players(db_path=db_path) == 0 and not ranks_snapshot:
                     log("SQLite database initialized with no existing rank or EHB history data.")
 
-                tasks_to_run = [discord_client.start(discord_token)]
+                tasks_to_run = []
 
-                if web_enabled:
-                    web_app = create_app(bot_state, host=web_host, port=web_port, log_func=log)
-                    uvi_config = uvicorn.Config(
-                        web_app, host=web_host, port=web_port, log_level="info"
-                    )
-                    server = uvicorn.Server(uvi_config)
+                if web_enabled and web_mode == "split":
+                    from web.services.shared_state import start_shared_state_publisher
+
+                    shared_state_task = start_shared_state_publisher(bot_state, log=log)
+                    log("Web UI runs separately (mode = split); publishing live state to SQLite.")
+                elif web_enabled:
+                    with startup_profile.phase("web app"):
+                        import uvicorn
+                        from web import create_app
+
+                        web_app = create_app(bot_state, host=web_host, port=web_port, log_func=log)
+                        uvi_config = uvicorn.Config(
+                            web_app, host=web_host, port=web_port, log_level="info"
+                        )
+                        server = uvicorn.Server(uvi_config)
                     tasks_to_run.append(server.serve())
 
+                discord_login_started = time.perf_counter()
+                tasks_to_run.insert(0, discord_client.start(discord_token))
+
                 await asyncio.gather(*tasks_to_run)
         
         try:
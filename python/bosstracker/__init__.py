@@ -0,0 +1,9 @@
+"""Budgeted boss kill-count collection (Feature 1)."""
+
+from .boss_collector import BossCollector, resolve_boss, start_boss_collector
+
+__all__ = [
+    "BossCollector",
+    "resolve_boss",
+    "start_boss_collector",
+]
@@ -0,0 +1,220 @@
+"""Budgeted round-robin boss kill-count collector (Feature 1).
+
+Boss leaderboards come from WOM's group hiscores endpoint, one boss (and up to
+50 members per page) per request. Collecting every boss at once would be a
+burst of dozens of requests, so this module rotates through the configured
+bosses a few per interval. Each tick spends about
+``requests_per_hour * interval / 3600`` requests (a tick always finishes its
+first boss, even one needing more pages), and it stops early whenever
+the shared :class:`utils.api_usage.ApiUsageTracker` shows the per-minute window
+is already half used. The collector therefore stays well clear of the circuit
+breaker.
+
+Snapshots are persisted through :func:`utils.database.log_boss_kills`. A
+leaderboard whose kill counts match the last stored snapshot is not written
+again.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timezone
+import math
+import typing as t
+
+from wom import enums
+
+from gainstracker import resolve_metric
+from utils.api_usage import api_caller, tracker as api_usage_tracker
+from utils.database import format_ts, get_boss_leaderboard, log_boss_kills, record_data_freshness
+
+# WOM caps paginated group endpoints at 50 rows per request.
+_PAGE_SIZE = 50
+
+
+def resolve_boss(name: str) -> t.Optional[enums.Metric]:
+    """Resolve a boss name (e.g. ``"zulrah"``) to its ``Metric``; ``None`` if not a boss."""
+    metric = resolve_metric(name)
+    return metric if metric in enums.Bosses else None
+
+
+def _build_boss_rows(entries: list) -> list[dict]:
+    """Turn hiscores entries into ``log_boss_kills`` rows, dropping unranked players (pure)."""
+    rows: list[dict] = []
+    for entry in entries:
+        player = getattr(entry, "player", None)
+        name = getattr(player, "display_name", None)
+        kills = getattr(getattr(entry, "data", None), "kills", 0) or 0
+        if not name or kills <= 0:
+            continue
+        rank = getattr(entry.data, "rank", None)
+        rows.append(
+            {
+                "username": name,
+                "player_id": getattr(player, "id", None),
+                "kills": int(kills),
+                "rank": rank if rank and rank > 0 else None,
+            }
+        )
+    return rows
+
+
+def _kills_by_player(rows: list[dict]) -> dict[str, int]:
+    return {str(row["username"]).casefold(): int(row["kills"]) for row in rows}
+
+
+class BossCollector:
+    """Rotate through ``bosses``, collecting as many per tick as the request budget allows."""
+
+    def __init__(
+        self,
+        *,
+        wom_client,
+        group_id: int,
+        bosses: list[str],
+        requests_per_hour: int,
+        interval_seconds: int,
+        log,
+        usage=api_usage_tracker,
+    ):
+        self.wom_client = wom_client
+        self.group_id = group_id
+        self.log = log
+        self.usage = usage
+        self.bosses: list[enums.Metric] = []
+        for name in bosses:
+            metric = resolve_boss(name)
+            if metric is None:
+                log(f"Boss collector: unknown boss '{name}', skipping.")
+            elif metric not in self.bosses:
+                self.bosses.append(metric)
+        self.request_budget = max(1, math.floor(requests_per_hour * interval_seconds / 3600))
+        self._cursor = 0
+        # Pages each boss needed last time, so a tick does not start a boss it
+        # cannot finish within the remaining budget.
+        self._pages: dict[str, int] = {}
+        self._last_kills: dict[str, dict[str, int]] = {}
+
+    async def _fetch_leaderboard(
+        self, metric: enums.Metric, max_pages: t.Optional[int]
+    ) -> tuple[t.Optional[list], int]:
+        """Fetch all pages for ``metric``; return ``(entries or None if cut short, requests)``."""
+        entries: list = []
+        requests = 0
+        while True:
+            if (max_pages is not None and requests >= max_pages) or not self.usage.has_headroom():
+                return None, requests
+            result = await self.wom_client.groups.get_hiscores(
+                self.group_id, metric, limit=_PAGE_SIZE, offset=len(entries)
+            )
+            requests += 1
+            if not result.is_ok:
+                raise RuntimeError(f"Failed to fetch hiscores for boss '{metric.value}': {result.unwrap_err()}")
+            page = list(result.unwrap())
+            entries.extend(page)
+            if len(page) < _PAGE_SIZE:
+                return entries, requests
+
+    def _unchanged(self, boss: str, rows: list[dict]) -> bool:
+        if boss not in self._last_kills:
+            self._last_kills[boss] = _kills_by_player(get_boss_leaderboard(boss))
+        return self._last_kills[boss] == _kills_by_player(rows)
+
+    async def collect_once(self, now: t.Optional[datetime] = None) -> dict:
+        """Collect the next bosses in rotation within one tick's request budget.
+
+        Returns ``{"collected": [boss, ...], "written": [boss, ...], "requests": n}``.
+        The rotation only advances past a boss once its full leaderboard was
+        fetched, so a tick cut short by the budget resumes with the same boss.
+        """
+        now = now or datetime.now(timezone.utc)
+        timestamp = format_ts(now)
+        report: dict = {"collected": [], "written": [], "requests": 0}
+        if not self.bosses:
+            return report
+
+        for _ in range(len(self.bosses)):
+            remaining = self.request_budget - report["requests"]
+            metric = self.bosses[self._cursor]
+            boss = metric.value
+            expected = self._pages.get(boss, 1)
+            # The first boss of a tick may overrun a too-small budget; otherwise
+            # a boss needing more pages than the budget would never be collected.
+            if remaining <= 0 or (report["collected"] and expected > remaining):
+                break
+            entries, requests = await self._fetch_leaderboard(
+                metric, max_pages=remaining if report["collected"] else None
+            )
+            report["requests"] += requests
+            if entries is None:
+                break
+            self._pages[boss] = requests
+            self._cursor = (self._cursor + 1) % len(self.bosses)
+            report["collected"].append(boss)
+
+            rows = _build_boss_rows(entries)
+            if self._unchanged(boss, rows):
+                continue
+            log_boss_kills(boss, rows, timestamp=timestamp)
+            self._last_kills[boss] = _kills_by_player(rows)
+            report["written"].append(boss)
+
+        if report["collected"]:
+            record_data_freshness("boss_kills_history", observed_at=timestamp)
+        return report
+
+
+@api_caller("bosses")
+async def _boss_collector_loop(
+    collector: BossCollector,
+    *,
+    interval_seconds: int,
+    initial_delay_seconds: int = 0,
+    debug: bool = False,
+) -> None:
+    if initial_delay_seconds > 0:
+        await asyncio.sleep(initial_delay_seconds)
+
+    while True:
+        try:
+            report = await collector.collect_once()
+            if debug:
+                collector.log(
+                    f"Boss collector: {len(report['collected'])} bosses collected, "
+                    f"{len(report['written'])} changed, {report['requests']} requests."
+                )
+        except Exception as e:  # noqa: BLE001 — a scheduler must not die on one bad cycle
+            collector.log(f"Boss collector loop error: {e}")
+            record_data_freshness("boss_kills_history", success=False, error=str(e))
+
+        await asyncio.sleep(max(interval_seconds, 60))
+
+
+def start_boss_collector(
+    *,
+    wom_client,
+    group_id: int,
+    bosses: list[str],
+    requests_per_hour: int,
+    interval_seconds: int,
+    initial_delay_seconds: int = 0,
+    log,
+    debug: bool = False,
+) -> asyncio.Task:
+    """Start the round-robin boss kill-count collector task."""
+    collector = BossCollector(
+        wom_client=wom_client,
+        group_id=group_id,
+        bosses=bosses,
+        requests_per_hour=requests_per_hour,
+        interval_seconds=interval_seconds,
+        log=log,
+    )
+    return asyncio.create_task(
+        _boss_collector_loop(
+            collector,
+            interval_seconds=interval_seconds,
+            initial_delay_seconds=initial_delay_seconds,
+            debug=debug,
+        )
+    )
@@ -0,0 +1,17 @@
+"""Group competition tracking with adaptive, conditional standings polls."""
+
+from .competition_tracker import (
+    CompetitionTracker,
+    competition_tracker_job,
+    find_overtakes,
+    next_poll_at,
+    rank_standings,
+)
+
+__all__ = [
+    "CompetitionTracker",
+    "competition_tracker_job",
+    "find_overtakes",
+    "next_poll_at",
+    "rank_standings",
+]
@@ -0,0 +1,410 @@
+"""Group competition tracking: discovery, adaptive standings polls, overtakes.
+
+Every interval the tracker spends at most ``requests_per_run`` requests:
+
+- Once an hour it lists the group's competitions
+  (``GET /groups/{id}/competitions``) and stores new or edited ones.
+- It then polls the competitions whose ``next_poll_at`` is due
+  (``GET /competitions/{id}``). A competition is polled rarely while its end is
+  far away and more often as the end approaches (:data:`POLL_STEPS`). It gets
+  one final poll shortly after the end and is then never fetched again.
+
+Both requests are conditional. The tracker sends the ETag WOM returned last
+time as ``If-None-Match`` and also compares a hash of the body, so an
+unchanged response is neither decoded nor written. Bodies are decoded into
+the few fields used here (see :mod:`utils.group_roster`). Standings are stored
+only when a gain or the order changed. A rise into the top ``announce_top``
+past another player is posted as an overtake, and a competition tracked while
+it ran gets its final podium posted.
+
+Calls are tagged ``competitions`` and go through the client's tracked session
+via :func:`utils.http_pool.wom_get`. Like the boss collector, a run stops early
+while the last minute already used half the rate limit, so a dozen live
+competitions cost at most ``requests_per_run`` per interval no matter how close
+their ends are.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from datetime import datetime, timedelta, timezone
+import typing as t
+
+import msgspec
+from wom import routes
+
+from utils.api_usage import api_caller, tracker as api_usage_tracker
+from utils.database import (
+    format_ts,
+    parse_ts,
+    read_competition_standings,
+    read_due_competitions,
+    read_wom_validator,
+    record_data_freshness,
+    store_competition_poll,
+    store_wom_validator,
+    upsert_competitions,
+)
+from utils.http_pool import wom_get
+from utils.job_scheduler import IntervalSchedule, Job
+
+# Newest first; ongoing and upcoming competitions are always on the first page.
+DISCOVERY_PAGE_SIZE = 50
+DISCOVERY_INTERVAL = timedelta(hours=1)
+# (seconds left until the end, poll interval), from the final stretch outwards.
+POLL_STEPS = ((3600, 300), (6 * 3600, 900), (24 * 3600, 3600))
+IDLE_POLL_SECONDS = 6 * 3600
+# Gives members updated in the last minutes time to land before the final read.
+FINAL_POLL_DELAY = timedelta(minutes=10)
+# Competitions that had ended this long before discovery are listed, not fetched.
+FINISHED_LOOKBACK = timedelta(days=30)
+# Overtake lines posted per poll; the rest are only stored.
+MAX_OVERTAKES_PER_POLL = 5
+
+
+class CompetitionFetchError(RuntimeError):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class CompetitionSummary(msgspec.Struct, rename="camel", gc=False):
+    id: int
+    title: str
+    metric: str
+    type: str
+    starts_at: datetime
+    ends_at: datetime
+    participant_count: int = 0
+
+
+class StandingPlayer(msgspec.Struct, rename="camel", gc=False):
+    id: int
+    display_name: str
+
+
+class StandingProgress(msgspec.Struct, rename="camel", gc=False):
+    gained: float = 0.0
+
+
+class StandingEntry(msgspec.Struct, rename="camel", gc=False):
+    player_id: int
+    player: StandingPlayer
+    progress: StandingProgress
+
+
+class CompetitionStandings(msgspec.Struct, rename="camel", gc=False):
+    id: int
+    participations: t.List[StandingEntry] = []
+
+
+_summaries_decoder = msgspec.json.Decoder(t.List[CompetitionSummary])
+_standings_decoder = msgspec.json.Decoder(CompetitionStandings)
+
+
+class Overtake(t.NamedTuple):
+    username: str
+    passed: str
+    rank: int
+    gained: float
+
+
+def next_poll_at(starts_at: datetime, ends_at: datetime, now: datetime) -> t.Optional[datetime]:
+    """When to poll a competition after polling it at ``now``; ``None`` if that poll was the final one (pure)."""
+    if now < starts_at:
+        return starts_at
+    final_at = ends_at + FINAL_POLL_DELAY
+    if now >= final_at:
+        return None
+    left = (ends_at - now).total_seconds()
+    step = next((interval for limit, interval in POLL_STEPS if left <= limit), IDLE_POLL_SECONDS)
+    if now + timedelta(seconds=step) >= ends_at:
+        return final_at
+    return now + timedelta(seconds=step)
+
+
+def rank_standings(entries: t.Iterable[StandingEntry]) -> list[dict]:
+    """Rank the participants who gained anything; equal gains share a rank (pure)."""
+    gainers = sorted(
+        (entry for entry in entries if entry.progress.gained > 0),
+        key=lambda entry: (-entry.progress.gained, entry.player.display_name.casefold(), entry.player_id),
+    )
+    rows: list[dict] = []
+    for position, entry in enumerate(gainers, start=1):
+        tied = rows and rows[-1]["gained"] == entry.progress.gained
+        rows.append(
+            {
+                "player_id": entry.player_id,
+                "username": entry.player.display_name,
+                "rank": rows[-1]["rank"] if tied else position,
+                "gained": entry.progress.gained,
+            }
+        )
+    return rows
+
+
+def find_overtakes(previous: list[dict], current: list[dict], *, top: int) -> list[Overtake]:
+    """Players who rose into the top ``top`` past someone ranked above them before (pure).
+
+    Each climber is reported once, with the best-placed player they passed.
+    """
+    before = {row["player_id"]: row["rank"] for row in previous}
+    overtakes: list[Overtake] = []
+    for row in current:
+        if row["rank"] > top:
+            break
+        old_rank = before.get(row["player_id"])
+        if old_rank is not None and row["rank"] >= old_rank:
+            continue
+        passed = [
+            other
+            for other in current
+            if other["gained"] < row["gained"]
+            and other["player_id"] in before
+            and (old_rank is None or before[other["player_id"]] < old_rank)
+        ]
+        if passed:
+            best = min(passed, key=lambda other: before[other["player_id"]])
+            overtakes.append(Overtake(row["username"], best["username"], row["rank"], row["gained"]))
+    return overtakes
+
+
+def format_gained(metric: str, gained: float) -> str:
+    if metric in ("ehp", "ehb"):
+        return f"{gained:,.2f} {metric.upper()}"
+    return f"{int(gained):,} {metric.replace('_', ' ')}"
+
+
+def _overtake_line(title: str, metric: str, overtake: Overtake) -> str:
+    return (
+        f"🏁 **{overtake.username}** passed **{overtake.passed}** for #{overtake.rank} "
+        f"in **{title}** ({format_gained(metric, overtake.gained)})"
+    )
+
+
+def _final_lines(title: str, metric: str, standings: list[dict]) -> str:
+    lines = [f"🏆 **{title}** has ended!"]
+    for row in standings[:3]:
+        lines.append(f"{row['rank']}. **{row['username']}** ({format_gained(metric, row['gained'])})")
+    if len(lines) == 1:
+        lines.append("Nobody gained anything.")
+    return "\n".join(lines)
+
+
+class CompetitionTracker:
+    """Discover the group's competitions and poll their standings within a per-run request budget."""
+
+    def __init__(
+        self,
+        *,
+        wom_client,
+        group_id: int,
+        requests_per_run: int,
+        announce_top: int,
+        log,
+        usage=api_usage_tracker,
+    ):
+        self.wom_client = wom_client
+        self.group_id = group_id
+        self.requests_per_run = max(int(requests_per_run), 1)
+        self.announce_top = max(int(announce_top), 0)
+        self.log = log
+        self.usage = usage
+        self._discovered_at: t.Optional[datetime] = None
+        self._standings: dict[int, list[dict]] = {}
+
+    async def _fetch_changed(self, route: routes.CompiledRoute) -> t.Optional[tuple[bytes, dict]]:
+        """GET ``route`` conditionally.
+
+        Returns ``None`` when the response matches the stored validator (a 304,
+        or the same body). Otherwise returns the body and the validator to store
+        once the body has been handled, so a failure is retried in full.
+        """
+        uri = route.uri
+        if route.params:
+            uri += "?" + "&".join(f"{key}={value}" for key, value in sorted(route.params.items()))
+        cached = read_wom_validator(uri)
+        headers = {"If-None-Match": cached["etag"]} if cached and cached["etag"] else None
+
+        response = await wom_get(self.wom_client, route, headers=headers)
+        if response.status == 304:
+            return None
+        body = response.body
+        if response.status >= 400:
+            preview = " ".join(body.decode(errors="replace").split())[:200]
+            raise CompetitionFetchError(response.status, f"GET {uri} -> HTTP {response.status}: {preview}")
+        etag = response.headers.get("ETag")
+
+        body_hash = hashlib.blake2b(body, digest_size=16).hexdigest()
+        if cached and cached["body_hash"] == body_hash:
+            if etag != cached["etag"]:
+                store_wom_validator(uri, etag=etag, body_hash=body_hash)
+            return None
+        return body, {"uri": uri, "etag": etag, "body_hash": body_hash}
+
+    async def discover(self, now: datetime) -> list[int]:
+        """List the group's competitions; return the IDs seen for the first time."""
+        route = routes.GROUP_COMPETITIONS.compile(self.group_id).with_params({"limit": DISCOVERY_PAGE_SIZE})
+        fetched = await self._fetch_changed(route)
+        self._discovered_at = now
+        if fetched is None:
+            return []
+        body, validator = fetched
+        rows = []
+        for competition in _summaries_decoder.decode(body):
+            if competition.ends_at + FINISHED_LOOKBACK < now:
+                first_poll = None
+            else:
+                first_poll = max(now, competition.starts_at)
+            rows.append(
+                {
+                    "id": competition.id,
+                    "title": competition.title,
+                    "metric": competition.metric,
+                    "type": competition.type,
+                    "starts_at": format_ts(competition.starts_at),
+                    "ends_at": format_ts(competition.ends_at),
+                    "participant_count": competition.participant_count,
+                    "next_poll_at": format_ts(first_poll) if first_poll else None,
+                }
+            )
+        new = upsert_competitions(self.group_id, rows, now=format_ts(now))
+        store_wom_validator(**validator)
+        return new
+
+    def _previous(self, competition_id: int) -> list[dict]:
+        if competition_id not in self._standings:
+            self._standings[competition_id] = read_competition_standings(competition_id)
+        return self._standings[competition_id]
+
+    async def poll(self, competition: dict, now: datetime) -> tuple[bool, list[str]]:
+        """Poll one competition; return ``(standings changed, messages to post)``."""
+        competition_id = competition["id"]
+        starts_at, ends_at = parse_ts(competition["starts_at"]), parse_ts(competition["ends_at"])
+        upcoming = next_poll_at(starts_at, ends_at, now)
+        final = upcoming is None
+        try:
+            fetched = await self._fetch_changed(routes.COMPETITION_DETAILS.compile(competition_id))
+        except CompetitionFetchError as e:
+            if e.status != 404:
+                raise
+            self.log(f"Competition tracker: competition {competition_id} no longer exists; not polling it again.")
+            store_competition_poll(competition_id, polled_at=format_ts(now), next_poll_at=None, final=True)
+            return False, []
+
+        previous = self._previous(competition_id)
+        current = previous
+        if fetched is not None:
+            current = rank_standings(_standings_decoder.decode(fetched[0]).participations)
+        changed = current != previous
+
+        messages: list[str] = []
+        title, metric = competition["title"], competition["metric"]
+        if final:
+            # Only a competition polled while it ran gets its result posted,
+            # not one discovered after it had already ended.
+            last_polled = competition["last_polled_at"]
+            if last_polled is not None and parse_ts(last_polled) < ends_at:
+                messages.append(_final_lines(title, metric, current))
+        elif changed and previous:
+            overtakes = find_overtakes(previous, current, top=self.announce_top)
+            messages.extend(_overtake_line(title, metric, item) for item in overtakes[:MAX_OVERTAKES_PER_POLL])
+
+        store_competition_poll(
+            competition_id,
+            polled_at=format_ts(now),
+            next_poll_at=format_ts(upcoming) if upcoming else None,
+            standings=current if changed else None,
+            final=final,
+        )
+        if fetched is not None:
+            store_wom_validator(**fetched[1])
+        if final:
+            self._standings.pop(competition_id, None)
+        else:
+            self._standings[competition_id] = current
+        return changed, messages
+
+    async def poll_once(self, now: t.Optional[datetime] = None) -> dict:
+        """Run discovery if due, then poll due competitions within the request budget.
+
+        Returns ``{"discovered": [id, ...], "polled": n, "changed": n,
+        "requests": n, "messages": [str, ...]}``. Competitions left over when
+        the budget or headroom runs out stay due for the next run.
+        """
+        now = now or datetime.now(timezone.utc)
+        report: dict = {"discovered": [], "polled": 0, "changed": 0, "requests": 0, "messages": []}
+
+        discovery_due = self._discovered_at is None or now - self._discovered_at >= DISCOVERY_INTERVAL
+        if discovery_due and self.usage.has_headroom():
+            report["discovered"] = await self.discover(now)
+            report["requests"] += 1
+
+        remaining = self.requests_per_run - report["requests"]
+        due = read_due_competitions(format_ts(now), remaining) if remaining > 0 else []
+        for competition in due:
+            if not self.usage.has_headroom():
+                break
+            changed, messages = await self.poll(competition, now)
+            report["requests"] += 1
+            report["polled"] += 1
+            report["changed"] += int(changed)
+            report["messages"].extend(messages)
+
+        if report["requests"]:
+            record_data_freshness("competitions", observed_at=format_ts(now))
+        return report
+
+
+def competition_tracker_job(
+    *,
+    wom_client,
+    discord_client,
+    group_id: int,
+    channel_id: int,
+    interval_seconds: int,
+    requests_per_run: int,
+    announce_top: int,
+    log,
+    debug: bool = False,
+) -> Job:
+    """Scheduler job running one :meth:`CompetitionTracker.poll_once` per interval.
+
+    Overtakes and final results go to ``channel_id``; ``0`` keeps them in
+    SQLite only.
+    """
+    tracker = CompetitionTracker(
+        wom_client=wom_client,
+        group_id=group_id,
+        requests_per_run=requests_per_run,
+        announce_top=announce_top,
+        log=log,
+    )
+
+    @api_caller("competitions")
+    async def run(_period: datetime) -> None:
+        try:
+            report = await tracker.poll_once()
+        except Exception as e:
+            record_data_freshness("competitions", success=False, error=str(e))
+            raise
+        if debug and report["requests"]:
+            log(
+                f"Competition tracker: {len(report['discovered'])} new, {report['polled']} polled, "
+                f"{report['changed']} changed, {report['requests']} requests."
+            )
+        if channel_id and report["messages"]:
+            channel = discord_client.get_channel(channel_id)
+            if channel is not None:
+                for message in report["messages"]:
+                    await channel.send(message)  # pyright: ignore[reportAttributeAccessIssue]
+
+    interval = max(int(interval_seconds), 60)
+    return Job(
+        name="competition_tracker",
+        schedule=IntervalSchedule(interval),
+        run=run,
+        retry_seconds=interval,
+        initial_delay_seconds=90,
+        run_on_first_start=True,
+    )
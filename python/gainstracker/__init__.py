@@ -3,15 +3,19 @@
 from .gains_snapshotter import (
     build_gains_lines,
     collect_gains_leaderboard,
+    compact_history_once,
     resolve_metric,
+    gains_snapshot_job,
+    history_compaction_job,
     snapshot_gains_once,
-    start_gains_snapshotter,
 )
 
 __all__ = [
     "build_gains_lines",
     "collect_gains_leaderboard",
+    "compact_history_once",
     "resolve_metric",
+    "gains_snapshot_job",
+    "history_compaction_job",
     "snapshot_gains_once",
-    "start_gains_snapshotter",
 ]
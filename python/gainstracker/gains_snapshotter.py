@@ -13,9 +13,9 @@ import typing as t
 
 from wom import enums
 
-from utils.database import log_gains_snapshot, read_latest_gains
-
-_TS_FMT = "%Y-%m-%d %H:%M:%S"
+from utils.api_usage import api_caller
+from utils.database import compact_snapshot_history, format_ts, log_gains_snapshot, read_latest_gains
+from utils.job_scheduler import IntervalSchedule, Job
 
 
 def resolve_metric(name: str) -> t.Optional[enums.Metric]:
@@ -68,7 +68,8 @@ def _build_gains_rows(
     """Turn gains API entries into persistable rows (pure)."""
     rows: list[dict] = []
     for entry in entries:
-        name = getattr(getattr(entry, "player", None), "display_name", None)
+        player = getattr(entry, "player", None)
+        name = getattr(player, "display_name", None)
         if not name:
             continue
         gained = getattr(getattr(entry, "data", None), "gained", 0) or 0
@@ -78,6 +79,7 @@ def _build_gains_rows(
                 "period_start": period_start,
                 "period_end": period_end,
                 "username": name,
+                "player_id": getattr(player, "id", None),
                 "metric": metric,
                 "gained": float(gained),
             }
@@ -100,8 +102,8 @@ async def snapshot_gains_once(
     """
     now = now or datetime.now(timezone.utc)
     period_start = now - timedelta(days=window_days)
-    snapshot_str = now.strftime(_TS_FMT)
-    start_str = period_start.strftime(_TS_FMT)
+    snapshot_str = format_ts(now)
+    start_str = format_ts(period_start)
 
     all_rows: list[dict] = []
     valid_metrics = 0
@@ -165,53 +167,36 @@ def build_gains_lines(metric_name: str, window_days: int, leaderboard: list[tupl
     return lines
 
 
-async def _gains_snapshot_loop(
+def compact_history_once(
     *,
-    wom_client,
-    discord_client,
-    group_id: int,
-    channel_id: int,
-    metrics: list[str],
-    window_days: int,
-    interval_seconds: int,
-    initial_delay_seconds: int = 0,
+    raw_retention_days: int,
+    daily_retention_days: int,
     log,
-    on_snapshot=None,
-    debug: bool = False,
-) -> None:
-    if initial_delay_seconds > 0:
-        await asyncio.sleep(initial_delay_seconds)
-
-    while True:
-        try:
-            inserted = await snapshot_gains_once(
-                wom_client=wom_client,
-                group_id=group_id,
-                metrics=metrics,
-                window_days=window_days,
-                log=log,
-            )
-            if debug:
-                log(f"Gains snapshot stored {inserted} rows.")
-            if on_snapshot is not None:
-                on_snapshot()
-
-            if channel_id and metrics:
-                primary = metrics[0]
-                leaderboard = [
-                    (row["username"], row["gained"]) for row in read_latest_gains(primary, limit=15)
-                ]
-                lines = build_gains_lines(primary, window_days, leaderboard)
-                channel = discord_client.get_channel(channel_id)
-                if channel is not None:
-                    await channel.send("```\n" + "\n".join(lines) + "\n```")  # pyright: ignore[reportAttributeAccessIssue]
-        except Exception as e:  # noqa: BLE001 — a scheduler must not die on one bad cycle
-            log(f"Gains snapshot loop error: {e}")
-
-        await asyncio.sleep(max(interval_seconds, 60))
-
-
-def start_gains_snapshotter(
+    now: t.Optional[datetime] = None,
+) -> t.Optional[dict]:
+    """Run one retention pass over the snapshot tables.
+
+    A non-positive ``raw_retention_days`` disables compaction and returns
+    ``None``; otherwise the result of ``compact_snapshot_history`` is returned.
+    """
+    if raw_retention_days <= 0:
+        return None
+    result = compact_snapshot_history(
+        raw_retention_days=raw_retention_days,
+        daily_retention_days=daily_retention_days,
+        now=now,
+    )
+    removed = sum(result["deleted"].values())
+    if removed:
+        per_table = ", ".join(f"{table}={count}" for table, count in result["deleted"].items())
+        log(
+            f"Snapshot retention removed {removed} superseded rows ({per_table}); "
+            f"~{result['reclaimed_bytes'] // 1024} KiB freed for reuse."
+        )
+    return result
+
+
+def gains_snapshot_job(
     *,
     wom_client,
     discord_client,
@@ -224,20 +209,77 @@ def start_gains_snapshotter(
     log,
     on_snapshot=None,
     debug: bool = False,
-) -> asyncio.Task:
-    """Start the daily gains-snapshot task (persists + optional Discord digest)."""
-    return asyncio.create_task(
-        _gains_snapshot_loop(
+) -> Job:
+    """Scheduler job for the gains snapshot (persists, optional Discord digest).
+
+    Runs once per ``interval_seconds`` period, the first time right after
+    ``initial_delay_seconds``. Periods missed while the bot was down become one
+    catch-up snapshot. A failed snapshot is retried instead of waiting a
+    whole interval.
+    """
+    interval_seconds = max(interval_seconds, 60)
+
+    @api_caller("gains")
+    async def run(_period: datetime) -> None:
+        inserted = await snapshot_gains_once(
             wom_client=wom_client,
-            discord_client=discord_client,
             group_id=group_id,
-            channel_id=channel_id,
             metrics=metrics,
             window_days=window_days,
-            interval_seconds=interval_seconds,
-            initial_delay_seconds=initial_delay_seconds,
             log=log,
-            on_snapshot=on_snapshot,
-            debug=debug,
         )
+        if debug:
+            log(f"Gains snapshot stored {inserted} rows.")
+        if on_snapshot is not None:
+            on_snapshot()
+
+        if channel_id and metrics:
+            primary = metrics[0]
+            leaderboard = [
+                (row["username"], row["gained"]) for row in read_latest_gains(primary, limit=15)
+            ]
+            lines = build_gains_lines(primary, window_days, leaderboard)
+            channel = discord_client.get_channel(channel_id)
+            if channel is not None:
+                await channel.send("```\n" + "\n".join(lines) + "\n```")  # pyright: ignore[reportAttributeAccessIssue]
+
+    return Job(
+        name="gains_snapshot",
+        schedule=IntervalSchedule(interval_seconds),
+        run=run,
+        jitter_seconds=min(600, interval_seconds / 10),
+        retry_seconds=min(900, interval_seconds),
+        initial_delay_seconds=initial_delay_seconds,
+        run_on_first_start=True,
+    )
+
+
+def history_compaction_job(
+    *,
+    raw_retention_days: int,
+    daily_retention_days: int,
+    log,
+    initial_delay_seconds: int = 300,
+) -> Job:
+    """Daily scheduler job thinning the snapshot tables (see ``compact_history_once``).
+
+    The SQLite work runs in a worker thread so the window-sorting deletes never
+    block the event loop.
+    """
+
+    async def run(_period: datetime) -> None:
+        await asyncio.to_thread(
+            compact_history_once,
+            raw_retention_days=raw_retention_days,
+            daily_retention_days=daily_retention_days,
+            log=log,
+        )
+
+    return Job(
+        name="history_compaction",
+        schedule=IntervalSchedule(86400),
+        run=run,
+        retry_seconds=3600,
+        initial_delay_seconds=initial_delay_seconds,
+        run_on_first_start=True,
     )
@@ -8,9 +8,22 @@ happening. This module is the safety net for the next one:
 
 - Every outbound call is classified, timed, and persisted to SQLite
   (``utils.database.log_api_call``) so usage is auditable after the fact.
-- A rolling per-minute rate counter trips a circuit breaker that blocks
-  further outbound calls for a cooldown period, so a future runaway loop
-  gets stopped automatically instead of running until someone notices.
+- Calls are scheduled by caller (:data:`CALLER_POLICIES`). Each caller has a
+  token bucket sized to its share of ``rate_limit_per_minute``, and callers
+  compete for the shared per-minute window in priority order: rank check,
+  then gains snapshots, then reports, boss collection and competition polls,
+  then diagnostics, then backfills. A
+  report burst is queued and paced and never delays the rank check. Code tags
+  its calls with :class:`api_caller`.
+- Transient failures (429, 5xx, connection errors) are retried with jittered
+  exponential backoff that honours ``Retry-After`` (:class:`RetryPolicy`).
+  Every attempt is scheduled and counted like any other call.
+- A caller with more calls queued than its own share of a minute has new
+  calls rejected (:class:`ApiCallShedError`); other callers are unaffected.
+- A circuit breaker remains as the last resort. It trips when one caller keeps
+  its token bucket empty for ``runaway_seconds`` (a runaway loop, even a
+  sequential one), or when calls bypass the scheduler and exceed the
+  per-minute limit. It then blocks every outbound call for a cooldown period.
 
 Every ``aiohttp.ClientSession`` that talks to the WOM API — the wom.py
 client's internal session and any raw diagnostic/admin session — must be
@@ -19,15 +32,23 @@ constructed via :func:`create_tracked_session` so nothing can bypass this.
 
 from __future__ import annotations
 
+import asyncio
+import contextvars
+import email.utils
+import functools
+import itertools
+import random
 import re
 import time
 from dataclasses import dataclass
 from collections import deque
+from datetime import datetime, timezone
 from typing import Callable, Optional
 
 import aiohttp
 
 from .database import log_api_call
+from .event_feed import EventFeed
 
 # Every WOM route this bot's code actually calls today, for reference (see
 # wom.py's own routes.py for the full, authoritative catalog — that library
@@ -39,6 +60,8 @@ from .database import log_api_call
 #   GET  /groups/{id}/achievements     groups.get_achievements
 #   GET  /groups/{id}/name-changes     groups.get_name_changes
 #   GET  /groups/{id}/statistics       groups.get_statistics
+#   GET  /groups/{id}/competitions     raw conditional fetch (competitiontracker)
+#   GET  /competitions/{id}            raw conditional fetch (competitiontracker)
 #
 # A previous version of this function matched "/gains" instead of the real
 # "/gained" path segment above, so every gains call silently fell into the
@@ -69,6 +92,108 @@ class ApiCircuitOpenError(RuntimeError):
     """Raised in place of making a request while the circuit breaker is open."""
 
 
+class ApiCallShedError(RuntimeError):
+    """Raised in place of queueing a call when its caller's queue is already full."""
+
+
+# ---------------------------------------------------------------------------
+# Caller priorities
+# ---------------------------------------------------------------------------
+
+
+@dataclass(frozen=True)
+class CallerPolicy:
+    """How one caller's requests are scheduled.
+
+    ``priority``: lower is admitted first when callers wait for the same
+    window slot. ``share``: fraction of ``rate_limit_per_minute`` the caller's
+    token bucket refills at. ``headroom``: fraction of the per-minute window
+    the caller leaves free for higher priorities.
+    """
+
+    priority: int
+    share: float
+    headroom: float = 0.0
+
+
+CALLER_POLICIES: dict[str, CallerPolicy] = {
+    "rank_check": CallerPolicy(priority=0, share=1.0),
+    "gains": CallerPolicy(priority=1, share=0.5, headroom=0.1),
+    "reports": CallerPolicy(priority=2, share=0.5, headroom=0.25),
+    # Boss hiscores collection: its own bucket, so it never drains the gains snapshot's.
+    "bosses": CallerPolicy(priority=2, share=0.25, headroom=0.25),
+    # Competition standings polls; the tracker also caps its own requests per run.
+    "competitions": CallerPolicy(priority=2, share=0.25, headroom=0.25),
+    # Slash commands and anything else that is not tagged.
+    "other": CallerPolicy(priority=2, share=0.5, headroom=0.25),
+    "diagnostics": CallerPolicy(priority=3, share=0.25, headroom=0.5),
+    # Operator-requested historical backfills: last in line, a trickle at most.
+    "backfill": CallerPolicy(priority=4, share=0.1, headroom=0.6),
+}
+DEFAULT_CALLER = "other"
+
+_current_caller: contextvars.ContextVar[str] = contextvars.ContextVar("wom_api_caller", default=DEFAULT_CALLER)
+
+
+def current_caller() -> str:
+    """Return the caller the current task's WOM API calls are scheduled as."""
+    caller = _current_caller.get()
+    return caller if caller in CALLER_POLICIES else DEFAULT_CALLER
+
+
+class api_caller:
+    """Schedule the WOM API calls made inside a block as ``name``'s.
+
+    Use as ``with api_caller("reports"): ...`` or as a decorator on a coroutine
+    function. Tasks created inside the block inherit the tag.
+    """
+
+    def __init__(self, name: str) -> None:
+        if name not in CALLER_POLICIES:
+            raise ValueError(f"Unknown WOM API caller {name!r}; expected one of {sorted(CALLER_POLICIES)}.")
+        self.name = name
+        self._tokens: list[contextvars.Token] = []
+
+    def __enter__(self) -> "api_caller":
+        self._tokens.append(_current_caller.set(self.name))
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        _current_caller.reset(self._tokens.pop())
+
+    def __call__(self, func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            with api_caller(self.name):
+                return await func(*args, **kwargs)
+
+        return wrapper
+
+
+class TokenBucket:
+    """``capacity`` tokens, refilled at ``rate`` tokens per second."""
+
+    def __init__(self, rate: float, capacity: float, now: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = now
+
+    def _refill(self, now: float) -> None:
+        elapsed = max(0.0, now - self.updated_at)
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+        self.updated_at = max(self.updated_at, now)
+
+    def delay(self, now: float) -> float:
+        """Seconds until a token is available; ``0`` if one is now."""
+        self._refill(now)
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self, now: float) -> None:
+        self._refill(now)
+        self.tokens -= 1
+
+
 @dataclass
 class _BreakerState:
     open_until: Optional[float] = None
@@ -76,20 +201,31 @@ class _BreakerState:
 
 
 class ApiUsageTracker:
-    """Rolling-window rate tracker and circuit breaker shared by every session."""
+    """Rolling-window rate tracker, caller scheduler and circuit breaker shared by every session."""
 
     def __init__(
         self,
         *,
         rate_limit_per_minute: int = 30,
         cooldown_seconds: int = 300,
+        runaway_seconds: int = 600,
         log: Callable[[str], None] = print,
     ) -> None:
         self.rate_limit_per_minute = rate_limit_per_minute
         self.cooldown_seconds = cooldown_seconds
+        self.runaway_seconds = runaway_seconds
         self._log = log
         self._recent: deque = deque()
         self._breaker = _BreakerState()
+        self._buckets: dict[str, TokenBucket] = {}
+        # (priority, arrival) ticket -> caller, for every call waiting in acquire().
+        self._waiting: dict[tuple[int, int], str] = {}
+        self._tickets = itertools.count()
+        # caller -> when its calls started finding its token bucket empty on arrival.
+        self._saturated_since: dict[str, float] = {}
+        self._changed: Optional[asyncio.Future] = None
+        # Every audited call is also published here for live admin views.
+        self.events = EventFeed(maxlen=200)
 
     def configure(
         self,
@@ -100,18 +236,137 @@ class ApiUsageTracker:
     ) -> None:
         self.rate_limit_per_minute = rate_limit_per_minute
         self.cooldown_seconds = cooldown_seconds
+        self._buckets.clear()
+        self._saturated_since.clear()
         if log is not None:
             self._log = log
 
+    def max_queued(self, caller: str) -> int:
+        """Waiting calls ``caller`` may have before new ones are shed: a minute of its share."""
+        return max(1, int(self.rate_limit_per_minute * CALLER_POLICIES[caller].share))
+
+    def queued_calls(self) -> dict[str, int]:
+        """Return how many calls each caller has waiting for a slot."""
+        counts: dict[str, int] = {}
+        for caller in self._waiting.values():
+            counts[caller] = counts.get(caller, 0) + 1
+        return counts
+
+    async def acquire(self, method: str, endpoint: str, caller: Optional[str] = None) -> None:
+        """Wait for ``caller``'s turn, then admit ``method endpoint`` via :meth:`before_request`.
+
+        A call waits for a token from its caller's bucket and for room in the
+        per-minute window below the caller's headroom. When several calls could
+        take the same slot, the higher-priority (then earlier) one goes first.
+        Raises :class:`ApiCircuitOpenError` while the breaker is open, and
+        :class:`ApiCallShedError` when ``caller`` already has
+        :meth:`max_queued` calls waiting. Trips the breaker when ``caller``'s
+        calls have found its bucket empty for ``runaway_seconds``.
+        """
+        caller = caller if caller in CALLER_POLICIES else current_caller()
+        self._check_breaker(method, endpoint)
+        queued = sum(1 for waiting in self._waiting.values() if waiting == caller)
+        if queued >= self.max_queued(caller):
+            raise ApiCallShedError(
+                f"{queued} {caller} WOM API call(s) already queued; dropping {method} {endpoint}."
+            )
+        self._check_runaway(caller, method, endpoint, time.monotonic())
+
+        ticket = (CALLER_POLICIES[caller].priority, next(self._tickets))
+        self._waiting[ticket] = caller
+        try:
+            while True:
+                now = time.monotonic()
+                delay = self._admission_delay(ticket, caller, now)
+                if delay == 0:
+                    break
+                await self._wait_for_change(delay)
+                self._check_breaker(method, endpoint)
+            self._bucket(caller, now).take(now)
+            del self._waiting[ticket]
+            self.before_request(method, endpoint)
+        finally:
+            self._waiting.pop(ticket, None)
+            self._notify()
+
+    def _check_runaway(self, caller: str, method: str, endpoint: str, now: float) -> None:
+        """Trip the breaker once ``caller`` has kept its bucket empty for ``runaway_seconds``.
+
+        A caller that pauses long enough to refill a token is reset, so only a
+        loop that keeps calling at its full paced rate gets here.
+        """
+        if self._bucket(caller, now).delay(now) == 0:
+            self._saturated_since.pop(caller, None)
+            return
+        since = self._saturated_since.setdefault(caller, now)
+        if now - since >= self.runaway_seconds:
+            self._saturated_since.pop(caller, None)
+            self._trip(method, endpoint, f"{caller} calls kept its budget exhausted for {int(now - since)}s")
+
+    def _bucket(self, caller: str, now: float) -> TokenBucket:
+        bucket = self._buckets.get(caller)
+        if bucket is None:
+            per_minute = max(1.0, self.rate_limit_per_minute * CALLER_POLICIES[caller].share)
+            # Up to 15 seconds' worth of calls may go out back to back.
+            bucket = self._buckets[caller] = TokenBucket(per_minute / 60, max(1.0, per_minute / 4), now)
+        return bucket
+
+    def _window_limit(self, caller: str) -> int:
+        return max(1, int(self.rate_limit_per_minute * (1 - CALLER_POLICIES[caller].headroom)))
+
+    def _trim_window(self, now: float) -> None:
+        window_start = now - 60
+        while self._recent and self._recent[0] <= window_start:
+            self._recent.popleft()
+
+    def _admission_delay(self, ticket: tuple[int, int], caller: str, now: float) -> Optional[float]:
+        """Seconds until ``ticket`` may go; ``0`` for now, ``None`` to wait for a higher-priority call."""
+        self._trim_window(now)
+        delay = self._bucket(caller, now).delay(now)
+        limit = self._window_limit(caller)
+        if len(self._recent) >= limit:
+            # Room opens up as the oldest admitted calls leave the window.
+            delay = max(delay, self._recent[len(self._recent) - limit] + 60 - now)
+        if delay > 0:
+            return delay
+        # A higher-priority waiter with a token is admitted first. Its window
+        # limit is at least ours, so if we fit, it fits.
+        for other, other_caller in self._waiting.items():
+            if other < ticket and self._bucket(other_caller, now).delay(now) == 0:
+                return None
+        return 0.0
+
+    async def _wait_for_change(self, timeout: Optional[float]) -> None:
+        """Sleep up to ``timeout`` seconds, waking early when a call is admitted or gives up."""
+        loop = asyncio.get_running_loop()
+        if self._changed is None or self._changed.done() or self._changed.get_loop() is not loop:
+            self._changed = loop.create_future()
+        await asyncio.wait({self._changed}, timeout=timeout)
+
+    def _notify(self) -> None:
+        changed = self._changed
+        if changed is not None and not changed.done() and not changed.get_loop().is_closed():
+            changed.set_result(None)
+
     def before_request(self, method: str, endpoint: str) -> None:
         """Raise :class:`ApiCircuitOpenError` if this call should be blocked.
 
         Must be called synchronously, before any network I/O happens, so a
         tight retry loop that ignores the exception can't still slip real
-        requests out between checks.
+        requests out between checks. :meth:`acquire` calls it once a scheduled
+        call is admitted; calling it directly skips the scheduler.
         """
+        self._check_breaker(method, endpoint)
         now = time.monotonic()
+        self._recent.append(now)
+        self._trim_window(now)
 
+        if len(self._recent) > self.rate_limit_per_minute:
+            self._trip(method, endpoint, f"more than {self.rate_limit_per_minute} requests/min")
+
+    def _check_breaker(self, method: str, endpoint: str) -> None:
+        """Raise while the breaker is open; close it once the cooldown has passed."""
+        now = time.monotonic()
         if self._breaker.open_until is not None:
             if now < self._breaker.open_until:
                 self._breaker.blocked_since_open += 1
@@ -125,32 +380,28 @@ class ApiUsageTracker:
                 f"WOM API circuit breaker closed after cooldown "
                 f"({blocked} call(s) were blocked while open)."
             )
-            log_api_call(
+            self._record(
                 method=method, endpoint=endpoint,
                 status_code=None, duration_ms=None, outcome="circuit_closed",
             )
 
-        self._recent.append(now)
-        window_start = now - 60
-        while self._recent and self._recent[0] < window_start:
-            self._recent.popleft()
-
-        if len(self._recent) > self.rate_limit_per_minute:
-            self._breaker = _BreakerState(open_until=now + self.cooldown_seconds, blocked_since_open=1)
-            self._recent.clear()
-            self._log(
-                f"WOM API circuit breaker OPEN: more than {self.rate_limit_per_minute} "
-                f"requests/min, triggered by {method} {endpoint}. Pausing all WOM API "
-                f"calls for {self.cooldown_seconds}s."
-            )
-            log_api_call(
-                method=method, endpoint=endpoint,
-                status_code=None, duration_ms=None, outcome="circuit_opened",
-            )
-            raise ApiCircuitOpenError(
-                f"WOM API circuit breaker just tripped on {method} {endpoint}; "
-                f"pausing for {self.cooldown_seconds}s."
-            )
+    def _trip(self, method: str, endpoint: str, reason: str) -> None:
+        """Open the breaker, wake every queued call so it fails too, and raise."""
+        self._breaker = _BreakerState(open_until=time.monotonic() + self.cooldown_seconds, blocked_since_open=1)
+        self._recent.clear()
+        self._log(
+            f"WOM API circuit breaker OPEN: {reason}, triggered by {method} {endpoint}. "
+            f"Pausing all WOM API calls for {self.cooldown_seconds}s."
+        )
+        self._record(
+            method=method, endpoint=endpoint,
+            status_code=None, duration_ms=None, outcome="circuit_opened",
+        )
+        self._notify()
+        raise ApiCircuitOpenError(
+            f"WOM API circuit breaker just tripped on {method} {endpoint}; "
+            f"pausing for {self.cooldown_seconds}s."
+        )
 
     def record_completed(
         self,
@@ -166,17 +417,34 @@ class ApiUsageTracker:
             self._log(f"WOM API {method} {endpoint} -> {status_code} ({duration_ms}ms)")
         else:
             self._log(f"WOM API {method} {endpoint} -> {outcome} ({duration_ms}ms)")
-        log_api_call(
+        self._record(
             method=method, endpoint=endpoint,
             status_code=status_code, duration_ms=duration_ms, outcome=outcome,
             user_agent=user_agent,
         )
 
+    def _record(self, **call) -> None:
+        """Persist one audit row and publish it to :attr:`events`."""
+        call.setdefault("user_agent", None)
+        call["timestamp"] = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+        log_api_call(**call)
+        self.events.publish(call)
+
     def calls_in_last(self, seconds: int) -> int:
         """Count real (non-blocked) calls within the trailing window, in-memory."""
         cutoff = time.monotonic() - seconds
         return sum(1 for t in self._recent if t >= cutoff)
 
+    def has_headroom(self, fraction: float = 0.5) -> bool:
+        """Whether the breaker is closed and under ``fraction`` of the per-minute limit was used.
+
+        Opportunistic collectors check this before each page so they back off
+        well before their calls would queue behind the token buckets.
+        """
+        if self.breaker_status()["open"]:
+            return False
+        return self.calls_in_last(60) < int(self.rate_limit_per_minute * fraction)
+
     def breaker_status(self) -> dict:
         now = time.monotonic()
         is_open = self._breaker.open_until is not None and now < self._breaker.open_until
@@ -192,12 +460,96 @@ class ApiUsageTracker:
 tracker = ApiUsageTracker()
 
 
+# ---------------------------------------------------------------------------
+# Retries
+# ---------------------------------------------------------------------------
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+# Only 429 is retried for other methods: the server did not act on the request.
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """How a tracked session retries transient failures.
+
+    ``attempts`` includes the first try. No retry is started that would begin
+    later than ``deadline_seconds`` after the first attempt; the last response
+    or error is returned instead.
+    """
+
+    attempts: int = 3
+    base_delay: float = 0.5
+    max_delay: float = 8.0
+    deadline_seconds: float = 30.0
+
+
+DEFAULT_RETRY_POLICY = RetryPolicy()
+
+
+def parse_retry_after(value: Optional[str], now: Optional[datetime] = None) -> Optional[float]:
+    """Return the seconds a ``Retry-After`` header asks for (delta or HTTP date), or ``None``."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    now = now or datetime.now(timezone.utc)
+    return max(0.0, (when - now).total_seconds())
+
+
+def backoff_delay(policy: RetryPolicy, retry: int, retry_after: Optional[float] = None) -> float:
+    """Full-jitter exponential delay before retry number ``retry`` (1-based), never below ``retry_after``."""
+    delay = random.uniform(0, min(policy.max_delay, policy.base_delay * 2 ** (retry - 1)))
+    return delay if retry_after is None else max(delay, retry_after)
+
+
+def _retry_middleware(policy: RetryPolicy):
+    """Build an aiohttp client middleware that retries transient failures per ``policy``."""
+
+    async def middleware(request, handler):
+        deadline = time.monotonic() + policy.deadline_seconds
+        idempotent = request.method.upper() in IDEMPOTENT_METHODS
+        retry = 0
+        while True:
+            retry += 1
+            try:
+                response = await handler(request)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                delay = backoff_delay(policy, retry)
+                if not idempotent or retry >= policy.attempts or time.monotonic() + delay > deadline:
+                    raise
+                reason = type(e).__name__
+            else:
+                status = response.status
+                if status not in RETRY_STATUSES or retry >= policy.attempts or not (idempotent or status == 429):
+                    return response
+                delay = backoff_delay(policy, retry, parse_retry_after(response.headers.get("Retry-After")))
+                if time.monotonic() + delay > deadline:
+                    return response
+                response.release()
+                reason = f"HTTP {status}"
+            tracker._log(
+                f"WOM API {request.method} {classify_endpoint(str(request.url))} -> {reason}; "
+                f"retry {retry}/{policy.attempts - 1} in {delay:.1f}s"
+            )
+            await asyncio.sleep(delay)
+
+    return middleware
+
+
 async def _tracking_middleware(request, handler):
-    """aiohttp client middleware: gate + time + log every request through ``tracker``."""
+    """aiohttp client middleware: schedule + time + log every request through ``tracker``."""
     endpoint = classify_endpoint(str(request.url))
     method = request.method
     user_agent = request.headers.get("User-Agent")
-    tracker.before_request(method, endpoint)
+    await tracker.acquire(method, endpoint)
 
     start = time.monotonic()
     try:
@@ -218,14 +570,20 @@ async def _tracking_middleware(request, handler):
     return response
 
 
-def create_tracked_session(**kwargs) -> aiohttp.ClientSession:
+def create_tracked_session(
+    *, retry: Optional[RetryPolicy] = DEFAULT_RETRY_POLICY, **kwargs
+) -> aiohttp.ClientSession:
     """Build an ``aiohttp.ClientSession`` that reports every request to ``tracker``.
 
     Use this instead of ``aiohttp.ClientSession(...)`` for every session that
     talks to the WOM API, so no outbound call — scheduled task, slash command,
     or one-off diagnostic — can bypass the shared rate tracking and circuit
-    breaker.
+    breaker. Transient failures are retried per ``retry``; pass ``None`` to
+    disable that. The retry layer sits outside the tracking one, so every
+    attempt is scheduled and logged.
     """
     middlewares = list(kwargs.pop("middlewares", ()))
+    if retry is not None:
+        middlewares.append(_retry_middleware(retry))
     middlewares.append(_tracking_middleware)
     return aiohttp.ClientSession(middlewares=middlewares, **kwargs)
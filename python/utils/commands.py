@@ -7,10 +7,8 @@ the recommended way for bots to interact with users.
 
 from datetime import datetime, timezone
 import os
-import socket
 from typing import Optional
 
-import aiohttp
 from discord import app_commands, Interaction
 from discord.ext import commands
 
@@ -21,20 +19,11 @@ from .rank_utils import (
     next_rank_ehp,
     save_ranks,
 )
-from .api_usage import create_tracked_session
+from .api_usage import api_caller
+from .http_pool import pool as http_pool
 from gainstracker import build_gains_lines, collect_gains_leaderboard, resolve_metric
-from weeklyupdater import (
-    generate_monthly_report_messages,
-    generate_weekly_report_messages,
-    generate_yearly_report_messages,
-    most_recent_month_end,
-    most_recent_year_end,
-    most_recent_week_end,
-    send_monthly_report,
-    send_yearly_report,
-    send_weekly_report,
-    write_yearly_report_file,
-)
+# weeklyupdater is imported inside the report commands, which only run when
+# reports are enabled, so it is not loaded at startup.
 
 
 def _chunk_code_block(lines: list[str], limit: int = 1990) -> list[str]:
@@ -243,6 +232,8 @@ def setup_commands(
         if not reports_enabled:
             await interaction.response.send_message(_REPORTS_DISABLED_MESSAGE, ephemeral=True)
             return
+        from weeklyupdater import generate_weekly_report_messages, most_recent_week_end, send_weekly_report
+
         if not weekly_channel_id:
             await interaction.response.send_message(
                 "❌ weekly_channel_id not configured.", ephemeral=True
@@ -278,6 +269,8 @@ def setup_commands(
         if not reports_enabled:
             await interaction.response.send_message(_REPORTS_DISABLED_MESSAGE, ephemeral=True)
             return
+        from weeklyupdater import generate_monthly_report_messages, most_recent_month_end, send_monthly_report
+
         if not monthly_channel_id:
             await interaction.response.send_message(
                 "❌ monthly_channel_id not configured.", ephemeral=True
@@ -313,6 +306,8 @@ def setup_commands(
         if not reports_enabled:
             await interaction.response.send_message(_REPORTS_DISABLED_MESSAGE, ephemeral=True)
             return
+        from weeklyupdater import generate_yearly_report_messages, most_recent_year_end, send_yearly_report
+
         if not yearly_channel_id:
             await interaction.response.send_message(
                 "❌ yearly_channel_id not configured.", ephemeral=True
@@ -370,6 +365,8 @@ def setup_commands(
         if not reports_enabled:
             await interaction.response.send_message(_REPORTS_DISABLED_MESSAGE, ephemeral=True)
             return
+        from weeklyupdater import generate_yearly_report_messages, most_recent_year_end, write_yearly_report_file
+
         await interaction.response.defer(ephemeral=True)
 
         try:
@@ -450,28 +447,27 @@ def setup_commands(
     # Command: /debug_group --- Debugging command to inspect the group response.
 
     @bot.tree.command(name="debug_group", description="Debugs and inspects group response.")
+    @api_caller("diagnostics")
     async def debug_group(interaction: Interaction):
         url = f"https://api.wiseoldman.net/v2/groups/{GROUP_ID}"
         try:
-            connector = aiohttp.TCPConnector(family=socket.AF_INET)
-            async with create_tracked_session(connector=connector) as session:
-                async with session.get(url) as response:
-                    if response.status == 200:
-                        group_data = await response.json()
-                        group_name = group_data.get("name", "Unknown")
-                        member_count = len(group_data.get("memberships", []))
-                        await interaction.response.send_message(
-                            f"Group Name: {group_name}\nMembers: {member_count}"
-                        )
-                        # Log the full group data for manual inspection
-                        if debug:
-                            print(group_data)
-                    else:
-                        error_message = await response.text()
-                        await interaction.response.send_message(
-                            f"Failed to fetch group details: {error_message}",
-                            ephemeral=True,
-                        )
+            async with http_pool.session().get(url) as response:
+                if response.status == 200:
+                    group_data = await response.json()
+                    group_name = group_data.get("name", "Unknown")
+                    member_count = len(group_data.get("memberships", []))
+                    await interaction.response.send_message(
+                        f"Group Name: {group_name}\nMembers: {member_count}"
+                    )
+                    # Log the full group data for manual inspection
+                    if debug:
+                        print(group_data)
+                else:
+                    error_message = await response.text()
+                    await interaction.response.send_message(
+                        f"Failed to fetch group details: {error_message}",
+                        ephemeral=True,
+                    )
         except Exception as e:
             await interaction.response.send_message(
                 f"Error fetching group details: {e}", ephemeral=True
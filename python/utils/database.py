@@ -3,14 +3,46 @@
 from __future__ import annotations
 
 import csv
+import json
 import os
+import pathlib
 import re
 import sqlite3
+import typing as t
 from contextlib import closing
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
+
+from .roster import Roster
 
 DEFAULT_DB_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "database.db")
 
+# Every stored TEXT timestamp is UTC in this format, so it sorts and compares
+# lexically.
+TS_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def format_ts(value: object) -> str | None:
+    """Format a datetime as a stored timestamp; naive values are taken as UTC.
+
+    Anything that is not a datetime (e.g. a missing API field) yields ``None``.
+    """
+    if not isinstance(value, datetime):
+        return None
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return value.strftime(TS_FORMAT)
+
+
+def parse_ts(value: str | None) -> datetime | None:
+    """Parse a stored timestamp as an aware UTC datetime; ``None`` if empty or malformed."""
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, TS_FORMAT).replace(tzinfo=timezone.utc)
+    except ValueError:
+        return None
+
+
 # SQLite cannot bind table/column names as parameters, so identifiers used in
 # DDL are interpolated directly. Restrict them to a safe character set so the
 # f-strings below can never carry injected SQL, even if a caller is changed.
@@ -29,6 +61,16 @@ def resolve_db_path() -> str:
     return os.environ.get("WOM_DATABASE_PATH", DEFAULT_DB_FILE)
 
 
+# The standalone dashboard (``python -m web``) sets this so every connection it
+# opens is read-only; the bot process remains the only writer and schema owner.
+READ_ONLY_ENV = "WOM_DATABASE_READONLY"
+
+
+def database_read_only() -> bool:
+    """Return whether this process may only read the database."""
+    return os.environ.get(READ_ONLY_ENV, "").strip().lower() in {"1", "true", "yes", "on"}
+
+
 def _ensure_columns(conn: sqlite3.Connection, table: str, columns: dict[str, str]) -> None:
     """Idempotently add missing columns to an existing table.
 
@@ -47,8 +89,16 @@ def _ensure_columns(conn: sqlite3.Connection, table: str, columns: dict[str, str
 
 
 def connect_db(db_path: str | None = None) -> sqlite3.Connection:
-    """Open a SQLite connection with row access enabled."""
-    conn = sqlite3.connect(db_path or resolve_db_path())
+    """Open a SQLite connection with row access enabled.
+
+    In read-only mode (see :func:`database_read_only`) the file is opened with
+    ``mode=ro``, so any write fails with ``sqlite3.OperationalError``.
+    """
+    path = db_path or resolve_db_path()
+    if database_read_only():
+        conn = sqlite3.connect(f"{pathlib.Path(path).absolute().as_uri()}?mode=ro", uri=True)
+    else:
+        conn = sqlite3.connect(path)
     conn.row_factory = sqlite3.Row
     return conn
 
@@ -65,11 +115,20 @@ def _resolve_history_csv_path(file_name: str) -> str:
 
 
 def init_database(db_path: str | None = None) -> str:
-    """Create the SQLite database and required tables if they do not exist."""
+    """Create the SQLite database and required tables if they do not exist.
+
+    A read-only process never creates or migrates anything; it only resolves
+    the path of the database the bot maintains.
+    """
     resolved_path = db_path or resolve_db_path()
+    if database_read_only():
+        return resolved_path
     os.makedirs(os.path.dirname(resolved_path), exist_ok=True)
 
     with closing(connect_db(resolved_path)) as conn:
+        # WAL lets the standalone dashboard read while the bot writes. The
+        # setting is persistent, so this is a no-op after the first call.
+        conn.execute("PRAGMA journal_mode=WAL")
         conn.execute(
             """
             CREATE TABLE IF NOT EXISTS players (
@@ -91,8 +150,15 @@ def init_database(db_path: str | None = None) -> str:
             )
             """
         )
+        # Username lookups are case-insensitive (``username = ? COLLATE NOCASE``).
+        # SQLite only uses an index for such a comparison when the index
+        # column has the same collation, so the per-player indexes are NOCASE.
+        # The original binary indexes could never serve those lookups; drop
+        # them on upgraded databases instead of maintaining them on every insert.
+        conn.execute("DROP INDEX IF EXISTS idx_ehb_history_username_ts")
         conn.execute(
-            "CREATE INDEX IF NOT EXISTS idx_ehb_history_username_ts ON ehb_history (username, timestamp)"
+            "CREATE INDEX IF NOT EXISTS idx_ehb_history_username_nocase_ts "
+            "ON ehb_history (username COLLATE NOCASE, timestamp)"
         )
 
         # EHP, total XP, and inactivity/status tracking add columns to the
@@ -131,6 +197,11 @@ def init_database(db_path: str | None = None) -> str:
               )
             """
         )
+        # Inactivity queries ("no WOM stat change since <cutoff>") are range
+        # scans on this index rather than full passes over ``players``.
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_players_last_changed_at ON players (last_changed_at)"
+        )
 
         # Feature 2 — EHP history (mirror of ehb_history)
         conn.execute(
@@ -144,8 +215,10 @@ def init_database(db_path: str | None = None) -> str:
             )
             """
         )
+        conn.execute("DROP INDEX IF EXISTS idx_ehp_history_username_ts")
         conn.execute(
-            "CREATE INDEX IF NOT EXISTS idx_ehp_history_username_ts ON ehp_history (username, timestamp)"
+            "CREATE INDEX IF NOT EXISTS idx_ehp_history_username_nocase_ts "
+            "ON ehp_history (username COLLATE NOCASE, timestamp)"
         )
 
         # Feature 1 — per-boss leaderboards / kill history
@@ -165,6 +238,10 @@ def init_database(db_path: str | None = None) -> str:
         conn.execute(
             "CREATE INDEX IF NOT EXISTS idx_boss_kills_boss_ts ON boss_kills_history (boss, timestamp)"
         )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_boss_kills_boss_user_nocase_ts "
+            "ON boss_kills_history (boss, username COLLATE NOCASE, timestamp)"
+        )
 
         # Feature 4 — persisted gains snapshots
         conn.execute(
@@ -184,8 +261,10 @@ def init_database(db_path: str | None = None) -> str:
         conn.execute(
             "CREATE INDEX IF NOT EXISTS idx_gains_metric_ts ON gains_history (metric, snapshot_time)"
         )
+        conn.execute("DROP INDEX IF EXISTS idx_gains_user_metric_ts")
         conn.execute(
-            "CREATE INDEX IF NOT EXISTS idx_gains_user_metric_ts ON gains_history (username, metric, snapshot_time)"
+            "CREATE INDEX IF NOT EXISTS idx_gains_user_nocase_metric_ts "
+            "ON gains_history (username COLLATE NOCASE, metric, snapshot_time)"
         )
 
         # Phase 1 achievement retention uses WOM's stable numeric player ID.
@@ -254,6 +333,27 @@ def init_database(db_path: str | None = None) -> str:
         conn.execute(
             "CREATE INDEX IF NOT EXISTS idx_achievements_metric_ts ON achievements (metric, measure, achieved_at)"
         )
+        # Checkpoint of the operator-requested achievement backfill (see
+        # weeklyupdater.achievement_backfill). One row: the requested
+        # [window_start, window_end) and the next page offset to read.
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS achievement_backfill (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                window_start TEXT NOT NULL,
+                window_end TEXT NOT NULL,
+                status TEXT NOT NULL,
+                next_offset INTEGER NOT NULL DEFAULT 0,
+                pages INTEGER NOT NULL DEFAULT 0,
+                matched INTEGER NOT NULL DEFAULT 0,
+                inserted INTEGER NOT NULL DEFAULT 0,
+                last_error TEXT,
+                requested_at TEXT NOT NULL,
+                updated_at TEXT NOT NULL,
+                completed_at TEXT
+            )
+            """
+        )
 
         # Central audit log for every outbound Wise Old Man API call (see
         # utils.api_usage). Added after the 2026-07 IP-block incident so
@@ -283,18 +383,340 @@ def init_database(db_path: str | None = None) -> str:
         # missing column.
         _ensure_columns(conn, "api_call_log", {"user_agent": "TEXT"})
 
+        # Monotonic per-family counters bumped by every writer in the same
+        # transaction as the data change. The web layer derives ETags from
+        # them, so an unchanged family never needs to be re-read.
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS data_versions (
+                family TEXT PRIMARY KEY,
+                version INTEGER NOT NULL DEFAULT 0,
+                updated_at TEXT NOT NULL
+            )
+            """
+        )
+
+        # Roadmap Phase 2 — group membership intervals. One row per continuous
+        # membership; a rejoin opens a new row. ``last_seen_at`` is written
+        # when the interval closes; while it is open the player was present in
+        # the latest complete roster (``data_freshness`` family "memberships").
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS group_memberships (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                group_id INTEGER NOT NULL,
+                player_id INTEGER NOT NULL,
+                role TEXT,
+                joined_at TEXT,
+                first_seen_at TEXT NOT NULL,
+                last_seen_at TEXT,
+                left_at TEXT
+            )
+            """
+        )
+        conn.execute(
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_group_memberships_open "
+            "ON group_memberships (group_id, player_id) WHERE left_at IS NULL"
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_group_memberships_player ON group_memberships (player_id, first_seen_at)"
+        )
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS data_freshness (
+                family TEXT PRIMARY KEY,
+                last_success_at TEXT,
+                last_attempt_at TEXT NOT NULL,
+                last_error TEXT
+            )
+            """
+        )
+
+        # Roadmap Phase 5 — history keyed by stable WOM player ID with integer
+        # epoch timestamps. WITHOUT ROWID stores each row once, inside its
+        # primary-key b-tree, so there is no separate rowid table or
+        # three-column TEXT unique index. Rows whose username cannot be mapped
+        # unambiguously to a player ID stay in the legacy username-keyed tables
+        # above; readers merge both.
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS player_ehb_history (
+                player_id INTEGER NOT NULL,
+                ts INTEGER NOT NULL,
+                ehb REAL NOT NULL,
+                PRIMARY KEY (player_id, ts)
+            ) WITHOUT ROWID
+            """
+        )
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS player_ehp_history (
+                player_id INTEGER NOT NULL,
+                ts INTEGER NOT NULL,
+                ehp REAL NOT NULL,
+                PRIMARY KEY (player_id, ts)
+            ) WITHOUT ROWID
+            """
+        )
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS player_gains_history (
+                player_id INTEGER NOT NULL,
+                metric TEXT NOT NULL,
+                ts INTEGER NOT NULL,
+                period_start INTEGER NOT NULL,
+                gained REAL NOT NULL,
+                PRIMARY KEY (player_id, metric, ts)
+            ) WITHOUT ROWID
+            """
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_player_gains_metric_ts ON player_gains_history (metric, ts)"
+        )
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS player_boss_kills_history (
+                player_id INTEGER NOT NULL,
+                boss TEXT NOT NULL,
+                ts INTEGER NOT NULL,
+                kills INTEGER NOT NULL,
+                rank INTEGER,
+                PRIMARY KEY (player_id, boss, ts)
+            ) WITHOUT ROWID
+            """
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_player_boss_kills_boss_ts ON player_boss_kills_history (boss, ts)"
+        )
+        # Live bot state for a dashboard running in its own process: one JSON
+        # value per key, plus a bounded tail of log lines (see
+        # web.services.shared_state).
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS bot_runtime_state (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                updated_at TEXT NOT NULL
+            )
+            """
+        )
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS bot_log_lines (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                line TEXT NOT NULL
+            )
+            """
+        )
+        # Persisted state of the periodic jobs (see utils.job_scheduler).
+        # ``last_period`` is the newest period boundary that was run or
+        # deliberately skipped, so a restart neither repeats nor loses a run.
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS scheduled_jobs (
+                job_name TEXT PRIMARY KEY,
+                last_period TEXT,
+                last_success_at TEXT,
+                last_attempt_at TEXT,
+                last_error TEXT,
+                failures INTEGER NOT NULL DEFAULT 0
+            )
+            """
+        )
+        # Resumable legacy -> player-ID migration checkpoint, one row per
+        # legacy table. ``last_id`` is the highest legacy row id examined in
+        # the current pass; it resets to 0 when a pass completes so rows that
+        # were unresolvable are retried once new aliases have been observed.
+        # ``settled_aliases`` is the ``player_aliases`` row count when a whole
+        # pass moved nothing; no further pass runs until that count changes.
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS legacy_history_migration (
+                source_table TEXT PRIMARY KEY,
+                last_id INTEGER NOT NULL DEFAULT 0,
+                migrated_rows INTEGER NOT NULL DEFAULT 0,
+                unresolved_rows INTEGER NOT NULL DEFAULT 0,
+                ambiguous_rows INTEGER NOT NULL DEFAULT 0,
+                conflict_rows INTEGER NOT NULL DEFAULT 0,
+                pass_migrated_rows INTEGER NOT NULL DEFAULT 0,
+                settled_aliases INTEGER,
+                passes_completed INTEGER NOT NULL DEFAULT 0,
+                updated_at TEXT NOT NULL
+            )
+            """
+        )
+        _ensure_columns(
+            conn,
+            "legacy_history_migration",
+            {
+                "conflict_rows": "INTEGER NOT NULL DEFAULT 0",
+                "pass_migrated_rows": "INTEGER NOT NULL DEFAULT 0",
+                "settled_aliases": "INTEGER",
+            },
+        )
+        # Cutoffs of the last snapshot compaction per table (see
+        # compact_snapshot_history). Rows older than these were already thinned,
+        # so the next pass only scans the slice that aged since. Dropping a row
+        # forces one full rescan of that table.
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS snapshot_compaction (
+                table_name TEXT PRIMARY KEY,
+                raw_cutoff TEXT NOT NULL,
+                daily_cutoff TEXT NOT NULL,
+                updated_at TEXT NOT NULL
+            )
+            """
+        )
+        # Immutable per-period report data (see weeklyupdater.period_rollups).
+        # One rollup per closed [period_start, period_end) window holds every
+        # player's non-zero gains per report metric plus the achievements and
+        # name changes created inside it; longer reports sum adjacent rollups.
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS period_rollups (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                group_id INTEGER NOT NULL,
+                period_start TEXT NOT NULL,
+                period_end TEXT NOT NULL,
+                created_at TEXT NOT NULL,
+                UNIQUE (group_id, period_start, period_end)
+            )
+            """
+        )
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS period_rollup_gains (
+                rollup_id INTEGER NOT NULL,
+                metric TEXT NOT NULL,
+                player_id INTEGER NOT NULL,
+                username TEXT NOT NULL,
+                gained REAL NOT NULL,
+                PRIMARY KEY (rollup_id, metric, player_id)
+            ) WITHOUT ROWID
+            """
+        )
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS period_rollup_events (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                rollup_id INTEGER NOT NULL,
+                kind TEXT NOT NULL,
+                created_at TEXT NOT NULL,
+                payload TEXT NOT NULL
+            )
+            """
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_period_rollup_events_rollup ON period_rollup_events (rollup_id, created_at)"
+        )
+        # Group gains responses per (group, metric, window). ``expires_at`` is
+        # NULL for windows that had closed when fetched, which never change;
+        # windows still open get a short TTL.
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS gains_window_cache (
+                group_id INTEGER NOT NULL,
+                metric TEXT NOT NULL,
+                start_date TEXT NOT NULL,
+                end_date TEXT NOT NULL,
+                fetched_at TEXT NOT NULL,
+                expires_at TEXT,
+                entries TEXT NOT NULL,
+                PRIMARY KEY (group_id, metric, start_date, end_date)
+            ) WITHOUT ROWID
+            """
+        )
+
+        # Validators of conditionally fetched WOM responses, keyed by request
+        # URI: the server's ETag if it sent one, and a hash of the body.
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS wom_validators (
+                uri TEXT PRIMARY KEY,
+                etag TEXT,
+                body_hash TEXT NOT NULL,
+                updated_at TEXT NOT NULL
+            ) WITHOUT ROWID
+            """
+        )
+        # Group competitions and their poll schedule. ``next_poll_at`` is NULL
+        # once the final standings are stored (or the competition ended too
+        # long before it was discovered to be worth fetching).
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS competitions (
+                id INTEGER PRIMARY KEY,
+                group_id INTEGER NOT NULL,
+                title TEXT NOT NULL,
+                metric TEXT NOT NULL,
+                type TEXT NOT NULL,
+                starts_at TEXT NOT NULL,
+                ends_at TEXT NOT NULL,
+                participant_count INTEGER NOT NULL DEFAULT 0,
+                discovered_at TEXT NOT NULL,
+                next_poll_at TEXT,
+                last_polled_at TEXT,
+                standings_at TEXT,
+                final INTEGER NOT NULL DEFAULT 0
+            )
+            """
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_competitions_next_poll ON competitions (next_poll_at)"
+        )
+        # Standings snapshots, written only when the order or a gain changed.
+        # A finished competition keeps only its final snapshot.
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS competition_standings (
+                competition_id INTEGER NOT NULL,
+                observed_at TEXT NOT NULL,
+                player_id INTEGER NOT NULL,
+                username TEXT NOT NULL,
+                rank INTEGER NOT NULL,
+                gained REAL NOT NULL,
+                PRIMARY KEY (competition_id, observed_at, player_id)
+            ) WITHOUT ROWID
+            """
+        )
+
         conn.commit()
 
     return resolved_path
 
 
+def _bump_data_version(conn: sqlite3.Connection, *families: str) -> None:
+    """Increment the ``data_versions`` counter for each family (caller commits)."""
+    updated_at = datetime.now(timezone.utc).strftime(TS_FORMAT)
+    conn.executemany(
+        """
+        INSERT INTO data_versions (family, version, updated_at)
+        VALUES (?, 1, ?)
+        ON CONFLICT(family) DO UPDATE SET
+            version = data_versions.version + 1,
+            updated_at = excluded.updated_at
+        """,
+        [(family, updated_at) for family in families],
+    )
+
+
+def read_data_versions(families: list[str] | tuple[str, ...], db_path: str | None = None) -> dict[str, int]:
+    """Return the current version counter for each family (``0`` if never written)."""
+    resolved_path = init_database(db_path)
+    with closing(connect_db(resolved_path)) as conn:
+        rows = conn.execute("SELECT family, version FROM data_versions").fetchall()
+    known = {row["family"]: row["version"] for row in rows}
+    return {family: int(known.get(family, 0)) for family in families}
+
+
 def upsert_players(players: dict[str, dict], db_path: str | None = None) -> None:
     """Persist the latest player rank snapshot (EHB + EHP + total XP) to SQLite."""
     if not players:
         return
 
     resolved_path = init_database(db_path)
-    timestamp = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
+    timestamp = datetime.utcnow().strftime(TS_FORMAT)
     with closing(connect_db(resolved_path)) as conn:
         conn.executemany(
             """
@@ -325,11 +747,12 @@ def upsert_players(players: dict[str, dict], db_path: str | None = None) -> None
                 for username, data in players.items()
             ],
         )
+        _bump_data_version(conn, "players")
         conn.commit()
 
 
-def read_player_snapshots(db_path: str | None = None) -> dict[str, dict]:
-    """Return the latest persisted EHB, EHP, and total-XP state by username."""
+def read_player_snapshots(db_path: str | None = None) -> Roster:
+    """Return the latest persisted EHB, EHP, and total-XP state as a :class:`Roster`."""
     resolved_path = init_database(db_path)
     with closing(connect_db(resolved_path)) as conn:
         rows = conn.execute(
@@ -339,33 +762,23 @@ def read_player_snapshots(db_path: str | None = None) -> dict[str, dict]:
             WHERE snapshot_initialized = 1
             """
         ).fetchall()
-
-    snapshots = {}
-    for row in rows:
-        snapshot = {
-            "last_ehb": row["last_ehb"],
-            "rank": row["rank"],
-        }
-        if row["last_ehp"] != 0 or row["ehp_rank"] != "Unknown":
-            snapshot["last_ehp"] = row["last_ehp"]
-            snapshot["ehp_rank"] = row["ehp_rank"]
-        if row["total_xp"] is not None:
-            snapshot["total_xp"] = row["total_xp"]
-        snapshots[row["username"]] = snapshot
-    return snapshots
+    return Roster.from_rows(rows)
 
 
 def upsert_player_status(rows: list[dict], db_path: str | None = None) -> None:
     """Persist per-player WOM status/activity metadata (Feature 3).
 
     Touches only the status/activity columns so it can be called independently of
-    :func:`upsert_players` without clobbering the rank snapshot.
+    :func:`upsert_players` without clobbering the rank snapshot. Timestamps
+    should be UTC ``YYYY-MM-DD HH:MM:SS`` strings so range queries compare
+    correctly.
     """
+    rows = [row for row in rows if row.get("username")]
     if not rows:
         return
 
     resolved_path = init_database(db_path)
-    captured_at = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+    captured_at = datetime.now(timezone.utc).strftime(TS_FORMAT)
     with closing(connect_db(resolved_path)) as conn:
         conn.executemany(
             """
@@ -394,9 +807,9 @@ def upsert_player_status(rows: list[dict], db_path: str | None = None) -> None:
                     captured_at,
                 )
                 for row in rows
-                if row.get("username")
             ],
         )
+        _bump_data_version(conn, "players")
         conn.commit()
 
 
@@ -418,6 +831,45 @@ def read_player_status_rows(db_path: str | None = None) -> list[dict]:
     return [dict(row) for row in rows]
 
 
+# ``players`` rows are keyed by username and never removed, so status reads
+# keep only the row under a current member's current display name: departed
+# members and pre-rename usernames are left out.
+_CURRENT_MEMBER_STATUS = """
+    SELECT p.username, p.player_id, p.wom_status, p.last_changed_at, p.wom_updated_at, p.status_captured_at
+    FROM players p
+    JOIN wom_players w ON w.player_id = p.player_id AND w.display_name = p.username
+    WHERE EXISTS (
+        SELECT 1 FROM group_memberships m WHERE m.player_id = p.player_id AND m.left_at IS NULL
+    )
+"""
+
+
+def read_players_changed_before(cutoff: str, db_path: str | None = None) -> list[dict]:
+    """Return current members' status rows whose WOM ``last_changed_at`` is older than ``cutoff``.
+
+    Oldest first. Rows without a captured ``last_changed_at`` are excluded;
+    see :func:`read_players_without_change_time`.
+    """
+    resolved_path = init_database(db_path)
+    with closing(connect_db(resolved_path)) as conn:
+        rows = conn.execute(
+            _CURRENT_MEMBER_STATUS + "AND p.last_changed_at < ? ORDER BY p.last_changed_at",
+            (cutoff,),
+        ).fetchall()
+    return [dict(row) for row in rows]
+
+
+def read_players_without_change_time(db_path: str | None = None) -> list[dict]:
+    """Return current members' captured status rows for which WOM reported no ``last_changed_at``."""
+    resolved_path = init_database(db_path)
+    with closing(connect_db(resolved_path)) as conn:
+        rows = conn.execute(
+            _CURRENT_MEMBER_STATUS
+            + "AND p.last_changed_at IS NULL AND p.status_captured_at IS NOT NULL ORDER BY p.username"
+        ).fetchall()
+    return [dict(row) for row in rows]
+
+
 def upsert_achievement_events(rows: list[dict], db_path: str | None = None) -> int:
     """Persist normalized WOM players, aliases, and achievement events.
 
@@ -576,124 +1028,809 @@ def upsert_achievement_events(rows: list[dict], db_path: str | None = None) -> i
     return inserted
 
 
-def log_ehb_history(username: str, ehb: float, timestamp: str | None = None, db_path: str | None = None) -> None:
-    """Insert one EHB history row into SQLite."""
+# ---------------------------------------------------------------------------
+# Roadmap Phase 2 — membership intervals and data freshness
+# ---------------------------------------------------------------------------
+
+
+def read_open_memberships(group_id: int, db_path: str | None = None) -> dict[int, dict]:
+    """Return ``{player_id: {role, joined_at, first_seen_at}}`` for open memberships."""
     resolved_path = init_database(db_path)
-    recorded_at = timestamp or datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
     with closing(connect_db(resolved_path)) as conn:
-        conn.execute(
+        rows = conn.execute(
             """
-            INSERT OR IGNORE INTO ehb_history (timestamp, username, ehb)
-            VALUES (?, ?, ?)
+            SELECT player_id, role, joined_at, first_seen_at FROM group_memberships
+            WHERE group_id = ? AND left_at IS NULL
             """,
-            (recorded_at, username, float(ehb)),
-        )
+            (group_id,),
+        ).fetchall()
+    return {
+        row["player_id"]: {"role": row["role"], "joined_at": row["joined_at"], "first_seen_at": row["first_seen_at"]}
+        for row in rows
+    }
+
+
+def apply_membership_changes(
+    group_id: int,
+    *,
+    joined: list[dict],
+    left: list[int],
+    role_changes: dict[int, str | None],
+    observed_at: str,
+    last_seen_at: str | None = None,
+    db_path: str | None = None,
+) -> None:
+    """Open, close and update membership intervals in one transaction.
+
+    ``joined`` rows are ``{player_id, role, joined_at}`` dicts. ``left`` player
+    intervals are closed at ``observed_at`` with ``last_seen_at`` (the previous
+    complete roster in which they appeared, defaulting to ``observed_at``).
+    """
+    if not joined and not left and not role_changes:
+        return
+
+    resolved_path = init_database(db_path)
+    with closing(connect_db(resolved_path)) as conn:
+        for row in joined:
+            conn.execute(
+                """
+                INSERT OR IGNORE INTO group_memberships (group_id, player_id, role, joined_at, first_seen_at)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                (group_id, int(row["player_id"]), row.get("role"), row.get("joined_at"), observed_at),
+            )
+        for player_id in left:
+            conn.execute(
+                """
+                UPDATE group_memberships SET last_seen_at = ?, left_at = ?
+                WHERE group_id = ? AND player_id = ? AND left_at IS NULL
+                """,
+                (last_seen_at or observed_at, observed_at, group_id, int(player_id)),
+            )
+        for player_id, role in role_changes.items():
+            conn.execute(
+                "UPDATE group_memberships SET role = ? WHERE group_id = ? AND player_id = ? AND left_at IS NULL",
+                (role, group_id, int(player_id)),
+            )
         conn.commit()
 
 
-def log_ehp_history(username: str, ehp: float, timestamp: str | None = None, db_path: str | None = None) -> None:
-    """Insert one EHP history row into SQLite (Feature 2)."""
+def record_data_freshness(
+    family: str,
+    *,
+    success: bool = True,
+    error: str | None = None,
+    observed_at: str | None = None,
+    db_path: str | None = None,
+) -> None:
+    """Record a collection attempt for a data family.
+
+    Only successful, complete collections advance ``last_success_at``; a
+    failure keeps the previous success time and stores ``error``.
+    """
     resolved_path = init_database(db_path)
-    recorded_at = timestamp or datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
+    observed_at = observed_at or datetime.now(timezone.utc).strftime(TS_FORMAT)
     with closing(connect_db(resolved_path)) as conn:
         conn.execute(
             """
-            INSERT OR IGNORE INTO ehp_history (timestamp, username, ehp)
-            VALUES (?, ?, ?)
+            INSERT INTO data_freshness (family, last_success_at, last_attempt_at, last_error)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(family) DO UPDATE SET
+                last_success_at = COALESCE(excluded.last_success_at, data_freshness.last_success_at),
+                last_attempt_at = excluded.last_attempt_at,
+                last_error = excluded.last_error
             """,
-            (recorded_at, username, float(ehp)),
+            (family, observed_at if success else None, observed_at, None if success else error),
         )
         conn.commit()
 
 
-def read_player_ehp_history(username: str, db_path: str | None = None) -> list[dict]:
-    """Return ``[{timestamp, ehp}]`` for a player, ordered by time (Feature 2)."""
+def read_data_freshness(db_path: str | None = None) -> dict[str, dict]:
+    """Return ``{family: {last_success_at, last_attempt_at, last_error}}``."""
     resolved_path = init_database(db_path)
     with closing(connect_db(resolved_path)) as conn:
         rows = conn.execute(
-            """
-            SELECT timestamp, ehp FROM ehp_history
-            WHERE username = ? COLLATE NOCASE
-            ORDER BY timestamp
-            """,
-            (username,),
+            "SELECT family, last_success_at, last_attempt_at, last_error FROM data_freshness"
         ).fetchall()
-    return [{"timestamp": row["timestamp"], "ehp": row["ehp"]} for row in rows]
+    return {row["family"]: {key: row[key] for key in row.keys() if key != "family"} for row in rows}
 
 
 # ---------------------------------------------------------------------------
-# Feature 1 — per-boss leaderboards / kill history
+# Roadmap Phase 5 — player-ID keyed history
 # ---------------------------------------------------------------------------
 
-
-def log_boss_kills(boss: str, rows: list[dict], timestamp: str | None = None, db_path: str | None = None) -> None:
-    """Persist a boss-kill leaderboard snapshot.
-
-    ``rows`` is a list of ``{username, kills, rank}`` dicts. The ``UNIQUE`` index
-    on ``(timestamp, boss, username)`` makes repeated writes of the same snapshot
-    idempotent.
+# Compact tables store integer epoch seconds. Legacy text timestamps are
+# naive wall-clock strings; they are interpreted as UTC on the way in and
+# formatted back the same way, so the round trip is lossless.
+_MIN_EPOCH = -(2**62)
+_MAX_EPOCH = 2**62
+
+
+class _HistorySeries(t.NamedTuple):
+    """Legacy and compact storage for one history family."""
+
+    family: str
+    legacy_table: str
+    legacy_time: str
+    compact_table: str
+    key_column: str | None
+    value_column: str
+
+
+_HISTORY_SERIES = {
+    "ehb": _HistorySeries("ehb_history", "ehb_history", "timestamp", "player_ehb_history", None, "ehb"),
+    "ehp": _HistorySeries("ehp_history", "ehp_history", "timestamp", "player_ehp_history", None, "ehp"),
+    "gains": _HistorySeries(
+        "gains_history", "gains_history", "snapshot_time", "player_gains_history", "metric", "gained"
+    ),
+    "boss": _HistorySeries(
+        "boss_kills_history", "boss_kills_history", "timestamp", "player_boss_kills_history", "boss", "kills"
+    ),
+}
+
+
+def _normalize_name(name: object) -> str:
+    return str(name or "").strip().casefold()
+
+
+def _to_epoch(value: str | None) -> int | None:
+    """Parse a stored timestamp into epoch seconds (naive values are UTC)."""
+    if value is None:
+        return None
+    try:
+        parsed = datetime.fromisoformat(str(value).strip())
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return int(parsed.timestamp())
+
+
+def _from_epoch(value: int) -> str:
+    return datetime.fromtimestamp(value, timezone.utc).strftime(TS_FORMAT)
+
+
+def _record_identity(conn: sqlite3.Connection, player_id: int, username: str, observed_at: str) -> None:
+    """Upsert the minimal ``wom_players`` row and alias for an observed player."""
+    display_name = str(username).strip()
+    conn.execute(
+        """
+        INSERT INTO wom_players (player_id, current_username, display_name, first_seen_at, last_seen_at)
+        VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT(player_id) DO UPDATE SET
+            current_username = excluded.current_username,
+            display_name = excluded.display_name,
+            last_seen_at = excluded.last_seen_at
+        """,
+        (player_id, _normalize_name(display_name), display_name, observed_at, observed_at),
+    )
+    conn.execute(
+        """
+        INSERT INTO player_aliases (player_id, normalized_name, display_name, first_seen_at, last_seen_at)
+        VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT(player_id, normalized_name) DO UPDATE SET
+            display_name = excluded.display_name,
+            last_seen_at = excluded.last_seen_at
+        """,
+        (player_id, _normalize_name(display_name), display_name, observed_at, observed_at),
+    )
+
+
+def record_player_identities(rows: list[dict], db_path: str | None = None) -> int:
+    """Record ``{player_id, username}`` observations from a group roster.
+
+    Keeps ``wom_players`` and ``player_aliases`` current so history writes and
+    reads can resolve a display name to its stable player ID, including after
+    a rename. Returns the number of rows recorded.
     """
-    if not rows:
-        return
+    resolved_path = init_database(db_path)
+    observed_at = datetime.now(timezone.utc).isoformat()
+    recorded = 0
+    with closing(connect_db(resolved_path)) as conn:
+        for row in rows:
+            try:
+                player_id = int(row["player_id"])
+            except (KeyError, TypeError, ValueError):
+                continue
+            if not _normalize_name(row.get("username")):
+                continue
+            _record_identity(conn, player_id, row["username"], observed_at)
+            recorded += 1
+        conn.commit()
+    return recorded
 
+
+def read_player_identities(db_path: str | None = None) -> dict[int, str]:
+    """Return the last recorded display name of every known WOM player ID."""
     resolved_path = init_database(db_path)
-    recorded_at = timestamp or datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
     with closing(connect_db(resolved_path)) as conn:
-        conn.executemany(
-            """
-            INSERT OR IGNORE INTO boss_kills_history (timestamp, boss, username, kills, rank)
-            VALUES (?, ?, ?, ?, ?)
+        rows = conn.execute("SELECT player_id, display_name FROM wom_players").fetchall()
+    return {row["player_id"]: row["display_name"] for row in rows}
+
+
+def _unambiguous_player_id(conn: sqlite3.Connection, username: str) -> int | None:
+    """Return the only player ID ever seen with ``username``, else ``None``."""
+    rows = conn.execute(
+        "SELECT DISTINCT player_id FROM player_aliases WHERE normalized_name = ? LIMIT 2",
+        (_normalize_name(username),),
+    ).fetchall()
+    return rows[0]["player_id"] if len(rows) == 1 else None
+
+
+def _history_player_id(
+    conn: sqlite3.Connection,
+    username: str,
+    player_id: int | None,
+    cache: dict[str, int | None],
+) -> int | None:
+    """Resolve the player ID for a history write; explicit IDs also record the alias."""
+    if player_id is not None:
+        key = f"{int(player_id)}:{_normalize_name(username)}"
+        if key not in cache:
+            _record_identity(conn, int(player_id), username, datetime.now(timezone.utc).isoformat())
+            cache[key] = int(player_id)
+        return int(player_id)
+    name = _normalize_name(username)
+    if name not in cache:
+        cache[name] = _unambiguous_player_id(conn, username)
+    return cache[name]
+
+
+def _current_player_ids(conn: sqlite3.Connection, names: list[str]) -> dict[str, int]:
+    """Map normalized names to the player most recently seen using them."""
+    if not names:
+        return {}
+    placeholders = ", ".join("?" for _ in names)
+    # nosemgrep: python.sqlalchemy.security.sqlalchemy-execute-raw-query.sqlalchemy-execute-raw-query,python.lang.security.audit.formatted-sql-query.formatted-sql-query -- only the placeholder count is interpolated
+    rows = conn.execute(
+        f"""
+        SELECT normalized_name, player_id, last_seen_at FROM player_aliases
+        WHERE normalized_name IN ({placeholders})
+        """,
+        names,
+    ).fetchall()
+    latest: dict[str, tuple[str, int]] = {}
+    for row in rows:
+        candidate = (row["last_seen_at"], row["player_id"])
+        if candidate > latest.get(row["normalized_name"], ("", -1)):
+            latest[row["normalized_name"]] = candidate
+    return {name: player_id for name, (_, player_id) in latest.items()}
+
+
+def _read_series(
+    conn: sqlite3.Connection,
+    spec: _HistorySeries,
+    usernames: list[str],
+    key_value: str | None,
+    start: str | None,
+    end: str | None,
+    value_key: str,
+) -> dict[str, list[dict]]:
+    """Read one history family for several players from compact and legacy storage.
+
+    A requested name resolves to the player most recently seen using it, so
+    rows recorded under earlier names of that player are included. Legacy rows
+    that have not been migrated yet are matched by name. Each requested name
+    maps to its time-ordered rows.
+    """
+    for identifier in (
+        spec.legacy_table, spec.legacy_time, spec.compact_table, spec.value_column,
+        *([spec.key_column] if spec.key_column else []),
+    ):
+        _assert_identifier(identifier)
+    requested = {_normalize_name(name): name for name in usernames if _normalize_name(name)}
+    result: dict[str, list[dict]] = {name: [] for name in requested.values()}
+    if not requested:
+        return result
+
+    key_clause = f"AND {spec.key_column} = ?" if spec.key_column else ""
+    key_params = [key_value] if spec.key_column else []
+
+    names_by_player: dict[int, list[str]] = {}
+    for normalized, player_id in _current_player_ids(conn, list(requested)).items():
+        names_by_player.setdefault(player_id, []).append(requested[normalized])
+    if names_by_player:
+        placeholders = ", ".join("?" for _ in names_by_player)
+        # nosemgrep: python.sqlalchemy.security.sqlalchemy-execute-raw-query.sqlalchemy-execute-raw-query,python.lang.security.audit.formatted-sql-query.formatted-sql-query -- identifiers validated above; values are bound parameters
+        compact_rows = conn.execute(
+            f"""
+            SELECT player_id, ts, {spec.value_column} AS value FROM {spec.compact_table}
+            WHERE player_id IN ({placeholders}) {key_clause}
+              AND ts >= ? AND ts <= ?
+            ORDER BY player_id, ts
             """,
             [
-                (
-                    recorded_at,
-                    boss,
-                    str(row.get("username")),
-                    int(row.get("kills", 0)),
-                    row.get("rank"),
-                )
-                for row in rows
-                if row.get("username")
+                *names_by_player,
+                *key_params,
+                _to_epoch(start) if start else _MIN_EPOCH,
+                _to_epoch(end) if end else _MAX_EPOCH,
             ],
+        ).fetchall()
+        for row in compact_rows:
+            entry = {"timestamp": _from_epoch(row["ts"]), value_key: row["value"]}
+            for name in names_by_player[row["player_id"]]:
+                result[name].append(entry)
+
+    placeholders = ", ".join("?" for _ in requested)
+    # nosemgrep: python.sqlalchemy.security.sqlalchemy-execute-raw-query.sqlalchemy-execute-raw-query,python.lang.security.audit.formatted-sql-query.formatted-sql-query -- identifiers validated above; values are bound parameters
+    legacy_rows = conn.execute(
+        f"""
+        SELECT username, {spec.legacy_time} AS ts, {spec.value_column} AS value
+        FROM {spec.legacy_table}
+        WHERE username COLLATE NOCASE IN ({placeholders}) {key_clause}
+          AND {spec.legacy_time} >= COALESCE(?, '') AND {spec.legacy_time} <= COALESCE(?, '9999')
+        ORDER BY username COLLATE NOCASE, {spec.legacy_time}
+        """,
+        [*requested, *key_params, start, end],
+    ).fetchall()
+    mixed: set[str] = set()
+    for row in legacy_rows:
+        name = requested.get(_normalize_name(row["username"]))
+        if name is None:
+            continue
+        if result[name] and name not in mixed:
+            mixed.add(name)
+        result[name].append({"timestamp": row["ts"], value_key: row["value"]})
+    for name in mixed:
+        result[name].sort(key=lambda entry: entry["timestamp"])
+    return result
+
+
+# Legacy table -> compact table column mapping used by the migration. Each
+# entry is (series, (compact column, SELECT expression over legacy alias ``h``)
+# pairs after player_id, extra WHERE condition selecting convertible rows).
+_LEGACY_MIGRATIONS = (
+    (
+        "ehb",
+        (("ts", "CAST(strftime('%s', h.timestamp) AS INTEGER)"), ("ehb", "h.ehb")),
+        "strftime('%s', h.timestamp) IS NOT NULL",
+    ),
+    (
+        "ehp",
+        (("ts", "CAST(strftime('%s', h.timestamp) AS INTEGER)"), ("ehp", "h.ehp")),
+        "strftime('%s', h.timestamp) IS NOT NULL",
+    ),
+    (
+        "gains",
+        (
+            ("metric", "h.metric"),
+            ("ts", "CAST(strftime('%s', h.snapshot_time) AS INTEGER)"),
+            ("period_start", "CAST(strftime('%s', h.period_start) AS INTEGER)"),
+            ("gained", "h.gained"),
+        ),
+        # The compact table stores period_end implicitly as the snapshot time.
+        "strftime('%s', h.snapshot_time) IS NOT NULL AND strftime('%s', h.period_start) IS NOT NULL "
+        "AND h.period_end = h.snapshot_time",
+    ),
+    (
+        "boss",
+        (
+            ("boss", "h.boss"),
+            ("ts", "CAST(strftime('%s', h.timestamp) AS INTEGER)"),
+            ("kills", "h.kills"),
+            ("rank", "h.rank"),
+        ),
+        "strftime('%s', h.timestamp) IS NOT NULL",
+    ),
+)
+
+
+def _migration_settled(state: sqlite3.Row | None, alias_count: int) -> bool:
+    """Whether a legacy table's last full pass moved nothing and no alias appeared since."""
+    return state is not None and not state["last_id"] and state["settled_aliases"] == alias_count
+
+
+def migrate_legacy_history(
+    *,
+    batch_size: int = 5000,
+    max_batches: int | None = None,
+    db_path: str | None = None,
+) -> dict[str, dict]:
+    """Move username-keyed history rows into the player-ID keyed tables.
+
+    Only rows whose username has been observed for exactly one WOM player ID
+    (via ``player_aliases``) and whose timestamps parse are moved; everything
+    else stays in the legacy table untouched. A legacy row is deleted only once
+    an identical row exists in the compact table. Rows colliding on the compact
+    key with different values (two old names of one player, or two rows in the
+    same second) stay in the legacy table as conflicts. Work is committed per
+    batch and checkpointed in ``legacy_history_migration``, so an interrupted
+    run resumes where it stopped and ``max_batches`` can bound the work per
+    call. A completed pass restarts from the beginning next time, retrying rows
+    whose names were unknown or ambiguous before. Once a whole pass moves
+    nothing the table is settled and skipped without scanning until a new
+    alias is recorded, so calling this repeatedly is cheap.
+
+    Returns ``{family: {migrated, unresolved, ambiguous, conflicts, remaining}}``
+    where ``migrated`` counts rows moved by this call; ``unresolved`` counts
+    rows the current pass left in place, ``ambiguous`` the subset whose name
+    belongs to several players and ``conflicts`` the subset that collided with
+    a different compact row; ``remaining`` is the legacy row count. A settled
+    table reports the counts of its last pass.
+    """
+    resolved_path = init_database(db_path)
+    report: dict[str, dict] = {}
+    batches_left = max_batches
+
+    with closing(connect_db(resolved_path)) as conn:
+        alias_count = conn.execute("SELECT COUNT(*) FROM player_aliases").fetchone()[0]
+        states = {
+            row["source_table"]: row
+            for row in conn.execute("SELECT * FROM legacy_history_migration").fetchall()
+        }
+        pending = [
+            migration
+            for migration in _LEGACY_MIGRATIONS
+            if not _migration_settled(states.get(_HISTORY_SERIES[migration[0]].legacy_table), alias_count)
+        ]
+        for series, _columns, _convertible in _LEGACY_MIGRATIONS:
+            spec = _HISTORY_SERIES[series]
+            state = states.get(spec.legacy_table)
+            if _migration_settled(state, alias_count):
+                report[spec.family] = {
+                    "migrated": 0,
+                    "unresolved": state["unresolved_rows"],
+                    "ambiguous": state["ambiguous_rows"],
+                    "conflicts": state["conflict_rows"],
+                    "remaining": state["unresolved_rows"],
+                }
+        if not pending:
+            return report
+
+        conn.execute(
+            "CREATE TEMP TABLE IF NOT EXISTS migration_aliases "
+            "(normalized_name TEXT PRIMARY KEY, player_id INTEGER NOT NULL)"
+        )
+        conn.execute("CREATE TEMP TABLE IF NOT EXISTS migration_ambiguous (normalized_name TEXT PRIMARY KEY)")
+        conn.execute(
+            """
+            INSERT INTO temp.migration_aliases (normalized_name, player_id)
+            SELECT normalized_name, MIN(player_id) FROM player_aliases
+            GROUP BY normalized_name HAVING COUNT(DISTINCT player_id) = 1
+            """
         )
+        conn.execute(
+            """
+            INSERT INTO temp.migration_ambiguous (normalized_name)
+            SELECT normalized_name FROM player_aliases
+            GROUP BY normalized_name HAVING COUNT(DISTINCT player_id) > 1
+            """
+        )
+
+        for series, columns, convertible in pending:
+            spec = _HISTORY_SERIES[series]
+            source, target = spec.legacy_table, spec.compact_table
+            _assert_identifier(source)
+            _assert_identifier(target)
+            compact_columns = ", ".join(column for column, _ in columns)
+            select_values = ", ".join(expression for _, expression in columns)
+            # ``IS`` so NULL ranks compare equal.
+            stored = " AND ".join(
+                ["t.player_id = a.player_id", *(f"t.{column} IS {expression}" for column, expression in columns)]
+            )
+            state = states.get(source)
+            last_id = state["last_id"] if state else 0
+            unresolved = state["unresolved_rows"] if state and last_id else 0
+            ambiguous = state["ambiguous_rows"] if state and last_id else 0
+            conflicts = state["conflict_rows"] if state and last_id else 0
+            pass_moved = state["pass_migrated_rows"] if state and last_id else 0
+            migrated_total = 0
+
+            while batches_left is None or batches_left > 0:
+                # nosemgrep: python.sqlalchemy.security.sqlalchemy-execute-raw-query.sqlalchemy-execute-raw-query,python.lang.security.audit.formatted-sql-query.formatted-sql-query -- table names validated above
+                bounds = conn.execute(
+                    f"SELECT MAX(id) AS hi, COUNT(*) AS n FROM "
+                    f"(SELECT id FROM {source} WHERE id > ? ORDER BY id LIMIT ?)",
+                    (last_id, batch_size),
+                ).fetchone()
+                pass_complete = bounds["hi"] is None
+                moved = 0
+                if not pass_complete:
+                    high_id = bounds["hi"]
+                    matched = (
+                        f"FROM {source} h JOIN temp.migration_aliases a "
+                        f"ON a.normalized_name = lower(trim(h.username)) "
+                        f"WHERE h.id > ? AND h.id <= ? AND {convertible}"
+                    )
+                    # nosemgrep: python.sqlalchemy.security.sqlalchemy-execute-raw-query.sqlalchemy-execute-raw-query,python.lang.security.audit.formatted-sql-query.formatted-sql-query -- table names validated above; column lists are module constants
+                    conn.execute(
+                        f"INSERT OR IGNORE INTO {target} (player_id, {compact_columns}) "
+                        f"SELECT a.player_id, {select_values} {matched}",
+                        (last_id, high_id),
+                    )
+                    # nosemgrep: python.sqlalchemy.security.sqlalchemy-execute-raw-query.sqlalchemy-execute-raw-query,python.lang.security.audit.formatted-sql-query.formatted-sql-query -- table names validated above; column lists are module constants
+                    moved = conn.execute(
+                        f"DELETE FROM {source} WHERE id IN ("
+                        f"SELECT h.id {matched} AND EXISTS (SELECT 1 FROM {target} t WHERE {stored}))",
+                        (last_id, high_id),
+                    ).rowcount
+                    # nosemgrep: python.sqlalchemy.security.sqlalchemy-execute-raw-query.sqlalchemy-execute-raw-query,python.lang.security.audit.formatted-sql-query.formatted-sql-query -- table names validated above; column lists are module constants
+                    conflicts += conn.execute(
+                        f"SELECT COUNT(*) {matched}", (last_id, high_id)
+                    ).fetchone()[0]
+                    # nosemgrep: python.sqlalchemy.security.sqlalchemy-execute-raw-query.sqlalchemy-execute-raw-query,python.lang.security.audit.formatted-sql-query.formatted-sql-query -- table name validated above
+                    ambiguous += conn.execute(
+                        f"""
+                        SELECT COUNT(*) FROM {source}
+                        WHERE id > ? AND id <= ?
+                          AND lower(trim(username)) IN (SELECT normalized_name FROM temp.migration_ambiguous)
+                        """,
+                        (last_id, high_id),
+                    ).fetchone()[0]
+                    unresolved += bounds["n"] - moved
+                    pass_moved += moved
+                    migrated_total += moved
+                    last_id = high_id
+                    if moved:
+                        _bump_data_version(conn, spec.family)
+                        # Migrated rows keep their old timestamps, behind the
+                        # compaction checkpoint; rescan the target next pass.
+                        conn.execute("DELETE FROM snapshot_compaction WHERE table_name = ?", (target,))
+                    if batches_left is not None:
+                        batches_left -= 1
+
+                conn.execute(
+                    """
+                    INSERT INTO legacy_history_migration (
+                        source_table, last_id, migrated_rows, unresolved_rows,
+                        ambiguous_rows, conflict_rows, pass_migrated_rows, settled_aliases,
+                        passes_completed, updated_at
+                    )
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(source_table) DO UPDATE SET
+                        last_id = excluded.last_id,
+                        migrated_rows = legacy_history_migration.migrated_rows + excluded.migrated_rows,
+                        unresolved_rows = excluded.unresolved_rows,
+                        ambiguous_rows = excluded.ambiguous_rows,
+                        conflict_rows = excluded.conflict_rows,
+                        pass_migrated_rows = excluded.pass_migrated_rows,
+                        settled_aliases = excluded.settled_aliases,
+                        passes_completed = legacy_history_migration.passes_completed + excluded.passes_completed,
+                        updated_at = excluded.updated_at
+                    """,
+                    (
+                        source,
+                        0 if pass_complete else last_id,
+                        moved,
+                        unresolved,
+                        ambiguous,
+                        conflicts,
+                        0 if pass_complete else pass_moved,
+                        alias_count if pass_complete and not pass_moved else None,
+                        1 if pass_complete else 0,
+                        datetime.now(timezone.utc).strftime(TS_FORMAT),
+                    ),
+                )
+                conn.commit()
+                if pass_complete:
+                    break
+
+            # nosemgrep: python.sqlalchemy.security.sqlalchemy-execute-raw-query.sqlalchemy-execute-raw-query,python.lang.security.audit.formatted-sql-query.formatted-sql-query -- table name validated above
+            remaining = conn.execute(f"SELECT COUNT(*) FROM {source}").fetchone()[0]
+            report[spec.family] = {
+                "migrated": migrated_total,
+                "unresolved": unresolved,
+                "ambiguous": ambiguous,
+                "conflicts": conflicts,
+                "remaining": remaining,
+            }
+
+    return report
+
+
+def _log_history_point(
+    series: str,
+    username: str,
+    value: float,
+    timestamp: str | None,
+    player_id: int | None,
+    db_path: str | None,
+) -> None:
+    spec = _HISTORY_SERIES[series]
+    resolved_path = init_database(db_path)
+    recorded_at = timestamp or datetime.utcnow().strftime(TS_FORMAT)
+    with closing(connect_db(resolved_path)) as conn:
+        resolved_id = _history_player_id(conn, username, player_id, {})
+        epoch = _to_epoch(recorded_at) if resolved_id is not None else None
+        if epoch is not None:
+            # nosemgrep: python.sqlalchemy.security.sqlalchemy-execute-raw-query.sqlalchemy-execute-raw-query,python.lang.security.audit.formatted-sql-query.formatted-sql-query -- identifiers come from the module-level series table
+            cursor = conn.execute(
+                f"INSERT OR IGNORE INTO {spec.compact_table} (player_id, ts, {spec.value_column}) VALUES (?, ?, ?)",
+                (resolved_id, epoch, float(value)),
+            )
+        else:
+            # nosemgrep: python.sqlalchemy.security.sqlalchemy-execute-raw-query.sqlalchemy-execute-raw-query,python.lang.security.audit.formatted-sql-query.formatted-sql-query -- identifiers come from the module-level series table
+            cursor = conn.execute(
+                f"INSERT OR IGNORE INTO {spec.legacy_table} (timestamp, username, {spec.value_column}) VALUES (?, ?, ?)",
+                (recorded_at, username, float(value)),
+            )
+        if cursor.rowcount:
+            _bump_data_version(conn, spec.family)
         conn.commit()
 
 
+def log_ehb_history(
+    username: str,
+    ehb: float,
+    timestamp: str | None = None,
+    db_path: str | None = None,
+    *,
+    player_id: int | None = None,
+) -> None:
+    """Insert one EHB history row into SQLite.
+
+    Rows go to ``player_ehb_history`` when ``player_id`` is given or the name
+    maps to exactly one known player, and to the legacy ``ehb_history``
+    otherwise.
+    """
+    _log_history_point("ehb", username, ehb, timestamp, player_id, db_path)
+
+
+def log_ehp_history(
+    username: str,
+    ehp: float,
+    timestamp: str | None = None,
+    db_path: str | None = None,
+    *,
+    player_id: int | None = None,
+) -> None:
+    """Insert one EHP history row into SQLite (Feature 2); see :func:`log_ehb_history`."""
+    _log_history_point("ehp", username, ehp, timestamp, player_id, db_path)
+
+
+def read_player_ehb_history(
+    username: str,
+    db_path: str | None = None,
+    *,
+    start: str | None = None,
+    end: str | None = None,
+) -> list[dict]:
+    """Return ``[{timestamp, ehb}]`` for a player across renames, ordered by time.
+
+    ``start``/``end`` optionally bound the inclusive timestamp range.
+    """
+    resolved_path = init_database(db_path)
+    with closing(connect_db(resolved_path)) as conn:
+        return _read_series(conn, _HISTORY_SERIES["ehb"], [username], None, start, end, "ehb")[username]
+
+
+def read_player_ehp_history(
+    username: str,
+    db_path: str | None = None,
+    *,
+    start: str | None = None,
+    end: str | None = None,
+) -> list[dict]:
+    """Return ``[{timestamp, ehp}]`` for a player, ordered by time (Feature 2).
+
+    ``start``/``end`` optionally bound the inclusive timestamp range.
+    """
+    resolved_path = init_database(db_path)
+    with closing(connect_db(resolved_path)) as conn:
+        return _read_series(conn, _HISTORY_SERIES["ehp"], [username], None, start, end, "ehp")[username]
+
+
+# ---------------------------------------------------------------------------
+# Feature 1 — per-boss leaderboards / kill history
+# ---------------------------------------------------------------------------
+
+
+def log_boss_kills(boss: str, rows: list[dict], timestamp: str | None = None, db_path: str | None = None) -> None:
+    """Persist a boss-kill leaderboard snapshot.
+
+    ``rows`` is a list of ``{username, kills, rank}`` dicts, optionally with
+    ``player_id``. Primary keys on both storage tables make repeated writes of
+    the same snapshot idempotent.
+    """
+    if not rows:
+        return
+
+    resolved_path = init_database(db_path)
+    recorded_at = timestamp or datetime.now(timezone.utc).strftime(TS_FORMAT)
+    epoch = _to_epoch(recorded_at)
+    with closing(connect_db(resolved_path)) as conn:
+        cache: dict[str, int | None] = {}
+        for row in rows:
+            if not row.get("username"):
+                continue
+            username = str(row.get("username"))
+            player_id = _history_player_id(conn, username, row.get("player_id"), cache)
+            if player_id is not None and epoch is not None:
+                conn.execute(
+                    """
+                    INSERT OR IGNORE INTO player_boss_kills_history (player_id, boss, ts, kills, rank)
+                    VALUES (?, ?, ?, ?, ?)
+                    """,
+                    (player_id, boss, epoch, int(row.get("kills", 0)), row.get("rank")),
+                )
+            else:
+                conn.execute(
+                    """
+                    INSERT OR IGNORE INTO boss_kills_history (timestamp, boss, username, kills, rank)
+                    VALUES (?, ?, ?, ?, ?)
+                    """,
+                    (recorded_at, boss, username, int(row.get("kills", 0)), row.get("rank")),
+                )
+        _bump_data_version(conn, "boss_kills_history")
+        conn.commit()
+
+
+def _latest_snapshot_rows(
+    conn: sqlite3.Connection,
+    spec: _HistorySeries,
+    key_value: str,
+    columns: str,
+) -> tuple[str | None, list[dict]]:
+    """Return the newest snapshot time for ``key_value`` and its rows from both tables.
+
+    ``columns`` lists the value columns to return besides ``username``. Compact
+    rows are named by the player's current display name.
+    """
+    for identifier in (spec.legacy_table, spec.legacy_time, spec.compact_table, spec.key_column or ""):
+        _assert_identifier(identifier)
+    # nosemgrep: python.sqlalchemy.security.sqlalchemy-execute-raw-query.sqlalchemy-execute-raw-query,python.lang.security.audit.formatted-sql-query.formatted-sql-query -- identifiers validated above
+    legacy_latest = conn.execute(
+        f"SELECT MAX({spec.legacy_time}) FROM {spec.legacy_table} WHERE {spec.key_column} = ?",
+        (key_value,),
+    ).fetchone()[0]
+    # nosemgrep: python.sqlalchemy.security.sqlalchemy-execute-raw-query.sqlalchemy-execute-raw-query,python.lang.security.audit.formatted-sql-query.formatted-sql-query -- identifiers validated above
+    compact_latest = conn.execute(
+        f"SELECT MAX(ts) FROM {spec.compact_table} WHERE {spec.key_column} = ?",
+        (key_value,),
+    ).fetchone()[0]
+    candidates = [value for value in (legacy_latest, compact_latest and _from_epoch(compact_latest)) if value]
+    if not candidates:
+        return None, []
+    latest = max(candidates)
+
+    rows: list[dict] = []
+    if compact_latest is not None and _from_epoch(compact_latest) == latest:
+        # nosemgrep: python.sqlalchemy.security.sqlalchemy-execute-raw-query.sqlalchemy-execute-raw-query,python.lang.security.audit.formatted-sql-query.formatted-sql-query -- identifiers validated above; columns are call-site constants
+        rows.extend(
+            dict(row)
+            for row in conn.execute(
+                f"""
+                SELECT COALESCE(p.display_name, p.current_username, CAST(h.player_id AS TEXT)) AS username,
+                       {columns}
+                FROM {spec.compact_table} h
+                LEFT JOIN wom_players p ON p.player_id = h.player_id
+                WHERE h.{spec.key_column} = ? AND h.ts = ?
+                """,
+                (key_value, compact_latest),
+            )
+        )
+    if legacy_latest == latest:
+        # nosemgrep: python.sqlalchemy.security.sqlalchemy-execute-raw-query.sqlalchemy-execute-raw-query,python.lang.security.audit.formatted-sql-query.formatted-sql-query -- identifiers validated above; columns are call-site constants
+        rows.extend(
+            dict(row)
+            for row in conn.execute(
+                f"""
+                SELECT username, {columns.replace("h.", "")}
+                FROM {spec.legacy_table}
+                WHERE {spec.key_column} = ? AND {spec.legacy_time} = ?
+                """,
+                (key_value, legacy_latest),
+            )
+        )
+    return latest, rows
+
+
 def get_boss_leaderboard(boss: str, db_path: str | None = None) -> list[dict]:
     """Return the latest stored leaderboard for ``boss`` (kills descending)."""
     resolved_path = init_database(db_path)
     with closing(connect_db(resolved_path)) as conn:
-        latest = conn.execute(
-            "SELECT MAX(timestamp) AS ts FROM boss_kills_history WHERE boss = ?",
-            (boss,),
-        ).fetchone()
-        if not latest or latest["ts"] is None:
-            return []
-        rows = conn.execute(
-            """
-            SELECT username, kills, rank, timestamp
-            FROM boss_kills_history
-            WHERE boss = ? AND timestamp = ?
-            ORDER BY kills DESC, username
-            """,
-            (boss, latest["ts"]),
-        ).fetchall()
-    return [dict(row) for row in rows]
+        latest, rows = _latest_snapshot_rows(conn, _HISTORY_SERIES["boss"], boss, "h.kills, h.rank")
+    for row in rows:
+        row["timestamp"] = latest
+    rows.sort(key=lambda row: (-row["kills"], row["username"]))
+    return rows
 
 
 def get_boss_history(boss: str, username: str, db_path: str | None = None) -> list[dict]:
     """Return ``[{timestamp, kills}]`` history for one player at one boss."""
     resolved_path = init_database(db_path)
     with closing(connect_db(resolved_path)) as conn:
-        rows = conn.execute(
-            """
-            SELECT timestamp, kills FROM boss_kills_history
-            WHERE boss = ? AND username = ? COLLATE NOCASE
-            ORDER BY timestamp
-            """,
-            (boss, username),
-        ).fetchall()
-    return [{"timestamp": row["timestamp"], "kills": row["kills"]} for row in rows]
+        return _read_series(conn, _HISTORY_SERIES["boss"], [username], boss, None, None, "kills")[username]
 
 
 def list_tracked_bosses(db_path: str | None = None) -> list[str]:
@@ -701,7 +1838,12 @@ def list_tracked_bosses(db_path: str | None = None) -> list[str]:
     resolved_path = init_database(db_path)
     with closing(connect_db(resolved_path)) as conn:
         rows = conn.execute(
-            "SELECT DISTINCT boss FROM boss_kills_history ORDER BY boss"
+            """
+            SELECT boss FROM boss_kills_history
+            UNION
+            SELECT boss FROM player_boss_kills_history
+            ORDER BY boss
+            """
         ).fetchall()
     return [row["boss"] for row in rows]
 
@@ -715,7 +1857,8 @@ def log_gains_snapshot(rows: list[dict], db_path: str | None = None) -> int:
     """Persist gains-snapshot rows.
 
     ``rows`` is a list of ``{snapshot_time, period_start, period_end, username,
-    metric, gained}`` dicts. Returns the number of newly inserted rows.
+    metric, gained}`` dicts, optionally with ``player_id``. Returns the number
+    of newly inserted rows.
     """
     if not rows:
         return 0
@@ -723,25 +1866,46 @@ def log_gains_snapshot(rows: list[dict], db_path: str | None = None) -> int:
     resolved_path = init_database(db_path)
     inserted = 0
     with closing(connect_db(resolved_path)) as conn:
+        cache: dict[str, int | None] = {}
         for row in rows:
             if not row.get("username"):
                 continue
-            cursor = conn.execute(
-                """
-                INSERT OR IGNORE INTO gains_history
-                    (snapshot_time, period_start, period_end, username, metric, gained)
-                VALUES (?, ?, ?, ?, ?, ?)
-                """,
-                (
-                    row.get("snapshot_time"),
-                    row.get("period_start"),
-                    row.get("period_end"),
-                    str(row.get("username")),
-                    str(row.get("metric")),
-                    float(row.get("gained", 0)),
-                ),
-            )
+            username = str(row.get("username"))
+            player_id = _history_player_id(conn, username, row.get("player_id"), cache)
+            snapshot_epoch = _to_epoch(row.get("snapshot_time"))
+            start_epoch = _to_epoch(row.get("period_start"))
+            if (
+                player_id is not None
+                and snapshot_epoch is not None
+                and start_epoch is not None
+                and row.get("period_end") == row.get("snapshot_time")
+            ):
+                cursor = conn.execute(
+                    """
+                    INSERT OR IGNORE INTO player_gains_history (player_id, metric, ts, period_start, gained)
+                    VALUES (?, ?, ?, ?, ?)
+                    """,
+                    (player_id, str(row.get("metric")), snapshot_epoch, start_epoch, float(row.get("gained", 0))),
+                )
+            else:
+                cursor = conn.execute(
+                    """
+                    INSERT OR IGNORE INTO gains_history
+                        (snapshot_time, period_start, period_end, username, metric, gained)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    """,
+                    (
+                        row.get("snapshot_time"),
+                        row.get("period_start"),
+                        row.get("period_end"),
+                        username,
+                        str(row.get("metric")),
+                        float(row.get("gained", 0)),
+                    ),
+                )
             inserted += cursor.rowcount
+        if inserted:
+            _bump_data_version(conn, "gains_history")
         conn.commit()
     return inserted
 
@@ -751,51 +1915,249 @@ def list_gains_metrics(db_path: str | None = None) -> list[str]:
     resolved_path = init_database(db_path)
     with closing(connect_db(resolved_path)) as conn:
         rows = conn.execute(
-            "SELECT DISTINCT metric FROM gains_history ORDER BY metric"
+            """
+            SELECT metric FROM gains_history
+            UNION
+            SELECT metric FROM player_gains_history
+            ORDER BY metric
+            """
         ).fetchall()
     return [row["metric"] for row in rows]
 
 
-def read_gains_history(username: str, metric: str, db_path: str | None = None) -> list[dict]:
-    """Return ``[{snapshot_time, gained}]`` for a player+metric, ordered by time."""
+def read_gains_history(
+    username: str,
+    metric: str,
+    db_path: str | None = None,
+    *,
+    start: str | None = None,
+    end: str | None = None,
+) -> list[dict]:
+    """Return ``[{timestamp, gained}]`` for a player+metric, ordered by time.
+
+    ``start``/``end`` optionally bound the inclusive snapshot-time range.
+    """
     resolved_path = init_database(db_path)
     with closing(connect_db(resolved_path)) as conn:
-        rows = conn.execute(
-            """
-            SELECT snapshot_time, gained FROM gains_history
-            WHERE username = ? COLLATE NOCASE AND metric = ?
-            ORDER BY snapshot_time
-            """,
-            (username, metric),
-        ).fetchall()
-    return [{"timestamp": row["snapshot_time"], "gained": row["gained"]} for row in rows]
+        return _read_series(conn, _HISTORY_SERIES["gains"], [username], metric, start, end, "gained")[username]
 
 
 def read_latest_gains(metric: str, limit: int = 20, db_path: str | None = None) -> list[dict]:
     """Return the most recent snapshot's leaderboard for ``metric`` (gained desc)."""
     resolved_path = init_database(db_path)
     with closing(connect_db(resolved_path)) as conn:
-        latest = conn.execute(
-            "SELECT MAX(snapshot_time) AS ts FROM gains_history WHERE metric = ?",
-            (metric,),
-        ).fetchone()
-        if not latest or latest["ts"] is None:
-            return []
-        rows = conn.execute(
-            """
-            SELECT username, gained, snapshot_time, period_start, period_end
-            FROM gains_history
-            WHERE metric = ? AND snapshot_time = ?
-            ORDER BY gained DESC, username
-            LIMIT ?
-            """,
-            (metric, latest["ts"], limit),
-        ).fetchall()
-    return [dict(row) for row in rows]
+        latest, rows = _latest_snapshot_rows(
+            conn, _HISTORY_SERIES["gains"], metric, "h.gained, h.period_start"
+        )
+    for row in rows:
+        if isinstance(row["period_start"], int):
+            row["period_start"] = _from_epoch(row["period_start"])
+        row["snapshot_time"] = latest
+        row["period_end"] = latest
+    rows.sort(key=lambda row: (-row["gained"], row["username"]))
+    return rows[:limit]
+
+
+# ---------------------------------------------------------------------------
+# Batch history reads (multi-player comparison charts)
+# ---------------------------------------------------------------------------
+
+
+def read_history_batch(
+    usernames: list[str],
+    series: str,
+    metric: str | None = None,
+    db_path: str | None = None,
+    *,
+    start: str | None = None,
+    end: str | None = None,
+) -> dict[str, list[dict]]:
+    """Return time-ordered history for several players with a fixed number of queries.
+
+    ``series`` is ``"ehb"``, ``"ehp"`` or ``"gains"`` (which requires
+    ``metric``). The result maps each requested username, as given, to the same
+    row shape the single-player readers return; players without history map to
+    an empty list. Names match case-insensitively. One alias lookup, one
+    compact-table read and one legacy-table read serve all players.
+    """
+    if series not in ("ehb", "ehp", "gains"):
+        raise KeyError(series)
+    value_key = "gained" if series == "gains" else series
+    resolved_path = init_database(db_path)
+    with closing(connect_db(resolved_path)) as conn:
+        return _read_series(conn, _HISTORY_SERIES[series], usernames, metric, start, end, value_key)
+
+
+# ---------------------------------------------------------------------------
+# Snapshot retention / downsampling (roadmap Phase 4)
+# ---------------------------------------------------------------------------
+
+
+class _RetentionTable(t.NamedTuple):
+    family: str
+    table: str
+    time_column: str
+    series_columns: tuple[str, ...]
+    row_key: tuple[str, ...]
+    epoch: bool
+
+
+# Dense snapshot tables and the columns identifying one series within them.
+# Each series keeps full resolution for the recent window, then one row per
+# UTC day, then one row per week. Because every row is a trailing-window total
+# (not a delta), the latest row in a bucket supersedes the earlier overlapping
+# windows in that bucket, so thinning keeps that row rather than averaging.
+_SNAPSHOT_RETENTION_TABLES = (
+    _RetentionTable("gains_history", "gains_history", "snapshot_time", ("username", "metric"), ("id",), False),
+    _RetentionTable("boss_kills_history", "boss_kills_history", "timestamp", ("boss", "username"), ("id",), False),
+    _RetentionTable(
+        "gains_history", "player_gains_history", "ts", ("player_id", "metric"),
+        ("player_id", "metric", "ts"), True,
+    ),
+    _RetentionTable(
+        "boss_kills_history", "player_boss_kills_history", "ts", ("player_id", "boss"),
+        ("player_id", "boss", "ts"), True,
+    ),
+)
+_DAILY_BUCKET = {False: "substr({column}, 1, 10)", True: "{column} / 86400"}
+_WEEKLY_BUCKET = {False: "strftime('%Y-%W', {column})", True: "strftime('%Y-%W', {column}, 'unixepoch')"}
+
+
+def _retention_bound(spec: _RetentionTable, moment: datetime | None) -> str | int | None:
+    """Express ``moment`` in the time format of ``spec``'s table."""
+    if moment is None:
+        return None
+    if spec.epoch:
+        return int(moment.timestamp())
+    return moment.strftime(TS_FORMAT)
+
+
+def _thin_snapshot_rows(
+    conn: sqlite3.Connection,
+    spec: _RetentionTable,
+    bucket_template: str,
+    older_than: str | int,
+    not_before: str | int | None,
+) -> int:
+    """Delete all but the latest row per series and bucket within a time range."""
+    for identifier in (spec.table, spec.time_column, *spec.series_columns, *spec.row_key):
+        _assert_identifier(identifier)
+    time_column = spec.time_column
+    bucket = bucket_template.format(column=time_column)
+    partition = ", ".join((*spec.series_columns, bucket))
+    row_key = ", ".join(spec.row_key)
+    lower_bound = f"AND {time_column} >= ?" if not_before is not None else ""
+    params = [older_than] + ([not_before] if not_before is not None else [])
+    # nosemgrep: python.sqlalchemy.security.sqlalchemy-execute-raw-query.sqlalchemy-execute-raw-query,python.lang.security.audit.formatted-sql-query.formatted-sql-query -- identifiers validated above; bucket expressions are module constants
+    cursor = conn.execute(
+        f"""
+        DELETE FROM {spec.table}
+        WHERE ({row_key}) IN (
+            SELECT {row_key} FROM (
+                SELECT {row_key}, ROW_NUMBER() OVER (
+                    PARTITION BY {partition}
+                    ORDER BY {time_column} DESC
+                ) AS position
+                FROM {spec.table}
+                WHERE {time_column} < ? {lower_bound}
+            )
+            WHERE position > 1
+        )
+        """,
+        params,
+    )
+    return cursor.rowcount
+
+
+def compact_snapshot_history(
+    *,
+    raw_retention_days: int,
+    daily_retention_days: int,
+    now: datetime | None = None,
+    db_path: str | None = None,
+) -> dict:
+    """Downsample dense snapshot tables and report the reclaimed space.
+
+    Rows newer than ``raw_retention_days`` are untouched. Older rows are thinned
+    to the latest snapshot per series per UTC day, and rows older than
+    ``daily_retention_days`` to the latest snapshot per series per week. The
+    job is idempotent; running it repeatedly only deletes newly aged rows.
+    Legacy and player-ID keyed tables are both thinned; counts are reported per
+    data family.
+
+    Returns ``{"deleted": {family: rows}, "reclaimed_bytes": int}``. Freed pages
+    go to SQLite's freelist and are reused by later snapshot inserts, which is
+    what keeps the file size bounded without a blocking ``VACUUM``.
+
+    The cutoffs of each pass are stored in ``snapshot_compaction``. Everything
+    older was already thinned, so the next pass starts one bucket before the
+    previous cutoff and its scan cost tracks the newly aged rows rather than
+    the age of the database.
+    """
+    now = now or datetime.now(timezone.utc)
+    daily_retention_days = max(daily_retention_days, raw_retention_days)
+    raw_cutoff = now - timedelta(days=raw_retention_days)
+    daily_cutoff = now - timedelta(days=daily_retention_days)
+
+    resolved_path = init_database(db_path)
+    deleted: dict[str, int] = {}
+    with closing(connect_db(resolved_path)) as conn:
+        free_before = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        checkpoints = {
+            row["table_name"]: row for row in conn.execute("SELECT * FROM snapshot_compaction").fetchall()
+        }
+        for spec in _SNAPSHOT_RETENTION_TABLES:
+            # One bucket of overlap: the bucket holding the previous cutoff may
+            # have gained rows that now compete with its surviving row.
+            checkpoint = checkpoints.get(spec.table)
+            raw_floor, daily_floor = daily_cutoff, None
+            if checkpoint is not None:
+                previous_raw = datetime.fromtimestamp(_to_epoch(checkpoint["raw_cutoff"]), timezone.utc)
+                previous_daily = datetime.fromtimestamp(_to_epoch(checkpoint["daily_cutoff"]), timezone.utc)
+                raw_floor = max(raw_floor, previous_raw - timedelta(days=1))
+                daily_floor = previous_daily - timedelta(weeks=1)
+            raw_bound, daily_bound = _retention_bound(spec, raw_cutoff), _retention_bound(spec, daily_cutoff)
+            removed = _thin_snapshot_rows(
+                conn, spec, _DAILY_BUCKET[spec.epoch], raw_bound, _retention_bound(spec, raw_floor)
+            )
+            removed += _thin_snapshot_rows(
+                conn, spec, _WEEKLY_BUCKET[spec.epoch], daily_bound, _retention_bound(spec, daily_floor)
+            )
+            deleted[spec.family] = deleted.get(spec.family, 0) + removed
+            conn.execute(
+                """
+                INSERT INTO snapshot_compaction (table_name, raw_cutoff, daily_cutoff, updated_at)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(table_name) DO UPDATE SET
+                    raw_cutoff = excluded.raw_cutoff,
+                    daily_cutoff = excluded.daily_cutoff,
+                    updated_at = excluded.updated_at
+                """,
+                (
+                    spec.table,
+                    raw_cutoff.strftime(TS_FORMAT),
+                    daily_cutoff.strftime(TS_FORMAT),
+                    now.strftime(TS_FORMAT),
+                ),
+            )
+        _bump_data_version(conn, *(family for family, removed in deleted.items() if removed))
+        conn.commit()
+        free_after = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+
+    return {
+        "deleted": deleted,
+        "reclaimed_bytes": max(free_after - free_before, 0) * page_size,
+    }
 
 
 def import_csv_history(db_path: str | None = None, file_name: str = "ehb_log.csv") -> int:
-    """Import existing CSV history into SQLite, skipping duplicates."""
+    """Import existing CSV history into SQLite, skipping duplicates.
+
+    Rows for names that resolve to one known player go straight to
+    ``player_ehb_history`` so already-migrated history is not re-imported into
+    the legacy table on every start.
+    """
     resolved_path = init_database(db_path)
     resolved_csv = _resolve_history_csv_path(file_name)
     if not os.path.exists(resolved_csv):
@@ -806,6 +2168,7 @@ def import_csv_history(db_path: str | None = None, file_name: str = "ehb_log.csv
         rows = list(csv.reader(file_obj))
 
     with closing(connect_db(resolved_path)) as conn:
+        cache: dict[str, int | None] = {}
         for row in rows:
             if len(row) < 3:
                 continue
@@ -815,14 +2178,24 @@ def import_csv_history(db_path: str | None = None, file_name: str = "ehb_log.csv
                 ehb = float(row[2].strip())
             except ValueError:
                 continue
-            cursor = conn.execute(
-                """
-                INSERT OR IGNORE INTO ehb_history (timestamp, username, ehb)
-                VALUES (?, ?, ?)
-                """,
-                (timestamp, username, ehb),
-            )
+            player_id = _history_player_id(conn, username, None, cache)
+            epoch = _to_epoch(timestamp) if player_id is not None else None
+            if epoch is not None:
+                cursor = conn.execute(
+                    "INSERT OR IGNORE INTO player_ehb_history (player_id, ts, ehb) VALUES (?, ?, ?)",
+                    (player_id, epoch, ehb),
+                )
+            else:
+                cursor = conn.execute(
+                    """
+                    INSERT OR IGNORE INTO ehb_history (timestamp, username, ehb)
+                    VALUES (?, ?, ?)
+                    """,
+                    (timestamp, username, ehb),
+                )
             imported += cursor.rowcount
+        if imported:
+            _bump_data_version(conn, "ehb_history")
         conn.commit()
     return imported
 
@@ -853,7 +2226,7 @@ def log_api_call(
 ) -> None:
     """Insert one row into the outbound API call audit log."""
     resolved_path = init_database(db_path)
-    recorded_at = timestamp or datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+    recorded_at = timestamp or datetime.now(timezone.utc).strftime(TS_FORMAT)
     with closing(connect_db(resolved_path)) as conn:
         conn.execute(
             """
@@ -907,3 +2280,656 @@ def read_api_call_counts_by_endpoint(since_timestamp: str, db_path: str | None =
             (since_timestamp,),
         ).fetchall()
     return [dict(row) for row in rows]
+
+
+def read_api_calls_after(after_id: int, limit: int = 50, db_path: str | None = None) -> list[tuple[int, dict]]:
+    """Return up to ``limit`` ``(id, row)`` API calls logged after ``after_id``, oldest first.
+
+    Only the most recent ``limit`` are returned when more are pending.
+    """
+    resolved_path = init_database(db_path)
+    with closing(connect_db(resolved_path)) as conn:
+        rows = conn.execute(
+            """
+            SELECT id, timestamp, method, endpoint, status_code, duration_ms, outcome, user_agent
+            FROM api_call_log
+            WHERE id > ?
+            ORDER BY id DESC
+            LIMIT ?
+            """,
+            (after_id, limit),
+        ).fetchall()
+    return [(row["id"], {key: row[key] for key in row.keys() if key != "id"}) for row in reversed(rows)]
+
+
+def read_last_api_call_id(db_path: str | None = None) -> int:
+    """Return the id of the newest API call log row, or ``0``."""
+    resolved_path = init_database(db_path)
+    with closing(connect_db(resolved_path)) as conn:
+        row = conn.execute("SELECT MAX(id) AS id FROM api_call_log").fetchone()
+    return int(row["id"] or 0) if row else 0
+
+
+# ---------------------------------------------------------------------------
+# Shared bot runtime state (standalone dashboard, see web.services.shared_state)
+# ---------------------------------------------------------------------------
+
+
+def write_bot_runtime_state(values: dict[str, t.Any], db_path: str | None = None) -> None:
+    """Upsert JSON-serializable runtime values by key."""
+    if not values:
+        return
+    resolved_path = init_database(db_path)
+    updated_at = datetime.now(timezone.utc).strftime(TS_FORMAT)
+    with closing(connect_db(resolved_path)) as conn:
+        conn.executemany(
+            """
+            INSERT INTO bot_runtime_state (key, value, updated_at)
+            VALUES (?, ?, ?)
+            ON CONFLICT(key) DO UPDATE SET
+                value = excluded.value,
+                updated_at = excluded.updated_at
+            """,
+            [(key, json.dumps(value), updated_at) for key, value in values.items()],
+        )
+        conn.commit()
+
+
+def read_bot_runtime_state(db_path: str | None = None) -> dict[str, t.Any]:
+    """Return every runtime value keyed by name."""
+    resolved_path = init_database(db_path)
+    with closing(connect_db(resolved_path)) as conn:
+        rows = conn.execute("SELECT key, value FROM bot_runtime_state").fetchall()
+    return {row["key"]: json.loads(row["value"]) for row in rows}
+
+
+def append_bot_log_lines(lines: list[str], keep: int = 500, db_path: str | None = None) -> None:
+    """Append log lines and drop all but the newest ``keep``."""
+    if not lines:
+        return
+    resolved_path = init_database(db_path)
+    with closing(connect_db(resolved_path)) as conn:
+        conn.executemany("INSERT INTO bot_log_lines (line) VALUES (?)", [(line,) for line in lines])
+        conn.execute(
+            "DELETE FROM bot_log_lines WHERE seq <= (SELECT MAX(seq) FROM bot_log_lines) - ?",
+            (keep,),
+        )
+        conn.commit()
+
+
+def read_bot_log_lines(after_seq: int = 0, limit: int = 500, db_path: str | None = None) -> list[tuple[int, str]]:
+    """Return up to the newest ``limit`` ``(seq, line)`` log lines after ``after_seq``, oldest first."""
+    resolved_path = init_database(db_path)
+    with closing(connect_db(resolved_path)) as conn:
+        rows = conn.execute(
+            "SELECT seq, line FROM bot_log_lines WHERE seq > ? ORDER BY seq DESC LIMIT ?",
+            (after_seq, limit),
+        ).fetchall()
+    return [(row["seq"], row["line"]) for row in reversed(rows)]
+
+
+def read_last_bot_log_seq(db_path: str | None = None) -> int:
+    """Return the sequence number of the newest log line, or ``0``."""
+    resolved_path = init_database(db_path)
+    with closing(connect_db(resolved_path)) as conn:
+        row = conn.execute("SELECT MAX(seq) AS seq FROM bot_log_lines").fetchone()
+    return int(row["seq"] or 0) if row else 0
+
+
+# ---------------------------------------------------------------------------
+# Scheduled jobs (see utils.job_scheduler)
+# ---------------------------------------------------------------------------
+
+
+def read_scheduled_jobs(db_path: str | None = None) -> dict[str, dict]:
+    """Return ``{job_name: {last_period, last_success_at, last_attempt_at, last_error, failures}}``."""
+    resolved_path = init_database(db_path)
+    with closing(connect_db(resolved_path)) as conn:
+        rows = conn.execute(
+            "SELECT job_name, last_period, last_success_at, last_attempt_at, last_error, failures FROM scheduled_jobs"
+        ).fetchall()
+    return {row["job_name"]: {key: row[key] for key in row.keys() if key != "job_name"} for row in rows}
+
+
+def advance_scheduled_job(
+    job_name: str,
+    last_period: str,
+    *,
+    ran: bool = True,
+    observed_at: str | None = None,
+    db_path: str | None = None,
+) -> None:
+    """Record ``last_period`` as handled for ``job_name``.
+
+    ``ran=True`` marks a successful run and clears the failure state;
+    ``ran=False`` only moves the period forward (a baseline or skipped periods).
+    """
+    resolved_path = init_database(db_path)
+    observed_at = observed_at or datetime.now(timezone.utc).strftime(TS_FORMAT)
+    succeeded_at = observed_at if ran else None
+    with closing(connect_db(resolved_path)) as conn:
+        conn.execute(
+            """
+            INSERT INTO scheduled_jobs (job_name, last_period, last_success_at, last_attempt_at, last_error, failures)
+            VALUES (?, ?, ?, ?, NULL, 0)
+            ON CONFLICT(job_name) DO UPDATE SET
+                last_period = excluded.last_period,
+                last_success_at = COALESCE(excluded.last_success_at, scheduled_jobs.last_success_at),
+                last_attempt_at = COALESCE(excluded.last_attempt_at, scheduled_jobs.last_attempt_at),
+                last_error = CASE WHEN excluded.last_success_at IS NULL THEN scheduled_jobs.last_error END,
+                failures = CASE WHEN excluded.last_success_at IS NULL THEN scheduled_jobs.failures ELSE 0 END
+            """,
+            (job_name, last_period, succeeded_at, succeeded_at),
+        )
+        conn.commit()
+
+
+def record_scheduled_job_failure(
+    job_name: str,
+    error: str,
+    *,
+    observed_at: str | None = None,
+    db_path: str | None = None,
+) -> None:
+    """Record a failed run; ``last_period`` stays put so the period is retried."""
+    resolved_path = init_database(db_path)
+    observed_at = observed_at or datetime.now(timezone.utc).strftime(TS_FORMAT)
+    with closing(connect_db(resolved_path)) as conn:
+        conn.execute(
+            """
+            INSERT INTO scheduled_jobs (job_name, last_attempt_at, last_error, failures)
+            VALUES (?, ?, ?, 1)
+            ON CONFLICT(job_name) DO UPDATE SET
+                last_attempt_at = excluded.last_attempt_at,
+                last_error = excluded.last_error,
+                failures = scheduled_jobs.failures + 1
+            """,
+            (job_name, observed_at, error),
+        )
+        conn.commit()
+
+
+# ---------------------------------------------------------------------------
+# Period rollups
+# ---------------------------------------------------------------------------
+
+
+def read_period_rollups(
+    group_id: int, period_start: str, period_end: str, db_path: str | None = None
+) -> list[dict]:
+    """Return the stored rollups lying inside ``[period_start, period_end)``, oldest first."""
+    resolved_path = init_database(db_path)
+    with closing(connect_db(resolved_path)) as conn:
+        rows = conn.execute(
+            """
+            SELECT id, period_start, period_end
+            FROM period_rollups
+            WHERE group_id = ? AND period_start >= ? AND period_end <= ?
+            ORDER BY period_start, period_end
+            """,
+            (group_id, period_start, period_end),
+        ).fetchall()
+    return [dict(row) for row in rows]
+
+
+def read_period_rollup_gains(rollup_ids: list[int], db_path: str | None = None) -> list[dict]:
+    """Sum stored gains per ``(metric, player_id)`` over ``rollup_ids``.
+
+    ``username`` is the one stored with the newest of those rollups.
+    """
+    if not rollup_ids:
+        return []
+    placeholders = ", ".join("?" for _ in rollup_ids)
+    resolved_path = init_database(db_path)
+    with closing(connect_db(resolved_path)) as conn:
+        rows = conn.execute(
+            f"""
+            SELECT g.metric, g.player_id, SUM(g.gained) AS gained, g.username, MAX(r.period_end) AS seen
+            FROM period_rollup_gains g
+            JOIN period_rollups r ON r.id = g.rollup_id
+            WHERE g.rollup_id IN ({placeholders})
+            GROUP BY g.metric, g.player_id
+            """,
+            list(rollup_ids),
+        ).fetchall()
+    return [
+        {"metric": row["metric"], "player_id": row["player_id"], "username": row["username"], "gained": row["gained"]}
+        for row in rows
+    ]
+
+
+def read_period_rollup_events(rollup_ids: list[int], db_path: str | None = None) -> list[dict]:
+    """Return ``{kind, created_at, payload}`` events stored with ``rollup_ids``, oldest first."""
+    if not rollup_ids:
+        return []
+    placeholders = ", ".join("?" for _ in rollup_ids)
+    resolved_path = init_database(db_path)
+    with closing(connect_db(resolved_path)) as conn:
+        rows = conn.execute(
+            f"""
+            SELECT kind, created_at, payload
+            FROM period_rollup_events
+            WHERE rollup_id IN ({placeholders})
+            ORDER BY created_at, id
+            """,
+            list(rollup_ids),
+        ).fetchall()
+    return [
+        {"kind": row["kind"], "created_at": row["created_at"], "payload": json.loads(row["payload"])}
+        for row in rows
+    ]
+
+
+def store_period_rollup(
+    group_id: int,
+    period_start: str,
+    period_end: str,
+    gains: list[dict],
+    events: list[dict],
+    db_path: str | None = None,
+) -> bool:
+    """Store one closed period's gains and events in a single transaction.
+
+    ``gains`` rows are ``{metric, player_id, username, gained}`` and ``events``
+    rows ``{kind, created_at, payload}``. Rollups are immutable: if the period
+    is already stored, nothing is written and ``False`` is returned.
+    """
+    resolved_path = init_database(db_path)
+    created_at = datetime.now(timezone.utc).strftime(TS_FORMAT)
+    with closing(connect_db(resolved_path)) as conn:
+        cursor = conn.execute(
+            """
+            INSERT OR IGNORE INTO period_rollups (group_id, period_start, period_end, created_at)
+            VALUES (?, ?, ?, ?)
+            """,
+            (group_id, period_start, period_end, created_at),
+        )
+        if cursor.rowcount == 0:
+            return False
+        rollup_id = cursor.lastrowid
+        conn.executemany(
+            """
+            INSERT OR REPLACE INTO period_rollup_gains (rollup_id, metric, player_id, username, gained)
+            VALUES (?, ?, ?, ?, ?)
+            """,
+            [
+                (rollup_id, row["metric"], int(row["player_id"]), str(row["username"]), float(row["gained"]))
+                for row in gains
+            ],
+        )
+        conn.executemany(
+            "INSERT INTO period_rollup_events (rollup_id, kind, created_at, payload) VALUES (?, ?, ?, ?)",
+            [(rollup_id, row["kind"], row["created_at"], json.dumps(row["payload"])) for row in events],
+        )
+        conn.commit()
+    return True
+
+
+# ---------------------------------------------------------------------------
+# Gains window cache
+# ---------------------------------------------------------------------------
+
+
+def read_gains_window(
+    group_id: int,
+    metric: str,
+    start_date: str,
+    end_date: str,
+    *,
+    now: str | None = None,
+    db_path: str | None = None,
+) -> list[dict] | None:
+    """Return the cached ``{player_id, username, gained}`` entries, or ``None`` if missing or expired."""
+    resolved_path = init_database(db_path)
+    now = now or datetime.now(timezone.utc).strftime(TS_FORMAT)
+    with closing(connect_db(resolved_path)) as conn:
+        row = conn.execute(
+            """
+            SELECT entries FROM gains_window_cache
+            WHERE group_id = ? AND metric = ? AND start_date = ? AND end_date = ?
+              AND (expires_at IS NULL OR expires_at > ?)
+            """,
+            (group_id, metric, start_date, end_date, now),
+        ).fetchone()
+    if row is None:
+        return None
+    return [
+        {"player_id": player_id, "username": username, "gained": gained}
+        for player_id, username, gained in json.loads(row["entries"])
+    ]
+
+
+def store_gains_window(
+    group_id: int,
+    metric: str,
+    start_date: str,
+    end_date: str,
+    entries: list[dict],
+    *,
+    expires_at: str | None,
+    now: str | None = None,
+    db_path: str | None = None,
+) -> None:
+    """Cache one gains response; ``expires_at=None`` keeps it forever. Expired entries are pruned."""
+    resolved_path = init_database(db_path)
+    now = now or datetime.now(timezone.utc).strftime(TS_FORMAT)
+    payload = json.dumps([[row["player_id"], row["username"], row["gained"]] for row in entries])
+    with closing(connect_db(resolved_path)) as conn:
+        conn.execute("DELETE FROM gains_window_cache WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,))
+        conn.execute(
+            """
+            INSERT OR REPLACE INTO gains_window_cache
+                (group_id, metric, start_date, end_date, fetched_at, expires_at, entries)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            (group_id, metric, start_date, end_date, now, expires_at, payload),
+        )
+        conn.commit()
+
+
+# ---------------------------------------------------------------------------
+# Achievement backfill checkpoint
+# ---------------------------------------------------------------------------
+
+
+def read_achievement_backfill(db_path: str | None = None) -> dict | None:
+    """Return the backfill checkpoint row, or ``None`` if none was ever requested."""
+    resolved_path = init_database(db_path)
+    with closing(connect_db(resolved_path)) as conn:
+        try:
+            row = conn.execute("SELECT * FROM achievement_backfill WHERE id = 1").fetchone()
+        except sqlite3.OperationalError:
+            # A read-only dashboard on a database the bot has not migrated yet.
+            return None
+    if row is None:
+        return None
+    return {key: row[key] for key in row.keys() if key != "id"}
+
+
+def request_achievement_backfill(window_start: str, window_end: str, db_path: str | None = None) -> dict:
+    """Start a backfill of ``[window_start, window_end)`` from offset 0, replacing any previous one."""
+    resolved_path = init_database(db_path)
+    now = datetime.now(timezone.utc).strftime(TS_FORMAT)
+    with closing(connect_db(resolved_path)) as conn:
+        conn.execute(
+            """
+            INSERT OR REPLACE INTO achievement_backfill
+                (id, window_start, window_end, status, next_offset, pages, matched, inserted,
+                 last_error, requested_at, updated_at, completed_at)
+            VALUES (1, ?, ?, 'pending', 0, 0, 0, 0, NULL, ?, ?, NULL)
+            """,
+            (window_start, window_end, now, now),
+        )
+        conn.commit()
+    return read_achievement_backfill(db_path)
+
+
+def advance_achievement_backfill(
+    requested_at: str,
+    next_offset: int,
+    *,
+    pages: int,
+    matched: int,
+    inserted: int,
+    completed: bool = False,
+    db_path: str | None = None,
+) -> bool:
+    """Checkpoint progress of the backfill requested at ``requested_at``.
+
+    Returns ``False`` (and writes nothing) if that backfill has since been
+    replaced or cancelled.
+    """
+    resolved_path = init_database(db_path)
+    now = datetime.now(timezone.utc).strftime(TS_FORMAT)
+    with closing(connect_db(resolved_path)) as conn:
+        cursor = conn.execute(
+            """
+            UPDATE achievement_backfill SET
+                status = ?,
+                next_offset = ?,
+                pages = pages + ?,
+                matched = matched + ?,
+                inserted = inserted + ?,
+                last_error = NULL,
+                updated_at = ?,
+                completed_at = ?
+            WHERE id = 1 AND requested_at = ? AND status IN ('pending', 'running')
+            """,
+            (
+                "completed" if completed else "running",
+                next_offset,
+                pages,
+                matched,
+                inserted,
+                now,
+                now if completed else None,
+                requested_at,
+            ),
+        )
+        conn.commit()
+    return cursor.rowcount > 0
+
+
+def record_achievement_backfill_error(requested_at: str, error: str, db_path: str | None = None) -> None:
+    """Record a failed page; the checkpoint offset stays put so the page is retried."""
+    resolved_path = init_database(db_path)
+    now = datetime.now(timezone.utc).strftime(TS_FORMAT)
+    with closing(connect_db(resolved_path)) as conn:
+        conn.execute(
+            "UPDATE achievement_backfill SET last_error = ?, updated_at = ? WHERE id = 1 AND requested_at = ?",
+            (error, now, requested_at),
+        )
+        conn.commit()
+
+
+def cancel_achievement_backfill(db_path: str | None = None) -> bool:
+    """Stop a pending or running backfill; already stored achievements are kept."""
+    resolved_path = init_database(db_path)
+    now = datetime.now(timezone.utc).strftime(TS_FORMAT)
+    with closing(connect_db(resolved_path)) as conn:
+        cursor = conn.execute(
+            """
+            UPDATE achievement_backfill SET status = 'cancelled', updated_at = ?
+            WHERE id = 1 AND status IN ('pending', 'running')
+            """,
+            (now,),
+        )
+        conn.commit()
+    return cursor.rowcount > 0
+
+
+# ---------------------------------------------------------------------------
+# Conditional fetch validators
+# ---------------------------------------------------------------------------
+
+
+def read_wom_validator(uri: str, db_path: str | None = None) -> dict | None:
+    """Return ``{etag, body_hash}`` stored for ``uri``, or ``None``."""
+    resolved_path = init_database(db_path)
+    with closing(connect_db(resolved_path)) as conn:
+        row = conn.execute("SELECT etag, body_hash FROM wom_validators WHERE uri = ?", (uri,)).fetchone()
+    return dict(row) if row is not None else None
+
+
+def store_wom_validator(uri: str, *, etag: str | None, body_hash: str, db_path: str | None = None) -> None:
+    resolved_path = init_database(db_path)
+    now = datetime.now(timezone.utc).strftime(TS_FORMAT)
+    with closing(connect_db(resolved_path)) as conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO wom_validators (uri, etag, body_hash, updated_at) VALUES (?, ?, ?, ?)",
+            (uri, etag, body_hash, now),
+        )
+        conn.commit()
+
+
+# ---------------------------------------------------------------------------
+# Competitions
+# ---------------------------------------------------------------------------
+
+
+def upsert_competitions(group_id: int, competitions: list[dict], *, now: str, db_path: str | None = None) -> list[int]:
+    """Store discovered competitions; return the IDs that were not known before.
+
+    Each row carries ``id``, ``title``, ``metric``, ``type``, ``starts_at``,
+    ``ends_at``, ``participant_count`` and the ``next_poll_at`` to use if it is
+    new. A known competition keeps its poll schedule unless its start or end
+    moved, in which case it is rescheduled and no longer final.
+    """
+    if not competitions:
+        return []
+
+    resolved_path = init_database(db_path)
+    with closing(connect_db(resolved_path)) as conn:
+        ids = [row["id"] for row in competitions]
+        known = {
+            row["id"]
+            for row in conn.execute(
+                f"SELECT id FROM competitions WHERE id IN ({', '.join('?' for _ in ids)})", ids
+            )
+        }
+        conn.executemany(
+            """
+            INSERT INTO competitions (
+                id, group_id, title, metric, type, starts_at, ends_at,
+                participant_count, discovered_at, next_poll_at
+            )
+            VALUES (
+                :id, :group_id, :title, :metric, :type, :starts_at, :ends_at,
+                :participant_count, :discovered_at, :next_poll_at
+            )
+            ON CONFLICT(id) DO UPDATE SET
+                title = excluded.title,
+                metric = excluded.metric,
+                type = excluded.type,
+                participant_count = excluded.participant_count,
+                next_poll_at = CASE
+                    WHEN competitions.starts_at != excluded.starts_at OR competitions.ends_at != excluded.ends_at
+                    THEN excluded.next_poll_at ELSE competitions.next_poll_at END,
+                final = CASE
+                    WHEN competitions.starts_at != excluded.starts_at OR competitions.ends_at != excluded.ends_at
+                    THEN 0 ELSE competitions.final END,
+                starts_at = excluded.starts_at,
+                ends_at = excluded.ends_at
+            """,
+            [dict(row, group_id=group_id, discovered_at=now) for row in competitions],
+        )
+        _bump_data_version(conn, "competitions")
+        conn.commit()
+    return [competition_id for competition_id in ids if competition_id not in known]
+
+
+def read_due_competitions(now: str, limit: int, db_path: str | None = None) -> list[dict]:
+    """Return up to ``limit`` competitions whose next poll is due, most overdue first."""
+    resolved_path = init_database(db_path)
+    with closing(connect_db(resolved_path)) as conn:
+        rows = conn.execute(
+            """
+            SELECT * FROM competitions
+            WHERE next_poll_at IS NOT NULL AND next_poll_at <= ?
+            ORDER BY next_poll_at, id
+            LIMIT ?
+            """,
+            (now, limit),
+        ).fetchall()
+    return [dict(row) for row in rows]
+
+
+def read_competitions(group_id: int | None = None, db_path: str | None = None) -> list[dict]:
+    """Return stored competitions, latest end first."""
+    resolved_path = init_database(db_path)
+    with closing(connect_db(resolved_path)) as conn:
+        try:
+            if group_id is None:
+                rows = conn.execute("SELECT * FROM competitions ORDER BY ends_at DESC, id DESC").fetchall()
+            else:
+                rows = conn.execute(
+                    "SELECT * FROM competitions WHERE group_id = ? ORDER BY ends_at DESC, id DESC", (group_id,)
+                ).fetchall()
+        except sqlite3.OperationalError:
+            # A read-only dashboard on a database the bot has not migrated yet.
+            return []
+    return [dict(row) for row in rows]
+
+
+def read_competition(competition_id: int, db_path: str | None = None) -> dict | None:
+    resolved_path = init_database(db_path)
+    with closing(connect_db(resolved_path)) as conn:
+        try:
+            row = conn.execute("SELECT * FROM competitions WHERE id = ?", (competition_id,)).fetchone()
+        except sqlite3.OperationalError:
+            return None
+    return dict(row) if row is not None else None
+
+
+def read_competition_standings(competition_id: int, db_path: str | None = None) -> list[dict]:
+    """Return the latest stored standings of a competition, best rank first."""
+    resolved_path = init_database(db_path)
+    with closing(connect_db(resolved_path)) as conn:
+        try:
+            rows = conn.execute(
+                """
+                SELECT player_id, username, rank, gained FROM competition_standings
+                WHERE competition_id = ?
+                  AND observed_at = (
+                      SELECT MAX(observed_at) FROM competition_standings WHERE competition_id = ?
+                  )
+                ORDER BY rank
+                """,
+                (competition_id, competition_id),
+            ).fetchall()
+        except sqlite3.OperationalError:
+            return []
+    return [dict(row) for row in rows]
+
+
+def store_competition_poll(
+    competition_id: int,
+    *,
+    polled_at: str,
+    next_poll_at: str | None,
+    standings: list[dict] | None = None,
+    final: bool = False,
+    db_path: str | None = None,
+) -> None:
+    """Record a poll, with a new standings snapshot if ``standings`` is given.
+
+    ``standings`` rows carry ``player_id``, ``username``, ``rank`` and
+    ``gained``. A final poll drops every snapshot but the latest one.
+    """
+    resolved_path = init_database(db_path)
+    with closing(connect_db(resolved_path)) as conn:
+        if standings is not None:
+            conn.executemany(
+                """
+                INSERT OR REPLACE INTO competition_standings
+                    (competition_id, observed_at, player_id, username, rank, gained)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                [
+                    (competition_id, polled_at, row["player_id"], row["username"], row["rank"], row["gained"])
+                    for row in standings
+                ],
+            )
+        conn.execute(
+            """
+            UPDATE competitions SET
+                last_polled_at = ?,
+                next_poll_at = ?,
+                standings_at = COALESCE(?, standings_at),
+                final = ?
+            WHERE id = ?
+            """,
+            (polled_at, next_poll_at, polled_at if standings is not None else None, int(final), competition_id),
+        )
+        if final:
+            conn.execute(
+                """
+                DELETE FROM competition_standings
+                WHERE competition_id = ?
+                  AND observed_at < (SELECT standings_at FROM competitions WHERE id = ?)
+                """,
+                (competition_id, competition_id),
+            )
+        if standings is not None or final:
+            _bump_data_version(conn, "competitions")
+        conn.commit()
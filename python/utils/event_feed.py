@@ -0,0 +1,97 @@
+"""Sequence-numbered in-memory event feeds for push-based live views.
+
+A :class:`EventFeed` keeps the most recent events in a ring buffer, each with a
+monotonically increasing sequence number. Readers remember the last sequence
+they saw and ask for what came after it, so a reader only ever receives new
+events. :meth:`EventFeed.wait` parks an async reader on a future until the next
+:meth:`EventFeed.publish`; an idle feed therefore costs its readers nothing.
+
+Publishing is thread-safe and wakes readers on their own event loops.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+from collections import deque
+from typing import Any, Iterator
+
+
+def _wake(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class EventFeed:
+    """Ring buffer of ``(seq, data)`` events with async waiters."""
+
+    def __init__(self, maxlen: int = 500):
+        self.maxlen = maxlen
+        self._events: deque[tuple[int, Any]] = deque(maxlen=maxlen)
+        self._seq = 0
+        self._lock = threading.Lock()
+        self._waiters: list[tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+
+    @property
+    def last_seq(self) -> int:
+        """Sequence number of the newest event; ``0`` before the first one."""
+        return self._seq
+
+    def publish(self, data: Any) -> int:
+        """Append ``data`` as the next event, wake all waiters and return its sequence."""
+        with self._lock:
+            self._seq += 1
+            self._events.append((self._seq, data))
+            waiters, self._waiters = self._waiters, []
+        for loop, future in waiters:
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(_wake, future)
+        return self._seq
+
+    # ``deque`` compatibility: ``BotState.log_buffer`` used to be a plain deque.
+    append = publish
+
+    def __iter__(self) -> Iterator[Any]:
+        with self._lock:
+            return iter([data for _, data in self._events])
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def since(self, seq: int) -> list[tuple[int, Any]]:
+        """Return retained events newer than ``seq``, oldest first."""
+        with self._lock:
+            return self._since(seq)
+
+    def _since(self, seq: int) -> list[tuple[int, Any]]:
+        if seq >= self._seq:
+            return []
+        # Sequences are contiguous, so the newer events are the buffer's tail.
+        count = min(self._seq - seq, len(self._events))
+        return list(self._events)[-count:] if count else []
+
+    def tail(self, count: int) -> list[tuple[int, Any]]:
+        """Return the ``count`` most recent events, oldest first."""
+        with self._lock:
+            return list(self._events)[-count:] if count > 0 else []
+
+    async def wait(self, seq: int, timeout: float | None = None) -> list[tuple[int, Any]]:
+        """Return events newer than ``seq``, waiting up to ``timeout`` seconds for one.
+
+        Returns an empty list on timeout.
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            events = self._since(seq)
+            if events:
+                return events
+            future = loop.create_future()
+            self._waiters.append((loop, future))
+        try:
+            await asyncio.wait({future}, timeout=timeout)
+        finally:
+            if not future.done():
+                with self._lock:
+                    self._waiters = [entry for entry in self._waiters if entry[1] is not future]
+                future.cancel()
+        return self.since(seq)
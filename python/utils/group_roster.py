@@ -0,0 +1,80 @@
+"""Lean decoding of the group-details payload for the rank check.
+
+``wom_client.groups.get_details`` decodes the whole document into wom.py's
+models: every player field, enum conversions and the group's social links. The
+rank check, membership tracker and status collector use only a few fields per
+member. :func:`fetch_group_roster` makes the same request through the wom.py
+client's session (:func:`utils.http_pool.wom_get`). It decodes the body into
+the small structs below.
+msgspec skips every other field without building it, and the structs are not
+tracked by the garbage collector.
+
+The structs keep wom.py's attribute names, so ``membership.player.display_name``
+and friends work unchanged. ``role`` and ``status`` are plain strings rather
+than enums. The code reading them already accepts both.
+"""
+
+from __future__ import annotations
+
+import typing as t
+from datetime import datetime
+
+import msgspec
+from wom import Err, Ok, models, routes
+
+from .http_pool import wom_get
+
+__all__ = ("GroupRoster", "RosterMembership", "RosterPlayer", "decode_group_roster", "fetch_group_roster")
+
+
+class RosterPlayer(msgspec.Struct, rename="camel", gc=False):
+    id: int
+    display_name: str
+    exp: int = 0
+    ehp: float = 0.0
+    ehb: float = 0.0
+    status: t.Optional[str] = None
+    updated_at: t.Optional[datetime] = None
+    last_changed_at: t.Optional[datetime] = None
+
+
+class RosterMembership(msgspec.Struct, rename="camel", gc=False):
+    player_id: int
+    player: RosterPlayer
+    role: t.Optional[str] = None
+    created_at: t.Optional[datetime] = None
+
+
+class GroupRoster(msgspec.Struct, rename="camel", gc=False):
+    id: int
+    name: str = ""
+    member_count: t.Optional[int] = None
+    memberships: t.List[RosterMembership] = []
+
+
+_decoder = msgspec.json.Decoder(GroupRoster)
+_DEFAULT_ERROR = "An unexpected error occurred while making the request."
+
+
+def decode_group_roster(data: bytes) -> GroupRoster:
+    """Decode a WOM group-details body into a :class:`GroupRoster`."""
+    return _decoder.decode(data)
+
+
+async def fetch_group_roster(wom_client, group_id: int) -> t.Any:
+    """Fetch group details like ``groups.get_details``, returning ``Ok(GroupRoster)`` or ``Err``."""
+    response = await wom_get(wom_client, routes.GROUP_DETAILS.compile(group_id))
+    if response.status >= 400:
+        return Err(_error_response(response.body, response.status))
+    return Ok(decode_group_roster(response.body))
+
+
+def _error_response(body: bytes, status: int) -> models.HttpErrorResponse:
+    """Build the ``HttpErrorResponse`` wom.py returns for an error body."""
+    try:
+        error = msgspec.json.decode(body)
+    except msgspec.DecodeError:
+        return models.HttpErrorResponse(_DEFAULT_ERROR, status)
+    if not isinstance(error, dict):
+        return models.HttpErrorResponse(_DEFAULT_ERROR, status)
+    return models.HttpErrorResponse(error.get("message", _DEFAULT_ERROR), status, error.get("code"))
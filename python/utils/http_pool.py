@@ -0,0 +1,151 @@
+"""One pooled, keep-alive HTTP connector for every Wise Old Man API call.
+
+The wom.py client and the raw calls (group refresh, fetch diagnostics,
+``/debug_group``) used to build a fresh ``aiohttp.TCPConnector`` per client or
+per call, so every raw request paid for DNS, TCP and TLS again. :data:`pool`
+owns a single IPv4 connector with DNS caching, keep-alive and a connection
+limit. The wom.py client opens its session on it via
+:meth:`WomHttpPool.tracked_session`, and raw calls share
+:meth:`WomHttpPool.session`. Both are tracked sessions (see
+:mod:`utils.api_usage`).
+
+The bot enters the pool with ``async with pool:`` around its lifetime, so the
+connector is closed on shutdown.
+
+:func:`wom_get` sends an undecoded GET through the wom.py client's own
+session, for callers that decode the body themselves or send conditional
+headers. It is the only place outside ``WOM.Client`` that touches wom.py's
+private ``HttpService`` attributes. ``requirements.txt`` pins the wom.py
+version these were checked against, and ``tests/test_http_pool.py`` fails if
+they move.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import socket
+from dataclasses import dataclass
+from typing import Mapping, Optional
+
+import aiohttp
+
+from .api_usage import create_tracked_session
+
+# All traffic goes to one host; the scheduler already paces it, so a few
+# sockets are plenty.
+CONNECTION_LIMIT = 8
+DNS_CACHE_SECONDS = 300
+KEEPALIVE_SECONDS = 30
+
+
+class WomHttpPool:
+    """Lazily created shared connector plus a shared tracked session for raw calls."""
+
+    def __init__(
+        self,
+        *,
+        limit: int = CONNECTION_LIMIT,
+        ttl_dns_cache: int = DNS_CACHE_SECONDS,
+        keepalive_timeout: float = KEEPALIVE_SECONDS,
+    ) -> None:
+        self.limit = limit
+        self.ttl_dns_cache = ttl_dns_cache
+        self.keepalive_timeout = keepalive_timeout
+        self._connector: Optional[aiohttp.TCPConnector] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # Closes of connectors left behind by a previous event loop.
+        self._retiring: set[asyncio.Task] = set()
+
+    @property
+    def connector(self) -> aiohttp.TCPConnector:
+        """The shared connector, created on first use inside the running loop."""
+        loop = asyncio.get_running_loop()
+        if self._connector is None or self._connector.closed or self._loop is not loop:
+            self._retire()
+            self._connector = aiohttp.TCPConnector(
+                # Prefer IPv4 inside containers where IPv6 DNS answers exist but
+                # outbound IPv6 connectivity is not actually configured.
+                family=socket.AF_INET,
+                limit=self.limit,
+                ttl_dns_cache=self.ttl_dns_cache,
+                keepalive_timeout=self.keepalive_timeout,
+            )
+            self._session = None
+            self._loop = loop
+        return self._connector
+
+    def _retire(self) -> None:
+        """Schedule the close of the previous loop's session and connector before replacing them.
+
+        A loop still running in another thread closes its own; otherwise the
+        close runs as a task on the current loop, which :meth:`close` awaits.
+        """
+        session, connector, loop = self._session, self._connector, self._loop
+        self._session = self._connector = self._loop = None
+        if connector is None or connector.closed:
+            return
+        if loop is not None and loop.is_running():
+            asyncio.run_coroutine_threadsafe(_close_session_and_connector(session, connector), loop)
+            return
+        task = asyncio.get_running_loop().create_task(_close_session_and_connector(session, connector))
+        self._retiring.add(task)
+        task.add_done_callback(self._retiring.discard)
+
+    def tracked_session(self, **kwargs) -> aiohttp.ClientSession:
+        """Return a new tracked session on the shared connector; closing it leaves the pool open."""
+        return create_tracked_session(connector=self.connector, connector_owner=False, **kwargs)
+
+    def session(self) -> aiohttp.ClientSession:
+        """Return the shared tracked session for raw WOM calls. Do not close it."""
+        connector = self.connector
+        if self._session is None or self._session.closed:
+            self._session = create_tracked_session(connector=connector, connector_owner=False)
+        return self._session
+
+    async def close(self) -> None:
+        session, connector = self._session, self._connector
+        self._session = self._connector = self._loop = None
+        await _close_session_and_connector(session, connector)
+        if self._retiring:
+            await asyncio.gather(*self._retiring, return_exceptions=True)
+
+    async def __aenter__(self) -> "WomHttpPool":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+
+async def _close_session_and_connector(
+    session: Optional[aiohttp.ClientSession], connector: Optional[aiohttp.TCPConnector]
+) -> None:
+    if session is not None and not session.closed:
+        await session.close()
+    if connector is not None and not connector.closed:
+        await connector.close()
+
+
+pool = WomHttpPool()
+
+
+@dataclass(frozen=True)
+class RawResponse:
+    """Status, undecoded body and headers of a :func:`wom_get` response."""
+
+    status: int
+    body: bytes
+    headers: Mapping[str, str]
+
+
+async def wom_get(wom_client, route, *, headers: Optional[Mapping[str, str]] = None) -> RawResponse:
+    """GET a compiled wom.py ``route`` on ``wom_client``'s session without decoding it.
+
+    The client's API key and user agent are sent along with ``headers``. Error
+    statuses are returned, not raised; a 304 has an empty body.
+    """
+    http = wom_client._http
+    request_headers = {**http._headers, **(headers or {})}
+    async with http._session.get(http._base_url + route.uri, headers=request_headers, params=route.params) as response:
+        body = b"" if response.status == 304 else await response.read()
+        return RawResponse(response.status, body, response.headers)
@@ -0,0 +1,58 @@
+"""Inactivity classification over the persisted player status rows (Feature 3).
+
+A player is inactive for ``N`` days when Wise Old Man has recorded no stat
+change (``last_changed_at``) in the last ``N`` days. ``players.last_changed_at``
+is indexed, so listing inactive players is a range scan. Players WOM has never
+seen change are reported as ``"unknown"`` rather than inactive. Only current
+group members under their current name are listed (open ``group_memberships``
+intervals and ``wom_players.display_name``).
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+from .database import format_ts, parse_ts, read_players_changed_before, read_players_without_change_time
+
+ACTIVE = "active"
+INACTIVE = "inactive"
+UNKNOWN = "unknown"
+
+
+def _utc_now(now: datetime | None) -> datetime:
+    now = now or datetime.now(timezone.utc)
+    return now.astimezone(timezone.utc) if now.tzinfo else now.replace(tzinfo=timezone.utc)
+
+
+def days_since_change(row: dict, now: datetime | None = None) -> float | None:
+    """Return days since the row's ``last_changed_at``, or ``None`` if unknown."""
+    changed_at = parse_ts(row.get("last_changed_at"))
+    if changed_at is None:
+        return None
+    return (_utc_now(now) - changed_at).total_seconds() / 86400
+
+
+def classify(row: dict, days: int, now: datetime | None = None) -> str:
+    """Classify one status row as ``"active"``, ``"inactive"`` or ``"unknown"``."""
+    elapsed = days_since_change(row, now)
+    if elapsed is None:
+        return UNKNOWN
+    return INACTIVE if elapsed > days else ACTIVE
+
+
+def inactive_players(days: int, *, now: datetime | None = None, db_path: str | None = None) -> list[dict]:
+    """Return players with no WOM stat change in ``days`` days, longest inactive first.
+
+    Each row is a status row plus ``days_inactive`` (whole days).
+    """
+    now = _utc_now(now)
+    cutoff = format_ts(now - timedelta(days=days))
+    rows = read_players_changed_before(cutoff, db_path=db_path)
+    for row in rows:
+        row["days_inactive"] = int(days_since_change(row, now))
+    return rows
+
+
+def players_with_unknown_activity(db_path: str | None = None) -> list[dict]:
+    """Return captured players for which WOM has no last-change time."""
+    return read_players_without_change_time(db_path=db_path)
@@ -0,0 +1,244 @@
+"""One scheduler for the periodic reporters, with persisted per-job state.
+
+Each :class:`Job` has a :class:`Schedule` of period boundaries, such as every
+Sunday 18:00 UTC or every 24 hours, and a coroutine that handles one period.
+:class:`JobScheduler` records the newest handled period of every job in the
+``scheduled_jobs`` table, so after a restart a job neither repeats a period
+it already ran nor silently skips one that came due while the bot was down:
+
+- Catch-up: ``catch_up="latest"`` runs only the newest missed period, and
+  ``"all"`` runs up to ``max_catch_up`` of them, oldest first. Periods more than
+  ``misfire_grace_seconds`` late are skipped instead.
+- A failed run leaves the period unhandled and is retried after ``retry_seconds``.
+- Every period is delayed by a jitter of up to ``jitter_seconds``. It is
+  derived from the job name and period, so it is stable across restarts and
+  jobs whose boundaries coincide do not all start their WOM calls at once.
+
+A job that has never run starts from the most recent boundary without running it.
+The exception is ``run_on_first_start``, which runs that period right away.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Optional
+
+from .database import advance_scheduled_job, format_ts, parse_ts, read_scheduled_jobs, record_scheduled_job_failure
+
+CATCH_UP_LATEST = "latest"
+CATCH_UP_ALL = "all"
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+# Used to step from a boundary to the one before it.
+_TICK = timedelta(microseconds=1)
+
+
+def _utc_now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class Schedule:
+    """Period boundaries of a job. ``previous(now)`` is ``<= now``; ``next(after)`` is ``> after``."""
+
+    def __init__(self, previous: Callable[[datetime], datetime], next: Callable[[datetime], datetime]):
+        self.previous = previous
+        self.next = next
+
+
+class IntervalSchedule(Schedule):
+    """Boundaries every ``seconds``, anchored at the Unix epoch."""
+
+    def __init__(self, seconds: float):
+        self.seconds = max(float(seconds), 1.0)
+        super().__init__(self._previous, lambda after: self._previous(after) + timedelta(seconds=self.seconds))
+
+    def _previous(self, now: datetime) -> datetime:
+        elapsed = (now - _EPOCH).total_seconds()
+        return _EPOCH + timedelta(seconds=elapsed // self.seconds * self.seconds)
+
+
+@dataclass
+class Job:
+    """A periodic task; ``run`` receives the period boundary it handles."""
+
+    name: str
+    schedule: Schedule
+    run: Callable[[datetime], Awaitable[None]]
+    catch_up: str = CATCH_UP_LATEST
+    max_catch_up: int = 1
+    misfire_grace_seconds: Optional[float] = None
+    jitter_seconds: float = 0.0
+    retry_seconds: float = 900.0
+    initial_delay_seconds: float = 0.0
+    run_on_first_start: bool = False
+
+    def jitter(self, period: datetime) -> timedelta:
+        """Stable delay in ``[0, jitter_seconds)`` for ``period``."""
+        if self.jitter_seconds <= 0:
+            return timedelta(0)
+        digest = hashlib.blake2b(f"{self.name}:{format_ts(period)}".encode(), digest_size=4).digest()
+        return timedelta(seconds=int.from_bytes(digest, "big") / 2**32 * self.jitter_seconds)
+
+    def due_at(self, period: datetime) -> datetime:
+        return period + self.jitter(period)
+
+
+@dataclass
+class RunPlan:
+    """Periods to run now, and the period to record first as handled without running."""
+
+    periods: list[datetime]
+    skip_to: Optional[datetime] = None
+
+
+def plan_runs(job: Job, last_period: Optional[datetime], now: datetime) -> RunPlan:
+    """Decide which periods of ``job`` to run at ``now`` given its last handled period (pure)."""
+    previous = job.schedule.previous
+    period = previous(now)
+    if job.due_at(period) > now:
+        period = previous(period - _TICK)
+    if last_period is None and not job.run_on_first_start:
+        return RunPlan([], skip_to=period)
+    if last_period is not None and period <= last_period:
+        return RunPlan([])
+
+    newest = period
+    limit = max(job.max_catch_up, 1) if job.catch_up == CATCH_UP_ALL and last_period is not None else 1
+    periods: list[datetime] = []
+    while last_period is None or period > last_period:
+        grace = job.misfire_grace_seconds
+        if grace is not None and (now - job.due_at(period)).total_seconds() > grace:
+            break
+        periods.append(period)
+        if len(periods) >= limit:
+            break
+        period = previous(period - _TICK)
+    periods.reverse()
+
+    skip_to = previous(periods[0] - _TICK) if periods else newest
+    if last_period is not None and skip_to <= last_period:
+        skip_to = None
+    if last_period is None and periods:
+        skip_to = None
+    return RunPlan(periods, skip_to=skip_to)
+
+
+class JobScheduler:
+    """Run registered jobs when their periods come due, persisting what was handled."""
+
+    def __init__(
+        self,
+        *,
+        log: Callable[[str], None] = print,
+        clock: Callable[[], datetime] = _utc_now,
+        db_path: Optional[str] = None,
+    ):
+        self.log = log
+        self.clock = clock
+        self.db_path = db_path
+        self.jobs: dict[str, Job] = {}
+        self._last_period: dict[str, Optional[datetime]] = {}
+        self._retry_at: dict[str, datetime] = {}
+        self._not_before: dict[str, datetime] = {}
+        self._running: dict[str, asyncio.Task] = {}
+        self._loaded = False
+
+    def add(self, job: Job) -> Job:
+        if job.name in self.jobs:
+            raise ValueError(f"Job {job.name!r} is already scheduled.")
+        self.jobs[job.name] = job
+        self._loaded = False
+        self._not_before[job.name] = self.clock() + timedelta(seconds=job.initial_delay_seconds)
+        return job
+
+    def _load(self) -> None:
+        if self._loaded:
+            return
+        state = read_scheduled_jobs(db_path=self.db_path)
+        for name in self.jobs:
+            self._last_period[name] = parse_ts((state.get(name) or {}).get("last_period"))
+        self._loaded = True
+
+    def next_run_at(self, job: Job) -> datetime:
+        """When ``job`` should next be checked."""
+        self._load()
+        not_before = self._not_before[job.name]
+        if job.name in self._retry_at:
+            return max(self._retry_at[job.name], not_before)
+        last_period = self._last_period.get(job.name)
+        if last_period is None:
+            return not_before
+        period = job.schedule.next(last_period)
+        return max(job.due_at(period), not_before)
+
+    def _advance(self, job: Job, period: datetime, *, ran: bool) -> None:
+        advance_scheduled_job(job.name, format_ts(period), ran=ran, db_path=self.db_path)
+        self._last_period[job.name] = period
+
+    async def run_job(self, job: Job) -> bool:
+        """Run whatever ``job`` has due now; return ``False`` if a run failed."""
+        self._load()
+        now = self.clock()
+        plan = plan_runs(job, self._last_period.get(job.name), now)
+        if plan.skip_to is not None:
+            if self._last_period.get(job.name) is not None:
+                self.log(f"Scheduler: {job.name} skipped missed periods up to {format_ts(plan.skip_to)} UTC.")
+            self._advance(job, plan.skip_to, ran=False)
+        self._retry_at.pop(job.name, None)
+        for period in plan.periods:
+            try:
+                await job.run(period)
+            except Exception as e:  # noqa: BLE001 — one failed job must not stop the scheduler
+                record_scheduled_job_failure(job.name, str(e), db_path=self.db_path)
+                self._retry_at[job.name] = self.clock() + timedelta(seconds=job.retry_seconds)
+                self.log(
+                    f"Scheduler: {job.name} failed for period {format_ts(period)} UTC: {e}. "
+                    f"Retrying in {job.retry_seconds / 60:.0f} minutes."
+                )
+                return False
+            self._advance(job, period, ran=True)
+        return True
+
+    async def run_forever(self) -> None:
+        """Start due jobs as tasks (at most one per job) and sleep until the next is due."""
+        self._load()
+        try:
+            await self._loop()
+        finally:
+            for task in self._running.values():
+                task.cancel()
+            self._running.clear()
+
+    async def _loop(self) -> None:
+        while True:
+            now = self.clock()
+            for name, job in self.jobs.items():
+                if name not in self._running and self.next_run_at(job) <= now:
+                    self._running[name] = asyncio.create_task(self.run_job(job))
+
+            idle = [job for name, job in self.jobs.items() if name not in self._running]
+            timeout = None
+            if idle:
+                wake_at = min(self.next_run_at(job) for job in idle)
+                timeout = max((wake_at - self.clock()).total_seconds(), 1.0)
+            if self._running:
+                done, _ = await asyncio.wait(
+                    set(self._running.values()), timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                for name, task in list(self._running.items()):
+                    if task in done:
+                        del self._running[name]
+                        if not task.cancelled() and task.exception() is not None:
+                            self.log(f"Scheduler: {name} crashed: {task.exception()}")
+                            self._retry_at[name] = self.clock() + timedelta(seconds=self.jobs[name].retry_seconds)
+            elif timeout is not None:
+                await asyncio.sleep(timeout)
+            else:
+                return
+
+    def start(self) -> asyncio.Task:
+        """Start :meth:`run_forever` as a task."""
+        return asyncio.create_task(self.run_forever())
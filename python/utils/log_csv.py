@@ -19,7 +19,7 @@ def _resolve_csv_path(file_name: str) -> str:
     return os.path.join(base_dir, file_name)
 
 
-def log_ehb_to_csv(username, ehb, file_name="ehb_log.csv", print_csv_changes=True):
+def log_ehb_to_csv(username, ehb, file_name="ehb_log.csv", print_csv_changes=True, player_id=None):
     """Logs the username, EHB value, and timestamp to a CSV file."""
     resolved_path = _resolve_csv_path(file_name)
     try:
@@ -27,7 +27,7 @@ def log_ehb_to_csv(username, ehb, file_name="ehb_log.csv", print_csv_changes=Tru
             writer = csv.writer(file)
             timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             writer.writerow([timestamp, username, ehb])
-            log_ehb_history(username, ehb, timestamp=timestamp)
+            log_ehb_history(username, ehb, timestamp=timestamp, player_id=player_id)
             if print_csv_changes:
                 timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
                 print(
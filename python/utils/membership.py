@@ -0,0 +1,131 @@
+"""Group membership intervals derived from the rank check's group details.
+
+Every rank check already downloads the full roster. :class:`MembershipTracker`
+keeps the previous roster in memory and diffs each new one against it, so the
+database is only written when someone joins, leaves or changes role. On first
+use the previous roster is seeded from the open intervals in SQLite, which
+keeps a restart from re-recording every member.
+
+A roster counts as complete only when every membership carries a player ID and
+the count matches the group's ``member_count``. Incomplete rosters may open
+intervals and update roles (those players were observed) but never close one,
+and they do not advance the "memberships" freshness timestamp.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+
+from .database import (
+    apply_membership_changes,
+    format_ts,
+    read_data_freshness,
+    read_open_memberships,
+    record_data_freshness,
+)
+
+FRESHNESS_FAMILY = "memberships"
+
+
+@dataclass
+class MembershipChanges:
+    """Result of diffing one roster against the previous one."""
+
+    joined: list[dict] = field(default_factory=list)
+    left: list[int] = field(default_factory=list)
+    role_changes: dict[int, str | None] = field(default_factory=dict)
+    complete: bool = True
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.joined or self.left or self.role_changes)
+
+
+def roster_from_memberships(memberships) -> tuple[dict[int, dict], int]:
+    """Return ``({player_id: {role, joined_at}}, skipped)`` for a memberships list.
+
+    ``skipped`` counts memberships without a usable player ID.
+    """
+    roster: dict[int, dict] = {}
+    skipped = 0
+    for membership in memberships or []:
+        player_id = getattr(membership, "player_id", None)
+        if player_id is None:
+            player_id = getattr(getattr(membership, "player", None), "id", None)
+        try:
+            player_id = int(player_id)
+        except (TypeError, ValueError):
+            skipped += 1
+            continue
+        role = getattr(membership, "role", None)
+        roster[player_id] = {
+            "role": getattr(role, "value", role),
+            "joined_at": format_ts(getattr(membership, "created_at", None)),
+        }
+    return roster, skipped
+
+
+class MembershipTracker:
+    """Diff successive group rosters and persist membership intervals on change."""
+
+    def __init__(self, group_id: int, *, db_path: str | None = None):
+        self.group_id = group_id
+        self.db_path = db_path
+        self._roster: dict[int, dict] | None = None
+        self._last_complete_at: str | None = None
+
+    def _load(self) -> dict[int, dict]:
+        if self._roster is None:
+            self._roster = read_open_memberships(self.group_id, db_path=self.db_path)
+            freshness = read_data_freshness(db_path=self.db_path).get(FRESHNESS_FAMILY, {})
+            self._last_complete_at = freshness.get("last_success_at")
+        return self._roster
+
+    def observe(self, group, observed_at: datetime | None = None) -> MembershipChanges:
+        """Record the roster in ``group`` (a WOM ``GroupDetail``) and return the changes."""
+        observed = format_ts(observed_at or datetime.now(timezone.utc))
+        previous = self._load()
+        memberships = list(getattr(group, "memberships", None) or [])
+        current, skipped = roster_from_memberships(memberships)
+        member_count = getattr(group, "member_count", None)
+        complete = bool(current) and not skipped and (member_count is None or member_count == len(current))
+
+        changes = MembershipChanges(complete=complete)
+        for player_id, entry in current.items():
+            if player_id not in previous:
+                changes.joined.append({"player_id": player_id, **entry})
+            elif entry["role"] != previous[player_id]["role"]:
+                changes.role_changes[player_id] = entry["role"]
+        if complete:
+            changes.left = [player_id for player_id in previous if player_id not in current]
+
+        apply_membership_changes(
+            self.group_id,
+            joined=changes.joined,
+            left=changes.left,
+            role_changes=changes.role_changes,
+            observed_at=observed,
+            last_seen_at=self._last_complete_at,
+            db_path=self.db_path,
+        )
+
+        if complete:
+            self._roster = current
+            self._last_complete_at = observed
+            record_data_freshness(FRESHNESS_FAMILY, observed_at=observed, db_path=self.db_path)
+        else:
+            # Keep everyone not seen this time; only a complete roster may close them.
+            self._roster = {**previous, **current}
+            record_data_freshness(
+                FRESHNESS_FAMILY,
+                success=False,
+                error=f"Incomplete roster: {len(current)} of {member_count} members with {skipped} missing IDs.",
+                observed_at=observed,
+                db_path=self.db_path,
+            )
+        return changes
+
+    def record_failure(self, error: str) -> None:
+        """Record a failed group-details fetch without touching any interval."""
+        record_data_freshness(FRESHNESS_FAMILY, success=False, error=error, db_path=self.db_path)
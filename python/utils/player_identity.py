@@ -0,0 +1,43 @@
+"""Player ID ↔ display name observations from the rank check's group details.
+
+History is keyed by stable WOM player ID (see :func:`utils.database.record_player_identities`).
+The roster repeats every member's ID and name on each rank check, but a name
+only changes on a rename, so :class:`PlayerIdentityRecorder` remembers the
+last written name per ID and records only new IDs and renames.
+"""
+
+from __future__ import annotations
+
+from .database import read_player_identities, record_player_identities
+
+
+class PlayerIdentityRecorder:
+    """Write player identities only when an ID is new or its display name changed."""
+
+    def __init__(self, *, db_path: str | None = None):
+        self.db_path = db_path
+        self._known: dict[int, str] | None = None
+
+    def _load(self) -> dict[int, str]:
+        if self._known is None:
+            self._known = read_player_identities(db_path=self.db_path)
+        return self._known
+
+    def record(self, memberships) -> int:
+        """Persist new or renamed players among ``memberships``; return how many were written."""
+        known = self._load()
+        changed: list[dict] = []
+        for membership in memberships or []:
+            player = getattr(membership, "player", None)
+            player_id = getattr(player, "id", None)
+            username = str(getattr(player, "display_name", None) or "").strip()
+            if player_id is None or not username:
+                continue
+            if known.get(player_id) != username:
+                changed.append({"player_id": player_id, "username": username})
+        if not changed:
+            return 0
+        record_player_identities(changed, db_path=self.db_path)
+        for row in changed:
+            known[row["player_id"]] = row["username"]
+        return len(changed)
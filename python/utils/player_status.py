@@ -0,0 +1,68 @@
+"""Player status/activity collection from the rank check's group details (Feature 3).
+
+Each ``membership.player`` in the group-details response already carries the
+WOM ``status``, ``updated_at`` and ``last_changed_at`` fields, so collecting
+them costs no extra API call. :class:`PlayerStatusCollector` remembers the
+last written values and passes only rows that changed to
+:func:`utils.database.upsert_player_status` in one batch.
+"""
+
+from __future__ import annotations
+
+from .database import format_ts, read_player_status_rows, upsert_player_status
+
+# Fields compared to decide whether a row changed; ``status_captured_at`` is
+# deliberately excluded so an unchanged player is not rewritten every check.
+_TRACKED_FIELDS = ("player_id", "wom_status", "last_changed_at", "wom_updated_at")
+
+
+def status_row(player) -> dict | None:
+    """Build an ``upsert_player_status`` row from a WOM player, or ``None`` without a name."""
+    username = getattr(player, "display_name", None)
+    if not username:
+        return None
+    status = getattr(player, "status", None)
+    last_changed_at = format_ts(getattr(player, "last_changed_at", None))
+    return {
+        "username": username,
+        "player_id": getattr(player, "id", None),
+        "wom_status": getattr(status, "value", status),
+        "last_changed_at": last_changed_at,
+        "wom_updated_at": format_ts(getattr(player, "updated_at", None)),
+        # WOM's last stat change is the best progress signal available without
+        # fetching snapshots.
+        "last_progressed_at": last_changed_at,
+    }
+
+
+class PlayerStatusCollector:
+    """Write player status rows only when their WOM fields changed."""
+
+    def __init__(self, *, db_path: str | None = None):
+        self.db_path = db_path
+        self._known: dict[str, tuple] | None = None
+
+    def _load(self) -> dict[str, tuple]:
+        if self._known is None:
+            self._known = {
+                row["username"]: tuple(row[field] for field in _TRACKED_FIELDS)
+                for row in read_player_status_rows(db_path=self.db_path)
+                if row.get("status_captured_at")
+            }
+        return self._known
+
+    def collect(self, memberships) -> int:
+        """Persist changed status rows for ``memberships``; return how many were written."""
+        known = self._load()
+        changed: list[dict] = []
+        for membership in memberships or []:
+            row = status_row(getattr(membership, "player", None))
+            if row is None:
+                continue
+            values = tuple(row[field] for field in _TRACKED_FIELDS)
+            if known.get(row["username"]) != values:
+                changed.append(row)
+        upsert_player_status(changed, db_path=self.db_path)
+        for row in changed:
+            known[row["username"]] = tuple(row[field] for field in _TRACKED_FIELDS)
+        return len(changed)
@@ -3,6 +3,7 @@ import os
 import configparser
 from .database import read_player_snapshots, upsert_players
 from .log_csv import load_latest_ehb_from_csv
+from .roster import Roster
 
 # Legacy JSON snapshot retained only as a one-time migration source.
 RANKS_FILE = os.path.join(os.path.dirname(__file__), 'player_ranks.json')
@@ -84,7 +85,10 @@ def _bootstrap_ranks_from_csv():
     return ranks_data
 
 def load_ranks():
-    """Load rank snapshots from SQLite, importing legacy storage when empty."""
+    """Load rank snapshots from SQLite, importing legacy storage when empty.
+
+    Always returns a :class:`~utils.roster.Roster` whose rows count as saved.
+    """
     persisted = read_player_snapshots()
     if persisted:
         return persisted
@@ -104,13 +108,19 @@ def load_ranks():
                 }
                 upsert_players(sanitized_data)
                 print(f"Imported legacy rank snapshots from {RANKS_FILE} into SQLite.")
-                return sanitized_data
+                return _clean_roster(sanitized_data)
 
     legacy_data = _bootstrap_ranks_from_csv()
     if legacy_data:
         upsert_players(legacy_data)
         print("Imported legacy EHB snapshots from CSV into SQLite.")
-    return legacy_data
+    return _clean_roster(legacy_data)
+
+
+def _clean_roster(data):
+    roster = Roster(data)
+    roster.mark_clean()
+    return roster
 
 def _sanitize_player_entry(pdata):
     """Return the supported rank fields for SQLite persistence."""
@@ -137,7 +147,16 @@ def merge_manual_rank_update(last_data: dict, ehb: float, rank: str) -> dict:
 
 
 def save_ranks(data):
-    """Persist the latest sanitized rank snapshot to SQLite."""
+    """Persist the latest sanitized rank snapshot to SQLite.
+
+    A :class:`~utils.roster.Roster` writes only the rows changed since it was
+    loaded or last saved; a plain dict is written in full.
+    """
+    if isinstance(data, Roster):
+        upsert_players(data.changed_entries())
+        data.mark_clean()
+        return
+
     sanitized_data = {
         username: _sanitize_player_entry(pdata)
         for username, pdata in data.items()
@@ -0,0 +1,276 @@
+"""Compact, array-backed rank state for the whole roster.
+
+:class:`Roster` stores one row per player in parallel ``array`` columns (EHB,
+EHP, total XP, indices into a shared rank-name table and a flag byte) plus
+a username → row map. A 10k-member roster is a few hundred KB of columns
+instead of 10k small dicts. The rank check reads and updates rows in place with
+:meth:`Roster.update_member`, the web snapshot walks :meth:`Roster.records`,
+and :func:`utils.rank_utils.save_ranks` writes only the rows whose values changed
+since the roster was loaded.
+
+It is still a ``MutableMapping[str, dict]``. Indexing builds the same
+``{"last_ehb", "rank", ["last_ehp", "ehp_rank"], ["total_xp"]}`` entry dict
+that :func:`utils.database.read_player_snapshots` used to return, so code that
+treats rank state as a dict keeps working.
+"""
+
+from __future__ import annotations
+
+from array import array
+from collections.abc import Iterable, Iterator, Mapping, MutableMapping
+from typing import NamedTuple, Optional
+
+UNKNOWN_RANK = "Unknown"
+
+# Bits of the ``flags`` column.
+HAS_EHP = 1
+HAS_XP = 2
+
+
+class MemberUpdate(NamedTuple):
+    """What :meth:`Roster.update_member` changed, for the caller's side effects."""
+
+    ehb_increase: bool
+    ehb_old_rank: str
+    last_ehb: float
+    ehp_increase: bool
+    ehp_old_rank: str
+
+
+class RosterRecord(NamedTuple):
+    """One row of :meth:`Roster.records`; the EHP fields are ``None`` when untracked."""
+
+    username: str
+    ehb: float
+    rank: str
+    ehp: Optional[float]
+    ehp_rank: Optional[str]
+    total_xp: Optional[int]
+
+
+class Roster(MutableMapping):
+    """Per-player rank state in parallel columns, with dirty tracking for saves."""
+
+    __slots__ = ("names", "_index", "ehb", "ehp", "xp", "rank", "ehp_rank", "flags", "_dirty", "_rank_names", "_rank_ids")
+
+    def __init__(self, entries: Mapping[str, Mapping] | None = None):
+        self.names: list[str] = []
+        self._index: dict[str, int] = {}
+        self.ehb = array("d")
+        self.ehp = array("d")
+        self.xp = array("q")
+        self.rank = array("H")
+        self.ehp_rank = array("H")
+        self.flags = array("B")
+        self._dirty = bytearray()
+        self._rank_names: list[str] = []
+        self._rank_ids: dict[str, int] = {}
+        if entries:
+            for username, entry in entries.items():
+                self[username] = entry
+
+    @classmethod
+    def from_rows(cls, rows: Iterable) -> "Roster":
+        """Build a clean roster from ``(username, last_ehb, rank, last_ehp, ehp_rank, total_xp)`` rows.
+
+        EHP counts as tracked when it is non-zero or has a known rank, matching
+        how the ``players`` table stores untracked EHP.
+        """
+        roster = cls()
+        for username, last_ehb, rank, last_ehp, ehp_rank, total_xp in rows:
+            flags = HAS_EHP if (last_ehp != 0 or ehp_rank != UNKNOWN_RANK) else 0
+            if total_xp is not None:
+                flags |= HAS_XP
+            roster._append(username, last_ehb, rank, last_ehp, ehp_rank, total_xp or 0, flags)
+        roster.mark_clean()
+        return roster
+
+    # -- rank-name table ---------------------------------------------------
+
+    def _rank_id(self, name: str) -> int:
+        rank_id = self._rank_ids.get(name)
+        if rank_id is None:
+            rank_id = self._rank_ids[name] = len(self._rank_names)
+            self._rank_names.append(name)
+        return rank_id
+
+    # -- rows ----------------------------------------------------------------
+
+    def _append(self, username: str, ehb, rank: str, ehp, ehp_rank: str, xp: int, flags: int) -> int:
+        row = len(self.names)
+        self._index[username] = row
+        self.names.append(username)
+        self.ehb.append(float(ehb))
+        self.rank.append(self._rank_id(str(rank)))
+        self.ehp.append(float(ehp))
+        self.ehp_rank.append(self._rank_id(str(ehp_rank)))
+        self.xp.append(int(xp))
+        self.flags.append(flags)
+        self._dirty.append(1)
+        return row
+
+    def _entry(self, row: int) -> dict:
+        entry = {"last_ehb": self.ehb[row], "rank": self._rank_names[self.rank[row]]}
+        flags = self.flags[row]
+        if flags & HAS_EHP:
+            entry["last_ehp"] = self.ehp[row]
+            entry["ehp_rank"] = self._rank_names[self.ehp_rank[row]]
+        if flags & HAS_XP:
+            entry["total_xp"] = self.xp[row]
+        return entry
+
+    def records(self) -> Iterator[RosterRecord]:
+        """Yield every row as a :class:`RosterRecord`, without building entry dicts."""
+        rank_names = self._rank_names
+        for row, username in enumerate(self.names):
+            flags = self.flags[row]
+            tracked = flags & HAS_EHP
+            yield RosterRecord(
+                username,
+                self.ehb[row],
+                rank_names[self.rank[row]],
+                self.ehp[row] if tracked else None,
+                rank_names[self.ehp_rank[row]] if tracked else None,
+                self.xp[row] if flags & HAS_XP else None,
+            )
+
+    # -- MutableMapping --------------------------------------------------------
+
+    def __getitem__(self, username: str) -> dict:
+        return self._entry(self._index[username])
+
+    def __setitem__(self, username: str, entry: Mapping) -> None:
+        """Store ``entry`` with the same field handling as ``save_ranks``' sanitizing."""
+        entry = entry or {}
+        flags = 0
+        ehp, ehp_rank = 0.0, UNKNOWN_RANK
+        if "last_ehp" in entry or "ehp_rank" in entry:
+            flags |= HAS_EHP
+            ehp, ehp_rank = entry.get("last_ehp", 0), entry.get("ehp_rank", UNKNOWN_RANK)
+        xp = entry.get("total_xp")
+        if xp is not None:
+            flags |= HAS_XP
+        values = (entry.get("last_ehb", 0), entry.get("rank", UNKNOWN_RANK), ehp, ehp_rank, xp or 0, flags)
+        row = self._index.get(username)
+        if row is None:
+            self._append(username, *values)
+            return
+        if self._entry(row) != self._entry_for(*values):
+            self._set_row(row, *values)
+
+    def _entry_for(self, ehb, rank, ehp, ehp_rank, xp, flags) -> dict:
+        entry = {"last_ehb": float(ehb), "rank": str(rank)}
+        if flags & HAS_EHP:
+            entry["last_ehp"] = float(ehp)
+            entry["ehp_rank"] = str(ehp_rank)
+        if flags & HAS_XP:
+            entry["total_xp"] = int(xp)
+        return entry
+
+    def _set_row(self, row: int, ehb, rank, ehp, ehp_rank, xp, flags) -> None:
+        self.ehb[row] = float(ehb)
+        self.rank[row] = self._rank_id(str(rank))
+        self.ehp[row] = float(ehp)
+        self.ehp_rank[row] = self._rank_id(str(ehp_rank))
+        self.xp[row] = int(xp)
+        self.flags[row] = flags
+        self._dirty[row] = 1
+
+    def __delitem__(self, username: str) -> None:
+        row = self._index.pop(username)
+        del self.names[row]
+        for column in (self.ehb, self.ehp, self.xp, self.rank, self.ehp_rank, self.flags, self._dirty):
+            del column[row]
+        for later, name in enumerate(self.names[row:], start=row):
+            self._index[name] = later
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.names)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __contains__(self, username: object) -> bool:
+        return username in self._index
+
+    def __repr__(self) -> str:
+        return f"Roster({len(self)} players, {len(self.changed_rows())} changed)"
+
+    # -- rank check ----------------------------------------------------------
+
+    def update_member(
+        self,
+        username: str,
+        ehb: float,
+        rank: str,
+        *,
+        ehp: Optional[float] = None,
+        ehp_rank: Optional[str] = None,
+        track_ehp: bool = False,
+        total_xp: Optional[int] = None,
+    ) -> MemberUpdate:
+        """Merge one member's fresh values into their row in place.
+
+        Same decisions as :func:`utils.rank_utils.compute_member_update`. EHB
+        and EHP are judged independently, a changed rank is corrected even
+        without an increase, and an unknown player starts from a 0 / ``"Unknown"``
+        baseline. The row is marked changed only when one of its values differs.
+        """
+        row = self._index.get(username)
+        if row is None:
+            row = self._append(username, 0.0, UNKNOWN_RANK, 0.0, UNKNOWN_RANK, 0, 0)
+        flags = self.flags[row]
+        changed = False
+
+        last_ehb = self.ehb[row]
+        old_rank = self._rank_names[self.rank[row]]
+        ehb_increase = ehb > last_ehb
+        if ehb_increase:
+            self.ehb[row] = ehb
+            changed = True
+        if rank != old_rank:
+            self.rank[row] = self._rank_id(rank)
+            changed = True
+
+        ehp_increase = False
+        has_ehp = flags & HAS_EHP
+        old_ehp_rank = self._rank_names[self.ehp_rank[row]] if has_ehp else UNKNOWN_RANK
+        if track_ehp and ehp is not None:
+            last_ehp = self.ehp[row] if has_ehp else 0
+            ehp_increase = ehp > last_ehp
+            if ehp_increase or ehp_rank != old_ehp_rank:
+                changed = True
+                self.ehp[row] = ehp
+                self.ehp_rank[row] = self._rank_id(ehp_rank)
+                flags |= HAS_EHP
+
+        if total_xp is not None:
+            if not flags & HAS_XP or self.xp[row] != total_xp:
+                changed = True
+            self.xp[row] = int(total_xp)
+            flags |= HAS_XP
+
+        self.flags[row] = flags
+        if changed:
+            self._dirty[row] = 1
+        return MemberUpdate(ehb_increase, old_rank, last_ehb, ehp_increase, old_ehp_rank)
+
+    # -- saving --------------------------------------------------------------
+
+    def changed_rows(self) -> list[int]:
+        """Return the rows added or changed since the last :meth:`mark_clean`."""
+        dirty = self._dirty
+        rows: list[int] = []
+        row = dirty.find(1)
+        while row != -1:
+            rows.append(row)
+            row = dirty.find(1, row + 1)
+        return rows
+
+    def changed_entries(self) -> dict[str, dict]:
+        """Return ``{username: entry}`` for the changed rows only."""
+        return {self.names[row]: self._entry(row) for row in self.changed_rows()}
+
+    def mark_clean(self) -> None:
+        """Treat every row as persisted."""
+        self._dirty = bytearray(len(self.names))
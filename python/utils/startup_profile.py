@@ -0,0 +1,56 @@
+"""Boot phase timings, logged once so slow restarts are measurable.
+
+``WOM.py`` creates one :class:`StartupProfile` before its heavy imports and
+records each boot phase: imports, database init, legacy import, web app, Discord
+login and the first rank-check tick. After the first tick,
+:meth:`StartupProfile.report` returns a one-line summary, and
+``None`` on every later call.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import time
+from typing import Callable, Iterator, Optional
+
+
+def _format_seconds(seconds: float) -> str:
+    return f"{seconds * 1000:.0f} ms" if seconds < 1 else f"{seconds:.2f} s"
+
+
+class StartupProfile:
+    """Collect ``(phase, seconds)`` timings for one process start."""
+
+    def __init__(self, started_at: Optional[float] = None, clock: Callable[[], float] = time.perf_counter):
+        self._clock = clock
+        self.started_at = clock() if started_at is None else started_at
+        self.phases: list[tuple[str, float]] = []
+        self.reported = False
+
+    def record(self, name: str, seconds: float) -> None:
+        self.phases.append((name, max(0.0, seconds)))
+
+    def record_since(self, name: str, started_at: float) -> None:
+        """Record ``name`` as the time from ``started_at`` until now."""
+        self.record(name, self._clock() - started_at)
+
+    @contextlib.contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time the enclosed block as ``name``, even if it raises."""
+        started_at = self._clock()
+        try:
+            yield
+        finally:
+            self.record_since(name, started_at)
+
+    def elapsed(self) -> float:
+        """Seconds since the profile's start (the top of ``WOM.py``)."""
+        return self._clock() - self.started_at
+
+    def report(self) -> Optional[str]:
+        """Return the summary line the first time it is called, then ``None``."""
+        if self.reported:
+            return None
+        self.reported = True
+        phases = ", ".join(f"{name} {_format_seconds(seconds)}" for name, seconds in self.phases)
+        return f"Startup profile: {phases or 'no phases recorded'}; ready after {_format_seconds(self.elapsed())}."
@@ -1,5 +1,20 @@
 """Web interface for WOMupdtr."""
 
-from .app import create_app
+from __future__ import annotations
+
+import typing as t
+
+if t.TYPE_CHECKING:
+    from .app import create_app
 
 __all__ = ["create_app"]
+
+
+def __getattr__(name: str):
+    # FastAPI, Jinja and the routers load only when the app is built, so
+    # importing ``web.services.bot_state`` stays cheap with the web UI off.
+    if name == "create_app":
+        from .app import create_app
+
+        return create_app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
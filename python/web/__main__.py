@@ -0,0 +1,58 @@
+"""Run the dashboard in its own process: ``python -m web`` from ``python/``.
+
+Use this with ``[web] mode = split`` in ``config.ini``. The bot then serves no
+HTTP itself and publishes its live state to SQLite, and this process serves the
+dashboard from a read-only connection to the same database. Host, port and
+worker count default to the ``[web]`` section and can be overridden on the
+command line.
+"""
+
+from __future__ import annotations
+
+import argparse
+import configparser
+import os
+
+from utils.database import READ_ONLY_ENV
+
+_CONFIG_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "config.ini")
+
+
+def _web_config() -> configparser.SectionProxy | dict:
+    config = configparser.ConfigParser()
+    config.read(_CONFIG_FILE)
+    return config["web"] if config.has_section("web") else {}
+
+
+def main(argv: list[str] | None = None) -> None:
+    web_config = _web_config()
+    parser = argparse.ArgumentParser(prog="python -m web", description="Serve the WOMupdtr dashboard read-only.")
+    parser.add_argument("--host", default=web_config.get("host", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(web_config.get("port", "8080")))
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=int(web_config.get("workers", "1") or 1),
+        help="uvicorn worker processes; each opens its own read-only connections",
+    )
+    args = parser.parse_args(argv)
+
+    # Set before the workers start so every process inherits it.
+    os.environ[READ_ONLY_ENV] = "1"
+    os.environ["WOM_WEB_HOST"] = args.host
+    os.environ["WOM_WEB_PORT"] = str(args.port)
+
+    import uvicorn
+
+    uvicorn.run(
+        "web.app:create_standalone_app",
+        factory=True,
+        host=args.host,
+        port=args.port,
+        workers=max(1, args.workers),
+        log_level="info",
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,7 @@ import os
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.staticfiles import StaticFiles
 
 from .services.bot_state import BotState
@@ -13,28 +14,48 @@ from .services.bot_state import BotState
 _BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
 
-def create_app(state: BotState, host: str = "0.0.0.0", port: int = 8080, log_func=None) -> FastAPI:
-    """Build and return the configured FastAPI application."""
+def create_app(
+    state: BotState,
+    host: str = "0.0.0.0",
+    port: int = 8080,
+    log_func=None,
+    api_usage=None,
+) -> FastAPI:
+    """Build and return the configured FastAPI application.
+
+    ``api_usage`` replaces the process-wide API usage tracker in the admin
+    views; split mode passes a tracker backed by the bot's database.
+    """
 
     @asynccontextmanager
     async def lifespan(app: FastAPI):
+        from .services.ranks_service import use_bot_state
+
         app.state.bot_state = state
+        app.state.api_usage = api_usage
+        use_bot_state(state)
         display_host = "localhost" if host in ("0.0.0.0", "") else host
         url = f"http://{display_host}:{port}"
         if log_func:
             log_func(f"Web UI is up and running at {url}")
         else:
             print(f"Web UI is up and running at {url}")
-        yield
+        try:
+            yield
+        finally:
+            use_bot_state(None)
 
     app = FastAPI(title="WOMupdtr Dashboard", lifespan=lifespan)
+    # Chart histories and player lists compress very well; tiny bodies are
+    # left alone since gzip framing would outweigh the savings.
+    app.add_middleware(GZipMiddleware, minimum_size=1024)
 
     # Static files
     static_dir = os.path.join(_BASE_DIR, "static")
     app.mount("/static", StaticFiles(directory=static_dir), name="static")
 
     # Register routers (imported here to avoid circular imports)
-    from .routers import admin, charts, dashboard, group, players, reports
+    from .routers import admin, charts, competitions, dashboard, group, players, reports
 
     app.include_router(dashboard.router)
     app.include_router(players.router, prefix="/players", tags=["players"])
@@ -42,5 +63,24 @@ def create_app(state: BotState, host: str = "0.0.0.0", port: int = 8080, log_fun
     app.include_router(charts.router, prefix="/charts", tags=["charts"])
     app.include_router(admin.router, prefix="/admin", tags=["admin"])
     app.include_router(group.router, prefix="/group", tags=["group"])
+    app.include_router(competitions.router, prefix="/competitions", tags=["competitions"])
 
     return app
+
+
+def create_standalone_app() -> FastAPI:
+    """Build the dashboard for its own process (``python -m web``).
+
+    Used as a uvicorn factory, so every worker builds its own app. The database
+    is opened read-only and the bot's live state comes from the tables its
+    shared state publisher writes.
+    """
+    from utils.database import READ_ONLY_ENV
+
+    from .services.shared_state import SharedApiUsage, SharedBotState
+
+    os.environ[READ_ONLY_ENV] = "1"
+    state = SharedBotState()
+    host = os.environ.get("WOM_WEB_HOST", "0.0.0.0")
+    port = int(os.environ.get("WOM_WEB_PORT", "8080"))
+    return create_app(state, host=host, port=port, api_usage=SharedApiUsage(state))
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import functools
 import json
 
 RANK_ORDER = [
@@ -48,6 +49,7 @@ def rank_slug(rank_name: str | None) -> str:
     return canonicalize_rank_name(rank_name).lower().replace(" ", "-")
 
 
+@functools.lru_cache(maxsize=1)
 def rank_palette_json() -> str:
     """Return the canonical rank palette as JSON for the frontend."""
     return json.dumps(RANK_COLORS)
@@ -0,0 +1,89 @@
+"""Conditional, fast-serialized JSON responses for the data APIs.
+
+Chart and stats payloads only change when the bot writes new data, so each
+response carries a weak ETag derived from the relevant data versions and the
+request URL. Routes check ``If-None-Match`` *before* reading or serializing
+anything; a match short-circuits to an empty 304. Bodies are encoded with
+msgspec, which is several times faster than the stdlib encoder for the
+list-of-dicts payloads these routes return.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import typing as t
+
+import msgspec
+from fastapi import Request
+from fastapi.responses import JSONResponse, Response
+
+from utils.database import read_data_versions
+
+logger = logging.getLogger(__name__)
+
+# Proxies and browsers may store the response but must revalidate every time,
+# which is a cheap 304 while the data version is unchanged.
+_CACHE_CONTROL = "no-cache"
+
+
+class FastJSONResponse(JSONResponse):
+    """``JSONResponse`` serialized with msgspec instead of the stdlib encoder."""
+
+    def render(self, content: t.Any) -> bytes:
+        return msgspec.json.encode(content)
+
+
+def data_version(*families: str) -> str | None:
+    """Return a compact version token for SQLite data families, or ``None`` on error."""
+    try:
+        versions = read_data_versions(families)
+    except Exception:
+        logger.exception("Failed to read data versions")
+        return None
+    return ".".join(f"{family}:{versions[family]}" for family in families)
+
+
+def build_etag(request: Request, *versions: str | None) -> str | None:
+    """Return a weak ETag for ``request`` at the given data versions.
+
+    ``None`` in ``versions`` means the version is unknown; the response is
+    then served without an ETag rather than risk a stale 304.
+    """
+    if any(version is None for version in versions):
+        return None
+    key = "|".join((request.url.path, str(request.url.query), *t.cast(tuple[str, ...], versions)))
+    return f'W/"{hashlib.blake2b(key.encode(), digest_size=12).hexdigest()}"'
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # Weak comparison: proxies may strip or add the W/ prefix.
+    opaque = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in header.split(","))
+
+
+def not_modified(request: Request, etag: str | None) -> Response | None:
+    """Return a 304 response if the client already holds ``etag``, else ``None``."""
+    if etag is None or not _etag_matches(request, etag):
+        return None
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": _CACHE_CONTROL})
+
+
+def json_response(
+    content: t.Any,
+    *,
+    etag: str | None = None,
+    headers: dict[str, str] | None = None,
+    status_code: int = 200,
+) -> FastJSONResponse:
+    """Serialize ``content``; attach the ETag only to successful, error-free responses."""
+    headers = dict(headers or {})
+    if etag is not None and status_code == 200 and "X-Data-Error" not in headers:
+        headers["ETag"] = etag
+        headers["Cache-Control"] = _CACHE_CONTROL
+    return FastJSONResponse(content=content, headers=headers, status_code=status_code)
@@ -2,28 +2,50 @@
 
 from __future__ import annotations
 
+import asyncio
 import html
 import logging
+import time
+from typing import AsyncIterator
 
 from fastapi import APIRouter, Depends, Request
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse
 
 from datetime import datetime, timedelta, timezone
 
 from ..dependencies import get_bot_state
 from ..services.bot_state import BotState
-from ..ui import render_template
+from ..ui import render_template, templates
 from utils.api_usage import tracker as api_usage_tracker
-from utils.database import count_api_calls_since, read_recent_api_calls
+from utils.database import (
+    cancel_achievement_backfill,
+    count_api_calls_since,
+    read_achievement_backfill,
+    read_recent_api_calls,
+)
+from weeklyupdater.achievement_backfill import describe_backfill, parse_window_bound, request_backfill
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Lines kept in the log viewer and calls listed in the API usage table.
+LOG_LINES = 100
+RECENT_API_CALLS = 25
+# An idle stream only sends an SSE comment this often so proxies keep it open.
+STREAM_KEEPALIVE_SECONDS = 30
+
+_summary_cache: tuple[tuple[int, int], str] | None = None
+
 
 @router.get("/", response_class=HTMLResponse)
 async def admin_page(request: Request, state: BotState = Depends(get_bot_state)):
-    return render_template(request, "admin.html", bot_state=state)
+    return render_template(
+        request,
+        "admin.html",
+        bot_state=state,
+        backfill_status=describe_backfill(read_achievement_backfill()),
+    )
 
 
 @router.post("/force-check", response_class=HTMLResponse)
@@ -57,26 +79,167 @@ async def refresh_group(state: BotState = Depends(get_bot_state)):
 
 @router.get("/logs", response_class=HTMLResponse)
 async def get_logs(request: Request, state: BotState = Depends(get_bot_state)):
-    log_lines = list(state.log_buffer)[-100:]
+    log_lines = list(state.log_buffer)[-LOG_LINES:]
     return render_template(request, "partials/log_feed.html", log_lines=log_lines)
 
 
-@router.get("/api-usage", response_class=HTMLResponse)
-async def get_api_usage(request: Request):
+def get_api_usage_tracker(request: Request):
+    """Return the app's API usage source: the shared tracker unless split mode replaced it."""
+    return getattr(request.app.state, "api_usage", None) or api_usage_tracker
+
+
+def _usage_summary_context(usage) -> dict:
     _TS_FMT = "%Y-%m-%d %H:%M:%S"
     now = datetime.now(timezone.utc)
     hour_ago = (now - timedelta(hours=1)).strftime(_TS_FMT)
     day_ago = (now - timedelta(days=1)).strftime(_TS_FMT)
+    return {
+        "breaker": usage.breaker_status(),
+        "calls_last_minute": usage.calls_in_last(60),
+        "calls_last_hour": count_api_calls_since(hour_ago),
+        "calls_last_day": count_api_calls_since(day_ago),
+        "rate_limit_per_minute": usage.rate_limit_per_minute,
+    }
 
+
+@router.get("/api-usage", response_class=HTMLResponse)
+async def get_api_usage(request: Request, usage=Depends(get_api_usage_tracker)):
     return render_template(
         request,
         "partials/api_usage_feed.html",
-        breaker=api_usage_tracker.breaker_status(),
-        calls_last_minute=api_usage_tracker.calls_in_last(60),
-        calls_last_hour=count_api_calls_since(hour_ago),
-        calls_last_day=count_api_calls_since(day_ago),
-        recent_calls=read_recent_api_calls(limit=25),
-        rate_limit_per_minute=api_usage_tracker.rate_limit_per_minute,
+        recent_calls=read_recent_api_calls(limit=RECENT_API_CALLS),
+        **_usage_summary_context(usage),
+    )
+
+
+# ---------------------------------------------------------------------------
+# Server-sent events: live logs and API usage
+# ---------------------------------------------------------------------------
+
+
+def _sse(event: str, data: str, event_id: str | None = None) -> str:
+    lines = [f"event: {event}"]
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.extend(f"data: {line}" for line in data.splitlines() or [""])
+    return "\n".join(lines) + "\n\n"
+
+
+def _render(template_name: str, **context) -> str:
+    return templates.get_template(template_name).render(context)
+
+
+def _usage_summary_html(usage) -> str:
+    """Render the usage summary, shared by every open stream for the same second and call."""
+    global _summary_cache
+    key = (id(usage), usage.events.last_seq, int(time.monotonic()))
+    if _summary_cache is None or _summary_cache[0] != key:
+        _summary_cache = (key, _render("partials/api_usage_summary.html", **_usage_summary_context(usage)))
+    return _summary_cache[1]
+
+
+def _summary_refresh_seconds(usage) -> float | None:
+    """Seconds until the usage summary goes stale without any new call, if ever."""
+    breaker = usage.breaker_status()
+    if breaker["open"]:
+        return max(1, breaker["seconds_remaining"])
+    if usage.calls_in_last(60):
+        return 60
+    return None
+
+
+def _parse_event_id(value: str | None) -> tuple[int, int] | None:
+    """Parse a ``"<log seq>.<usage seq>"`` ``Last-Event-ID``."""
+    try:
+        log_seq, usage_seq = (int(part) for part in (value or "").split("."))
+    except ValueError:
+        return None
+    return log_seq, usage_seq
+
+
+async def _wait_for_events(state: BotState, usage, log_seq: int, usage_seq: int, timeout: float) -> None:
+    waits = [
+        asyncio.ensure_future(state.log_buffer.wait(log_seq, timeout)),
+        asyncio.ensure_future(usage.events.wait(usage_seq, timeout)),
+    ]
+    try:
+        await asyncio.wait(waits, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for waiter in waits:
+            waiter.cancel()
+
+
+async def admin_event_stream(state: BotState, last_event_id: str | None = None, usage=None) -> AsyncIterator[str]:
+    """Yield SSE messages for the admin page.
+
+    A new connection first gets the full ``logs`` and ``usage`` panels. After
+    that only deltas are sent: ``log-lines`` with the new log lines,
+    ``usage-calls`` with new API call rows (newest first) and
+    ``usage-summary`` with the refreshed counters. Every delta carries the
+    ``"<log seq>.<usage seq>"`` event ID, so a reconnecting browser resumes
+    where it left off. While the bot is idle the stream only waits.
+    """
+    usage = usage or api_usage_tracker
+    logs = state.log_buffer
+    calls = usage.events
+    resume = _parse_event_id(last_event_id)
+    if resume is None or resume[0] > logs.last_seq or resume[1] > calls.last_seq:
+        # New client, or a sequence from before a restart: start from a snapshot.
+        log_seq, usage_seq = logs.last_seq, calls.last_seq
+        event_id = f"{log_seq}.{usage_seq}"
+        yield _sse("logs", _render("partials/log_feed.html", log_lines=[line for _, line in logs.tail(LOG_LINES)]), event_id)
+        yield _sse(
+            "usage",
+            _render(
+                "partials/api_usage_feed.html",
+                recent_calls=read_recent_api_calls(limit=RECENT_API_CALLS),
+                **_usage_summary_context(usage),
+            ),
+            event_id,
+        )
+    else:
+        log_seq, usage_seq = resume
+
+    refresh_at = None
+    while True:
+        delay = _summary_refresh_seconds(usage)
+        if delay is not None and refresh_at is None:
+            refresh_at = time.monotonic() + delay
+        timeout = STREAM_KEEPALIVE_SECONDS
+        if refresh_at is not None:
+            timeout = max(0.0, min(timeout, refresh_at - time.monotonic()))
+        await _wait_for_events(state, usage, log_seq, usage_seq, timeout)
+
+        new_lines = logs.since(log_seq)
+        new_calls = calls.since(usage_seq)
+        if new_lines:
+            log_seq = new_lines[-1][0]
+        if new_calls:
+            usage_seq = new_calls[-1][0]
+        event_id = f"{log_seq}.{usage_seq}"
+
+        if new_lines:
+            yield _sse("log-lines", _render("partials/log_feed.html", log_lines=[line for _, line in new_lines[-LOG_LINES:]]), event_id)
+        if new_calls:
+            rows = [call for _, call in reversed(new_calls[-RECENT_API_CALLS:])]
+            yield _sse("usage-calls", _render("partials/api_usage_rows.html", recent_calls=rows), event_id)
+        if new_calls or (refresh_at is not None and time.monotonic() >= refresh_at):
+            refresh_at = None
+            yield _sse("usage-summary", _usage_summary_html(usage), event_id)
+        elif not new_lines:
+            yield ": keepalive\n\n"
+
+
+@router.get("/stream")
+async def admin_stream(
+    request: Request,
+    state: BotState = Depends(get_bot_state),
+    usage=Depends(get_api_usage_tracker),
+):
+    return StreamingResponse(
+        admin_event_stream(state, request.headers.get("last-event-id"), usage),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
 
 
@@ -97,7 +260,34 @@ async def bot_status(state: BotState = Depends(get_bot_state)):
 
 @router.post("/config", response_class=HTMLResponse)
 async def update_config(request: Request, state: BotState = Depends(get_bot_state)):
+    if getattr(state, "read_only", False):
+        return HTMLResponse(
+            '<p class="feedback error">Runtime flags can only be changed in the bot process '
+            "when the dashboard runs separately.</p>"
+        )
     form = await request.form()
     state.silent = "silent" in form
     state.debug = "debug" in form
     return HTMLResponse('<p class="feedback success">Configuration updated.</p>')
+
+
+@router.post("/achievement-backfill", response_class=HTMLResponse)
+async def achievement_backfill(request: Request, state: BotState = Depends(get_bot_state)):
+    """Request or cancel the achievement backfill; the bot's scheduler does the fetching."""
+    if getattr(state, "read_only", False):
+        return HTMLResponse(
+            '<p class="feedback error">The dashboard runs separately with a read-only database. '
+            "Use <code>python -m weeklyupdater.achievement_backfill</code> instead.</p>"
+        )
+    form = await request.form()
+    if "cancel" in form:
+        cancel_achievement_backfill()
+    else:
+        try:
+            start = parse_window_bound(str(form.get("start", "")))
+            end = parse_window_bound(str(form.get("end", "")))
+            request_backfill(start, end)
+        except ValueError as e:
+            return HTMLResponse(f'<p class="feedback error">{html.escape(str(e))}</p>')
+    status = html.escape(describe_backfill(read_achievement_backfill()))
+    return HTMLResponse(f'<p class="feedback success">{status}</p>')
@@ -3,36 +3,57 @@
 from __future__ import annotations
 
 import logging
+from datetime import datetime
 
 from fastapi import APIRouter, Query, Request
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, Response
 
-from utils.database import read_player_ehp_history
+from utils.database import format_ts, read_history_batch, read_player_ehb_history, read_player_ehp_history
 
-from ..services.csv_service import read_player_ehb_history
+from ..responses import build_etag, data_version, json_response, not_modified
+from ..services.downsample import lttb
 from ..services.gains_service import list_available_metrics, read_player_gains_history
-from ..services.ranks_service import get_rank_snapshot
+from ..services.ranks_service import get_rank_snapshot, snapshot_version
 from ..ui import render_template
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+# Upper bound for ``points``; well above any chart width in pixels.
+MAX_CHART_POINTS = 2000
+# Upper bound on players per comparison request, keeping the IN (...) list small.
+MAX_BATCH_PLAYERS = 25
+
 
 def _error_headers(error: str | None) -> dict[str, str]:
     return {"X-Data-Error": error} if error else {}
 
 
-def _history_response(data: list[dict], error: str | None = None) -> JSONResponse:
-    return JSONResponse(
-        content=data,
+def _history_response(data: list[dict], error: str | None = None, etag: str | None = None) -> Response:
+    return json_response(
+        data,
+        etag=etag,
         headers=_error_headers(error),
         status_code=503 if error else 200,
     )
 
 
-def _read_database_history(reader, error_message: str, *args) -> JSONResponse:
+def _read_database_history(
+    request: Request,
+    family: str,
+    reader,
+    error_message: str,
+    *args,
+    value_key: str,
+    points: int | None,
+    **kwargs,
+) -> Response:
+    etag = build_etag(request, data_version(family))
+    cached = not_modified(request, etag)
+    if cached is not None:
+        return cached
     try:
-        return _history_response(reader(*args))
+        return _history_response(lttb(reader(*args, **kwargs), value_key, points), etag=etag)
     except Exception:
         logger.exception("Failed to read chart history data")
         return _history_response([], error_message)
@@ -52,37 +73,130 @@ async def charts_page(request: Request):
 
 
 @router.get("/api/ehb-history")
-async def ehb_history_api(player: str = Query(...)):
-    result = read_player_ehb_history(player)
-    return _history_response(result.data, result.error)
+async def ehb_history_api(
+    request: Request,
+    player: str = Query(...),
+    start: datetime | None = Query(None, alias="from"),
+    end: datetime | None = Query(None, alias="to"),
+    points: int | None = Query(None, ge=3, le=MAX_CHART_POINTS),
+):
+    return _read_database_history(
+        request,
+        "ehb_history",
+        read_player_ehb_history,
+        "EHB history could not be loaded. Check the server logs for details.",
+        player,
+        value_key="ehb",
+        points=points,
+        start=format_ts(start),
+        end=format_ts(end),
+    )
 
 
 @router.get("/api/ehp-history")
-async def ehp_history_api(player: str = Query(...)):
+async def ehp_history_api(
+    request: Request,
+    player: str = Query(...),
+    start: datetime | None = Query(None, alias="from"),
+    end: datetime | None = Query(None, alias="to"),
+    points: int | None = Query(None, ge=3, le=MAX_CHART_POINTS),
+):
     return _read_database_history(
+        request,
+        "ehp_history",
         read_player_ehp_history,
         "EHP history could not be loaded. Check the server logs for details.",
         player,
+        value_key="ehp",
+        points=points,
+        start=format_ts(start),
+        end=format_ts(end),
     )
 
 
 @router.get("/api/gains-history")
-async def gains_history_api(player: str = Query(...), metric: str = Query("overall")):
+async def gains_history_api(
+    request: Request,
+    player: str = Query(...),
+    metric: str = Query("overall"),
+    start: datetime | None = Query(None, alias="from"),
+    end: datetime | None = Query(None, alias="to"),
+    points: int | None = Query(None, ge=3, le=MAX_CHART_POINTS),
+):
     return _read_database_history(
+        request,
+        "gains_history",
         read_player_gains_history,
         "Gains history could not be loaded. Check the server logs for details.",
         player,
         metric,
+        value_key="gained",
+        points=points,
+        start=format_ts(start),
+        end=format_ts(end),
+    )
+
+
+@router.get("/api/history-batch")
+async def history_batch_api(
+    request: Request,
+    players: list[str] = Query(...),
+    series: str = Query("ehb", pattern="^(ehb|ehp|gains)$"),
+    metric: str = Query("overall"),
+    start: datetime | None = Query(None, alias="from"),
+    end: datetime | None = Query(None, alias="to"),
+    points: int | None = Query(None, ge=3, le=MAX_CHART_POINTS),
+):
+    """Return ``{player: [{timestamp, <value>}]}`` for up to ``MAX_BATCH_PLAYERS`` players.
+
+    ``series`` selects EHB, EHP or gains history (``metric`` applies to gains
+    only). ``players`` may be repeated or comma-separated.
+    """
+    names = list(dict.fromkeys(
+        name.strip() for value in players for name in value.split(",") if name.strip()
+    ))
+    if not names or len(names) > MAX_BATCH_PLAYERS:
+        return json_response(
+            {"detail": f"Provide between 1 and {MAX_BATCH_PLAYERS} players."}, status_code=422
+        )
+
+    etag = build_etag(request, data_version(f"{series}_history"))
+    cached = not_modified(request, etag)
+    if cached is not None:
+        return cached
+    try:
+        grouped = read_history_batch(
+            names, series, metric, start=format_ts(start), end=format_ts(end)
+        )
+    except Exception:
+        logger.exception("Failed to read batch chart history data")
+        return json_response(
+            {},
+            headers=_error_headers("History could not be loaded. Check the server logs for details."),
+            status_code=503,
+        )
+    value_key = "gained" if series == "gains" else series
+    return json_response(
+        {name: lttb(rows, value_key, points) for name, rows in grouped.items()},
+        etag=etag,
     )
 
 
 @router.get("/api/rank-distribution")
-async def rank_distribution_api():
+async def rank_distribution_api(request: Request):
+    etag = build_etag(request, snapshot_version())
+    cached = not_modified(request, etag)
+    if cached is not None:
+        return cached
     snapshot = get_rank_snapshot()
-    return JSONResponse(content=snapshot.rank_distribution, headers=_error_headers(snapshot.error))
+    return json_response(snapshot.rank_distribution, etag=etag, headers=_error_headers(snapshot.error))
 
 
 @router.get("/api/top-players")
-async def top_players_api(limit: int = Query(15, ge=1, le=50)):
+async def top_players_api(request: Request, limit: int = Query(15, ge=1, le=50)):
+    etag = build_etag(request, snapshot_version())
+    cached = not_modified(request, etag)
+    if cached is not None:
+        return cached
     snapshot = get_rank_snapshot()
-    return JSONResponse(content=snapshot.players[:limit], headers=_error_headers(snapshot.error))
+    return json_response(snapshot.players[:limit], etag=etag, headers=_error_headers(snapshot.error))
@@ -0,0 +1,28 @@
+"""Competitions router - group competitions and their leaderboards."""
+
+from __future__ import annotations
+
+from fastapi import APIRouter, Request
+from fastapi.responses import HTMLResponse
+
+from ..services.competition_service import competition_leaderboard, competition_overview
+from ..ui import render_template
+
+router = APIRouter()
+
+
+@router.get("/", response_class=HTMLResponse)
+async def competitions_page(request: Request):
+    return render_template(request, "competitions.html", overview=competition_overview())
+
+
+@router.get("/{competition_id}", response_class=HTMLResponse)
+async def competition_detail(request: Request, competition_id: int):
+    competition, standings = competition_leaderboard(competition_id)
+    return render_template(
+        request,
+        "competition_detail.html",
+        competition=competition,
+        standings=standings,
+        status_code=200 if competition else 404,
+    )
@@ -10,8 +10,8 @@ from fastapi.responses import FileResponse, HTMLResponse
 from ..dependencies import get_bot_state
 from ..services.bot_state import BotState
 from ..services.csv_service import read_recent_changes
-from ..services.ranks_service import get_rank_snapshot
-from ..ui import render_template
+from ..services.ranks_service import get_search_index
+from ..ui import render_fragment, render_template
 
 router = APIRouter()
 _ROBOTS_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "static", "robots.txt")
@@ -24,13 +24,15 @@ async def robots_txt():
 
 @router.get("/", response_class=HTMLResponse)
 async def dashboard(request: Request, state: BotState = Depends(get_bot_state)):
-    snapshot = get_rank_snapshot()
+    index = get_search_index()
+    snapshot = index.snapshot
     recent_result = read_recent_changes(limit=10)
     errors = [error for error in (snapshot.error, recent_result.error) if error]
     return render_template(
         request,
         "dashboard.html",
         snapshot=snapshot,
+        rank_spread=render_fragment("partials/rank_spread.html", index.version, (), lambda: {"snapshot": snapshot}),
         recent_changes=recent_result.data,
         bot_state=state,
         data_error=" ".join(errors) if errors else None,
@@ -3,10 +3,11 @@
 from __future__ import annotations
 
 from fastapi import APIRouter, Request
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse
 
-from ..services.ranks_service import get_rank_snapshot, get_rank_thresholds
-from ..ui import render_template
+from ..responses import build_etag, json_response, not_modified
+from ..services.ranks_service import get_rank_snapshot, get_rank_thresholds, get_search_index, snapshot_version
+from ..ui import render_fragment, render_template
 
 router = APIRouter()
 
@@ -17,26 +18,39 @@ def _error_headers(error: str | None) -> dict[str, str]:
 
 @router.get("/", response_class=HTMLResponse)
 async def group_page(request: Request):
-    snapshot = get_rank_snapshot()
+    index = get_search_index()
+    snapshot = index.snapshot
     thresholds = get_rank_thresholds()
+    # ranks.ini is re-read per request, so the thresholds are part of the key.
+    params = tuple((row["lower"], row["upper"], row["name"]) for row in thresholds)
     return render_template(
         request,
         "group_stats.html",
         snapshot=snapshot,
-        rank_thresholds=thresholds,
+        rank_ladder=render_fragment(
+            "partials/rank_ladder.html",
+            index.version,
+            params,
+            lambda: {"snapshot": snapshot, "rank_thresholds": thresholds},
+        ),
         data_error=snapshot.error,
     )
 
 
 @router.get("/api/stats")
-async def group_stats_api():
+async def group_stats_api(request: Request):
+    etag = build_etag(request, snapshot_version())
+    cached = not_modified(request, etag)
+    if cached is not None:
+        return cached
     snapshot = get_rank_snapshot()
-    return JSONResponse(
-        content={
+    return json_response(
+        {
             "total_players": snapshot.total_players,
             "total_ehb": round(snapshot.total_ehb, 2),
             "avg_ehb": round(snapshot.avg_ehb, 2),
             "rank_distribution": snapshot.rank_distribution,
         },
+        etag=etag,
         headers=_error_headers(snapshot.error),
     )
@@ -2,14 +2,47 @@
 
 from __future__ import annotations
 
+import logging
+
 from fastapi import APIRouter, Query, Request
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse
+
+from utils.database import read_player_ehb_history
 
-from ..services.csv_service import read_player_ehb_history
-from ..services.ranks_service import get_player_detail, get_rank_snapshot, search_players
-from ..ui import render_template
+from ..responses import build_etag, data_version, json_response, not_modified
+from ..services.ranks_service import get_player_detail, get_search_index, snapshot_version
+from ..ui import render_fragment, render_template
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
+
+# Upper bound on typeahead suggestions per request.
+MAX_TYPEAHEAD_RESULTS = 25
+# Rows rendered per players-list page; further pages load as the table scrolls.
+PLAYER_PAGE_SIZE = 50
+MAX_PLAYER_PAGE_SIZE = 200
+
+
+def _page_context(page, query: str, sort: str) -> dict:
+    return {
+        "players": page.players,
+        "query": query,
+        "sort": sort,
+        "offset": page.offset,
+        "limit": page.limit,
+        "total": page.total,
+        "next_offset": page.next_offset,
+    }
+
+
+def _player_rows(index, query: str, sort: str, offset: int, limit: int):
+    """Render one page of player rows, cached per snapshot version."""
+    return render_fragment(
+        "partials/player_row.html",
+        index.version,
+        (query, sort, offset, limit),
+        lambda: _page_context(index.page(query, sort, offset, limit), query, sort),
+    )
 
 
 def _error_headers(error: str | None) -> dict[str, str]:
@@ -17,44 +50,92 @@ def _error_headers(error: str | None) -> dict[str, str]:
 
 
 @router.get("/", response_class=HTMLResponse)
-async def player_list(request: Request, q: str = Query(""), sort: str = Query("ehb")):
-    snapshot = get_rank_snapshot()
-    players = search_players(q, sort=sort, snapshot=snapshot)
+async def player_list(
+    request: Request,
+    q: str = Query(""),
+    sort: str = Query("ehb"),
+    offset: int = Query(0, ge=0),
+    limit: int = Query(PLAYER_PAGE_SIZE, ge=1, le=MAX_PLAYER_PAGE_SIZE),
+):
+    index = get_search_index()
     return render_template(
         request,
         "player_list.html",
-        players=players,
+        player_rows=_player_rows(index, q, sort, offset, limit),
         query=q,
         sort=sort,
-        data_error=snapshot.error,
+        data_error=index.snapshot.error,
     )
 
 
 @router.get("/search", response_class=HTMLResponse)
-async def player_search(request: Request, q: str = Query(""), sort: str = Query("ehb")):
-    snapshot = get_rank_snapshot()
-    players = search_players(q, sort=sort, snapshot=snapshot)
-    return render_template(
-        request,
-        "partials/player_row.html",
-        players=players,
-        query=q,
-        sort=sort,
-        data_error=snapshot.error,
+async def player_search(
+    request: Request,
+    q: str = Query(""),
+    sort: str = Query("ehb"),
+    offset: int = Query(0, ge=0),
+    limit: int = Query(PLAYER_PAGE_SIZE, ge=1, le=MAX_PLAYER_PAGE_SIZE),
+):
+    """Render one page of result rows; later pages replace the load-more row."""
+    return HTMLResponse(_player_rows(get_search_index(), q, sort, offset, limit))
+
+
+@router.get("/api/list")
+async def player_list_api(
+    request: Request,
+    q: str = Query(""),
+    sort: str = Query("ehb", pattern="^(ehb|name|rank)$"),
+    offset: int = Query(0, ge=0),
+    limit: int = Query(PLAYER_PAGE_SIZE, ge=1, le=MAX_PLAYER_PAGE_SIZE),
+):
+    """Return ``{players, offset, limit, total, next_offset}`` for one page of the roster."""
+    etag = build_etag(request, snapshot_version())
+    cached = not_modified(request, etag)
+    if cached is not None:
+        return cached
+    index = get_search_index()
+    page = index.page(q, sort, offset, limit)
+    return json_response(
+        {
+            "players": page.players,
+            "offset": page.offset,
+            "limit": page.limit,
+            "total": page.total,
+            "next_offset": page.next_offset,
+        },
+        etag=etag,
+        headers=_error_headers(index.snapshot.error),
     )
 
 
+@router.get("/api/search")
+async def player_typeahead(
+    request: Request,
+    q: str = Query(""),
+    limit: int = Query(10, ge=1, le=MAX_TYPEAHEAD_RESULTS),
+):
+    """Return ``[{username, rank, ehb}]`` suggestions, name-prefix matches first."""
+    etag = build_etag(request, snapshot_version())
+    cached = not_modified(request, etag)
+    if cached is not None:
+        return cached
+    index = get_search_index()
+    suggestions = [
+        {"username": player["username"], "rank": player["rank"], "ehb": player["ehb"]}
+        for player in index.typeahead(q, limit)
+    ]
+    return json_response(suggestions, etag=etag, headers=_error_headers(index.snapshot.error))
+
+
 @router.get("/{username}", response_class=HTMLResponse)
 async def player_detail(request: Request, username: str):
-    snapshot = get_rank_snapshot()
+    snapshot = get_search_index().snapshot
     player = get_player_detail(username, snapshot=snapshot)
-    history_result = read_player_ehb_history(username)
     if not player:
         return render_template(
             request,
             "player_detail.html",
             player=None,
-            history_error=history_result.error,
             data_error=snapshot.error,
             status_code=404,
         )
@@ -62,12 +143,23 @@ async def player_detail(request: Request, username: str):
         request,
         "player_detail.html",
         player=player,
-        history_error=history_result.error,
         data_error=snapshot.error,
     )
 
 
 @router.get("/{username}/history")
-async def player_history(username: str):
-    result = read_player_ehb_history(username)
-    return JSONResponse(content=result.data, headers=_error_headers(result.error))
+async def player_history(request: Request, username: str):
+    etag = build_etag(request, data_version("ehb_history"))
+    cached = not_modified(request, etag)
+    if cached is not None:
+        return cached
+    try:
+        history = read_player_ehb_history(username)
+    except Exception:
+        logger.exception("Failed to read player EHB history")
+        return json_response(
+            [],
+            headers=_error_headers("EHB history could not be loaded. Check the server logs for details."),
+            status_code=503,
+        )
+    return json_response(history, etag=etag)
@@ -2,11 +2,13 @@
 
 from __future__ import annotations
 
-from collections import deque
 from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Any, Callable, Optional
 
+from utils.event_feed import EventFeed
+from utils.roster import Roster
+
 
 @dataclass
 class BotState:
@@ -37,8 +39,15 @@ class BotState:
     reports_enabled: bool = False
 
     # Runtime telemetry
-    log_buffer: deque = field(default_factory=lambda: deque(maxlen=500))
+    # Sequence-numbered, so the admin stream pushes only new lines.
+    log_buffer: EventFeed = field(default_factory=lambda: EventFeed(maxlen=500))
     last_rank_check: Optional[datetime] = None
     last_group_refresh: Optional[datetime] = None
     last_gains_snapshot: Optional[datetime] = None
     bot_started_at: Optional[datetime] = None
+
+    # Rank state kept in memory by the rank check, and the ``players`` data
+    # version it matches. The embedded dashboard reads it instead of
+    # rebuilding the roster from SQLite on every snapshot.
+    roster: Optional[Roster] = None
+    roster_version: Optional[int] = None
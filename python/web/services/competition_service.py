@@ -0,0 +1,45 @@
+"""Competition lists and leaderboards for the dashboard, read from SQLite.
+
+The bot's competition tracker (``competitiontracker``) writes the data; the
+dashboard only reads it, so it works the same in embedded and split mode.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+from competitiontracker.competition_tracker import format_gained
+from utils.database import format_ts, read_competition, read_competition_standings, read_competitions
+
+
+def _status(competition: dict, now: str) -> str:
+    if now < competition["starts_at"]:
+        return "upcoming"
+    if now < competition["ends_at"]:
+        return "ongoing"
+    return "finished"
+
+
+def competition_overview(now: datetime | None = None) -> dict[str, list[dict]]:
+    """Group stored competitions into ongoing (ending soonest first), upcoming and finished."""
+    stamp = format_ts(now or datetime.now(timezone.utc))
+    overview: dict[str, list[dict]] = {"ongoing": [], "upcoming": [], "finished": []}
+    for competition in read_competitions():
+        overview[_status(competition, stamp)].append(competition)
+    overview["ongoing"].reverse()
+    overview["upcoming"].reverse()
+    return overview
+
+
+def competition_leaderboard(competition_id: int, now: datetime | None = None) -> tuple[dict | None, list[dict]]:
+    """Return the competition (with its ``status``) and its latest standings."""
+    competition = read_competition(competition_id)
+    if competition is None:
+        return None, []
+    stamp = format_ts(now or datetime.now(timezone.utc))
+    competition["status"] = _status(competition, stamp)
+    standings = [
+        dict(row, gained_label=format_gained(competition["metric"], row["gained"]))
+        for row in read_competition_standings(competition_id)
+    ]
+    return competition, standings
@@ -21,6 +21,15 @@ class CsvReadResult:
     error: str | None = None
 
 
+def history_version() -> str:
+    """Return a cheap change token for the EHB CSV log (size and mtime)."""
+    try:
+        stat = os.stat(_resolve_csv_path("ehb_log.csv"))
+    except OSError:
+        return "csv:missing"
+    return f"csv:{stat.st_size}-{stat.st_mtime_ns}"
+
+
 def _read_csv_rows() -> CsvReadResult:
     resolved_path = _resolve_csv_path("ehb_log.csv")
     if not os.path.exists(resolved_path):
@@ -34,8 +43,15 @@ def _read_csv_rows() -> CsvReadResult:
         return CsvReadResult([], "EHB history could not be loaded. Check the server logs for details.")
 
 
-def read_player_ehb_history(username: str) -> CsvReadResult:
-    """Return list of {timestamp, ehb} for a specific player, sorted by time."""
+def read_player_ehb_history(
+    username: str,
+    start: str | None = None,
+    end: str | None = None,
+) -> CsvReadResult:
+    """Return list of {timestamp, ehb} for a specific player, sorted by time.
+
+    ``start``/``end`` optionally bound the inclusive timestamp range.
+    """
     rows_result = _read_csv_rows()
     history = []
 
@@ -48,8 +64,11 @@ def read_player_ehb_history(username: str) -> CsvReadResult:
             ehb = float(row[2].strip())
         except ValueError:
             continue
-        if name.lower() == username.lower():
-            history.append({"timestamp": ts, "ehb": ehb})
+        if name.lower() != username.lower():
+            continue
+        if (start is not None and ts < start) or (end is not None and ts > end):
+            continue
+        history.append({"timestamp": ts, "ehb": ehb})
 
     history.sort(key=lambda entry: entry["timestamp"])
     return CsvReadResult(history, rows_result.error)
@@ -0,0 +1,68 @@
+"""Server-side downsampling for chart time series.
+
+History tables grow without bound while a chart canvas is a few hundred pixels
+wide. Largest-Triangle-Three-Buckets (LTTB) keeps the first and last points and,
+for each bucket in between, the point that spans the largest triangle with its
+neighbours. Peaks and dips survive, unlike with plain striding or averaging.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+
+
+def _x_values(rows: list[dict]) -> list[float]:
+    """Map timestamps to seconds; fall back to row position if any cannot be parsed."""
+    values = []
+    for row in rows:
+        try:
+            values.append(datetime.fromisoformat(str(row["timestamp"])).timestamp())
+        except ValueError:
+            return [float(index) for index in range(len(rows))]
+    return values
+
+
+def lttb(rows: list[dict], value_key: str, threshold: int | None) -> list[dict]:
+    """Downsample time-ordered ``rows`` to at most ``threshold`` points.
+
+    ``rows`` are ``{timestamp, <value_key>}`` dicts as returned by the history
+    readers. They are returned unchanged when ``threshold`` is ``None``, below
+    3, or not smaller than the series; otherwise a subset of the original rows
+    is returned in order.
+    """
+    count = len(rows)
+    if threshold is None or threshold < 3 or count <= threshold:
+        return rows
+
+    xs = _x_values(rows)
+    ys = [float(row[value_key]) for row in rows]
+    sampled = [rows[0]]
+    bucket_size = (count - 2) / (threshold - 2)
+    previous = 0
+
+    for bucket in range(threshold - 2):
+        start = int(bucket * bucket_size) + 1
+        end = int((bucket + 1) * bucket_size) + 1
+
+        # Average of the next bucket is the third triangle vertex.
+        next_start = end
+        next_end = min(int((bucket + 2) * bucket_size) + 1, count)
+        span = next_end - next_start
+        avg_x = sum(xs[next_start:next_end]) / span
+        avg_y = sum(ys[next_start:next_end]) / span
+
+        prev_x, prev_y = xs[previous], ys[previous]
+        best_index, best_area = start, -1.0
+        for index in range(start, end):
+            area = abs(
+                (prev_x - avg_x) * (ys[index] - prev_y)
+                - (prev_x - xs[index]) * (avg_y - prev_y)
+            )
+            if area > best_area:
+                best_index, best_area = index, area
+
+        sampled.append(rows[best_index])
+        previous = best_index
+
+    sampled.append(rows[-1])
+    return sampled
@@ -24,9 +24,14 @@ def list_available_metrics() -> list[str]:
     return metrics or list(_DEFAULT_METRICS)
 
 
-def read_player_gains_history(username: str, metric: str) -> list[dict]:
+def read_player_gains_history(
+    username: str,
+    metric: str,
+    start: str | None = None,
+    end: str | None = None,
+) -> list[dict]:
     """Return ``[{timestamp, gained}]`` gains history for a player + metric."""
-    return read_gains_history(username, metric)
+    return read_gains_history(username, metric, start=start, end=end)
 
 
 def read_latest_gains_leaderboard(metric: str, limit: int = 20) -> list[dict]:
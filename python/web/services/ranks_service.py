@@ -2,9 +2,12 @@
 
 from __future__ import annotations
 
+import bisect
 import logging
-from dataclasses import dataclass
+import threading
+from dataclasses import dataclass, field
 
+from utils.database import read_data_versions, resolve_db_path
 from utils.rank_utils import (
     EHB_SECTION,
     get_rank_thresholds as _get_rank_thresholds,
@@ -12,11 +15,17 @@ from utils.rank_utils import (
     next_rank,
     next_rank_ehp,
 )
+from utils.roster import Roster
 
 from ..presentation import RANK_ORDER, canonicalize_rank_name
+from ..responses import data_version
 
 logger = logging.getLogger(__name__)
 
+# Bot state of the embedded dashboard (see :func:`use_bot_state`); ``None`` in
+# split mode and before the app has started.
+_bot_state = None
+
 
 @dataclass
 class RankSnapshot:
@@ -42,10 +51,55 @@ def _build_player(username: str, data: dict) -> dict:
     }
 
 
+def _build_players(ranks) -> list[dict]:
+    if not isinstance(ranks, Roster):
+        return [_build_player(username, data) for username, data in ranks.items()]
+    # Read the roster's columns directly instead of materializing entry dicts.
+    return [
+        {
+            "username": record.username,
+            "ehb": record.ehb,
+            "rank": canonicalize_rank_name(record.rank),
+            "ehp_tracked": record.ehp is not None,
+            "ehp": record.ehp,
+            "ehp_rank": record.ehp_rank,
+        }
+        for record in ranks.records()
+    ]
+
+
+def use_bot_state(state) -> None:
+    """Read ranks from ``state.roster`` while it is current; ``None`` reverts to SQLite."""
+    global _bot_state
+    _bot_state = state
+
+
+def _shared_roster() -> Roster | None:
+    """Return the rank check's in-memory roster if it matches the persisted ``players`` data.
+
+    Split mode has no roster, and one that another writer has since changed
+    (e.g. ``/update``) is skipped, so both fall back to :func:`load_ranks`.
+    """
+    state = _bot_state
+    roster = getattr(state, "roster", None)
+    if roster is None:
+        return None
+    if read_data_versions(["players"]).get("players") != state.roster_version:
+        return None
+    return roster
+
+
+def snapshot_version() -> str | None:
+    """Return the version token of the persisted rank snapshot (``players``)."""
+    return data_version("players")
+
+
 def get_rank_snapshot() -> RankSnapshot:
     """Return a normalized snapshot of rank data for a single request."""
     try:
-        ranks = load_ranks()
+        ranks = _shared_roster()
+        if ranks is None:
+            ranks = load_ranks()
     except Exception:
         logger.exception("Failed to load player ranks for web request")
         return RankSnapshot(
@@ -57,7 +111,7 @@ def get_rank_snapshot() -> RankSnapshot:
             error="Rank data could not be loaded. Check the server logs for details.",
         )
 
-    players = [_build_player(username, data) for username, data in ranks.items()]
+    players = _build_players(ranks)
     players.sort(key=lambda player: (-player["ehb"], player["username"].lower()))
 
     rank_distribution = {}
@@ -109,22 +163,173 @@ def get_rank_distribution(snapshot: RankSnapshot | None = None) -> dict[str, int
     return dict((snapshot or get_rank_snapshot()).rank_distribution)
 
 
-def search_players(query: str, sort: str = "ehb", snapshot: RankSnapshot | None = None) -> list[dict]:
-    """Case-insensitive search by username prefix/substring with optional sorting."""
-    players = list((snapshot or get_rank_snapshot()).players)
-    query_lower = query.lower().strip()
-    if query_lower:
-        players = [player for player in players if query_lower in player["username"].lower()]
-
-    if sort == "name":
-        players.sort(key=lambda player: player["username"].lower())
-    elif sort == "rank":
+@dataclass
+class PlayerPage:
+    """One page of player search results."""
+
+    players: list[dict]
+    offset: int
+    limit: int
+    total: int
+    next_offset: int | None
+
+
+# Substrings up to this length are indexed directly; longer queries intersect
+# the postings of their trigrams and then confirm the substring.
+_GRAM = 3
+SEARCH_SORTS = ("ehb", "name", "rank")
+
+
+@dataclass
+class PlayerSearchIndex:
+    """Casefolded n-gram and prefix index over one rank snapshot.
+
+    ``players`` keeps the snapshot order (EHB descending). Each sort has a
+    precomputed ordering, so a search only filters positions; it never
+    re-sorts player dicts.
+    """
+
+    snapshot: RankSnapshot
+    # Data version the index was cached under; ``None`` when it is not cacheable.
+    version: str | None = None
+    names: list[str] = field(init=False)
+    grams: dict[str, list[int]] = field(init=False)
+    orders: dict[str, list[int]] = field(init=False)
+    order_rank: dict[str, list[int]] = field(init=False)
+    prefixes: list[tuple[str, int]] = field(init=False)
+
+    def __post_init__(self) -> None:
+        players = self.snapshot.players
+        self.names = [player["username"].casefold() for player in players]
+        grams: dict[str, set[int]] = {}
+        for position, name in enumerate(self.names):
+            for size in range(1, _GRAM + 1):
+                for start in range(len(name) - size + 1):
+                    grams.setdefault(name[start:start + size], set()).add(position)
+        self.grams = {gram: sorted(positions) for gram, positions in grams.items()}
+
         rank_positions = {name: index for index, name in enumerate(RANK_ORDER)}
-        players.sort(key=lambda player: (rank_positions.get(player["rank"], len(RANK_ORDER)), -player["ehb"]))
-    else:
-        players.sort(key=lambda player: (-player["ehb"], player["username"].lower()))
+        positions = range(len(players))
+        self.orders = {
+            "ehb": list(positions),
+            "name": sorted(positions, key=lambda i: self.names[i]),
+            "rank": sorted(
+                positions,
+                key=lambda i: (rank_positions.get(players[i]["rank"], len(RANK_ORDER)), -players[i]["ehb"]),
+            ),
+        }
+        self.order_rank = {}
+        for sort, order in self.orders.items():
+            ranks = [0] * len(order)
+            for index, position in enumerate(order):
+                ranks[position] = index
+            self.order_rank[sort] = ranks
+        self.prefixes = sorted((name, position) for position, name in enumerate(self.names))
 
-    return players
+    def _matches(self, needle: str) -> list[int] | None:
+        """Return positions whose name contains ``needle``; ``None`` means all."""
+        if not needle:
+            return None
+        if len(needle) <= _GRAM:
+            return self.grams.get(needle, [])
+        postings = sorted(
+            (self.grams.get(needle[i:i + _GRAM], []) for i in range(len(needle) - _GRAM + 1)),
+            key=len,
+        )
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            candidates.intersection_update(posting)
+            if not candidates:
+                return []
+        return [position for position in candidates if needle in self.names[position]]
+
+    def _ordered(self, query: str, sort: str) -> list[int]:
+        order = self.orders.get(sort, self.orders["ehb"])
+        matches = self._matches(query.casefold().strip())
+        if matches is None:
+            return order
+        if len(matches) * 4 > len(order):
+            # Broad matches: walking the precomputed order beats sorting them.
+            matched = set(matches)
+            return [position for position in order if position in matched]
+        ranks = self.order_rank.get(sort, self.order_rank["ehb"])
+        return sorted(matches, key=ranks.__getitem__)
+
+    def search(self, query: str, sort: str = "ehb") -> list[dict]:
+        """Return players whose name contains ``query`` (case-insensitive), in ``sort`` order."""
+        players = self.snapshot.players
+        return [players[position] for position in self._ordered(query, sort)]
+
+    def page(self, query: str, sort: str = "ehb", offset: int = 0, limit: int = 50) -> "PlayerPage":
+        """Return one page of :meth:`search` results.
+
+        Orderings are total (ties fall back to snapshot order), so consecutive
+        offsets over one snapshot version never repeat or skip a player.
+        """
+        positions = self._ordered(query, sort)
+        offset = max(offset, 0)
+        end = offset + max(limit, 0)
+        players = self.snapshot.players
+        return PlayerPage(
+            players=[players[position] for position in positions[offset:end]],
+            offset=offset,
+            limit=limit,
+            total=len(positions),
+            next_offset=end if end < len(positions) else None,
+        )
+
+    def typeahead(self, query: str, limit: int = 10) -> list[dict]:
+        """Return up to ``limit`` suggestions.
+
+        Name-prefix matches come first in name order, then other substring
+        matches by EHB.
+        """
+        needle = query.casefold().strip()
+        if not needle or limit <= 0:
+            return []
+        players = self.snapshot.players
+        results: list[int] = []
+        start = bisect.bisect_left(self.prefixes, (needle, -1))
+        for name, position in self.prefixes[start:]:
+            if not name.startswith(needle) or len(results) >= limit:
+                break
+            results.append(position)
+        if len(results) < limit:
+            seen = set(results)
+            ranks = self.order_rank["ehb"]
+            extra = sorted((p for p in self._matches(needle) or [] if p not in seen), key=ranks.__getitem__)
+            results.extend(extra[:limit - len(results)])
+        return [players[position] for position in results]
+
+
+_search_index_lock = threading.Lock()
+_search_index_cache: tuple[tuple[str, str], PlayerSearchIndex] | None = None
+
+
+def get_search_index() -> PlayerSearchIndex:
+    """Return the search index for the current snapshot version, building it once per version.
+
+    Snapshots that failed to load are indexed but never cached; their
+    ``version`` stays ``None`` so derived caches skip them too.
+    """
+    global _search_index_cache
+    version = snapshot_version()
+    key = (resolve_db_path(), version) if version is not None else None
+    cached = _search_index_cache
+    if key is not None and cached is not None and cached[0] == key:
+        return cached[1]
+    index = PlayerSearchIndex(get_rank_snapshot())
+    if key is not None and index.snapshot.error is None:
+        index.version = version
+        with _search_index_lock:
+            _search_index_cache = (key, index)
+    return index
+
+
+def search_players(query: str, sort: str = "ehb", snapshot: RankSnapshot | None = None) -> list[dict]:
+    """Case-insensitive search by username prefix/substring with optional sorting."""
+    index = PlayerSearchIndex(snapshot) if snapshot is not None else get_search_index()
+    return index.search(query, sort)
 
 
 def get_rank_thresholds(section: str = EHB_SECTION) -> list[dict]:
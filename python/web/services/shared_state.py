@@ -0,0 +1,274 @@
+"""Live bot state shared with a dashboard running in its own process.
+
+In the default embedded mode the dashboard reads :class:`BotState` and the API
+usage tracker directly. In split mode (``[web] mode = split``, dashboard started
+with ``python -m web``) the two processes only share the SQLite file, which
+the dashboard opens read-only:
+
+- The bot runs :func:`run_shared_state_publisher`. It writes the runtime fields
+  to ``bot_runtime_state`` when they change and appends new log lines to
+  ``bot_log_lines``. API calls are already in ``api_call_log``.
+- The dashboard wraps those tables in :class:`SharedBotState` and
+  :class:`SharedApiUsage`, which expose the attributes the routes and templates
+  already use. :class:`PolledEventFeed` gives the admin stream the same
+  interface as :class:`utils.event_feed.EventFeed`, backed by the tables'
+  increasing ids.
+
+Nothing in split mode can call back into the bot, so the admin actions report
+that they are unavailable there.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Iterator
+
+from utils.api_usage import ApiUsageTracker, tracker as api_usage_tracker
+from utils.database import (
+    append_bot_log_lines,
+    count_api_calls_since,
+    format_ts,
+    read_api_calls_after,
+    read_bot_log_lines,
+    read_bot_runtime_state,
+    read_last_api_call_id,
+    read_last_bot_log_seq,
+    write_bot_runtime_state,
+)
+
+from .bot_state import BotState
+
+logger = logging.getLogger(__name__)
+
+_TIMESTAMP_FIELDS = ("bot_started_at", "last_rank_check", "last_group_refresh", "last_gains_snapshot")
+_SETTING_FIELDS = ("group_id", "check_interval", "post_to_discord", "silent", "debug", "reports_enabled")
+# Log lines mirrored to SQLite; matches the in-process buffer.
+LOG_LINES_KEPT = 500
+# How often the publisher compares state, and how often a split-mode dashboard
+# re-reads it.
+PUBLISH_INTERVAL_SECONDS = 2.0
+STATE_TTL_SECONDS = 1.0
+# After the first new log line, wait this long so a burst is written as one batch.
+LOG_BATCH_SECONDS = 0.5
+
+
+# ---------------------------------------------------------------------------
+# Bot side
+# ---------------------------------------------------------------------------
+
+
+def runtime_snapshot(state: BotState, usage: ApiUsageTracker = api_usage_tracker) -> dict[str, Any]:
+    """Return the JSON-serializable runtime fields a split-mode dashboard shows."""
+    snapshot: dict[str, Any] = {
+        name: value.isoformat() if (value := getattr(state, name)) is not None else None
+        for name in _TIMESTAMP_FIELDS
+    }
+    snapshot.update({name: getattr(state, name) for name in _SETTING_FIELDS})
+    breaker = usage.breaker_status()
+    snapshot["api_usage"] = {
+        "rate_limit_per_minute": usage.rate_limit_per_minute,
+        # Wall-clock end of the cooldown, so the reader can count down itself.
+        "breaker_open_until": int(time.time()) + breaker["seconds_remaining"] if breaker["open"] else None,
+        "blocked_since_open": breaker["blocked_since_open"],
+    }
+    return snapshot
+
+
+class SharedStatePublisher:
+    """Mirror changed runtime state and new log lines into SQLite."""
+
+    def __init__(self, state: BotState, *, usage: ApiUsageTracker = api_usage_tracker, db_path: str | None = None):
+        self.state = state
+        self.usage = usage
+        self.db_path = db_path
+        self._published: dict[str, Any] = {}
+        self.log_seq = 0
+
+    def publish_once(self) -> int:
+        """Write what changed since the last call; return how many keys and lines were written."""
+        snapshot = runtime_snapshot(self.state, self.usage)
+        changed = {key: value for key, value in snapshot.items() if self._published.get(key, object()) != value}
+        write_bot_runtime_state(changed, db_path=self.db_path)
+        self._published.update(changed)
+
+        lines = self.state.log_buffer.since(self.log_seq)
+        append_bot_log_lines([line for _, line in lines], keep=LOG_LINES_KEPT, db_path=self.db_path)
+        if lines:
+            self.log_seq = lines[-1][0]
+        return len(changed) + len(lines)
+
+
+async def run_shared_state_publisher(
+    publisher: SharedStatePublisher,
+    *,
+    interval_seconds: float = PUBLISH_INTERVAL_SECONDS,
+    log: Callable[[str], None] = print,
+) -> None:
+    """Publish forever. New log lines go out within a short batch window; other fields every interval."""
+    while True:
+        try:
+            publisher.publish_once()
+        except Exception as e:  # noqa: BLE001 — the bot must keep running without the dashboard
+            log(f"Shared state publisher error: {e}")
+            await asyncio.sleep(interval_seconds)
+            continue
+        if await publisher.state.log_buffer.wait(publisher.log_seq, timeout=interval_seconds):
+            await asyncio.sleep(LOG_BATCH_SECONDS)
+
+
+def start_shared_state_publisher(state: BotState, *, log: Callable[[str], None] = print) -> asyncio.Task:
+    """Start the split-mode state publisher task."""
+    return asyncio.create_task(run_shared_state_publisher(SharedStatePublisher(state), log=log))
+
+
+# ---------------------------------------------------------------------------
+# Dashboard side
+# ---------------------------------------------------------------------------
+
+
+class PolledEventFeed:
+    """Read-only :class:`utils.event_feed.EventFeed` lookalike over rows in SQLite.
+
+    Another process appends the rows, so :meth:`wait` polls every
+    ``poll_seconds`` instead of being woken.
+    """
+
+    def __init__(
+        self,
+        read_after: Callable[[int, int], list[tuple[int, Any]]],
+        read_last_seq: Callable[[], int],
+        *,
+        maxlen: int = LOG_LINES_KEPT,
+        poll_seconds: float = PUBLISH_INTERVAL_SECONDS,
+    ):
+        self._read_after = read_after
+        self._read_last_seq = read_last_seq
+        self.maxlen = maxlen
+        self.poll_seconds = poll_seconds
+
+    @property
+    def last_seq(self) -> int:
+        return self._read_last_seq()
+
+    def since(self, seq: int) -> list[tuple[int, Any]]:
+        return self._read_after(seq, self.maxlen)
+
+    def tail(self, count: int) -> list[tuple[int, Any]]:
+        return self._read_after(0, count) if count > 0 else []
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter([data for _, data in self.tail(self.maxlen)])
+
+    def __len__(self) -> int:
+        return len(self.tail(self.maxlen))
+
+    def append(self, data: Any) -> int:
+        raise RuntimeError("The shared log feed is read-only; the bot process writes it.")
+
+    async def wait(self, seq: int, timeout: float | None = None) -> list[tuple[int, Any]]:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            events = self.since(seq)
+            if events:
+                return events
+            remaining = self.poll_seconds if deadline is None else deadline - time.monotonic()
+            if remaining <= 0:
+                return []
+            await asyncio.sleep(min(self.poll_seconds, remaining))
+
+
+def _parse_timestamp(value: str | None) -> datetime | None:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return None
+
+
+class SharedBotState:
+    """:class:`BotState` stand-in that reads the bot's published state from SQLite.
+
+    Values are re-read at most every ``ttl_seconds``. The bot's callables are
+    always ``None``, and ``read_only`` tells the admin routes not to accept
+    changes.
+    """
+
+    read_only = True
+    wom_client = None
+    discord_client = None
+    group_passcode = ""
+    get_rank = None
+    list_all_members_and_ranks = None
+    check_for_rank_changes = None
+    refresh_group_data = None
+    log_func = None
+    # The bot's in-memory roster lives in another process; ranks come from SQLite.
+    roster = None
+    roster_version = None
+
+    def __init__(self, *, ttl_seconds: float = STATE_TTL_SECONDS, db_path: str | None = None):
+        self.ttl_seconds = ttl_seconds
+        self.db_path = db_path
+        self._values: dict[str, Any] = {}
+        self._loaded_at: float | None = None
+        self.log_buffer = PolledEventFeed(
+            lambda after, limit: read_bot_log_lines(after, limit, db_path=db_path),
+            lambda: read_last_bot_log_seq(db_path=db_path),
+        )
+
+    def values(self) -> dict[str, Any]:
+        """Return the published values, refreshed when older than the TTL."""
+        now = time.monotonic()
+        if self._loaded_at is None or now - self._loaded_at >= self.ttl_seconds:
+            try:
+                self._values = read_bot_runtime_state(db_path=self.db_path)
+            except Exception:
+                logger.exception("Failed to read shared bot state")
+            self._loaded_at = now
+        return self._values
+
+    def __getattr__(self, name: str) -> Any:
+        if name in _TIMESTAMP_FIELDS:
+            return _parse_timestamp(self.values().get(name))
+        if name in _SETTING_FIELDS:
+            default = getattr(BotState, name, None)
+            return self.values().get(name, default)
+        raise AttributeError(name)
+
+
+class SharedApiUsage:
+    """API usage tracker stand-in built from ``api_call_log`` and the published breaker state."""
+
+    def __init__(self, state: SharedBotState, *, db_path: str | None = None):
+        self.state = state
+        self.db_path = db_path
+        self.events = PolledEventFeed(
+            lambda after, limit: read_api_calls_after(after, limit, db_path=db_path),
+            lambda: read_last_api_call_id(db_path=db_path),
+            maxlen=200,
+        )
+
+    def _usage(self) -> dict[str, Any]:
+        return self.state.values().get("api_usage") or {}
+
+    @property
+    def rate_limit_per_minute(self) -> int:
+        return int(self._usage().get("rate_limit_per_minute") or api_usage_tracker.rate_limit_per_minute)
+
+    def breaker_status(self) -> dict:
+        usage = self._usage()
+        open_until = usage.get("breaker_open_until")
+        remaining = max(0, int(open_until - time.time())) if open_until else 0
+        return {
+            "open": remaining > 0,
+            "seconds_remaining": remaining,
+            "blocked_since_open": usage.get("blocked_since_open", 0) if remaining else 0,
+        }
+
+    def calls_in_last(self, seconds: int) -> int:
+        since = format_ts(datetime.now(timezone.utc) - timedelta(seconds=seconds))
+        return count_api_calls_since(since, db_path=self.db_path)
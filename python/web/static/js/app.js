@@ -82,6 +82,17 @@ function destroyChart(canvasId) {
     }
 }
 
+// History endpoints downsample server-side; ask for roughly one point per
+// pixel of chart width so long histories stay cheap to fetch and draw.
+const MAX_CHART_POINTS = 2000;
+
+function withPointBudget(url, canvas) {
+    const width = Math.round(canvas.clientWidth || canvas.parentElement?.clientWidth || 600);
+    const points = Math.min(MAX_CHART_POINTS, Math.max(50, width));
+    const separator = url.includes("?") ? "&" : "?";
+    return `${url}${separator}points=${points}`;
+}
+
 function safeRankColor(rank, fallback) {
     return Object.hasOwn(RANK_COLORS, rank) ? RANK_COLORS[rank] : fallback;
 }
@@ -234,7 +245,9 @@ async function renderPlayerHistory(username, canvasId, messageId) {
     destroyChart(canvasId);
     chartMessage(messageId, "Loading chart...");
     try {
-        const result = await fetchJson(`/charts/api/ehb-history?player=${encodeURIComponent(username)}`);
+        const result = await fetchJson(
+            withPointBudget(`/charts/api/ehb-history?player=${encodeURIComponent(username)}`, canvas),
+        );
         if (!result.data?.length) {
             chartMessage(messageId, "No EHB history data is available for this player.");
             return;
@@ -274,7 +287,7 @@ async function renderPlayerMetricHistory(url, label, valueKey, canvasId, message
     destroyChart(canvasId);
     chartMessage(messageId, "Loading chart...");
     try {
-        const result = await fetchJson(url);
+        const result = await fetchJson(withPointBudget(url, canvas));
         if (!result.data?.length) {
             chartMessage(messageId, `No ${label} data is available for this player.`);
             return;
@@ -416,6 +429,62 @@ function initHistoryPlayer() {
     renderPlayerHistory(username, container.dataset.historyTarget, container.dataset.historyMessage);
 }
 
+const LOG_LINE_LIMIT = 100;
+const API_CALL_ROW_LIMIT = 25;
+
+function trimChildren(container, limit, fromStart) {
+    while (container.children.length > limit) {
+        (fromStart ? container.firstElementChild : container.lastElementChild).remove();
+    }
+}
+
+function initLiveFeeds() {
+    const usageFeed = document.querySelector("[data-live-stream]");
+    const logFeed = document.getElementById("log-feed");
+    if (!usageFeed || !window.EventSource) {
+        return;
+    }
+    // The server sends full panels on connect and only new lines/rows afterwards.
+    const source = new EventSource(usageFeed.dataset.liveStream);
+    const stickToBottom = (update) => {
+        const atBottom = logFeed.scrollHeight - logFeed.scrollTop - logFeed.clientHeight < 8;
+        update();
+        if (atBottom) {
+            logFeed.scrollTop = logFeed.scrollHeight;
+        }
+    };
+    source.addEventListener("logs", (event) => {
+        stickToBottom(() => {
+            logFeed.innerHTML = event.data;
+        });
+    });
+    source.addEventListener("log-lines", (event) => {
+        stickToBottom(() => {
+            logFeed.querySelector(".log-empty")?.remove();
+            logFeed.insertAdjacentHTML("beforeend", event.data);
+            trimChildren(logFeed, LOG_LINE_LIMIT, true);
+        });
+    });
+    source.addEventListener("usage", (event) => {
+        usageFeed.innerHTML = event.data;
+    });
+    source.addEventListener("usage-summary", (event) => {
+        const summary = document.getElementById("api-usage-summary");
+        if (summary) {
+            summary.innerHTML = event.data;
+        }
+    });
+    source.addEventListener("usage-calls", (event) => {
+        const rows = document.getElementById("api-usage-calls");
+        if (!rows) {
+            return;
+        }
+        rows.querySelector("[data-empty-row]")?.remove();
+        rows.insertAdjacentHTML("afterbegin", event.data);
+        trimChildren(rows, API_CALL_ROW_LIMIT, false);
+    });
+}
+
 document.addEventListener("DOMContentLoaded", () => {
     initUptime();
     loadRankDistribution();
@@ -425,4 +494,5 @@ document.addEventListener("DOMContentLoaded", () => {
     initEhpHistoryPlayer();
     initEhpHistorySelect();
     initGainsSelect();
+    initLiveFeeds();
 });
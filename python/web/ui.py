@@ -1,13 +1,28 @@
-"""Shared template helpers for the WOMupdtr web UI."""
+"""Shared template helpers for the WOMupdtr web UI.
+
+The rank snapshot only changes once per rank check, so the expensive,
+request-independent regions of the pages (rank spread, rank ladder, player
+rows) are rendered through :func:`render_fragment`. It keeps the rendered HTML
+in memory keyed by template, parameters and data version, and re-renders only
+after the bot writes a new version. Compiled templates are also kept in a Jinja
+bytecode cache, so a restart skips recompiling them.
+"""
 
 from __future__ import annotations
 
+import functools
 import os
-from typing import Any
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
 
 from fastapi import Request
 from fastapi.responses import HTMLResponse
 from fastapi.templating import Jinja2Templates
+from jinja2 import FileSystemBytecodeCache
+from markupsafe import Markup
+
+from utils.database import resolve_db_path
 
 from .presentation import rank_palette_json, rank_slug
 
@@ -16,16 +31,90 @@ _TEMPLATES_DIR = os.path.join(_BASE_DIR, "templates")
 
 templates = Jinja2Templates(directory=_TEMPLATES_DIR)
 templates.env.filters["rank_slug"] = rank_slug
+templates.env.bytecode_cache = FileSystemBytecodeCache()
 
 _NAV_ITEMS = (
     {"key": "dashboard", "label": "Dashboard", "href": "/"},
     {"key": "players", "label": "Players", "href": "/players/"},
     {"key": "reports", "label": "Reports", "href": "/reports/weekly"},
     {"key": "charts", "label": "Charts", "href": "/charts/"},
+    {"key": "competitions", "label": "Competitions", "href": "/competitions/"},
     {"key": "group", "label": "Group", "href": "/group/"},
     {"key": "admin", "label": "Admin", "href": "/admin/"},
 )
 
+# Distinct (template, parameters) pairs kept rendered; each holds one version.
+FRAGMENT_CACHE_SIZE = 256
+
+
+class FragmentCache:
+    """Bounded LRU of rendered fragments keyed by ``(template, params)``.
+
+    Each entry remembers the data version it was rendered at, so a new version
+    replaces the entry instead of piling up beside it.
+    """
+
+    def __init__(self, max_entries: int = FRAGMENT_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[tuple[str, Hashable], tuple[Hashable, str]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, template_name: str, params: Hashable, version: Hashable) -> str | None:
+        key = (template_name, params)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != version:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, template_name: str, params: Hashable, version: Hashable, html: str) -> None:
+        key = (template_name, params)
+        with self._lock:
+            self._entries[key] = (version, html)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+fragment_cache = FragmentCache()
+
+
+def render_fragment(
+    template_name: str,
+    version: str | None,
+    params: Hashable,
+    build_context: Callable[[], dict[str, Any]],
+) -> Markup:
+    """Render a request-independent partial, reusing the output cached for ``version``.
+
+    ``params`` must capture everything besides the data version that changes
+    the output. ``build_context`` is only called on a miss. A ``None`` version
+    (unknown, or data that failed to load) always renders and never caches.
+    """
+    cache_version = (resolve_db_path(), version) if version is not None else None
+    if cache_version is not None:
+        html = fragment_cache.get(template_name, params, cache_version)
+        if html is not None:
+            return Markup(html)
+    html = templates.get_template(template_name).render(build_context())
+    if cache_version is not None:
+        fragment_cache.put(template_name, params, cache_version, html)
+    return Markup(html)
+
 
 def current_page_key(path: str) -> str:
     """Map a request path to its active navigation key."""
@@ -38,23 +127,27 @@ def current_page_key(path: str) -> str:
     return ""
 
 
-def build_context(request: Request, **context: Any) -> dict[str, Any]:
-    """Return a base template context with global UI metadata."""
-    page_key = current_page_key(request.url.path)
-    bot_state = getattr(request.app.state, "bot_state", None)
-    reports_enabled = getattr(bot_state, "reports_enabled", True)
-    nav_items = [
+@functools.lru_cache(maxsize=None)
+def _nav_items(page_key: str, reports_enabled: bool) -> tuple[dict[str, Any], ...]:
+    return tuple(
         {
             **item,
             "active": item["key"] == page_key,
             "label": f"{item['label']} (disabled)" if item["key"] == "reports" and not reports_enabled else item["label"],
         }
         for item in _NAV_ITEMS
-    ]
+    )
+
+
+def build_context(request: Request, **context: Any) -> dict[str, Any]:
+    """Return a base template context with global UI metadata."""
+    page_key = current_page_key(request.url.path)
+    bot_state = getattr(request.app.state, "bot_state", None)
+    reports_enabled = getattr(bot_state, "reports_enabled", True)
     return {
         "request": request,
         "current_page": page_key,
-        "nav_items": nav_items,
+        "nav_items": _nav_items(page_key, bool(reports_enabled)),
         "rank_palette_json": rank_palette_json(),
         **context,
     }
@@ -4,19 +4,19 @@ from .weekly_reporter import (
     generate_weekly_report_messages,
     most_recent_week_end,
     send_weekly_report,
-    start_weekly_reporter,
+    weekly_report_job,
 )
 from .monthly_reporter import (
     generate_monthly_report_messages,
     most_recent_month_end,
     send_monthly_report,
-    start_monthly_reporter,
+    monthly_report_job,
 )
 from .yearly_reporter import (
     generate_yearly_report_messages,
     most_recent_year_end,
     send_yearly_report,
-    start_yearly_reporter,
+    yearly_report_job,
     write_yearly_report_file,
 )
 
@@ -24,14 +24,14 @@ __all__ = [
     "generate_weekly_report_messages",
     "most_recent_week_end",
     "send_weekly_report",
-    "start_weekly_reporter",
+    "weekly_report_job",
     "generate_monthly_report_messages",
     "most_recent_month_end",
     "send_monthly_report",
-    "start_monthly_reporter",
+    "monthly_report_job",
     "generate_yearly_report_messages",
     "most_recent_year_end",
     "send_yearly_report",
-    "start_yearly_reporter",
+    "yearly_report_job",
     "write_yearly_report_file",
 ]
@@ -0,0 +1,195 @@
+"""Operator-requested, resumable backfill of historical group achievements.
+
+Reports only store the achievements inside the windows they cover (see
+:mod:`weeklyupdater.achievement_retention`). To fill the ``achievements`` table
+for older periods, an operator requests a bounded window from the admin panel or
+the command line (run from ``python/``)::
+
+    python -m weeklyupdater.achievement_backfill --from 2024-01-01 --to 2025-01-01
+
+The request is a checkpoint row in ``achievement_backfill``. With
+``achievement_backfill = true`` the bot runs :func:`achievement_backfill_job`.
+Each interval it reads up to ``pages_per_run`` pages of WOM's newest-first group
+achievements, starting at the checkpointed offset:
+
+- Achievements inside the window get the same normalization and idempotent
+  upsert as report fetches. The offset is checkpointed after every page, so
+  after a restart the walk resumes where it stopped.
+- The walk ends at the first page that reaches back past the window start.
+- Calls are tagged ``backfill``, the lowest API caller priority with a tenth of
+  the budget. A run also stops early while the last minute already used half
+  the rate limit or the breaker is open.
+
+New achievements push older ones to later offsets, so a resumed walk may
+re-read a few rows but does not skip any. The upsert ignores rows it
+already has.
+"""
+
+from __future__ import annotations
+
+import argparse
+from datetime import datetime, timezone
+import typing as t
+
+from utils.api_usage import api_caller, tracker as api_usage_tracker
+from utils.database import (
+    TS_FORMAT,
+    advance_achievement_backfill,
+    cancel_achievement_backfill,
+    format_ts,
+    parse_ts,
+    read_achievement_backfill,
+    record_achievement_backfill_error,
+    request_achievement_backfill,
+    upsert_achievement_events,
+)
+from utils.job_scheduler import IntervalSchedule, Job
+
+from .achievement_retention import achievement_rows
+
+# WOM caps the paginated group achievements endpoint at 50 rows per request.
+BACKFILL_PAGE_SIZE = 50
+_ACTIVE = ("pending", "running")
+
+
+def parse_window_bound(value: str) -> datetime:
+    """Parse ``YYYY-MM-DD`` or ``YYYY-MM-DD HH:MM:SS`` as a UTC instant."""
+    value = value.strip()
+    for fmt in (TS_FORMAT, "%Y-%m-%d"):
+        try:
+            return datetime.strptime(value, fmt).replace(tzinfo=timezone.utc)
+        except ValueError:
+            continue
+    raise ValueError(f"Invalid date {value!r}; expected YYYY-MM-DD.")
+
+
+def request_backfill(start: datetime, end: datetime) -> dict:
+    """Validate and store a backfill request for ``[start, end)``, replacing any previous one."""
+    if start >= end:
+        raise ValueError("The backfill window must start before it ends.")
+    return request_achievement_backfill(format_ts(start), format_ts(end))
+
+
+def describe_backfill(checkpoint: t.Optional[dict]) -> str:
+    """One-line status of a backfill checkpoint for the CLI and admin panel."""
+    if checkpoint is None:
+        return "No achievement backfill has been requested."
+    line = (
+        f"Achievement backfill {checkpoint['window_start']} - {checkpoint['window_end']} UTC: "
+        f"{checkpoint['status']}, {checkpoint['pages']} pages read, "
+        f"{checkpoint['matched']} achievements in window, {checkpoint['inserted']} new."
+    )
+    if checkpoint.get("last_error"):
+        line += f" Last error: {checkpoint['last_error']}"
+    return line
+
+
+async def backfill_achievements_once(
+    *,
+    wom_client,
+    group_id: int,
+    max_pages: int,
+    usage=api_usage_tracker,
+) -> dict:
+    """Read up to ``max_pages`` pages of the requested backfill.
+
+    Returns ``{"pages", "matched", "inserted", "status"}``, where ``status`` is
+    the checkpoint's status afterwards (``None`` if nothing was requested). A
+    failed page is recorded on the checkpoint and re-raised, and the offset
+    stays at that page.
+    """
+    checkpoint = read_achievement_backfill()
+    report = {"pages": 0, "matched": 0, "inserted": 0, "status": checkpoint and checkpoint["status"]}
+    if checkpoint is None or checkpoint["status"] not in _ACTIVE:
+        return report
+
+    start, end = parse_ts(checkpoint["window_start"]), parse_ts(checkpoint["window_end"])
+    requested_at = checkpoint["requested_at"]
+    offset = checkpoint["next_offset"]
+    while report["pages"] < max_pages and usage.has_headroom():
+        try:
+            result = await wom_client.groups.get_achievements(group_id, limit=BACKFILL_PAGE_SIZE, offset=offset)
+            if not result.is_ok:
+                raise RuntimeError(f"failed to fetch achievements at offset {offset}: {result.unwrap_err()}")
+            page = list(result.unwrap())
+            in_window = [item for item in page if start <= item.created_at < end]
+            inserted = upsert_achievement_events(achievement_rows(in_window, group_id=group_id, player_name_map={}))
+        except Exception as e:
+            record_achievement_backfill_error(requested_at, str(e))
+            raise
+
+        done = len(page) < BACKFILL_PAGE_SIZE or page[-1].created_at < start
+        offset += len(page)
+        if not advance_achievement_backfill(
+            requested_at, offset, pages=1, matched=len(in_window), inserted=inserted, completed=done
+        ):
+            # Cancelled or replaced while this page was in flight.
+            report["status"] = (read_achievement_backfill() or {}).get("status")
+            return report
+        report["pages"] += 1
+        report["matched"] += len(in_window)
+        report["inserted"] += inserted
+        report["status"] = "completed" if done else "running"
+        if done:
+            break
+    return report
+
+
+def achievement_backfill_job(
+    *,
+    wom_client,
+    group_id: int,
+    interval_seconds: int,
+    pages_per_run: int,
+    log,
+) -> Job:
+    """Scheduler job advancing a requested backfill by up to ``pages_per_run`` pages per interval."""
+
+    @api_caller("backfill")
+    async def run(_period: datetime) -> None:
+        report = await backfill_achievements_once(
+            wom_client=wom_client, group_id=group_id, max_pages=max(pages_per_run, 1)
+        )
+        if report["pages"]:
+            log(
+                f"Achievement backfill: {report['pages']} pages, {report['matched']} achievements "
+                f"in window, {report['inserted']} new ({report['status']})."
+            )
+
+    interval = max(int(interval_seconds), 60)
+    return Job(
+        name="achievement_backfill",
+        schedule=IntervalSchedule(interval),
+        run=run,
+        retry_seconds=interval,
+        initial_delay_seconds=180,
+        run_on_first_start=True,
+    )
+
+
+def main(argv: t.Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m weeklyupdater.achievement_backfill",
+        description="Request, inspect or cancel the achievement backfill. The running bot fetches the pages.",
+    )
+    parser.add_argument("--from", dest="start", help="window start (UTC), YYYY-MM-DD")
+    parser.add_argument("--to", dest="end", help="window end (UTC, exclusive), YYYY-MM-DD; defaults to now")
+    parser.add_argument("--cancel", action="store_true", help="stop the current backfill")
+    args = parser.parse_args(argv)
+
+    if args.cancel:
+        print("Backfill cancelled." if cancel_achievement_backfill() else "No backfill is running.")
+    elif args.start:
+        try:
+            start = parse_window_bound(args.start)
+            end = parse_window_bound(args.end) if args.end else datetime.now(timezone.utc).replace(microsecond=0)
+            request_backfill(start, end)
+        except ValueError as e:
+            parser.error(str(e))
+    elif args.end:
+        parser.error("--to needs --from")
+    print(describe_backfill(read_achievement_backfill()))
+
+
+if __name__ == "__main__":
+    main()
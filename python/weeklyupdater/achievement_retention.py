@@ -80,21 +80,31 @@ def _achievement_row(
     }
 
 
-def persist_fetched_achievements(
+def achievement_rows(
     achievements: list,
     *,
     group_id: int,
     player_name_map: dict[int, str],
-    log,
-) -> int:
-    """Persist fetched achievements without making report generation depend on storage."""
-    rows = [
+) -> list[dict]:
+    """Normalize WOM achievements into ``upsert_achievement_events`` rows, dropping incomplete ones."""
+    return [
         row
         for achievement in achievements
         if (
             row := _achievement_row(achievement, group_id, player_name_map)
         ) is not None
     ]
+
+
+def persist_fetched_achievements(
+    achievements: list,
+    *,
+    group_id: int,
+    player_name_map: dict[int, str],
+    log,
+) -> int:
+    """Persist fetched achievements without making report generation depend on storage."""
+    rows = achievement_rows(achievements, group_id=group_id, player_name_map=player_name_map)
     try:
         return upsert_achievement_events(rows)
     except Exception as exc:
@@ -2,28 +2,27 @@
 
 from __future__ import annotations
 
-import asyncio
 import calendar
 from datetime import datetime, timezone
 
 from wom import enums
 
-from .achievement_retention import (
-    append_milestone_sections,
-    categorize_additional_milestones,
-    persist_fetched_achievements,
-)
+from utils.api_usage import api_caller
+from utils.job_scheduler import Job, Schedule
+
+from .achievement_retention import append_milestone_sections, categorize_additional_milestones
+from .period_rollups import collect_period_activity
 from .weekly_reporter import (
     _chunk_messages,
     _format_float,
     _format_int,
-    _get_group_gains,
     _is_experience_measure,
     _is_level_measure,
     _is_skill_metric,
     _matches_threshold,
     _metric_label,
     _LEVEL_99_XP,
+    REPORT_JITTER_SECONDS,
 )
 
 
@@ -62,32 +61,6 @@ async def _get_group_member_map(wom_client, group_id: int, log) -> dict[int, str
     return {membership.player.id: membership.player.display_name for membership in group.memberships}
 
 
-async def _get_dated_pages(
-    fetch_page,
-    *,
-    start_date: datetime,
-    end_date: datetime,
-    log,
-    label: str,
-    limit: int = 50,
-) -> list:
-    entries = []
-    offset = 0
-    while True:
-        result = await fetch_page(limit, offset)
-        if not result.is_ok:
-            log(f"Monthly report: failed to fetch {label}: {result.unwrap_err()}")
-            break
-        page = list(result.unwrap())
-        if not page:
-            break
-        entries.extend(item for item in page if start_date <= item.created_at < end_date)
-        if len(page) < limit or page[-1].created_at < start_date:
-            break
-        offset += limit
-    return entries
-
-
 def _build_report_lines(
     *,
     start_date: datetime,
@@ -176,44 +149,26 @@ def _build_report_lines(
     return lines
 
 
+@api_caller("reports")
 async def _generate_monthly_report(*, wom_client, group_id: int, end_date: datetime, log) -> list[str]:
     start_date = _previous_month_boundary(end_date)
     player_name_map = await _get_group_member_map(wom_client, group_id, log)
 
-    overall_gains = await _get_group_gains(
-        wom_client, group_id, enums.Metric.Overall, start_date, end_date
-    )
-    ehb_gains = await _get_group_gains(
-        wom_client, group_id, enums.Metric.Ehb, start_date, end_date
-    )
-    ehp_gains = await _get_group_gains(
-        wom_client, group_id, enums.Metric.Ehp, start_date, end_date
-    )
-    sailing_gains = await _get_group_gains(
-        wom_client, group_id, enums.Metric.Sailing, start_date, end_date
-    )
-
-    groups = wom_client.groups
-    name_changes = await _get_dated_pages(
-        lambda limit, offset: groups.get_name_changes(group_id, limit=limit, offset=offset),
-        start_date=start_date,
-        end_date=end_date,
-        log=log,
-        label="name changes",
-    )
-    raw_achievements = await _get_dated_pages(
-        lambda limit, offset: groups.get_achievements(group_id, limit=limit, offset=offset),
+    activity = await collect_period_activity(
+        wom_client=wom_client,
+        group_id=group_id,
         start_date=start_date,
         end_date=end_date,
-        log=log,
-        label="achievements",
-    )
-    persist_fetched_achievements(
-        raw_achievements,
-        group_id=group_id,
         player_name_map=player_name_map,
         log=log,
     )
+
+    overall_gains = activity.gains_for(enums.Metric.Overall)
+    ehb_gains = activity.gains_for(enums.Metric.Ehb)
+    ehp_gains = activity.gains_for(enums.Metric.Ehp)
+    sailing_gains = activity.gains_for(enums.Metric.Sailing)
+    name_changes = activity.name_changes
+    raw_achievements = activity.achievements
     milestone_categories = categorize_additional_milestones(raw_achievements)
     achievements = [
         item
@@ -225,13 +180,6 @@ async def _generate_monthly_report(*, wom_client, group_id: int, end_date: datet
         )
     ]
 
-    for gains in (overall_gains, ehb_gains, ehp_gains, sailing_gains):
-        gains.sort(key=lambda entry: entry.data.gained, reverse=True)
-    for category in milestone_categories.values():
-        category.sort(key=lambda item: item.created_at)
-    achievements.sort(key=lambda item: item.created_at)
-    name_changes.sort(key=lambda item: item.created_at)
-
     return _chunk_messages(
         _build_report_lines(
             start_date=start_date,
@@ -259,29 +207,21 @@ async def _send_report(discord_client, channel_id: int, messages: list[str], log
         await channel.send(message)
 
 
-async def _monthly_report_loop(*, wom_client, discord_client, group_id: int, channel_id: int, log, debug: bool) -> None:
-    while True:
-        now = datetime.now(timezone.utc)
-        next_run = _next_month_end(now)
-        if debug:
-            log(f"Monthly report scheduled for {next_run.isoformat()}")
-        await asyncio.sleep(max((next_run - now).total_seconds(), 1))
+def monthly_report_job(*, wom_client, discord_client, group_id: int, channel_id: int, log) -> Job:
+    """Scheduler job posting each month's report; a missed month is still posted within a week."""
+
+    async def run(end_date: datetime) -> None:
         messages = await _generate_monthly_report(
-            wom_client=wom_client, group_id=group_id, end_date=next_run, log=log
+            wom_client=wom_client, group_id=group_id, end_date=end_date, log=log
         )
         await _send_report(discord_client, channel_id, messages, log)
 
-
-def start_monthly_reporter(*, wom_client, discord_client, group_id: int, channel_id: int, log, debug: bool = False) -> asyncio.Task:
-    return asyncio.create_task(
-        _monthly_report_loop(
-            wom_client=wom_client,
-            discord_client=discord_client,
-            group_id=group_id,
-            channel_id=channel_id,
-            log=log,
-            debug=debug,
-        )
+    return Job(
+        name="monthly_report",
+        schedule=Schedule(_most_recent_month_end, _next_month_end),
+        run=run,
+        misfire_grace_seconds=7 * 86400,
+        jitter_seconds=REPORT_JITTER_SECONDS,
     )
 
 
@@ -0,0 +1,373 @@
+"""Immutable per-period rollups that the longer reports are composed from.
+
+Every report needs the same inputs: each member's gains in the report metrics
+and the achievements and name changes created in its window. Once a window has
+closed those never change, so the first report that fetches a window stores them
+as a rollup (the ``period_rollups`` tables). A report over a longer range covers
+it with stored rollups, longest first, and asks WOM only for the gaps:
+
+- The weekly report splits its week at the month boundary, so every month (and
+  so every year) is covered exactly by stored pieces.
+- The monthly and yearly reports compose from those pieces, so after a year of
+  weekly reports neither makes a gains or event call. Only the windows they had
+  to fetch themselves are stored as new rollups.
+
+Composed gains are summed per player, which can differ slightly from a single WOM
+range query: WOM measures each piece between the snapshots nearest its own
+boundaries, and players who have left the group keep the gains stored while they
+were members.
+
+A gap whose fetch fails raises :class:`RollupFetchError` rather than yielding a
+partial window, so nothing incomplete is stored or reported.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+import typing as t
+
+from wom import enums
+from wom.models import NameChangeStatus
+from wom.models.players.enums import AchievementMeasure
+
+from utils.database import (
+    format_ts,
+    parse_ts,
+    read_period_rollup_events,
+    read_period_rollup_gains,
+    read_gains_window,
+    read_period_rollups,
+    store_gains_window,
+    store_period_rollup,
+)
+
+from .achievement_retention import persist_fetched_achievements
+
+REPORT_METRICS = (enums.Metric.Overall, enums.Metric.Ehb, enums.Metric.Ehp, enums.Metric.Sailing)
+
+# How long a gains response for a window that has not closed yet is reused.
+OPEN_WINDOW_TTL_SECONDS = 300
+
+# WOM caps the paginated group event endpoints at 50 rows per request.
+_PAGE_SIZE = 50
+
+ACHIEVEMENT = "achievement"
+NAME_CHANGE = "name_change"
+
+
+class RollupFetchError(RuntimeError):
+    """A WOM request for an uncovered window failed."""
+
+
+class RollupPlayer(t.NamedTuple):
+    id: int
+    display_name: str
+
+
+class RollupGain(t.NamedTuple):
+    gained: float
+
+
+class RollupGainsEntry(t.NamedTuple):
+    """Shaped like WOM's group gains entry: ``entry.player.display_name``, ``entry.data.gained``."""
+
+    player: RollupPlayer
+    data: RollupGain
+
+
+class RollupAchievement(t.NamedTuple):
+    player_id: int
+    name: t.Optional[str]
+    metric: t.Any
+    measure: t.Any
+    threshold: t.Any
+    created_at: datetime
+    player: t.Optional[RollupPlayer]
+
+
+class RollupNameChange(t.NamedTuple):
+    player_id: t.Optional[int]
+    old_name: str
+    new_name: str
+    status: t.Any
+    created_at: datetime
+
+
+@dataclass
+class PeriodActivity:
+    """Gains and events for one report window."""
+
+    gains: dict[str, list[RollupGainsEntry]] = field(default_factory=dict)
+    achievements: list[RollupAchievement] = field(default_factory=list)
+    name_changes: list[RollupNameChange] = field(default_factory=list)
+    stored_rollups: int = 0
+    fetched_windows: list[tuple[datetime, datetime]] = field(default_factory=list)
+
+    def gains_for(self, metric: enums.Metric) -> list[RollupGainsEntry]:
+        """Entries with non-zero gains in ``metric``, largest first."""
+        return list(self.gains.get(metric.value, []))
+
+
+def _value(value: t.Any) -> t.Any:
+    return getattr(value, "value", value)
+
+
+def _enum(enum_type, value: t.Any) -> t.Any:
+    try:
+        return enum_type(value)
+    except ValueError:
+        return value
+
+
+def plan_cover(
+    rollups: list[dict], start_date: datetime, end_date: datetime
+) -> tuple[list[int], list[tuple[datetime, datetime]]]:
+    """Cover ``[start_date, end_date)`` with stored rollups; return ``(rollup ids, gaps)`` (pure).
+
+    Walks forward from ``start_date``, each time taking the longest rollup that
+    starts at the cursor. Spans no rollup starts in become gaps.
+    """
+    longest: dict[datetime, tuple[datetime, int]] = {}
+    for rollup in rollups:
+        start, end = parse_ts(rollup["period_start"]), parse_ts(rollup["period_end"])
+        if start < start_date or end > end_date or end <= start:
+            continue
+        if start not in longest or end > longest[start][0]:
+            longest[start] = (end, rollup["id"])
+    starts = sorted(longest)
+
+    ids: list[int] = []
+    gaps: list[tuple[datetime, datetime]] = []
+    cursor = start_date
+    while cursor < end_date:
+        if cursor in longest:
+            end, rollup_id = longest[cursor]
+            ids.append(rollup_id)
+            cursor = end
+            continue
+        gap_end = next((start for start in starts if start > cursor), end_date)
+        gaps.append((cursor, gap_end))
+        cursor = gap_end
+    return ids, gaps
+
+
+def _split(
+    gaps: list[tuple[datetime, datetime]], split_at: t.Iterable[datetime]
+) -> list[tuple[datetime, datetime]]:
+    boundaries = sorted(set(split_at))
+    windows: list[tuple[datetime, datetime]] = []
+    for start, end in gaps:
+        for boundary in boundaries:
+            if start < boundary < end:
+                windows.append((start, boundary))
+                start = boundary
+        windows.append((start, end))
+    return windows
+
+
+async def _fetch_gains(
+    wom_client,
+    group_id: int,
+    metric: enums.Metric,
+    start_date: datetime,
+    end_date: datetime,
+    *,
+    now: t.Optional[datetime] = None,
+) -> list[dict]:
+    """Return ``{player_id, username, gained}`` for every member, through the gains window cache.
+
+    A window that has closed is cached for good; an open one for
+    ``OPEN_WINDOW_TTL_SECONDS``. On a miss, all group gains are fetched in one
+    request: WOM's group-gains endpoint does not support pagination and always
+    returns the full member list. Supplying an offset is ignored by the API, so
+    paginating on ``offset``/``limit`` here never terminates for groups over the
+    page size.
+    """
+    now = now or datetime.now(timezone.utc)
+    key = (group_id, metric.value, format_ts(start_date), format_ts(end_date))
+    cached = read_gains_window(*key, now=format_ts(now))
+    if cached is not None:
+        return cached
+
+    result = await wom_client.groups.get_gains(group_id, metric, start_date=start_date, end_date=end_date)
+    if not result.is_ok:
+        raise RollupFetchError(f"failed to fetch {metric.value} gains: {result.unwrap_err()}")
+    entries = [
+        {"player_id": entry.player.id, "username": entry.player.display_name, "gained": entry.data.gained}
+        for entry in result.unwrap()
+    ]
+    expires_at = None if end_date <= now else format_ts(now + timedelta(seconds=OPEN_WINDOW_TTL_SECONDS))
+    store_gains_window(*key, entries, expires_at=expires_at, now=format_ts(now))
+    return entries
+
+
+async def _fetch_dated_pages(fetch_page, *, start_date: datetime, end_date: datetime, label: str) -> list:
+    """Page a newest-first event endpoint back to ``start_date``."""
+    entries = []
+    offset = 0
+    while True:
+        result = await fetch_page(limit=_PAGE_SIZE, offset=offset)
+        if not result.is_ok:
+            raise RollupFetchError(f"failed to fetch {label}: {result.unwrap_err()}")
+        page = list(result.unwrap())
+        entries.extend(item for item in page if start_date <= item.created_at < end_date)
+        if len(page) < _PAGE_SIZE or page[-1].created_at < start_date:
+            return entries
+        offset += _PAGE_SIZE
+
+
+def _achievement_row(achievement: t.Any, player_name_map: dict[int, str]) -> dict:
+    player_id = achievement.player_id
+    display_name = getattr(getattr(achievement, "player", None), "display_name", None)
+    return {
+        "kind": ACHIEVEMENT,
+        "created_at": format_ts(achievement.created_at),
+        "payload": {
+            "player_id": player_id,
+            "display_name": display_name or player_name_map.get(player_id),
+            "name": getattr(achievement, "name", None),
+            "metric": _value(achievement.metric),
+            "measure": _value(achievement.measure),
+            "threshold": achievement.threshold,
+        },
+    }
+
+
+def _name_change_row(change: t.Any) -> dict:
+    return {
+        "kind": NAME_CHANGE,
+        "created_at": format_ts(change.created_at),
+        "payload": {
+            "player_id": getattr(change, "player_id", None),
+            "old_name": change.old_name,
+            "new_name": change.new_name,
+            "status": _value(change.status),
+        },
+    }
+
+
+def _event_from_row(row: dict) -> t.Union[RollupAchievement, RollupNameChange]:
+    payload = row["payload"]
+    created_at = parse_ts(row["created_at"])
+    if row["kind"] == NAME_CHANGE:
+        return RollupNameChange(
+            player_id=payload.get("player_id"),
+            old_name=payload["old_name"],
+            new_name=payload["new_name"],
+            status=_enum(NameChangeStatus, payload["status"]),
+            created_at=created_at,
+        )
+    display_name = payload.get("display_name")
+    return RollupAchievement(
+        player_id=payload["player_id"],
+        name=payload.get("name"),
+        metric=_enum(enums.Metric, payload["metric"]),
+        measure=_enum(AchievementMeasure, payload["measure"]),
+        threshold=payload["threshold"],
+        created_at=created_at,
+        player=RollupPlayer(payload["player_id"], display_name) if display_name else None,
+    )
+
+
+async def _fetch_windows(
+    wom_client,
+    group_id: int,
+    windows: list[tuple[datetime, datetime]],
+    *,
+    player_name_map: dict[int, str],
+    log,
+    now: datetime,
+) -> list[tuple[datetime, datetime, list[dict], list[dict]]]:
+    """Fetch gains and events for each window; return ``(start, end, gains, events)`` rows."""
+    span_start, span_end = windows[0][0], windows[-1][1]
+    groups = wom_client.groups
+    achievements = await _fetch_dated_pages(
+        lambda **page: groups.get_achievements(group_id, **page),
+        start_date=span_start,
+        end_date=span_end,
+        label="achievements",
+    )
+    name_changes = await _fetch_dated_pages(
+        lambda **page: groups.get_name_changes(group_id, **page),
+        start_date=span_start,
+        end_date=span_end,
+        label="name changes",
+    )
+    in_windows = [item for item in achievements if any(s <= item.created_at < e for s, e in windows)]
+    persist_fetched_achievements(in_windows, group_id=group_id, player_name_map=player_name_map, log=log)
+
+    fetched = []
+    for start, end in windows:
+        gains = []
+        for metric in REPORT_METRICS:
+            rows = await _fetch_gains(wom_client, group_id, metric, start, end, now=now)
+            gains.extend(dict(row, metric=metric.value) for row in rows if row["gained"])
+        events = [_achievement_row(item, player_name_map) for item in achievements if start <= item.created_at < end]
+        events.extend(_name_change_row(item) for item in name_changes if start <= item.created_at < end)
+        fetched.append((start, end, gains, events))
+    return fetched
+
+
+async def collect_period_activity(
+    *,
+    wom_client,
+    group_id: int,
+    start_date: datetime,
+    end_date: datetime,
+    player_name_map: dict[int, str],
+    log,
+    split_at: t.Iterable[datetime] = (),
+    now: t.Optional[datetime] = None,
+) -> PeriodActivity:
+    """Compose ``[start_date, end_date)`` from stored rollups, fetching and storing the gaps.
+
+    Gaps are additionally split at ``split_at`` boundaries before fetching. A
+    fetched window is stored only once it has closed (its end is not after ``now``).
+    """
+    now = now or datetime.now(timezone.utc)
+    stored = read_period_rollups(group_id, format_ts(start_date), format_ts(end_date))
+    rollup_ids, gaps = plan_cover(stored, start_date, end_date)
+    windows = _split(gaps, split_at)
+
+    fetched = []
+    if windows:
+        fetched = await _fetch_windows(
+            wom_client, group_id, windows, player_name_map=player_name_map, log=log, now=now
+        )
+    for start, end, gains, events in fetched:
+        if end <= now:
+            store_period_rollup(group_id, format_ts(start), format_ts(end), gains, events)
+    if fetched or rollup_ids:
+        log(
+            f"Period rollups: {format_ts(start_date)} - {format_ts(end_date)} UTC from "
+            f"{len(rollup_ids)} stored rollups and {len(fetched)} fetched windows."
+        )
+
+    totals: dict[tuple[str, int], list] = {}
+    gain_rows = read_period_rollup_gains(rollup_ids) + [row for window in fetched for row in window[2]]
+    for row in gain_rows:
+        key = (row["metric"], row["player_id"])
+        if key in totals:
+            totals[key][0] += row["gained"]
+            totals[key][1] = row["username"]
+        else:
+            totals[key] = [row["gained"], row["username"]]
+
+    activity = PeriodActivity(stored_rollups=len(rollup_ids), fetched_windows=[(s, e) for s, e, _, _ in fetched])
+    for (metric, player_id), (gained, username) in totals.items():
+        if gained:
+            name = player_name_map.get(player_id, username)
+            activity.gains.setdefault(metric, []).append(
+                RollupGainsEntry(RollupPlayer(player_id, name), RollupGain(gained))
+            )
+    for entries in activity.gains.values():
+        entries.sort(key=lambda entry: entry.data.gained, reverse=True)
+
+    event_rows = read_period_rollup_events(rollup_ids) + [row for window in fetched for row in window[3]]
+    for event in sorted((_event_from_row(row) for row in event_rows), key=lambda item: item.created_at):
+        if isinstance(event, RollupNameChange):
+            activity.name_changes.append(event)
+        else:
+            activity.achievements.append(event)
+    return activity
@@ -2,21 +2,22 @@
 
 from __future__ import annotations
 
-import asyncio
 from datetime import datetime, time, timedelta, timezone
 import typing as t
 
 from wom import enums
 from wom.models.players.enums import AchievementMeasure
 
-from .achievement_retention import (
-    append_milestone_sections,
-    categorize_additional_milestones,
-    persist_fetched_achievements,
-)
+from utils.api_usage import api_caller
+from utils.job_scheduler import Job, Schedule
+
+from .achievement_retention import append_milestone_sections, categorize_additional_milestones
+from .period_rollups import collect_period_activity
 
 _SKILL_METRIC_VALUES = {getattr(metric, "value", metric) for metric in enums.Skills}
 _LEVEL_99_XP = 13_034_431
+# Reports whose boundaries coincide start up to this many seconds apart.
+REPORT_JITTER_SECONDS = 600
 
 
 def _most_recent_sunday_1800_utc(now: datetime) -> datetime:
@@ -114,99 +115,6 @@ async def _get_group_member_map(wom_client, group_id: int, log) -> dict[int, str
     return {membership.player.id: membership.player.display_name for membership in group.memberships}
 
 
-async def _get_group_gains(
-    wom_client,
-    group_id: int,
-    metric: enums.Metric,
-    start_date: datetime,
-    end_date: datetime,
-) -> list:
-    """Fetch all group gains in one request.
-
-    WOM's group-gains endpoint does not support pagination and always returns the
-    full member list. Supplying an offset is ignored by the API, so paginating on
-    ``offset``/``limit`` here never terminates for groups over the page size.
-    """
-    result = await wom_client.groups.get_gains(
-        group_id,
-        metric,
-        start_date=start_date,
-        end_date=end_date,
-    )
-    if not result.is_ok:
-        return []
-
-    return list(result.unwrap())
-
-
-async def _get_group_achievements(
-    wom_client,
-    group_id: int,
-    start_date: datetime,
-    end_date: datetime,
-    log,
-    *,
-    limit: int = 50,
-) -> list:
-    achievements = []
-    offset = 0
-
-    while True:
-        result = await wom_client.groups.get_achievements(group_id, limit=limit, offset=offset)
-        if not result.is_ok:
-            log(f"Weekly report: failed to fetch achievements: {result.unwrap_err()}")
-            break
-
-        page = list(result.unwrap())
-        if not page:
-            break
-
-        for achievement in page:
-            if start_date <= achievement.created_at < end_date:
-                achievements.append(achievement)
-
-        if page[-1].created_at < start_date:
-            break
-
-        offset += limit
-
-    return achievements
-
-
-async def _get_group_name_changes(
-    wom_client,
-    group_id: int,
-    start_date: datetime,
-    end_date: datetime,
-    log,
-    *,
-    limit: int = 50,
-) -> list:
-    changes = []
-    offset = 0
-
-    while True:
-        result = await wom_client.groups.get_name_changes(group_id, limit=limit, offset=offset)
-        if not result.is_ok:
-            log(f"Weekly report: failed to fetch name changes: {result.unwrap_err()}")
-            break
-
-        page = list(result.unwrap())
-        if not page:
-            break
-
-        for change in page:
-            if start_date <= change.created_at < end_date:
-                changes.append(change)
-
-        if page[-1].created_at < start_date:
-            break
-
-        offset += limit
-
-    return changes
-
-
 def _chunk_messages(lines: list[str], limit: int = 2000) -> list[str]:
     chunks: list[str] = []
     current: list[str] = []
@@ -335,6 +243,7 @@ def _build_report_lines(
     return lines
 
 
+@api_caller("reports")
 async def _generate_weekly_report(
     *,
     wom_client,
@@ -345,40 +254,25 @@ async def _generate_weekly_report(
     start_date = end_date - timedelta(days=7)
 
     player_name_map = await _get_group_member_map(wom_client, group_id, log)
-
-    overall_gains = await _get_group_gains(
-        wom_client, group_id, enums.Metric.Overall, start_date, end_date
-    )
-    ehb_gains = await _get_group_gains(
-        wom_client, group_id, enums.Metric.Ehb, start_date, end_date
-    )
-    ehp_gains = await _get_group_gains(
-        wom_client, group_id, enums.Metric.Ehp, start_date, end_date
-    )
-    sailing_gains = await _get_group_gains(
-        wom_client, group_id, enums.Metric.Sailing, start_date, end_date  # type: ignore
-    )
-
-    name_changes = await _get_group_name_changes(
-        wom_client, group_id, start_date, end_date, log, limit=50
-    )
-    raw_achievements = await _get_group_achievements(
-        wom_client, group_id, start_date, end_date, log, limit=50
-    )
-    persist_fetched_achievements(
-        raw_achievements,
+    # Split at the month boundary so stored weeks also cover whole months.
+    month_start = datetime(end_date.year, end_date.month, 1, 18, 0, tzinfo=timezone.utc)
+    activity = await collect_period_activity(
+        wom_client=wom_client,
         group_id=group_id,
+        start_date=start_date,
+        end_date=end_date,
         player_name_map=player_name_map,
         log=log,
+        split_at=[month_start],
     )
-    milestone_categories = categorize_additional_milestones(raw_achievements)
-    for category in milestone_categories.values():
-        category.sort(key=lambda item: item.created_at)
 
-    overall_gains.sort(key=lambda entry: entry.data.gained, reverse=True)
-    ehb_gains.sort(key=lambda entry: entry.data.gained, reverse=True)
-    ehp_gains.sort(key=lambda entry: entry.data.gained, reverse=True)
-    sailing_gains.sort(key=lambda entry: entry.data.gained, reverse=True)
+    overall_gains = activity.gains_for(enums.Metric.Overall)
+    ehb_gains = activity.gains_for(enums.Metric.Ehb)
+    ehp_gains = activity.gains_for(enums.Metric.Ehp)
+    sailing_gains = activity.gains_for(enums.Metric.Sailing)
+    name_changes = activity.name_changes
+    raw_achievements = activity.achievements
+    milestone_categories = categorize_additional_milestones(raw_achievements)
 
     overall_top = None
     if overall_gains:
@@ -413,9 +307,6 @@ async def _generate_weekly_report(
             )
         )
     ]
-    achievements.sort(key=lambda item: item.created_at)
-
-    name_changes.sort(key=lambda item: item.created_at)
 
     lines = _build_report_lines(
         start_date=start_date,
@@ -449,50 +340,34 @@ async def _send_report(discord_client, channel_id: int, messages: list[str], log
         await channel.send(message)  # pyright: ignore[reportAttributeAccessIssue]
 
 
-async def _weekly_report_loop(
+def weekly_report_job(
     *,
     wom_client,
     discord_client,
     group_id: int,
     channel_id: int,
     log,
-    debug: bool,
-) -> None:
-    while True:
-        now = datetime.now(timezone.utc)
-        next_run = _next_sunday_1800_utc(now)
-        sleep_seconds = max((next_run - now).total_seconds(), 1)
-        if debug:
-            log(f"Weekly report scheduled for {next_run.isoformat()}")
-        await asyncio.sleep(sleep_seconds)
+) -> Job:
+    """Scheduler job posting the report for each week ending Sunday 18:00 UTC.
 
+    A week missed while the bot was down is still posted within three days.
+    """
+
+    async def run(end_date: datetime) -> None:
         report_messages = await _generate_weekly_report(
             wom_client=wom_client,
             group_id=group_id,
-            end_date=next_run,
+            end_date=end_date,
             log=log,
         )
         await _send_report(discord_client, channel_id, report_messages, log)
 
-
-def start_weekly_reporter(
-    *,
-    wom_client,
-    discord_client,
-    group_id: int,
-    channel_id: int,
-    log,
-    debug: bool = False,
-) -> asyncio.Task:
-    return asyncio.create_task(
-        _weekly_report_loop(
-            wom_client=wom_client,
-            discord_client=discord_client,
-            group_id=group_id,
-            channel_id=channel_id,
-            log=log,
-            debug=debug,
-        )
+    return Job(
+        name="weekly_report",
+        schedule=Schedule(_most_recent_sunday_1800_utc, _next_sunday_1800_utc),
+        run=run,
+        misfire_grace_seconds=3 * 86400,
+        jitter_seconds=REPORT_JITTER_SECONDS,
     )
 
 
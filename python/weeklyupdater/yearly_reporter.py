@@ -2,20 +2,19 @@
 
 from __future__ import annotations
 
-import asyncio
 from datetime import datetime, timezone
 import typing as t
 
 from wom import enums
 from wom.models.players.enums import AchievementMeasure
 
-from .achievement_retention import (
-    append_milestone_sections,
-    categorize_additional_milestones,
-    persist_fetched_achievements,
-)
+from utils.api_usage import api_caller
+from utils.job_scheduler import Job, Schedule
+
+from .achievement_retention import append_milestone_sections, categorize_additional_milestones
+from .period_rollups import collect_period_activity
+from .weekly_reporter import REPORT_JITTER_SECONDS
 
-RATE_LIMIT_DELAY_SECONDS = 1.5
 _SKILL_METRIC_VALUES = {getattr(metric, "value", metric) for metric in enums.Skills}
 _LEVEL_99_XP = 13_034_431
 
@@ -108,100 +107,6 @@ async def _get_group_member_map(wom_client, group_id: int, log) -> dict[int, str
     return {membership.player.id: membership.player.display_name for membership in group.memberships}
 
 
-async def _get_group_gains(
-    wom_client,
-    group_id: int,
-    metric: enums.Metric,
-    start_date: datetime,
-    end_date: datetime,
-    *,
-    limit: int = 50,
-) -> list:
-    result = await wom_client.groups.get_gains(
-        group_id,
-        metric,
-        start_date=start_date,
-        end_date=end_date,
-        limit=limit,
-        offset=0,
-    )
-
-    if not result.is_ok:
-        return []
-
-    return list(result.unwrap())
-
-
-async def _get_group_achievements(
-    wom_client,
-    group_id: int,
-    start_date: datetime,
-    end_date: datetime,
-    log,
-    *,
-    limit: int = 50,
-) -> list:
-    achievements = []
-    offset = 0
-
-    while True:
-        result = await wom_client.groups.get_achievements(group_id, limit=limit, offset=offset)
-        if not result.is_ok:
-            log(f"Yearly report: failed to fetch achievements: {result.unwrap_err()}")
-            break
-
-        page = list(result.unwrap())
-        if not page:
-            break
-
-        for achievement in page:
-            if start_date <= achievement.created_at < end_date:
-                achievements.append(achievement)
-
-        if page[-1].created_at < start_date:
-            break
-
-        offset += limit
-        await asyncio.sleep(RATE_LIMIT_DELAY_SECONDS)
-
-    return achievements
-
-
-async def _get_group_name_changes(
-    wom_client,
-    group_id: int,
-    start_date: datetime,
-    end_date: datetime,
-    log,
-    *,
-    limit: int = 50,
-) -> list:
-    changes = []
-    offset = 0
-
-    while True:
-        result = await wom_client.groups.get_name_changes(group_id, limit=limit, offset=offset)
-        if not result.is_ok:
-            log(f"Yearly report: failed to fetch name changes: {result.unwrap_err()}")
-            break
-
-        page = list(result.unwrap())
-        if not page:
-            break
-
-        for change in page:
-            if start_date <= change.created_at < end_date:
-                changes.append(change)
-
-        if page[-1].created_at < start_date:
-            break
-
-        offset += limit
-        await asyncio.sleep(RATE_LIMIT_DELAY_SECONDS)
-
-    return changes
-
-
 async def _get_group_statistics(wom_client, group_id: int, log):
     result = await wom_client.groups.get_statistics(group_id)
     if not result.is_ok:
@@ -391,6 +296,7 @@ def _build_report_lines(
     return lines
 
 
+@api_caller("reports")
 async def _generate_yearly_report(
     *,
     wom_client,
@@ -402,44 +308,23 @@ async def _generate_yearly_report(
 
     player_name_map = await _get_group_member_map(wom_client, group_id, log)
 
-    overall_gains = await _get_group_gains(
-        wom_client, group_id, enums.Metric.Overall, start_date, end_date, limit=50
-    )
-    await asyncio.sleep(RATE_LIMIT_DELAY_SECONDS)
-    ehb_gains = await _get_group_gains(
-        wom_client, group_id, enums.Metric.Ehb, start_date, end_date, limit=50
-    )
-    await asyncio.sleep(RATE_LIMIT_DELAY_SECONDS)
-    ehp_gains = await _get_group_gains(
-        wom_client, group_id, enums.Metric.Ehp, start_date, end_date, limit=50
-    )
-    await asyncio.sleep(RATE_LIMIT_DELAY_SECONDS)
-    sailing_gains = await _get_group_gains(
-        wom_client, group_id, enums.Metric.Sailing, start_date, end_date, limit=50
-    )
-    await asyncio.sleep(RATE_LIMIT_DELAY_SECONDS)
-
-    name_changes = await _get_group_name_changes(
-        wom_client, group_id, start_date, end_date, log, limit=50
-    )
-    await asyncio.sleep(RATE_LIMIT_DELAY_SECONDS)
-    achievements = await _get_group_achievements(
-        wom_client, group_id, start_date, end_date, log, limit=50
-    )
-    persist_fetched_achievements(
-        achievements,
+    activity = await collect_period_activity(
+        wom_client=wom_client,
         group_id=group_id,
+        start_date=start_date,
+        end_date=end_date,
         player_name_map=player_name_map,
         log=log,
     )
-    milestone_categories = categorize_additional_milestones(achievements)
-    await asyncio.sleep(RATE_LIMIT_DELAY_SECONDS)
     group_stats = await _get_group_statistics(wom_client, group_id, log)
 
-    overall_gains.sort(key=lambda entry: entry.data.gained, reverse=True)
-    ehb_gains.sort(key=lambda entry: entry.data.gained, reverse=True)
-    ehp_gains.sort(key=lambda entry: entry.data.gained, reverse=True)
-    sailing_gains.sort(key=lambda entry: entry.data.gained, reverse=True)
+    overall_gains = activity.gains_for(enums.Metric.Overall)
+    ehb_gains = activity.gains_for(enums.Metric.Ehb)
+    ehp_gains = activity.gains_for(enums.Metric.Ehp)
+    sailing_gains = activity.gains_for(enums.Metric.Sailing)
+    name_changes = activity.name_changes
+    achievements = activity.achievements
+    milestone_categories = categorize_additional_milestones(achievements)
 
     achievements_99s = [
         achievement
@@ -453,7 +338,6 @@ async def _generate_yearly_report(
             )
         )
     ]
-    achievements_99s.sort(key=lambda item: item.created_at)
 
     achievements_max_total = [
         achievement
@@ -462,7 +346,6 @@ async def _generate_yearly_report(
         and achievement.metric == enums.Metric.Overall
         and _matches_threshold(achievement.threshold, 2376)
     ]
-    achievements_max_total.sort(key=lambda item: item.created_at)
     milestone_categories["level"] = [
         achievement
         for achievement in milestone_categories["level"]
@@ -471,10 +354,6 @@ async def _generate_yearly_report(
             and _matches_threshold(achievement.threshold, 2376)
         )
     ]
-    for category in milestone_categories.values():
-        category.sort(key=lambda item: item.created_at)
-
-    name_changes.sort(key=lambda item: item.created_at)
 
     if achievements and not achievements_99s:
         sample_lines = []
@@ -516,50 +395,31 @@ async def _send_report(discord_client, channel_id: int, messages: list[str], log
         await channel.send(message)  # pyright: ignore[reportAttributeAccessIssue]
 
 
-async def _yearly_report_loop(
+def yearly_report_job(
     *,
     wom_client,
     discord_client,
     group_id: int,
     channel_id: int,
     log,
-    debug: bool,
-) -> None:
-    while True:
-        now = datetime.now(timezone.utc)
-        next_run = _next_jan1_1800_utc(now)
-        sleep_seconds = max((next_run - now).total_seconds(), 1)
-        if debug:
-            log(f"Yearly report scheduled for {next_run.isoformat()}")
-        await asyncio.sleep(sleep_seconds)
+) -> Job:
+    """Scheduler job posting each year's report; a missed year is still posted within two weeks."""
 
+    async def run(end_date: datetime) -> None:
         report_messages = await _generate_yearly_report(
             wom_client=wom_client,
             group_id=group_id,
-            end_date=next_run,
+            end_date=end_date,
             log=log,
         )
         await _send_report(discord_client, channel_id, report_messages, log)
 
-
-def start_yearly_reporter(
-    *,
-    wom_client,
-    discord_client,
-    group_id: int,
-    channel_id: int,
-    log,
-    debug: bool = False,
-) -> asyncio.Task:
-    return asyncio.create_task(
-        _yearly_report_loop(
-            wom_client=wom_client,
-            discord_client=discord_client,
-            group_id=group_id,
-            channel_id=channel_id,
-            log=log,
-            debug=debug,
-        )
+    return Job(
+        name="yearly_report",
+        schedule=Schedule(_most_recent_jan1_1800_utc, _next_jan1_1800_utc),
+        run=run,
+        misfire_grace_seconds=14 * 86400,
+        jitter_seconds=REPORT_JITTER_SECONDS,
     )
 
 
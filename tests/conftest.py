@@ -57,12 +57,19 @@ class FakeResult:
         return self._e
 
 
+# Default player IDs: one per display name, above the small explicit IDs tests
+# pass, so history keyed by player ID never merges two test players.
+_DEFAULT_PLAYER_IDS = {}
+
+
 def make_player(display_name, *, ehb=0.0, ehp=0.0, player_id=None, status="active",
                 last_changed_at=None, updated_at=None):
     """Build a SimpleNamespace matching the fields WOM's Player exposes."""
+    if player_id is None:
+        player_id = _DEFAULT_PLAYER_IDS.setdefault(display_name, 100000 + len(_DEFAULT_PLAYER_IDS))
     return types.SimpleNamespace(
         display_name=display_name,
-        id=player_id if player_id is not None else abs(hash(display_name)) % 100000,
+        id=player_id,
         ehb=ehb,
         ehp=ehp,
         status=status,
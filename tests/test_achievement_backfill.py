@@ -0,0 +1,159 @@
+"""Tests for the resumable achievement backfill (weeklyupdater.achievement_backfill)."""
+
+import asyncio
+import types
+from contextlib import closing
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from wom import enums
+
+from python.utils import database
+from python.weeklyupdater import achievement_backfill
+from python.weeklyupdater.achievement_backfill import (
+    backfill_achievements_once,
+    describe_backfill,
+    parse_window_bound,
+    request_backfill,
+)
+from tests.conftest import FakeResult, make_player
+
+START = datetime(2025, 1, 1, tzinfo=timezone.utc)
+END = datetime(2025, 2, 1, tzinfo=timezone.utc)
+ALICE = make_player("Alice", player_id=1)
+
+
+class _Usage:
+    def __init__(self, *, recent=0, breaker_open=False):
+        self.recent = recent
+        self.breaker_open = breaker_open
+        self.rate_limit_per_minute = 100
+
+    def has_headroom(self, fraction=0.5):
+        return not self.breaker_open and self.recent < self.rate_limit_per_minute * fraction
+
+
+class _Groups:
+    """Newest-first group achievements, one per day counting back from ``newest``."""
+
+    def __init__(self, count, *, newest=END + timedelta(days=60)):
+        self.achievements = [
+            types.SimpleNamespace(
+                player_id=ALICE.id,
+                player=ALICE,
+                name=f"{index} Agility",
+                metric=enums.Metric.Agility,
+                measure=types.SimpleNamespace(value="levels"),
+                threshold=index,
+                created_at=newest - timedelta(days=index),
+            )
+            for index in range(count)
+        ]
+        self.offsets = []
+        self.fail_at = None
+
+    async def get_achievements(self, group_id, *, limit, offset):
+        self.offsets.append(offset)
+        if offset == self.fail_at:
+            return FakeResult(err="WOM unavailable")
+        return FakeResult(value=self.achievements[offset: offset + limit])
+
+
+def _run(groups, max_pages=10, usage=None):
+    return asyncio.run(
+        backfill_achievements_once(
+            wom_client=types.SimpleNamespace(groups=groups),
+            group_id=7,
+            max_pages=max_pages,
+            usage=usage or _Usage(),
+        )
+    )
+
+
+def _stored():
+    with closing(database.connect_db(database.init_database())) as conn:
+        return conn.execute("SELECT COUNT(*) FROM achievements").fetchone()[0]
+
+
+def test_nothing_requested_makes_no_calls():
+    groups = _Groups(10)
+
+    assert _run(groups) == {"pages": 0, "matched": 0, "inserted": 0, "status": None}
+    assert groups.offsets == []
+
+
+def test_backfill_resumes_from_checkpoint_and_stops_past_window():
+    groups = _Groups(120)
+    request_backfill(START, END)
+
+    first = _run(groups, max_pages=1)
+    assert first["status"] == "running" and first["matched"] == 0
+    assert database.read_achievement_backfill()["next_offset"] == 50
+
+    second = _run(groups)
+
+    assert groups.offsets == [0, 50]
+    assert second["status"] == "completed"
+    assert second["matched"] == second["inserted"] == 31
+    assert _stored() == 31
+    checkpoint = database.read_achievement_backfill()
+    assert checkpoint["pages"] == 2 and checkpoint["completed_at"] is not None
+    assert _run(groups)["pages"] == 0
+
+
+def test_failed_page_is_recorded_and_retried_from_same_offset():
+    groups = _Groups(120)
+    groups.fail_at = 50
+    request_backfill(START, END)
+
+    with pytest.raises(RuntimeError):
+        _run(groups)
+    checkpoint = database.read_achievement_backfill()
+    assert checkpoint["next_offset"] == 50
+    assert "WOM unavailable" in checkpoint["last_error"]
+    assert "Last error" in describe_backfill(checkpoint)
+
+    groups.fail_at = None
+    assert _run(groups)["status"] == "completed"
+    assert groups.offsets == [0, 50, 50]
+    assert database.read_achievement_backfill()["last_error"] is None
+
+
+@pytest.mark.parametrize("usage", [_Usage(recent=50), _Usage(breaker_open=True)])
+def test_backfill_waits_without_headroom(usage):
+    groups = _Groups(120)
+    request_backfill(START, END)
+
+    assert _run(groups, usage=usage)["pages"] == 0
+    assert groups.offsets == []
+
+
+def test_cancel_and_new_request_reset_the_walk():
+    groups = _Groups(120)
+    request_backfill(START, END)
+    _run(groups, max_pages=1)
+
+    assert database.cancel_achievement_backfill() is True
+    assert _run(groups)["status"] == "cancelled"
+    assert database.cancel_achievement_backfill() is False
+
+    request_backfill(START, END + timedelta(days=5))
+    assert database.read_achievement_backfill()["next_offset"] == 0
+
+
+def test_window_must_be_ordered_and_parseable():
+    with pytest.raises(ValueError):
+        request_backfill(END, START)
+    with pytest.raises(ValueError):
+        parse_window_bound("January")
+    assert parse_window_bound("2025-01-01 12:00:00") == START + timedelta(hours=12)
+
+
+def test_job_is_a_low_priority_interval_job():
+    job = achievement_backfill.achievement_backfill_job(
+        wom_client=None, group_id=7, interval_seconds=5, pages_per_run=2, log=print
+    )
+
+    assert job.name == "achievement_backfill"
+    assert job.schedule.seconds == 60
+    assert job.run_on_first_start
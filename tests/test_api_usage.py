@@ -2,6 +2,7 @@
 
 import asyncio
 
+import aiohttp
 import pytest
 
 from python.utils import api_usage
@@ -98,6 +99,23 @@ def test_tracker_closes_after_cooldown(monkeypatch):
     assert tracker.breaker_status()["open"] is False
 
 
+def test_tracker_headroom_tracks_window_usage_and_breaker(monkeypatch):
+    tracker, now = _make_tracker(monkeypatch, rate_limit=4, cooldown=300)
+    tracker.before_request("GET", "groups/{id}")
+    assert tracker.has_headroom()
+    tracker.before_request("GET", "groups/{id}")
+    assert not tracker.has_headroom()
+    assert tracker.has_headroom(fraction=1.0)
+
+    tracker.before_request("GET", "groups/{id}")
+    tracker.before_request("GET", "groups/{id}")
+    with pytest.raises(api_usage.ApiCircuitOpenError):
+        tracker.before_request("GET", "groups/{id}")
+    now["t"] += 61
+    assert tracker.breaker_status()["open"] is True
+    assert not tracker.has_headroom(fraction=1.0)
+
+
 def test_tracker_rolling_window_drops_old_calls(monkeypatch):
     tracker, now = _make_tracker(monkeypatch, rate_limit=3)
     tracker.before_request("GET", "groups/{id}")
@@ -122,8 +140,13 @@ class _FakeRequest:
 
 
 class _FakeResponse:
-    def __init__(self, status):
+    def __init__(self, status, headers=None):
         self.status = status
+        self.headers = headers or {}
+        self.released = False
+
+    def release(self):
+        self.released = True
 
 
 def test_middleware_records_successful_call(monkeypatch):
@@ -171,10 +194,8 @@ def test_middleware_records_error_and_reraises(monkeypatch):
 
 
 def test_middleware_blocks_when_breaker_open(monkeypatch):
-    monkeypatch.setattr(
-        api_usage, "tracker",
-        api_usage.ApiUsageTracker(rate_limit_per_minute=1, cooldown_seconds=60, log=lambda m: None),
-    )
+    tracker = api_usage.ApiUsageTracker(rate_limit_per_minute=1, cooldown_seconds=60, log=lambda m: None)
+    monkeypatch.setattr(api_usage, "tracker", tracker)
     request = _FakeRequest("GET", "https://api.wiseoldman.net/v2/groups/2300")
 
     calls = []
@@ -184,12 +205,228 @@ def test_middleware_blocks_when_breaker_open(monkeypatch):
         return _FakeResponse(200)
 
     run(api_usage._tracking_middleware(request, handler))
+    # Something bypassing the scheduler runs away and trips the breaker.
+    with pytest.raises(api_usage.ApiCircuitOpenError):
+        tracker.before_request("GET", "groups/2300")
     with pytest.raises(api_usage.ApiCircuitOpenError):
         run(api_usage._tracking_middleware(request, handler))
 
     assert calls == [1]  # the blocked call never reached the network
 
 
+# ---------------------------------------------------------------------------
+# acquire — per-caller scheduling
+# ---------------------------------------------------------------------------
+
+
+async def _settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_full_window_queues_calls_and_admits_rank_check_first(monkeypatch):
+    tracker, now = _make_tracker(monkeypatch, rate_limit=4)
+    admitted = []
+
+    async def call(caller):
+        await tracker.acquire("GET", "groups/1", caller=caller)
+        admitted.append(caller)
+
+    async def scenario():
+        for _ in range(4):
+            tracker.before_request("GET", "groups/1")
+        tasks = [asyncio.ensure_future(call("reports")), asyncio.ensure_future(call("rank_check"))]
+        await _settle()
+        queued = tracker.queued_calls()
+        now["t"] += 61
+        tracker._notify()
+        await asyncio.gather(*tasks)
+        return queued
+
+    queued = run(scenario())
+    assert queued == {"reports": 1, "rank_check": 1}
+    assert admitted == ["rank_check", "reports"]
+    assert tracker.breaker_status()["open"] is False
+
+
+def test_caller_bucket_paces_bursts(monkeypatch):
+    tracker, now = _make_tracker(monkeypatch, rate_limit=60)
+    admitted = []
+
+    async def call():
+        with api_usage.api_caller("diagnostics"):
+            await tracker.acquire("GET", "groups/1")
+        admitted.append(now["t"])
+
+    async def scenario():
+        # Diagnostics get 15 calls/min with a burst of 3.
+        tasks = [asyncio.ensure_future(call()) for _ in range(4)]
+        await _settle()
+        burst = len(admitted)
+        now["t"] += 1
+        tracker._notify()
+        await asyncio.gather(*tasks)
+        return burst
+
+    assert run(scenario()) == 3
+    assert admitted == [1000.0, 1000.0, 1000.0, 1001.0]
+
+
+def test_full_caller_queue_sheds_only_that_callers_calls(monkeypatch):
+    tracker, now = _make_tracker(monkeypatch, rate_limit=4)
+    admitted = []
+
+    async def call(caller):
+        await tracker.acquire("GET", "groups/1", caller=caller)
+        admitted.append(caller)
+
+    async def scenario():
+        for _ in range(4):
+            tracker.before_request("GET", "groups/1")
+        # Reports may queue a minute of their share: 2 calls.
+        reports = [asyncio.ensure_future(call("reports")) for _ in range(2)]
+        await _settle()
+        with pytest.raises(api_usage.ApiCallShedError):
+            await tracker.acquire("GET", "groups/1", caller="reports")
+        rank_check = asyncio.ensure_future(call("rank_check"))
+        await _settle()
+        queued = tracker.queued_calls()
+        now["t"] += 61
+        tracker._notify()
+        await rank_check
+        for task in reports:
+            task.cancel()
+        await asyncio.gather(*reports, return_exceptions=True)
+        return queued
+
+    assert run(scenario()) == {"reports": 2, "rank_check": 1}
+    assert admitted[0] == "rank_check"
+    assert tracker.breaker_status()["open"] is False
+
+
+def test_sustained_bucket_saturation_trips_breaker(monkeypatch):
+    tracker, now = _make_tracker(monkeypatch, rate_limit=60)
+    tracker.runaway_seconds = 10
+
+    async def paced_call():
+        # Diagnostics refill one token every 4 seconds.
+        task = asyncio.ensure_future(tracker.acquire("GET", "groups/1", caller="diagnostics"))
+        await _settle()
+        now["t"] += 4
+        tracker._notify()
+        await task
+
+    async def scenario():
+        for _ in range(3):
+            await tracker.acquire("GET", "groups/1", caller="diagnostics")
+        await paced_call()
+        # A pause long enough to refill the bucket is not a runaway.
+        now["t"] += 60
+        for _ in range(3):
+            await tracker.acquire("GET", "groups/1", caller="diagnostics")
+        assert "diagnostics" not in tracker._saturated_since
+        for _ in range(3):
+            await paced_call()
+        with pytest.raises(api_usage.ApiCircuitOpenError):
+            await tracker.acquire("GET", "groups/1", caller="diagnostics")
+
+    run(scenario())
+    assert tracker.breaker_status()["open"] is True
+
+
+def test_api_caller_tags_coroutines_and_rejects_unknown_names():
+    @api_usage.api_caller("gains")
+    async def tagged():
+        return api_usage.current_caller()
+
+    assert run(tagged()) == "gains"
+    assert api_usage.current_caller() == api_usage.DEFAULT_CALLER
+    with pytest.raises(ValueError):
+        api_usage.api_caller("everything")
+
+
+# ---------------------------------------------------------------------------
+# _retry_middleware — backoff and Retry-After
+# ---------------------------------------------------------------------------
+
+_FAST_RETRY = api_usage.RetryPolicy(attempts=3, base_delay=0.001, max_delay=0.002, deadline_seconds=5)
+
+
+def _scripted_handler(outcomes):
+    calls = []
+
+    async def handler(_req):
+        calls.append(1)
+        outcome = outcomes[len(calls) - 1]
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    return handler, calls
+
+
+def test_parse_retry_after_accepts_seconds_and_http_dates():
+    from datetime import datetime, timezone
+
+    now = datetime(2026, 1, 1, 12, 0, 0, tzinfo=timezone.utc)
+    assert api_usage.parse_retry_after("7") == 7.0
+    assert api_usage.parse_retry_after("Thu, 01 Jan 2026 12:00:30 GMT", now=now) == 30.0
+    assert api_usage.parse_retry_after("Thu, 01 Jan 2026 11:00:00 GMT", now=now) == 0.0
+    assert api_usage.parse_retry_after("soon") is None
+    assert api_usage.parse_retry_after(None) is None
+
+
+def test_backoff_delay_is_jittered_capped_and_honours_retry_after():
+    policy = api_usage.RetryPolicy(base_delay=1, max_delay=4)
+    assert all(0 <= api_usage.backoff_delay(policy, 5) <= 4 for _ in range(50))
+    assert api_usage.backoff_delay(policy, 1, retry_after=10) >= 10
+
+
+def test_retry_middleware_retries_server_errors_until_success():
+    first = _FakeResponse(503)
+    handler, calls = _scripted_handler([first, _FakeResponse(200)])
+    middleware = api_usage._retry_middleware(_FAST_RETRY)
+
+    response = run(middleware(_FakeRequest("GET", "https://api.wiseoldman.net/v2/groups/1"), handler))
+
+    assert response.status == 200
+    assert len(calls) == 2
+    assert first.released
+
+
+def test_retry_middleware_gives_up_after_attempts_and_on_connection_errors():
+    middleware = api_usage._retry_middleware(_FAST_RETRY)
+    handler, calls = _scripted_handler([_FakeResponse(502)] * 3)
+    assert run(middleware(_FakeRequest("GET", "https://x/v2/groups/1"), handler)).status == 502
+    assert len(calls) == 3
+
+    handler, calls = _scripted_handler([aiohttp.ServerDisconnectedError()] * 3)
+    with pytest.raises(aiohttp.ServerDisconnectedError):
+        run(middleware(_FakeRequest("GET", "https://x/v2/groups/1"), handler))
+    assert len(calls) == 3
+
+
+def test_retry_middleware_only_retries_rate_limits_for_posts():
+    middleware = api_usage._retry_middleware(_FAST_RETRY)
+    handler, calls = _scripted_handler([_FakeResponse(503)])
+    assert run(middleware(_FakeRequest("POST", "https://x/v2/groups/1/update-all"), handler)).status == 503
+    assert len(calls) == 1
+
+    handler, calls = _scripted_handler([_FakeResponse(429), _FakeResponse(200)])
+    assert run(middleware(_FakeRequest("POST", "https://x/v2/groups/1/update-all"), handler)).status == 200
+    assert len(calls) == 2
+
+
+def test_retry_middleware_returns_response_when_retry_after_exceeds_deadline():
+    middleware = api_usage._retry_middleware(_FAST_RETRY)
+    handler, calls = _scripted_handler([_FakeResponse(429, {"Retry-After": "60"})])
+
+    response = run(middleware(_FakeRequest("GET", "https://x/v2/groups/1"), handler))
+
+    assert response.status == 429 and not response.released
+    assert len(calls) == 1
+
+
 # ---------------------------------------------------------------------------
 # create_tracked_session — wiring
 # ---------------------------------------------------------------------------
@@ -204,6 +441,7 @@ def test_create_tracked_session_attaches_tracking_middleware():
         try:
             assert api_usage._tracking_middleware in session._middlewares
             assert _noop_middleware in session._middlewares
+            assert len(session._middlewares) == 3
         finally:
             await session.close()
 
@@ -0,0 +1,92 @@
+"""Tests for the budgeted boss kill-count collector — Feature 1."""
+
+import asyncio
+from datetime import datetime, timezone
+
+from python.bosstracker import boss_collector
+from python.utils import database
+from tests.conftest import make_hiscores_entry, make_player
+
+
+NOW = datetime(2025, 1, 8, 0, 0, tzinfo=timezone.utc)
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def _log(_msg):
+    pass
+
+
+class FakeUsage:
+    rate_limit_per_minute = 30
+
+    def __init__(self, recent=0, open_=False):
+        self.recent = recent
+        self.open = open_
+
+    def has_headroom(self, fraction=0.5):
+        return not self.open and self.recent < self.rate_limit_per_minute * fraction
+
+
+def _board(*kills):
+    return [
+        make_hiscores_entry(make_player(f"p{i}", player_id=i + 1), kills=count, rank=i + 1)
+        for i, count in enumerate(kills)
+    ]
+
+
+def _collector(client, bosses, *, requests_per_hour=12, usage=None):
+    return boss_collector.BossCollector(
+        wom_client=client, group_id=1, bosses=bosses, requests_per_hour=requests_per_hour,
+        interval_seconds=900, log=_log, usage=usage or FakeUsage(),
+    )
+
+
+def test_resolve_boss_rejects_non_boss_metrics():
+    assert boss_collector.resolve_boss("zulrah") is not None
+    assert boss_collector.resolve_boss("overall") is None
+
+
+def test_collect_once_rotates_within_budget(fake_wom_client):
+    client = fake_wom_client(hiscores={"zulrah": _board(5), "vorkath": _board(3), "scorpia": _board(1)})
+    collector = _collector(client, ["zulrah", "vorkath", "scorpia"], requests_per_hour=8)  # 2 per tick
+
+    first = run(collector.collect_once(NOW))
+    second = run(collector.collect_once(NOW))
+
+    assert first["collected"] == ["zulrah", "vorkath"] and first["requests"] == 2
+    assert second["collected"] == ["scorpia", "zulrah"]
+    assert database.get_boss_leaderboard("vorkath")[0]["kills"] == 3
+
+
+def test_collect_once_skips_unchanged_leaderboards(fake_wom_client):
+    client = fake_wom_client(hiscores={"zulrah": _board(5, 2, 0)})
+    collector = _collector(client, ["zulrah"])
+
+    assert run(collector.collect_once(NOW))["written"] == ["zulrah"]
+    assert run(collector.collect_once(NOW))["written"] == []
+    # A fresh collector compares against the stored snapshot too.
+    assert run(_collector(client, ["zulrah"]).collect_once(NOW))["written"] == []
+    assert [row["username"] for row in database.get_boss_leaderboard("zulrah")] == ["p0", "p1"]
+
+
+def test_collect_once_pages_large_groups(fake_wom_client):
+    client = fake_wom_client(hiscores={"zulrah": _board(*range(120, 0, -1))})
+    collector = _collector(client, ["zulrah"], requests_per_hour=4)  # 1 per tick
+
+    report = run(collector.collect_once(NOW))
+
+    assert report["requests"] == 3
+    assert len(database.get_boss_leaderboard("zulrah")) == 120
+
+
+def test_collect_once_stops_without_rate_headroom(fake_wom_client):
+    client = fake_wom_client(hiscores={"zulrah": _board(5)})
+    collector = _collector(client, ["zulrah"], usage=FakeUsage(recent=15))
+
+    report = run(collector.collect_once(NOW))
+
+    assert report == {"collected": [], "written": [], "requests": 0}
+    assert client.groups.calls == []
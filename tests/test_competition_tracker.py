@@ -0,0 +1,258 @@
+"""Tests for group competition tracking (competitiontracker)."""
+
+import asyncio
+import json
+import types
+from contextlib import closing
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from python.competitiontracker import competition_tracker
+from python.competitiontracker.competition_tracker import (
+    CompetitionTracker,
+    StandingEntry,
+    StandingPlayer,
+    StandingProgress,
+    find_overtakes,
+    next_poll_at,
+    rank_standings,
+)
+from python.utils import database
+
+NOW = datetime(2025, 6, 10, 12, 0, tzinfo=timezone.utc)
+HOUR = timedelta(hours=1)
+
+
+class _Usage:
+    def __init__(self, *, recent=0):
+        self.recent = recent
+        self.rate_limit_per_minute = 100
+
+    def has_headroom(self, fraction=0.5):
+        return self.recent < self.rate_limit_per_minute * fraction
+
+
+class _Response:
+    def __init__(self, status, body=b"", etag=None):
+        self.status = status
+        self.body = body
+        self.headers = {"ETag": etag} if etag else {}
+
+    async def read(self):
+        return self.body
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *_exc):
+        return False
+
+
+class _FakeWom:
+    """Serves JSON per path with an ETag and answers a matching ``If-None-Match`` with 304."""
+
+    def __init__(self):
+        self.documents = {}
+        self.requests = []
+        self._http = types.SimpleNamespace(
+            _headers={"User-Agent": "test"}, _base_url="https://wom.test/v2", _session=self
+        )
+
+    def serve(self, path, document):
+        self.documents[path] = json.dumps(document).encode()
+
+    def get(self, url, *, headers, params):
+        path = url.removeprefix("https://wom.test/v2")
+        self.requests.append((path, headers.get("If-None-Match")))
+        body = self.documents.get(path)
+        if body is None:
+            return _Response(404, b'{"message": "Competition not found."}')
+        etag = f'W/"{hash(body) & 0xFFFF:x}"'
+        if headers.get("If-None-Match") == etag:
+            return _Response(304)
+        return _Response(200, body, etag)
+
+
+def _iso(value):
+    return value.strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+
+def _competition(competition_id, starts_at, ends_at, title="Boss week", metric="ehb"):
+    return {
+        "id": competition_id, "title": title, "metric": metric, "type": "classic",
+        "startsAt": _iso(starts_at), "endsAt": _iso(ends_at), "groupId": 7, "score": 0,
+        "participantCount": 3, "createdAt": _iso(starts_at), "updatedAt": _iso(starts_at),
+    }
+
+
+def _details(competition_id, gains):
+    return {
+        "id": competition_id,
+        "title": "Boss week",
+        "participations": [
+            {
+                "playerId": player_id, "competitionId": competition_id, "teamName": None,
+                "player": {"id": player_id, "displayName": name, "type": "regular"},
+                "progress": {"start": 0, "end": gained, "gained": gained},
+                "levels": {"start": 0, "end": 0, "gained": 0},
+            }
+            for player_id, (name, gained) in enumerate(gains, start=1)
+        ],
+    }
+
+
+def _tracker(wom, **kwargs):
+    options = dict(wom_client=wom, group_id=7, requests_per_run=10, announce_top=3, log=lambda _m: None, usage=_Usage())
+    options.update(kwargs)
+    return CompetitionTracker(**options)
+
+
+def _entry(player_id, name, gained):
+    return StandingEntry(player_id, StandingPlayer(player_id, name), StandingProgress(gained))
+
+
+def _snapshots(competition_id):
+    with closing(database.connect_db(database.init_database())) as conn:
+        return conn.execute(
+            "SELECT COUNT(DISTINCT observed_at) FROM competition_standings WHERE competition_id = ?",
+            (competition_id,),
+        ).fetchone()[0]
+
+
+# ---------------------------------------------------------------------------
+# Pure helpers
+# ---------------------------------------------------------------------------
+
+
+def test_poll_interval_tightens_towards_the_end():
+    starts, ends = NOW, NOW + timedelta(days=7)
+
+    assert next_poll_at(starts, ends, NOW - HOUR) == starts
+    assert next_poll_at(starts, ends, NOW) == NOW + 6 * HOUR
+    assert next_poll_at(starts, ends, ends - 20 * HOUR) == ends - 19 * HOUR
+    assert next_poll_at(starts, ends, ends - 3 * HOUR) == ends - 3 * HOUR + timedelta(minutes=15)
+    assert next_poll_at(starts, ends, ends - HOUR) == ends - timedelta(minutes=55)
+    assert next_poll_at(starts, ends, ends - timedelta(minutes=3)) == ends + timedelta(minutes=10)
+    assert next_poll_at(starts, ends, ends + timedelta(minutes=10)) is None
+
+
+def test_rank_standings_drops_zero_gains_and_shares_tied_ranks():
+    rows = rank_standings([_entry(1, "Alice", 5), _entry(2, "Bob", 9), _entry(3, "Cat", 5), _entry(4, "Dan", 0)])
+
+    assert [(row["username"], row["rank"]) for row in rows] == [("Bob", 1), ("Alice", 2), ("Cat", 2)]
+
+
+def test_overtakes_report_climbers_in_the_top_ranks_only():
+    previous = rank_standings([_entry(1, "Alice", 10), _entry(2, "Bob", 8), _entry(3, "Cat", 6), _entry(4, "Dan", 4)])
+    current = rank_standings([_entry(1, "Alice", 10), _entry(2, "Bob", 8), _entry(3, "Cat", 12), _entry(4, "Dan", 9)])
+
+    overtakes = find_overtakes(previous, current, top=3)
+
+    assert [(item.username, item.passed, item.rank) for item in overtakes] == [
+        ("Cat", "Alice", 1),
+        ("Dan", "Bob", 3),
+    ]
+    assert find_overtakes(previous, current, top=1) == overtakes[:1]
+    assert find_overtakes(current, current, top=3) == []
+
+
+# ---------------------------------------------------------------------------
+# Tracker
+# ---------------------------------------------------------------------------
+
+
+def test_discovery_schedules_live_competitions_and_skips_old_ones():
+    wom = _FakeWom()
+    wom.serve("/groups/7/competitions", [
+        _competition(1, NOW - HOUR, NOW + timedelta(days=7)),
+        _competition(2, NOW + timedelta(days=2), NOW + timedelta(days=9)),
+        _competition(3, NOW - timedelta(days=90), NOW - timedelta(days=83)),
+    ])
+
+    report = asyncio.run(_tracker(wom, requests_per_run=1).poll_once(NOW))
+
+    assert sorted(report["discovered"]) == [1, 2, 3]
+    stored = {row["id"]: row["next_poll_at"] for row in database.read_competitions(7)}
+    assert stored == {1: "2025-06-10 12:00:00", 2: "2025-06-12 12:00:00", 3: None}
+    assert report["polled"] == 0
+
+
+def test_unchanged_responses_are_conditional_and_not_rewritten():
+    wom = _FakeWom()
+    wom.serve("/groups/7/competitions", [_competition(1, NOW - HOUR, NOW + timedelta(days=7))])
+    wom.serve("/competitions/1", _details(1, [("Alice", 3.0), ("Bob", 1.0)]))
+    tracker = _tracker(wom)
+
+    first = asyncio.run(tracker.poll_once(NOW))
+    second = asyncio.run(tracker.poll_once(NOW + 6 * HOUR))
+
+    assert (first["requests"], first["changed"]) == (2, 1)
+    assert (second["requests"], second["changed"]) == (2, 0)
+    assert [path for path, _etag in wom.requests[-2:]] == ["/groups/7/competitions", "/competitions/1"]
+    assert all(etag is not None for _path, etag in wom.requests[-2:])
+    assert _snapshots(1) == 1
+    assert [row["username"] for row in database.read_competition_standings(1)] == ["Alice", "Bob"]
+    assert database.read_competition(1)["next_poll_at"] == "2025-06-11 00:00:00"
+
+
+def test_overtakes_are_announced_and_final_podium_replaces_snapshots():
+    ends = NOW + 2 * HOUR
+    wom = _FakeWom()
+    wom.serve("/groups/7/competitions", [_competition(1, NOW - timedelta(days=7), ends)])
+    wom.serve("/competitions/1", _details(1, [("Alice", 3.0), ("Bob", 1.0)]))
+    tracker = _tracker(wom)
+    asyncio.run(tracker.poll_once(NOW))
+
+    wom.serve("/competitions/1", _details(1, [("Alice", 3.0), ("Bob", 4.5)]))
+    overtake = asyncio.run(tracker.poll_once(NOW + HOUR))
+    final = asyncio.run(tracker.poll_once(ends + timedelta(minutes=10)))
+
+    assert overtake["messages"] == ["🏁 **Bob** passed **Alice** for #1 in **Boss week** (4.50 EHB)"]
+    [podium] = final["messages"]
+    assert podium.startswith("🏆 **Boss week** has ended!\n1. **Bob** (4.50 EHB)")
+    competition = database.read_competition(1)
+    assert competition["final"] == 1 and competition["next_poll_at"] is None
+    assert _snapshots(1) == 1
+    assert asyncio.run(tracker.poll_once(ends + HOUR))["polled"] == 0
+
+
+def test_poll_budget_and_headroom_leave_competitions_due():
+    wom = _FakeWom()
+    wom.serve(
+        "/groups/7/competitions",
+        [_competition(index, NOW - HOUR, NOW + timedelta(days=7)) for index in range(1, 5)],
+    )
+    for index in range(1, 5):
+        wom.serve(f"/competitions/{index}", _details(index, [("Alice", float(index))]))
+
+    report = asyncio.run(_tracker(wom, requests_per_run=3).poll_once(NOW))
+    busy = asyncio.run(_tracker(wom, usage=_Usage(recent=50)).poll_once(NOW))
+
+    assert (report["requests"], report["polled"]) == (3, 2)
+    assert len(database.read_due_competitions("2025-06-10 12:00:00", 10)) == 2
+    assert busy["requests"] == 0
+
+
+def test_deleted_competition_is_not_polled_again():
+    wom = _FakeWom()
+    wom.serve("/groups/7/competitions", [_competition(1, NOW - HOUR, NOW + timedelta(days=7))])
+
+    report = asyncio.run(_tracker(wom).poll_once(NOW))
+
+    assert report["polled"] == 1
+    assert database.read_competition(1)["next_poll_at"] is None
+
+
+def test_failed_poll_raises_and_keeps_competition_due():
+    wom = _FakeWom()
+    wom.serve("/groups/7/competitions", [_competition(1, NOW - HOUR, NOW + timedelta(days=7))])
+    tracker = _tracker(wom)
+    asyncio.run(tracker.discover(NOW))
+    original = wom.get
+    wom.get = lambda url, **kwargs: _Response(503, b"busy") if "competitions/1" in url else original(url, **kwargs)
+
+    with pytest.raises(competition_tracker.CompetitionFetchError):
+        asyncio.run(tracker.poll_once(NOW))
+
+    assert database.read_competition(1)["next_poll_at"] == "2025-06-10 12:00:00"
@@ -25,6 +25,20 @@ def test_init_database_creates_expected_tables(tmp_path):
     }.issubset(tables)
 
 
+def test_timestamp_helpers_round_trip_in_utc():
+    from datetime import datetime, timedelta, timezone
+
+    aware = datetime(2025, 3, 1, 14, 30, tzinfo=timezone(timedelta(hours=2)))
+
+    assert database.format_ts(aware) == "2025-03-01 12:30:00"
+    assert database.format_ts(datetime(2025, 3, 1, 12, 30)) == "2025-03-01 12:30:00"
+    assert database.format_ts("2025-03-01") is None
+    assert database.format_ts(None) is None
+    assert database.parse_ts("2025-03-01 12:30:00") == aware
+    assert database.parse_ts("") is None
+    assert database.parse_ts("yesterday") is None
+
+
 def test_upsert_players_writes_snapshot_rows(tmp_path):
     db_path = tmp_path / "database.db"
 
@@ -390,3 +404,391 @@ def test_read_api_call_counts_by_endpoint(tmp_path):
     counts = database.read_api_call_counts_by_endpoint("2026-07-25 00:00:00", db_path=str(db_path))
     assert counts[0] == {"endpoint": "groups/{id}/gains", "count": 3}
     assert {"endpoint": "groups/{id}", "count": 1} in counts
+
+
+# ---------------------------------------------------------------------------
+# Snapshot retention / downsampling
+# ---------------------------------------------------------------------------
+
+
+def _gains_row(snapshot_time, username="alice", metric="overall", gained=1.0):
+    return {
+        "snapshot_time": snapshot_time,
+        "period_start": snapshot_time,
+        "period_end": snapshot_time,
+        "username": username,
+        "metric": metric,
+        "gained": gained,
+    }
+
+
+def test_compact_snapshot_history_keeps_latest_per_bucket(tmp_path):
+    from datetime import datetime, timezone
+
+    db_path = str(tmp_path / "database.db")
+    database.log_gains_snapshot(
+        [
+            # Recent window: untouched.
+            _gains_row("2025-03-30 06:00:00", gained=1.0),
+            _gains_row("2025-03-30 18:00:00", gained=2.0),
+            # Daily window: one row per day survives (the latest).
+            _gains_row("2025-03-01 06:00:00", gained=3.0),
+            _gains_row("2025-03-01 18:00:00", gained=4.0),
+            _gains_row("2025-03-01 18:00:00", metric="ehb", gained=0.5),
+            # Weekly window: 2024-12-02 and 2024-12-04 fall in the same %W week.
+            _gains_row("2024-12-02 12:00:00", gained=5.0),
+            _gains_row("2024-12-04 12:00:00", gained=6.0),
+            _gains_row("2024-12-04 12:00:00", username="bob", gained=7.0),
+        ],
+        db_path=db_path,
+    )
+    database.log_boss_kills(
+        "zulrah", [{"username": "alice", "kills": 10, "rank": 1}],
+        timestamp="2025-03-01 06:00:00", db_path=db_path,
+    )
+    database.log_boss_kills(
+        "zulrah", [{"username": "alice", "kills": 12, "rank": 1}],
+        timestamp="2025-03-01 20:00:00", db_path=db_path,
+    )
+
+    result = database.compact_snapshot_history(
+        raw_retention_days=7,
+        daily_retention_days=60,
+        now=datetime(2025, 4, 1, tzinfo=timezone.utc),
+        db_path=db_path,
+    )
+
+    assert result["deleted"] == {"gains_history": 2, "boss_kills_history": 1}
+    assert result["reclaimed_bytes"] >= 0
+    with sqlite3.connect(db_path) as conn:
+        gains = conn.execute(
+            "SELECT username, metric, gained FROM gains_history ORDER BY snapshot_time, username, metric"
+        ).fetchall()
+        kills = conn.execute("SELECT kills FROM boss_kills_history").fetchall()
+    assert gains == [
+        ("alice", "overall", 6.0),
+        ("bob", "overall", 7.0),
+        ("alice", "ehb", 0.5),
+        ("alice", "overall", 4.0),
+        ("alice", "overall", 1.0),
+        ("alice", "overall", 2.0),
+    ]
+    assert kills == [(12,)]
+
+
+def test_compact_snapshot_history_is_idempotent(tmp_path):
+    from datetime import datetime, timezone
+
+    db_path = str(tmp_path / "database.db")
+    database.log_gains_snapshot(
+        [_gains_row("2025-03-01 06:00:00"), _gains_row("2025-03-01 18:00:00")],
+        db_path=db_path,
+    )
+    kwargs = dict(
+        raw_retention_days=7,
+        daily_retention_days=60,
+        now=datetime(2025, 4, 1, tzinfo=timezone.utc),
+        db_path=db_path,
+    )
+
+    first = database.compact_snapshot_history(**kwargs)
+    second = database.compact_snapshot_history(**kwargs)
+
+    assert first["deleted"]["gains_history"] == 1
+    assert second["deleted"] == {"gains_history": 0, "boss_kills_history": 0}
+
+
+def test_compact_snapshot_history_only_scans_newly_aged_rows(tmp_path):
+    from datetime import datetime, timezone
+
+    db_path = str(tmp_path / "database.db")
+    kwargs = dict(raw_retention_days=7, daily_retention_days=60, db_path=db_path)
+    database.compact_snapshot_history(now=datetime(2025, 4, 1, tzinfo=timezone.utc), **kwargs)
+    database.log_gains_snapshot(
+        [
+            # Far behind the stored checkpoint: not rescanned.
+            _gains_row("2024-06-03 06:00:00", gained=1.0),
+            _gains_row("2024-06-03 18:00:00", gained=2.0),
+            # Aged past the raw cutoff since the last pass.
+            _gains_row("2025-03-26 06:00:00", gained=3.0),
+            _gains_row("2025-03-26 18:00:00", gained=4.0),
+        ],
+        db_path=db_path,
+    )
+
+    report = database.compact_snapshot_history(now=datetime(2025, 4, 8, tzinfo=timezone.utc), **kwargs)
+
+    assert report["deleted"]["gains_history"] == 1
+    with sqlite3.connect(db_path) as conn:
+        gained = [row[0] for row in conn.execute("SELECT gained FROM gains_history ORDER BY snapshot_time")]
+        cutoffs = conn.execute(
+            "SELECT raw_cutoff, daily_cutoff FROM snapshot_compaction WHERE table_name = 'gains_history'"
+        ).fetchone()
+    assert gained == [1.0, 2.0, 4.0]
+    assert cutoffs == ("2025-04-01 00:00:00", "2025-02-07 00:00:00")
+
+
+def test_migration_resets_the_compaction_checkpoint_of_its_target(tmp_path):
+    from datetime import datetime, timezone
+
+    db_path = str(tmp_path / "database.db")
+    database.log_gains_snapshot([_gains_row("2024-06-03 06:00:00")], db_path=db_path)
+    database.compact_snapshot_history(
+        raw_retention_days=7, daily_retention_days=60,
+        now=datetime(2025, 4, 1, tzinfo=timezone.utc), db_path=db_path,
+    )
+    database.record_player_identities([{"player_id": 7, "username": "alice"}], db_path=db_path)
+
+    assert database.migrate_legacy_history(db_path=db_path)["gains_history"]["migrated"] == 1
+
+    with sqlite3.connect(db_path) as conn:
+        tables = {row[0] for row in conn.execute("SELECT table_name FROM snapshot_compaction")}
+    assert "player_gains_history" not in tables
+    assert "gains_history" in tables
+
+
+def test_writers_bump_data_versions_only_on_change(tmp_path):
+    db_path = str(tmp_path / "database.db")
+
+    assert database.read_data_versions(["ehb_history", "players"], db_path=db_path) == {
+        "ehb_history": 0,
+        "players": 0,
+    }
+
+    database.log_ehb_history("alice", 1.0, timestamp="2025-01-01 00:00:00", db_path=db_path)
+    database.log_ehb_history("alice", 1.0, timestamp="2025-01-01 00:00:00", db_path=db_path)  # duplicate
+    database.upsert_players({"alice": {"last_ehb": 1.0, "rank": "Goblin"}}, db_path=db_path)
+
+    assert database.read_data_versions(["ehb_history", "players"], db_path=db_path) == {
+        "ehb_history": 1,
+        "players": 1,
+    }
+
+
+def test_read_history_batch_groups_by_requested_name(tmp_path):
+    db_path = str(tmp_path / "database.db")
+    database.log_ehp_history("Alice", 1.0, timestamp="2025-01-01 00:00:00", db_path=db_path)
+    database.log_ehp_history("bob", 2.0, timestamp="2025-01-02 00:00:00", db_path=db_path)
+    database.log_ehp_history("carol", 3.0, timestamp="2025-01-03 00:00:00", db_path=db_path)
+
+    result = database.read_history_batch(
+        ["alice", "BOB", "dave"], "ehp", db_path=db_path, start="2025-01-01 00:00:00"
+    )
+
+    assert result == {
+        "alice": [{"timestamp": "2025-01-01 00:00:00", "ehp": 1.0}],
+        "BOB": [{"timestamp": "2025-01-02 00:00:00", "ehp": 2.0}],
+        "dave": [],
+    }
+
+
+# ---------------------------------------------------------------------------
+# Query plans — case-insensitive username lookups must be index seeks
+# ---------------------------------------------------------------------------
+
+
+def _select_plans(monkeypatch, db_path, call):
+    """Run ``call`` and return the query plan of every SELECT it issued."""
+    from contextlib import closing
+
+    statements = []
+    real_connect = database.connect_db
+
+    def tracing_connect(path=None):
+        conn = real_connect(path)
+        conn.set_trace_callback(statements.append)
+        return conn
+
+    monkeypatch.setattr(database, "connect_db", tracing_connect)
+    call()
+    monkeypatch.setattr(database, "connect_db", real_connect)
+
+    selects = [sql for sql in statements if sql.lstrip().upper().startswith("SELECT")]
+    assert selects
+    with closing(sqlite3.connect(db_path)) as conn:
+        return [
+            " | ".join(row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql))
+            for sql in selects
+        ]
+
+
+def test_player_history_lookups_use_nocase_indexes(monkeypatch, tmp_path):
+    db_path = str(tmp_path / "database.db")
+    database.record_player_identities([{"player_id": 1, "username": "Alice"}], db_path=db_path)
+    database.log_ehp_history("Alice", 1.0, timestamp="2025-01-01 00:00:00", db_path=db_path)
+
+    cases = [
+        (lambda: database.read_player_ehp_history("alice", db_path=db_path),
+         "idx_ehp_history_username_nocase_ts"),
+        (lambda: database.read_gains_history("alice", "overall", db_path=db_path),
+         "idx_gains_user_nocase_metric_ts"),
+        (lambda: database.get_boss_history("zulrah", "alice", db_path=db_path),
+         "idx_boss_kills_boss_user_nocase_ts"),
+        (lambda: database.read_history_batch(["alice", "bob"], "ehb", db_path=db_path),
+         "idx_ehb_history_username_nocase_ts"),
+        (lambda: database.read_history_batch(["alice", "bob"], "gains", "overall", db_path=db_path),
+         "idx_gains_user_nocase_metric_ts"),
+    ]
+    for call, index_name in cases:
+        plans = _select_plans(monkeypatch, db_path, call)
+        assert any(index_name in plan for plan in plans), plans
+        for plan in plans:
+            assert "SEARCH" in plan and "TEMP B-TREE" not in plan, plan
+
+
+def test_init_database_replaces_binary_username_indexes(tmp_path):
+    db_path = tmp_path / "database.db"
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(
+            "CREATE TABLE ehb_history (id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp TEXT NOT NULL, "
+            "username TEXT NOT NULL, ehb REAL NOT NULL, UNIQUE(timestamp, username, ehb))"
+        )
+        conn.execute("CREATE INDEX idx_ehb_history_username_ts ON ehb_history (username, timestamp)")
+        conn.execute("INSERT INTO ehb_history (timestamp, username, ehb) VALUES ('2025-01-01', 'Alice', 1.0)")
+
+    database.init_database(str(db_path))
+
+    with sqlite3.connect(db_path) as conn:
+        indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert "idx_ehb_history_username_ts" not in indexes
+    assert "idx_ehb_history_username_nocase_ts" in indexes
+    assert database.read_history_batch(["ALICE"], "ehb", db_path=str(db_path))["ALICE"] == [
+        {"timestamp": "2025-01-01", "ehb": 1.0}
+    ]
+
+
+# ---------------------------------------------------------------------------
+# Roadmap Phase 5 — player-ID keyed history
+# ---------------------------------------------------------------------------
+
+
+def _count(db_path, table):
+    with sqlite3.connect(db_path) as conn:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+def test_history_writes_with_player_id_use_compact_tables(tmp_path):
+    db_path = str(tmp_path / "database.db")
+
+    database.log_ehb_history("Alice", 10.0, timestamp="2025-01-01 00:00:00", db_path=db_path, player_id=7)
+    database.log_ehb_history("Stranger", 1.0, timestamp="2025-01-01 00:00:00", db_path=db_path)
+    database.log_gains_snapshot([{
+        "snapshot_time": "2025-01-08 00:00:00", "period_start": "2025-01-01 00:00:00",
+        "period_end": "2025-01-08 00:00:00", "username": "Alice", "metric": "overall", "gained": 5.0,
+    }], db_path=db_path)
+    database.log_boss_kills("zulrah", [{"username": "alice", "kills": 3, "rank": 1}],
+                            timestamp="2025-01-08 00:00:00", db_path=db_path)
+
+    assert _count(db_path, "player_ehb_history") == 1
+    assert _count(db_path, "ehb_history") == 1
+    assert _count(db_path, "player_gains_history") == 1
+    assert _count(db_path, "player_boss_kills_history") == 1
+    assert database.read_history_batch(["alice"], "ehb", db_path=db_path) == {
+        "alice": [{"timestamp": "2025-01-01 00:00:00", "ehb": 10.0}]
+    }
+    assert database.read_latest_gains("overall", db_path=db_path)[0]["username"] == "Alice"
+    assert database.get_boss_leaderboard("zulrah", db_path=db_path) == [
+        {"username": "Alice", "kills": 3, "rank": 1, "timestamp": "2025-01-08 00:00:00"}
+    ]
+
+
+def test_history_follows_player_across_renames(tmp_path):
+    db_path = str(tmp_path / "database.db")
+    database.log_ehp_history("OldName", 1.0, timestamp="2025-01-01 00:00:00", db_path=db_path, player_id=7)
+    database.log_ehp_history("NewName", 2.0, timestamp="2025-02-01 00:00:00", db_path=db_path, player_id=7)
+
+    assert database.read_player_ehp_history("newname", db_path=db_path) == [
+        {"timestamp": "2025-01-01 00:00:00", "ehp": 1.0},
+        {"timestamp": "2025-02-01 00:00:00", "ehp": 2.0},
+    ]
+
+
+def test_migrate_legacy_history_moves_only_unambiguous_rows(tmp_path):
+    db_path = str(tmp_path / "database.db")
+    for day in range(1, 6):
+        database.log_ehb_history("Alice", float(day), timestamp=f"2025-01-0{day} 00:00:00", db_path=db_path)
+    database.log_ehb_history("Shared", 1.0, timestamp="2025-01-01 00:00:00", db_path=db_path)
+    database.log_ehb_history("Unknown", 1.0, timestamp="2025-01-01 00:00:00", db_path=db_path)
+    database.record_player_identities([
+        {"player_id": 1, "username": "alice"},
+        {"player_id": 2, "username": "Shared"},
+        {"player_id": 3, "username": "shared"},
+    ], db_path=db_path)
+    before = database.read_history_batch(["ALICE", "shared", "unknown"], "ehb", db_path=db_path)
+
+    first = database.migrate_legacy_history(batch_size=2, max_batches=1, db_path=db_path)
+    assert first["ehb_history"]["migrated"] == 2
+    rest = database.migrate_legacy_history(batch_size=2, db_path=db_path)
+
+    assert rest["ehb_history"] == {"migrated": 3, "unresolved": 2, "ambiguous": 1, "conflicts": 0, "remaining": 2}
+    assert _count(db_path, "player_ehb_history") == 5
+    assert database.read_history_batch(["ALICE", "shared", "unknown"], "ehb", db_path=db_path) == before
+    assert database.migrate_legacy_history(db_path=db_path)["ehb_history"]["migrated"] == 0
+
+
+def test_migrate_legacy_history_keeps_rows_that_conflict_on_the_compact_key(tmp_path):
+    db_path = str(tmp_path / "database.db")
+    database.log_ehb_history("Alice", 10.0, timestamp="2025-01-01 00:00:00", db_path=db_path)
+    database.log_ehb_history("OldAlice", 9.0, timestamp="2025-01-01 00:00:00", db_path=db_path)
+    database.log_ehb_history("OldAlice", 10.0, timestamp="2025-01-01 00:00:00", db_path=db_path)
+    database.log_ehb_history("Alice", 11.0, timestamp="2025-01-02 00:00:00", db_path=db_path)
+    database.log_ehb_history("Alice", 12.0, timestamp="2025-01-02 00:00:00", db_path=db_path)
+    database.record_player_identities([
+        {"player_id": 7, "username": "Alice"},
+        {"player_id": 7, "username": "OldAlice"},
+    ], db_path=db_path)
+
+    report = database.migrate_legacy_history(db_path=db_path)["ehb_history"]
+
+    # The exact duplicate is folded in; the two differing same-second rows stay behind.
+    assert report == {"migrated": 3, "unresolved": 2, "ambiguous": 0, "conflicts": 2, "remaining": 2}
+    assert _count(db_path, "player_ehb_history") == 2
+    with sqlite3.connect(db_path) as conn:
+        kept = conn.execute("SELECT username, timestamp, ehb FROM ehb_history ORDER BY id").fetchall()
+    assert kept == [("OldAlice", "2025-01-01 00:00:00", 9.0), ("Alice", "2025-01-02 00:00:00", 12.0)]
+    assert database.migrate_legacy_history(db_path=db_path)["ehb_history"]["conflicts"] == 2
+
+
+def test_migrate_legacy_history_settles_until_a_new_alias_appears(tmp_path):
+    db_path = str(tmp_path / "database.db")
+    database.log_ehb_history("Unknown", 1.0, timestamp="2025-01-01 00:00:00", db_path=db_path)
+
+    def passes():
+        with sqlite3.connect(db_path) as conn:
+            return conn.execute(
+                "SELECT passes_completed FROM legacy_history_migration WHERE source_table = 'ehb_history'"
+            ).fetchone()[0]
+
+    database.migrate_legacy_history(db_path=db_path)
+    settled = database.migrate_legacy_history(db_path=db_path)["ehb_history"]
+    assert settled == {"migrated": 0, "unresolved": 1, "ambiguous": 0, "conflicts": 0, "remaining": 1}
+    assert passes() == 1
+
+    database.record_player_identities([{"player_id": 4, "username": "Unknown"}], db_path=db_path)
+    assert database.migrate_legacy_history(db_path=db_path)["ehb_history"]["migrated"] == 1
+    assert passes() == 2
+
+
+def test_compact_snapshot_history_thins_player_id_tables(tmp_path):
+    from datetime import datetime, timezone
+
+    db_path = str(tmp_path / "database.db")
+    rows = [
+        {
+            "snapshot_time": f"2025-01-01 {hour:02d}:00:00", "period_start": "2024-12-25 00:00:00",
+            "period_end": f"2025-01-01 {hour:02d}:00:00", "username": "Alice", "player_id": 7,
+            "metric": "overall", "gained": float(hour),
+        }
+        for hour in range(6)
+    ]
+    database.log_gains_snapshot(rows, db_path=db_path)
+
+    report = database.compact_snapshot_history(
+        raw_retention_days=1, daily_retention_days=30,
+        now=datetime(2025, 1, 10, tzinfo=timezone.utc), db_path=db_path,
+    )
+
+    assert report["deleted"]["gains_history"] == 5
+    assert database.read_gains_history("alice", "overall", db_path=db_path) == [
+        {"timestamp": "2025-01-01 05:00:00", "gained": 5.0}
+    ]
@@ -0,0 +1,41 @@
+"""Tests for LTTB chart downsampling (web.services.downsample)."""
+
+from datetime import datetime, timedelta
+
+from web.services.downsample import lttb
+
+
+def _series(values):
+    start = datetime(2025, 1, 1)
+    return [
+        {"timestamp": (start + timedelta(hours=index)).strftime("%Y-%m-%d %H:%M:%S"), "ehb": value}
+        for index, value in enumerate(values)
+    ]
+
+
+def test_lttb_returns_short_series_unchanged():
+    rows = _series([1, 2, 3])
+    assert lttb(rows, "ehb", 10) is rows
+    assert lttb(rows, "ehb", None) is rows
+
+
+def test_lttb_keeps_endpoints_order_and_peaks():
+    values = [0.0] * 200
+    values[57] = 500.0  # a single spike must survive downsampling
+    values[140] = -300.0
+    rows = _series(values)
+
+    sampled = lttb(rows, "ehb", 20)
+
+    assert len(sampled) == 20
+    assert sampled[0] is rows[0]
+    assert sampled[-1] is rows[-1]
+    timestamps = [row["timestamp"] for row in sampled]
+    assert timestamps == sorted(timestamps)
+    assert rows[57] in sampled
+    assert rows[140] in sampled
+
+
+def test_lttb_tolerates_unparseable_timestamps():
+    rows = [{"timestamp": f"t{index}", "ehb": float(index % 7)} for index in range(50)]
+    assert len(lttb(rows, "ehb", 5)) == 5
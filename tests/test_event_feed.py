@@ -0,0 +1,116 @@
+"""Tests for the sequence-numbered live event feeds and the admin SSE stream."""
+
+import asyncio
+
+from utils import api_usage
+from utils.event_feed import EventFeed
+from web.routers import admin
+from web.services.bot_state import BotState
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+# ---------------------------------------------------------------------------
+# EventFeed
+# ---------------------------------------------------------------------------
+
+def test_feed_returns_only_events_after_sequence():
+    feed = EventFeed(maxlen=3)
+    for line in ("a", "b", "c", "d"):
+        feed.append(line)
+
+    assert feed.last_seq == 4
+    assert list(feed) == ["b", "c", "d"]
+    assert feed.since(2) == [(3, "c"), (4, "d")]
+    assert feed.since(0) == [(2, "b"), (3, "c"), (4, "d")]
+    assert feed.since(4) == []
+    assert feed.tail(1) == [(4, "d")]
+
+
+def test_feed_wait_wakes_on_publish_and_times_out_when_idle():
+    async def scenario():
+        feed = EventFeed()
+        assert await feed.wait(0, timeout=0.01) == []
+        waiter = asyncio.ensure_future(feed.wait(0, timeout=5))
+        await asyncio.sleep(0)
+        feed.publish("hello")
+        return await waiter, feed._waiters
+
+    events, waiters = run(scenario())
+    assert events == [(1, "hello")]
+    assert waiters == []
+
+
+# ---------------------------------------------------------------------------
+# /admin/stream event generator
+# ---------------------------------------------------------------------------
+
+def _fresh_tracker(monkeypatch):
+    tracker = api_usage.ApiUsageTracker(rate_limit_per_minute=5, cooldown_seconds=60, log=lambda m: None)
+    monkeypatch.setattr(admin, "api_usage_tracker", tracker)
+    return tracker
+
+
+def test_stream_sends_snapshot_then_only_new_log_lines(monkeypatch):
+    _fresh_tracker(monkeypatch)
+    state = BotState()
+    state.log_buffer.append("2025-01-01 00:00:00 - old line")
+
+    async def scenario():
+        stream = admin.admin_event_stream(state)
+        first = [await anext(stream), await anext(stream)]
+        pending = asyncio.ensure_future(anext(stream))
+        await asyncio.sleep(0)
+        state.log_buffer.append("2025-01-01 00:00:01 - new line")
+        delta = await pending
+        await stream.aclose()
+        return first, delta
+
+    (logs, usage), delta = run(scenario())
+    assert logs.startswith("event: logs\nid: 1.0\n") and "old line" in logs
+    assert usage.startswith("event: usage\n") and "No API calls logged yet." in usage
+    assert delta.startswith("event: log-lines\nid: 2.0\n")
+    assert "new line" in delta and "old line" not in delta
+
+
+def test_stream_pushes_api_call_deltas(monkeypatch):
+    tracker = _fresh_tracker(monkeypatch)
+    state = BotState()
+
+    async def scenario():
+        stream = admin.admin_event_stream(state, last_event_id="0.0")
+        pending = asyncio.ensure_future(anext(stream))
+        await asyncio.sleep(0)
+        tracker.before_request("GET", "groups/1")
+        tracker.record_completed(
+            method="GET", endpoint="groups/1", status_code=200, duration_ms=12, outcome="ok",
+        )
+        calls = await pending
+        summary = await anext(stream)
+        await stream.aclose()
+        return calls, summary
+
+    calls, summary = run(scenario())
+    assert calls.startswith("event: usage-calls\nid: 0.1\n")
+    assert "groups/1" in calls and "12ms" in calls
+    assert summary.startswith("event: usage-summary\n")
+    assert "Circuit breaker closed" in summary
+
+
+def test_stream_resumes_from_last_event_id(monkeypatch):
+    _fresh_tracker(monkeypatch)
+    state = BotState()
+    for index in range(3):
+        state.log_buffer.append(f"line {index}")
+
+    async def scenario():
+        stream = admin.admin_event_stream(state, last_event_id="2.0")
+        message = await anext(stream)
+        await stream.aclose()
+        return message
+
+    message = run(scenario())
+    assert message.startswith("event: log-lines\nid: 3.0\n")
+    assert "line 2" in message and "line 1" not in message
@@ -1,8 +1,9 @@
 """Tests for the persisted gains snapshotter — Feature 4."""
 
 import asyncio
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 import types
+import threading
 
 import pytest
 
@@ -123,7 +124,7 @@ def test_snapshot_gains_once_multi_metric(fake_wom_client, tmp_path):
 
 
 def test_snapshot_gains_once_accepts_full_response_beyond_50(fake_wom_client):
-    entries = [make_gains_entry(make_player(f"p{i}"), gained=float(i)) for i in range(120)]
+    entries = [make_gains_entry(make_player(f"p{i}", player_id=i + 1), gained=float(i)) for i in range(120)]
     client = fake_wom_client(gains={"overall": entries})
 
     inserted = run(gains_snapshotter.snapshot_gains_once(
@@ -238,61 +239,97 @@ def test_live_gains_leaderboard_propagates_api_failure(fake_wom_client):
         ))
 
 
-def test_snapshot_loop_does_not_publish_or_mark_failed_cycle(fake_wom_client, monkeypatch):
+def _gains_job(client, discord_client, **overrides):
+    options = dict(
+        wom_client=client,
+        discord_client=discord_client,
+        group_id=1,
+        channel_id=123,
+        metrics=["overall"],
+        window_days=7,
+        interval_seconds=60,
+        log=_log,
+    )
+    options.update(overrides)
+    return gains_snapshotter.gains_snapshot_job(**options)
+
+
+def test_snapshot_job_does_not_publish_or_mark_failed_cycle(fake_wom_client):
     client = fake_wom_client(gains_errors={("overall", 0): "scheduled failure"})
     snapshot_calls = []
     channel_lookups = []
-    logs = []
-
-    async def stop_after_first_cycle(_seconds):
-        raise asyncio.CancelledError
-
-    monkeypatch.setattr(gains_snapshotter.asyncio, "sleep", stop_after_first_cycle)
     discord_client = types.SimpleNamespace(
         get_channel=lambda channel_id: channel_lookups.append(channel_id)
     )
+    job = _gains_job(client, discord_client, on_snapshot=lambda: snapshot_calls.append(True))
 
-    with pytest.raises(asyncio.CancelledError):
-        run(gains_snapshotter._gains_snapshot_loop(
-            wom_client=client,
-            discord_client=discord_client,
-            group_id=1,
-            channel_id=123,
-            metrics=["overall"],
-            window_days=7,
-            interval_seconds=60,
-            log=logs.append,
-            on_snapshot=lambda: snapshot_calls.append(True),
-        ))
+    # The scheduler records the failure and retries the period.
+    with pytest.raises(RuntimeError, match="scheduled failure"):
+        run(job.run(NOW))
 
     assert snapshot_calls == []
     assert channel_lookups == []
-    assert any("scheduled failure" in message for message in logs)
 
 
-def test_snapshot_loop_honors_initial_delay_before_recurring_interval(fake_wom_client, monkeypatch):
-    client = fake_wom_client()
-    sleep_calls = []
+def test_snapshot_job_runs_first_period_after_initial_delay(fake_wom_client):
+    job = _gains_job(
+        fake_wom_client(),
+        types.SimpleNamespace(get_channel=lambda _channel_id: None),
+        channel_id=0,
+        interval_seconds=300,
+        initial_delay_seconds=60,
+    )
 
-    async def stop_after_recurring_sleep(seconds):
-        sleep_calls.append(seconds)
-        if len(sleep_calls) == 2:
-            raise asyncio.CancelledError
+    assert job.name == "gains_snapshot"
+    assert job.run_on_first_start
+    assert job.initial_delay_seconds == 60
+    assert job.schedule.next(NOW) - NOW == timedelta(seconds=300)
 
-    monkeypatch.setattr(gains_snapshotter.asyncio, "sleep", stop_after_recurring_sleep)
-    discord_client = types.SimpleNamespace(get_channel=lambda _channel_id: None)
 
-    with pytest.raises(asyncio.CancelledError):
-        run(gains_snapshotter._gains_snapshot_loop(
-            wom_client=client,
-            discord_client=discord_client,
-            group_id=1,
-            channel_id=0,
-            metrics=["overall"],
-            window_days=7,
-            interval_seconds=300,
-            initial_delay_seconds=60,
-            log=_log,
+# ---------------------------------------------------------------------------
+# Retention compaction
+# ---------------------------------------------------------------------------
+
+def test_compact_history_once_disabled_by_zero_retention():
+    assert gains_snapshotter.compact_history_once(
+        raw_retention_days=0, daily_retention_days=90, log=_log, now=NOW,
+    ) is None
+
+
+def test_compact_history_once_thins_and_logs(fake_wom_client):
+    client = fake_wom_client(gains={
+        "overall": [make_gains_entry(make_player("alice"), gained=5000.0)],
+    })
+    for hour in (6, 18):
+        run(gains_snapshotter.snapshot_gains_once(
+            wom_client=client, group_id=1, metrics=["overall"], window_days=7, log=_log,
+            now=datetime(2024, 12, 1, hour, 0, tzinfo=timezone.utc),
         ))
+    logs = []
+
+    result = gains_snapshotter.compact_history_once(
+        raw_retention_days=14, daily_retention_days=90, log=logs.append, now=NOW,
+    )
+
+    assert result["deleted"]["gains_history"] == 1
+    assert any("removed 1 superseded rows" in message for message in logs)
+
+
+def test_history_compaction_job_runs_daily_off_the_event_loop(monkeypatch):
+    threads = []
+
+    def fake_compact(**kwargs):
+        threads.append(threading.current_thread())
+        assert kwargs["raw_retention_days"] == 14
+        assert kwargs["daily_retention_days"] == 90
+
+    monkeypatch.setattr(gains_snapshotter, "compact_history_once", fake_compact)
+    job = gains_snapshotter.history_compaction_job(
+        raw_retention_days=14, daily_retention_days=90, log=_log,
+    )
+
+    run(job.run(NOW))
 
-    assert sleep_calls == [60, 300]
+    assert job.name == "history_compaction"
+    assert job.schedule.next(NOW) - NOW == timedelta(days=1)
+    assert threads and threads[0] is not threading.main_thread()
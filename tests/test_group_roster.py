@@ -0,0 +1,97 @@
+"""Tests for the lean group-details decode used by the rank check (utils.group_roster)."""
+
+import asyncio
+import json
+import types
+from datetime import datetime, timezone
+
+from wom import models
+
+from python.utils import group_roster, membership, player_status
+
+_TS = "2025-06-01T12:00:00.000Z"
+
+
+def _payload(count=2):
+    def player(i):
+        return {
+            "id": i, "username": f"p{i}", "displayName": f"Player {i}", "type": "regular",
+            "build": "main", "country": None, "status": "active", "patron": False,
+            "exp": 1_000_000 + i, "ehp": 10.5, "ehb": 5.25, "ttm": 1.0, "tt200m": 2.0,
+            "registeredAt": _TS, "updatedAt": _TS, "lastChangedAt": _TS, "lastImportedAt": None,
+        }
+
+    return json.dumps({
+        "id": 1, "name": "Test Group", "clanChat": None, "description": None, "homeworld": None,
+        "verified": True, "patron": False, "profileImage": None, "bannerImage": None, "score": 0,
+        "createdAt": _TS, "updatedAt": _TS, "memberCount": count,
+        "socialLinks": {"id": 1, "groupId": 1, "website": None, "createdAt": _TS, "updatedAt": _TS},
+        "memberships": [
+            {"playerId": i, "groupId": 1, "role": "member", "createdAt": _TS, "updatedAt": _TS, "player": player(i)}
+            for i in range(1, count + 1)
+        ],
+    }).encode()
+
+
+def test_decode_keeps_only_rank_check_fields():
+    roster = group_roster.decode_group_roster(_payload())
+
+    assert roster.name == "Test Group" and roster.member_count == 2
+    first = roster.memberships[0]
+    assert first.player_id == 1 and first.role == "member"
+    assert first.player.display_name == "Player 1"
+    assert (first.player.ehb, first.player.ehp, first.player.exp) == (5.25, 10.5, 1_000_001)
+    assert first.player.last_changed_at == datetime(2025, 6, 1, 12, tzinfo=timezone.utc)
+    assert not hasattr(first.player, "username")
+
+
+def test_roster_feeds_membership_and_status_collectors(tmp_path):
+    db_path = str(tmp_path / "database.db")
+    roster = group_roster.decode_group_roster(_payload())
+
+    changes = membership.MembershipTracker(1, db_path=db_path).observe(roster)
+    row = player_status.status_row(roster.memberships[1].player)
+
+    assert changes.complete and [entry["player_id"] for entry in changes.joined] == [1, 2]
+    assert changes.joined[0]["role"] == "member"
+    assert changes.joined[0]["joined_at"] == "2025-06-01 12:00:00"
+    assert row["wom_status"] == "active" and row["last_changed_at"] == "2025-06-01 12:00:00"
+
+
+class _Response:
+    def __init__(self, status, body):
+        self.status = status
+        self.body = body
+        self.headers = {}
+
+    async def read(self):
+        return self.body
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *_exc):
+        return False
+
+
+def test_fetch_returns_ok_or_the_client_error():
+    responses = [_Response(200, _payload(1)), _Response(404, b'{"message": "Group not found."}'), _Response(502, b"<html>")]
+    requested = []
+
+    def get(url, *, headers, params):
+        requested.append((url, headers["User-Agent"]))
+        return responses.pop(0)
+
+    session = types.SimpleNamespace(get=get)
+    client = types.SimpleNamespace(
+        _http=types.SimpleNamespace(_session=session, _headers={"User-Agent": "test"}, _base_url="https://wom.test/v2")
+    )
+
+    ok = asyncio.run(group_roster.fetch_group_roster(client, 7))
+    err = asyncio.run(group_roster.fetch_group_roster(client, 7))
+    gateway = asyncio.run(group_roster.fetch_group_roster(client, 7))
+
+    assert requested == [("https://wom.test/v2/groups/7", "test")] * 3
+    assert ok.is_ok and ok.unwrap().memberships[0].player.display_name == "Player 1"
+    assert err.is_err and err.unwrap_err().message == "Group not found." and err.unwrap_err().status == 404
+    assert isinstance(gateway.unwrap_err(), models.HttpErrorResponse) and gateway.unwrap_err().status == 502
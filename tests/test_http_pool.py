@@ -0,0 +1,97 @@
+"""Tests for the shared pooled WOM HTTP connector (utils.http_pool)."""
+
+import asyncio
+import socket
+
+import wom
+from wom import routes
+
+from utils import api_usage
+from utils.http_pool import WomHttpPool, wom_get
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_sessions_share_one_keepalive_connector():
+    async def scenario():
+        async with WomHttpPool(limit=4, ttl_dns_cache=60) as pool:
+            connector = pool.connector
+            raw = pool.session()
+            client = pool.tracked_session()
+            shared = raw is pool.session() and raw.connector is connector and client.connector is connector
+            await client.close()
+            still_open = not connector.closed and not raw.closed
+            settings = (connector.limit, connector._family, connector.use_dns_cache, connector._keepalive_timeout)
+            tracked = api_usage._tracking_middleware in raw._middlewares
+        return shared, still_open, settings, tracked, connector.closed, raw.closed
+
+    shared, still_open, settings, tracked, connector_closed, raw_closed = run(scenario())
+    assert shared and still_open and tracked
+    assert settings == (4, socket.AF_INET, True, 30)
+    assert connector_closed and raw_closed
+
+
+def test_pool_recreates_its_connector_on_a_new_loop_and_closes_the_old_one():
+    pool = WomHttpPool()
+
+    async def grab():
+        session = pool.session()
+        connector = pool.connector
+        await asyncio.sleep(0)
+        return session, connector
+
+    first_session, first = run(grab())
+    second_session, second = run(grab())
+
+    assert first is not second
+    assert first.closed and first_session.closed
+    assert not second.closed
+    run(pool.close())
+    assert second.closed and second_session.closed
+
+
+def test_wom_client_still_has_the_internals_wom_get_uses():
+    # WOM.Client.start() installs ``_session``; the rest is set by wom.py itself.
+    http = wom.Client(api_key="key", user_agent="test")._http
+    route = routes.GROUP_DETAILS.compile(7)
+
+    assert "_session" in type(http).__slots__
+    assert http._headers["x-api-key"] == "key" and "test" in http._headers["User-Agent"]
+    assert http._base_url.startswith("https://")
+    assert (route.uri, route.params) == ("/groups/7", {})
+
+
+def test_wom_get_sends_client_headers_and_returns_the_raw_response():
+    sent = {}
+
+    class _Response:
+        status = 304
+        headers = {"ETag": 'W/"1"'}
+
+        async def read(self):
+            raise AssertionError("a 304 has no body to read")
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *_exc):
+            return False
+
+    class _Session:
+        def get(self, url, *, headers, params):
+            sent.update(url=url, headers=headers, params=params)
+            return _Response()
+
+    http = wom.Client(api_key="key", user_agent="test")._http
+    http._session = _Session()
+    client = type("Client", (), {"_http": http})()
+    route = routes.GROUP_COMPETITIONS.compile(7).with_params({"limit": 50})
+
+    response = run(wom_get(client, route, headers={"If-None-Match": 'W/"1"'}))
+
+    assert (response.status, response.body, response.headers["ETag"]) == (304, b"", 'W/"1"')
+    assert sent["url"] == http._base_url + "/groups/7/competitions"
+    assert sent["headers"]["x-api-key"] == "key" and sent["headers"]["If-None-Match"] == 'W/"1"'
+    assert sent["params"] == {"limit": 50}
@@ -0,0 +1,81 @@
+"""Tests for python/utils/inactivity.py."""
+
+import sqlite3
+from datetime import datetime, timezone
+
+from python.utils import database, inactivity
+
+NOW = datetime(2025, 3, 31, tzinfo=timezone.utc)
+
+
+def _seed(db_path):
+    database.upsert_player_status([
+        {"username": "idle", "player_id": 1, "last_changed_at": "2025-01-01 00:00:00"},
+        {"username": "recent", "player_id": 2, "last_changed_at": "2025-03-30 00:00:00"},
+        {"username": "fresh", "player_id": 3, "last_changed_at": None},
+    ], db_path=db_path)
+    _members(db_path, {1: "idle", 2: "recent", 3: "fresh"})
+
+
+def _members(db_path, names):
+    database.record_player_identities(
+        [{"player_id": player_id, "username": name} for player_id, name in names.items()], db_path=db_path
+    )
+    database.apply_membership_changes(
+        7,
+        joined=[{"player_id": player_id} for player_id in names],
+        left=[],
+        role_changes={},
+        observed_at="2025-01-01 00:00:00",
+        db_path=db_path,
+    )
+
+
+def test_inactive_players_uses_last_changed_at(tmp_path):
+    db_path = str(tmp_path / "database.db")
+    _seed(db_path)
+
+    rows = inactivity.inactive_players(30, now=NOW, db_path=db_path)
+
+    assert [(row["username"], row["days_inactive"]) for row in rows] == [("idle", 89)]
+    assert [row["username"] for row in inactivity.players_with_unknown_activity(db_path)] == ["fresh"]
+
+
+def test_departed_and_renamed_players_are_not_reported(tmp_path):
+    db_path = str(tmp_path / "database.db")
+    _seed(db_path)
+    database.upsert_player_status([
+        {"username": "gone", "player_id": 4, "last_changed_at": "2025-01-02 00:00:00"},
+        {"username": "oldname", "player_id": 5, "last_changed_at": "2025-01-03 00:00:00"},
+        {"username": "newname", "player_id": 5, "last_changed_at": "2025-01-03 00:00:00"},
+    ], db_path=db_path)
+    _members(db_path, {4: "gone", 5: "oldname"})
+    database.record_player_identities([{"player_id": 5, "username": "newname"}], db_path=db_path)
+    database.apply_membership_changes(
+        7, joined=[], left=[4], role_changes={}, observed_at="2025-03-01 00:00:00", db_path=db_path
+    )
+
+    rows = inactivity.inactive_players(30, now=NOW, db_path=db_path)
+
+    assert [row["username"] for row in rows] == ["idle", "newname"]
+
+
+def test_classify():
+    assert inactivity.classify({"last_changed_at": "2025-01-01 00:00:00"}, 30, NOW) == inactivity.INACTIVE
+    assert inactivity.classify({"last_changed_at": "2025-03-30 00:00:00"}, 30, NOW) == inactivity.ACTIVE
+    assert inactivity.classify({"last_changed_at": None}, 30, NOW) == inactivity.UNKNOWN
+
+
+def test_inactive_query_is_an_index_range_scan(tmp_path):
+    db_path = str(tmp_path / "database.db")
+    database.init_database(db_path)
+    with sqlite3.connect(db_path) as conn:
+        plan = " | ".join(
+            row[3]
+            for row in conn.execute(
+                "EXPLAIN QUERY PLAN " + database._CURRENT_MEMBER_STATUS
+                + "AND p.last_changed_at < ? ORDER BY p.last_changed_at",
+                ("2025-01-01 00:00:00",),
+            )
+        )
+    assert "idx_players_last_changed_at" in plan and "TEMP B-TREE" not in plan
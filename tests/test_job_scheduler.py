@@ -0,0 +1,181 @@
+"""Tests for the persisted job scheduler (utils.job_scheduler)."""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from python.utils import database, job_scheduler
+from python.utils.job_scheduler import CATCH_UP_ALL, IntervalSchedule, Job, JobScheduler, plan_runs
+from python.weeklyupdater import weekly_reporter
+
+HOUR = timedelta(hours=1)
+# A Sunday, one hour after the weekly report boundary.
+SUNDAY = datetime(2025, 6, 1, 19, 0, tzinfo=timezone.utc)
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def _hourly_job(runs=None, **overrides):
+    async def record(period):
+        runs.append(period)
+
+    options = dict(name="hourly", schedule=IntervalSchedule(3600), run=record)
+    options.update(overrides)
+    return Job(**options)
+
+
+class _Clock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+# ---------------------------------------------------------------------------
+# Planning (pure)
+# ---------------------------------------------------------------------------
+
+
+def test_first_start_records_baseline_without_running():
+    plan = plan_runs(_hourly_job(), None, SUNDAY + 0.5 * HOUR)
+
+    assert plan.periods == []
+    assert plan.skip_to == SUNDAY
+
+
+def test_first_start_runs_current_period_when_requested():
+    plan = plan_runs(_hourly_job(run_on_first_start=True), None, SUNDAY + 0.5 * HOUR)
+
+    assert plan.periods == [SUNDAY]
+    assert plan.skip_to is None
+
+
+def test_nothing_due_within_the_handled_period():
+    assert plan_runs(_hourly_job(), SUNDAY, SUNDAY + 0.9 * HOUR).periods == []
+
+
+def test_missed_periods_collapse_to_latest_and_skip_older():
+    plan = plan_runs(_hourly_job(), SUNDAY, SUNDAY + 5.5 * HOUR)
+
+    assert plan.periods == [SUNDAY + 5 * HOUR]
+    assert plan.skip_to == SUNDAY + 4 * HOUR
+
+
+def test_catch_up_all_runs_oldest_first_up_to_limit():
+    job = _hourly_job(catch_up=CATCH_UP_ALL, max_catch_up=3)
+
+    plan = plan_runs(job, SUNDAY, SUNDAY + 5.5 * HOUR)
+
+    assert plan.periods == [SUNDAY + 3 * HOUR, SUNDAY + 4 * HOUR, SUNDAY + 5 * HOUR]
+    assert plan.skip_to == SUNDAY + 2 * HOUR
+
+
+def test_periods_past_misfire_grace_are_skipped():
+    job = _hourly_job(misfire_grace_seconds=600)
+
+    plan = plan_runs(job, SUNDAY, SUNDAY + 1.5 * HOUR)
+
+    assert plan.periods == []
+    assert plan.skip_to == SUNDAY + HOUR
+
+
+def test_jitter_is_stable_bounded_and_delays_due_time():
+    job = _hourly_job(jitter_seconds=600)
+    jitter = job.jitter(SUNDAY)
+
+    assert jitter == job.jitter(SUNDAY)
+    assert timedelta(0) <= jitter < timedelta(seconds=600)
+    assert plan_runs(job, SUNDAY - HOUR, SUNDAY + jitter - timedelta(seconds=1)).periods == []
+    assert plan_runs(job, SUNDAY - HOUR, SUNDAY + jitter).periods == [SUNDAY]
+
+
+def test_weekly_report_job_uses_sunday_boundaries():
+    job = weekly_reporter.weekly_report_job(
+        wom_client=None, discord_client=None, group_id=1, channel_id=1, log=print
+    )
+    last_week = SUNDAY - timedelta(days=7, hours=1)
+
+    plan = plan_runs(job, last_week, SUNDAY + HOUR)
+
+    assert plan.periods == [SUNDAY - HOUR]
+
+
+# ---------------------------------------------------------------------------
+# Scheduler
+# ---------------------------------------------------------------------------
+
+
+def test_restart_does_not_repeat_a_handled_period():
+    runs = []
+    clock = _Clock(SUNDAY + 0.5 * HOUR)
+    first = JobScheduler(clock=clock, log=lambda _msg: None)
+    first.add(_hourly_job(runs, run_on_first_start=True))
+    run(first.run_job(first.jobs["hourly"]))
+
+    restarted = JobScheduler(clock=clock, log=lambda _msg: None)
+    job = restarted.add(_hourly_job(runs, run_on_first_start=True))
+    run(restarted.run_job(job))
+
+    assert runs == [SUNDAY]
+    assert restarted.next_run_at(job) == SUNDAY + HOUR
+    assert database.read_scheduled_jobs()["hourly"]["last_period"] == "2025-06-01 19:00:00"
+
+
+def test_failed_run_is_recorded_and_retried():
+    attempts = []
+
+    async def flaky(period):
+        attempts.append(period)
+        if len(attempts) == 1:
+            raise RuntimeError("WOM unavailable")
+
+    clock = _Clock(SUNDAY + 0.5 * HOUR)
+    logs = []
+    scheduler = JobScheduler(clock=clock, log=logs.append)
+    job = scheduler.add(_hourly_job(run=flaky, retry_seconds=300))
+    database.advance_scheduled_job("hourly", "2025-06-01 18:00:00", ran=True)
+
+    assert run(scheduler.run_job(job)) is False
+    state = database.read_scheduled_jobs()["hourly"]
+    assert state["last_period"] == "2025-06-01 18:00:00"
+    assert state["failures"] == 1 and state["last_error"] == "WOM unavailable"
+    assert scheduler.next_run_at(job) == clock.now + timedelta(seconds=300)
+    assert any("WOM unavailable" in line for line in logs)
+
+    clock.now += timedelta(seconds=300)
+    assert run(scheduler.run_job(job)) is True
+    state = database.read_scheduled_jobs()["hourly"]
+    assert state["last_period"] == "2025-06-01 19:00:00"
+    assert state["failures"] == 0 and state["last_error"] is None
+    assert attempts == [SUNDAY, SUNDAY]
+
+
+def test_run_forever_starts_due_jobs_and_waits_for_the_next(monkeypatch):
+    runs = []
+    scheduler = JobScheduler(log=lambda _msg: None)
+    scheduler.add(_hourly_job(runs, run_on_first_start=True))
+    sleeps = []
+
+    async def stop(seconds):
+        sleeps.append(seconds)
+        raise asyncio.CancelledError
+
+    monkeypatch.setattr(job_scheduler.asyncio, "sleep", stop)
+
+    with pytest.raises(asyncio.CancelledError):
+        run(scheduler.run_forever())
+
+    assert len(runs) == 1
+    assert 0 < sleeps[0] <= 3600
+
+
+def test_duplicate_job_names_are_rejected():
+    scheduler = JobScheduler()
+    scheduler.add(_hourly_job())
+
+    with pytest.raises(ValueError):
+        scheduler.add(_hourly_job())
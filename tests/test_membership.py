@@ -0,0 +1,99 @@
+"""Tests for python/utils/membership.py."""
+
+import types
+from datetime import datetime, timezone
+
+from python.utils import database, membership
+
+
+def _group(*members, member_count=None):
+    memberships = [
+        types.SimpleNamespace(
+            player_id=player_id,
+            role=types.SimpleNamespace(value=role),
+            created_at=datetime(2025, 1, 1, tzinfo=timezone.utc),
+        )
+        for player_id, role in members
+    ]
+    return types.SimpleNamespace(
+        memberships=memberships,
+        member_count=len(memberships) if member_count is None else member_count,
+    )
+
+
+def _intervals(db_path):
+    from contextlib import closing
+
+    with closing(database.connect_db(db_path)) as conn:
+        return [
+            dict(row)
+            for row in conn.execute(
+                "SELECT player_id, role, first_seen_at, last_seen_at, left_at FROM group_memberships ORDER BY id"
+            )
+        ]
+
+
+def _at(day):
+    return datetime(2025, 2, day, tzinfo=timezone.utc)
+
+
+def test_tracker_records_joins_leaves_and_rejoins(tmp_path):
+    db_path = str(tmp_path / "database.db")
+    tracker = membership.MembershipTracker(1, db_path=db_path)
+
+    first = tracker.observe(_group((10, "member"), (20, "member")), _at(1))
+    assert [row["player_id"] for row in first.joined] == [10, 20]
+
+    second = tracker.observe(_group((10, "leader")), _at(2))
+    assert second.left == [20] and second.role_changes == {10: "leader"}
+
+    tracker.observe(_group((10, "leader"), (20, "member")), _at(3))
+
+    assert _intervals(db_path) == [
+        {"player_id": 10, "role": "leader", "first_seen_at": "2025-02-01 00:00:00", "last_seen_at": None, "left_at": None},
+        {"player_id": 20, "role": "member", "first_seen_at": "2025-02-01 00:00:00",
+         "last_seen_at": "2025-02-01 00:00:00", "left_at": "2025-02-02 00:00:00"},
+        {"player_id": 20, "role": "member", "first_seen_at": "2025-02-03 00:00:00", "last_seen_at": None, "left_at": None},
+    ]
+    assert database.read_data_freshness(db_path)["memberships"]["last_success_at"] == "2025-02-03 00:00:00"
+
+
+def test_tracker_writes_nothing_for_an_unchanged_roster(tmp_path, monkeypatch):
+    db_path = str(tmp_path / "database.db")
+    tracker = membership.MembershipTracker(1, db_path=db_path)
+    tracker.observe(_group((10, "member")), _at(1))
+
+    calls = []
+    monkeypatch.setattr(membership, "apply_membership_changes", lambda *a, **k: calls.append(k))
+    changes = tracker.observe(_group((10, "member")), _at(2))
+
+    assert not changes.changed
+    assert calls == [{
+        "joined": [], "left": [], "role_changes": {}, "observed_at": "2025-02-02 00:00:00",
+        "last_seen_at": "2025-02-01 00:00:00", "db_path": db_path,
+    }]
+
+
+def test_incomplete_roster_never_closes_intervals(tmp_path):
+    db_path = str(tmp_path / "database.db")
+    tracker = membership.MembershipTracker(1, db_path=db_path)
+    tracker.observe(_group((10, "member"), (20, "member")), _at(1))
+
+    partial = tracker.observe(_group((10, "member"), member_count=2), _at(2))
+    tracker.record_failure("HTTP 500")
+
+    assert not partial.complete and partial.left == []
+    assert all(row["left_at"] is None for row in _intervals(db_path))
+    freshness = database.read_data_freshness(db_path)["memberships"]
+    assert freshness["last_success_at"] == "2025-02-01 00:00:00"
+    assert freshness["last_error"] == "HTTP 500"
+
+
+def test_new_tracker_resumes_from_open_intervals(tmp_path):
+    db_path = str(tmp_path / "database.db")
+    membership.MembershipTracker(1, db_path=db_path).observe(_group((10, "member"), (20, "member")), _at(1))
+
+    changes = membership.MembershipTracker(1, db_path=db_path).observe(_group((10, "member")), _at(2))
+
+    assert changes.joined == [] and changes.left == [20]
+    assert len(_intervals(db_path)) == 2
@@ -0,0 +1,212 @@
+"""Tests for composing report windows from stored period rollups (weeklyupdater.period_rollups)."""
+
+import asyncio
+import types
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from wom import enums
+from wom.models import NameChangeStatus
+
+from python.utils import database
+from python.weeklyupdater import period_rollups
+from python.weeklyupdater.period_rollups import RollupFetchError, collect_period_activity, plan_cover
+from tests.conftest import FakeResult, make_gains_entry, make_player
+
+MAY = datetime(2025, 5, 1, 18, 0, tzinfo=timezone.utc)
+JUNE = datetime(2025, 6, 1, 18, 0, tzinfo=timezone.utc)
+WEEK = timedelta(days=7)
+ALICE = make_player("Alice", player_id=1)
+BOB = make_player("Bob", player_id=2)
+
+
+class _WindowedGroups:
+    """Group service whose gains are a fixed amount per player per day of the window."""
+
+    def __init__(self, *, daily=None, achievements=(), name_changes=(), fail=None):
+        self.daily = daily or {"overall": [(ALICE, 1000.0), (BOB, 10.0)], "ehb": [(ALICE, 1.0)]}
+        self.achievements = sorted(achievements, key=lambda item: item.created_at, reverse=True)
+        self.name_changes = sorted(name_changes, key=lambda item: item.created_at, reverse=True)
+        self.fail = fail
+        self.calls = []
+
+    async def get_gains(self, group_id, metric, *, start_date=None, end_date=None, **_kwargs):
+        self.calls.append(("get_gains", metric.value, start_date, end_date))
+        if self.fail == "gains":
+            return FakeResult(err="WOM unavailable")
+        days = (end_date - start_date).total_seconds() / 86400
+        return FakeResult(
+            value=[
+                make_gains_entry(player, gained=per_day * days)
+                for player, per_day in self.daily.get(metric.value, [])
+            ]
+        )
+
+    async def _page(self, name, items, limit, offset):
+        self.calls.append((name, offset))
+        if self.fail == name:
+            return FakeResult(err="WOM unavailable")
+        return FakeResult(value=items[offset: offset + limit])
+
+    async def get_achievements(self, group_id, *, limit, offset):
+        return await self._page("get_achievements", self.achievements, limit, offset)
+
+    async def get_name_changes(self, group_id, *, limit, offset):
+        return await self._page("get_name_changes", self.name_changes, limit, offset)
+
+
+def _collect(groups, start, end, **kwargs):
+    return asyncio.run(
+        collect_period_activity(
+            wom_client=types.SimpleNamespace(groups=groups),
+            group_id=7,
+            start_date=start,
+            end_date=end,
+            player_name_map={1: "Alice", 2: "Bob"},
+            log=lambda _message: None,
+            **kwargs,
+        )
+    )
+
+
+def _achievement(player, created_at, *, metric="agility", threshold=99):
+    return types.SimpleNamespace(
+        player_id=player.id,
+        player=player,
+        name=f"{threshold} {metric}",
+        metric=enums.Metric(metric),
+        measure=types.SimpleNamespace(value="levels"),
+        threshold=threshold,
+        created_at=created_at,
+    )
+
+
+def _rollup(rollup_id, start, end):
+    return {
+        "id": rollup_id,
+        "period_start": start.strftime("%Y-%m-%d %H:%M:%S"),
+        "period_end": end.strftime("%Y-%m-%d %H:%M:%S"),
+    }
+
+
+def test_plan_cover_takes_longest_rollups_and_reports_gaps():
+    rollups = [
+        _rollup(1, MAY, MAY + WEEK),
+        _rollup(2, MAY, MAY + 2 * WEEK),
+        _rollup(3, MAY + 3 * WEEK, JUNE),
+        _rollup(4, MAY + 3 * WEEK, JUNE + WEEK),  # runs past the window
+    ]
+
+    ids, gaps = plan_cover(rollups, MAY, JUNE)
+
+    assert ids == [2, 3]
+    assert gaps == [(MAY + 2 * WEEK, MAY + 3 * WEEK)]
+
+
+def test_weeks_are_stored_split_at_month_boundary_and_compose_the_month():
+    groups = _WindowedGroups(
+        achievements=[_achievement(ALICE, MAY + timedelta(days=3))],
+        name_changes=[
+            types.SimpleNamespace(
+                player_id=2, old_name="Bobby", new_name="Bob", status=NameChangeStatus.Approved,
+                created_at=MAY + timedelta(days=10),
+            )
+        ],
+    )
+    week_end = MAY - timedelta(days=3)
+    while week_end < JUNE + WEEK:
+        _collect(groups, week_end - WEEK, week_end, split_at=[week_end.replace(day=1)])
+        week_end += WEEK
+    groups.calls.clear()
+
+    month = _collect(groups, MAY, JUNE)
+
+    assert groups.calls == []
+    assert month.fetched_windows == []
+    overall = month.gains_for(enums.Metric.Overall)
+    assert [entry.player.display_name for entry in overall] == ["Alice", "Bob"]
+    assert overall[0].data.gained == pytest.approx(31 * 1000.0)
+    assert month.gains_for(enums.Metric.Ehp) == []
+    [achievement] = month.achievements
+    assert achievement.metric == enums.Metric.Agility and achievement.player.display_name == "Alice"
+    [change] = month.name_changes
+    assert change.status == NameChangeStatus.Approved and change.created_at == MAY + timedelta(days=10)
+
+
+def test_only_gaps_are_fetched_and_stored():
+    groups = _WindowedGroups()
+    _collect(groups, MAY, MAY + WEEK)
+    groups.calls.clear()
+
+    activity = _collect(groups, MAY, MAY + 2 * WEEK)
+
+    assert activity.stored_rollups == 1
+    assert activity.fetched_windows == [(MAY + WEEK, MAY + 2 * WEEK)]
+    assert {call[2] for call in groups.calls if call[0] == "get_gains"} == {MAY + WEEK}
+    assert activity.gains_for(enums.Metric.Ehb)[0].data.gained == pytest.approx(14.0)
+    assert len(database.read_period_rollups(7, "2025-05-01 18:00:00", "2025-05-15 18:00:00")) == 2
+
+
+@pytest.mark.parametrize("fail", ["gains", "get_achievements", "get_name_changes"])
+def test_failed_fetch_raises_and_stores_nothing(fail):
+    with pytest.raises(RollupFetchError):
+        _collect(_WindowedGroups(fail=fail), MAY, MAY + WEEK)
+
+    assert database.read_period_rollups(7, "2025-01-01 00:00:00", "2026-01-01 00:00:00") == []
+
+
+def test_open_window_is_reported_but_not_stored():
+    activity = _collect(_WindowedGroups(), MAY, MAY + WEEK, now=MAY + timedelta(days=2))
+
+    assert activity.gains_for(enums.Metric.Overall)
+    assert database.read_period_rollups(7, "2025-01-01 00:00:00", "2026-01-01 00:00:00") == []
+
+
+def test_stored_rollups_are_immutable():
+    start, end = "2025-05-01 18:00:00", "2025-05-08 18:00:00"
+    gains = [{"metric": "overall", "player_id": 1, "username": "Alice", "gained": 5.0}]
+
+    assert database.store_period_rollup(7, start, end, gains, []) is True
+    assert database.store_period_rollup(7, start, end, [dict(gains[0], gained=9.0)], []) is False
+
+    [rollup] = database.read_period_rollups(7, start, end)
+    assert database.read_period_rollup_gains([rollup["id"]])[0]["gained"] == 5.0
+
+
+def _fetch_overall(groups, start, end, now):
+    return asyncio.run(
+        period_rollups._fetch_gains(
+            types.SimpleNamespace(groups=groups), 7, enums.Metric.Overall, start, end, now=now
+        )
+    )
+
+
+def test_closed_window_gains_are_cached_for_good():
+    groups = _WindowedGroups()
+
+    first = _fetch_overall(groups, MAY, MAY + WEEK, now=JUNE)
+    again = _fetch_overall(groups, MAY, MAY + WEEK, now=JUNE + 52 * WEEK)
+
+    assert again == first
+    assert first[0] == {"player_id": 1, "username": "Alice", "gained": 7000.0}
+    assert len(groups.calls) == 1
+
+
+def test_open_window_gains_expire_after_ttl():
+    groups = _WindowedGroups()
+    now = MAY + timedelta(days=2)
+    ttl = timedelta(seconds=period_rollups.OPEN_WINDOW_TTL_SECONDS)
+
+    _fetch_overall(groups, MAY, MAY + WEEK, now=now)
+    _fetch_overall(groups, MAY, MAY + WEEK, now=now + ttl - timedelta(seconds=1))
+    assert len(groups.calls) == 1
+
+    _fetch_overall(groups, MAY, MAY + WEEK, now=now + ttl)
+    assert len(groups.calls) == 2
+
+
+def test_failed_gains_fetch_is_not_cached():
+    with pytest.raises(RollupFetchError):
+        _fetch_overall(_WindowedGroups(fail="gains"), MAY, MAY + WEEK, now=JUNE)
+
+    assert database.read_gains_window(7, "overall", "2025-05-01 18:00:00", "2025-05-08 18:00:00") is None
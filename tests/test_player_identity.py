@@ -0,0 +1,25 @@
+"""Tests for python/utils/player_identity.py."""
+
+from tests.conftest import make_membership, make_player
+from python.utils import database, player_identity
+
+
+def test_record_writes_only_new_ids_and_renames(tmp_path):
+    db_path = str(tmp_path / "database.db")
+    recorder = player_identity.PlayerIdentityRecorder(db_path=db_path)
+    roster = [make_membership(make_player("Alice", player_id=1)), make_membership(make_player("Bob", player_id=2))]
+
+    assert recorder.record(roster) == 2
+    assert recorder.record(roster) == 0
+
+    roster[0] = make_membership(make_player("Alicia", player_id=1))
+    assert recorder.record(roster) == 1
+    assert database.read_player_identities(db_path=db_path) == {1: "Alicia", 2: "Bob"}
+
+
+def test_new_recorder_seeds_from_stored_identities(tmp_path):
+    db_path = str(tmp_path / "database.db")
+    roster = [make_membership(make_player("Alice", player_id=1))]
+    player_identity.PlayerIdentityRecorder(db_path=db_path).record(roster)
+
+    assert player_identity.PlayerIdentityRecorder(db_path=db_path).record(roster) == 0
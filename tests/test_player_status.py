@@ -0,0 +1,40 @@
+"""Tests for python/utils/player_status.py."""
+
+from datetime import datetime, timezone
+
+from tests.conftest import make_membership, make_player
+from python.utils import database, player_status
+
+
+def _player(name, *, changed_day, status="active", player_id=1):
+    return make_player(
+        name,
+        player_id=player_id,
+        status=status,
+        last_changed_at=datetime(2025, 3, changed_day, 12, tzinfo=timezone.utc),
+        updated_at=datetime(2025, 3, 20, tzinfo=timezone.utc),
+    )
+
+
+def test_collect_writes_only_changed_rows(tmp_path, monkeypatch):
+    db_path = str(tmp_path / "database.db")
+    collector = player_status.PlayerStatusCollector(db_path=db_path)
+    roster = [make_membership(_player("alice", changed_day=1)), make_membership(_player("bob", changed_day=2, player_id=2))]
+
+    assert collector.collect(roster) == 2
+    assert collector.collect(roster) == 0
+
+    roster[1] = make_membership(_player("bob", changed_day=5, player_id=2))
+    assert collector.collect(roster) == 1
+
+    rows = {row["username"]: row for row in database.read_player_status_rows(db_path)}
+    assert rows["bob"]["last_changed_at"] == "2025-03-05 12:00:00"
+    assert rows["alice"]["wom_status"] == "active"
+
+
+def test_new_collector_seeds_from_stored_rows(tmp_path):
+    db_path = str(tmp_path / "database.db")
+    roster = [make_membership(_player("alice", changed_day=1))]
+    player_status.PlayerStatusCollector(db_path=db_path).collect(roster)
+
+    assert player_status.PlayerStatusCollector(db_path=db_path).collect(roster) == 0
@@ -222,6 +222,97 @@ def test_search_players_supports_name_sort(monkeypatch, sample_players):
     assert [player["username"] for player in result] == ["goblin_gaz", "silver_sam", "zenyte_zoe"]
 
 
+def test_search_index_matches_linear_scan_for_every_sort(monkeypatch):
+    """Indexed search returns what a substring scan plus sort would."""
+    ranks = {
+        f"{prefix}{index}": {"last_ehb": float((index * 37) % 101), "rank": rank}
+        for index in range(60)
+        for prefix, rank in (("Iron ", "Onyx"), ("main", "Goblin"))
+    }
+    monkeypatch.setattr(ranks_service, "load_ranks", lambda: ranks)
+    index = ranks_service.PlayerSearchIndex(ranks_service.get_rank_snapshot())
+    rank_positions = {name: i for i, name in enumerate(ranks_service.RANK_ORDER)}
+    sort_keys = {
+        "ehb": lambda p: (-p["ehb"], p["username"].lower()),
+        "name": lambda p: p["username"].lower(),
+        "rank": lambda p: (rank_positions.get(p["rank"], len(rank_positions)), -p["ehb"]),
+    }
+
+    for query in ("", "i", "N1", "iron 1", "main5", "on 4", "zzz"):
+        for sort, key in sort_keys.items():
+            expected = [
+                p for p in index.snapshot.players if query.lower().strip() in p["username"].lower()
+            ]
+            expected.sort(key=key)
+            assert [p["username"] for p in index.search(query, sort)] == [p["username"] for p in expected]
+
+
+def test_search_index_typeahead_prefers_prefix_matches(monkeypatch):
+    monkeypatch.setattr(ranks_service, "load_ranks", lambda: {
+        "Zulu": {"last_ehb": 500.0}, "alzu": {"last_ehb": 900.0}, "zulrah fan": {"last_ehb": 1.0},
+    })
+    index = ranks_service.PlayerSearchIndex(ranks_service.get_rank_snapshot())
+
+    assert [p["username"] for p in index.typeahead("zu", limit=3)] == ["zulrah fan", "Zulu", "alzu"]
+    assert [p["username"] for p in index.typeahead("ZU", limit=1)] == ["zulrah fan"]
+    assert index.typeahead("   ") == []
+
+
+def test_search_index_pages_cover_results_exactly_once(monkeypatch):
+    ranks = {f"p{i:03d}": {"last_ehb": float(i % 7), "rank": "Goblin"} for i in range(23)}
+    monkeypatch.setattr(ranks_service, "load_ranks", lambda: ranks)
+    index = ranks_service.PlayerSearchIndex(ranks_service.get_rank_snapshot())
+
+    for sort in ranks_service.SEARCH_SORTS:
+        seen, offset = [], 0
+        while offset is not None:
+            page = index.page("p", sort, offset, 10)
+            assert page.total == 23
+            seen.extend(player["username"] for player in page.players)
+            offset = page.next_offset
+        assert seen == [player["username"] for player in index.search("p", sort)]
+
+    assert index.page("", "ehb", 40, 10).players == []
+
+
+def test_get_search_index_is_reused_until_players_change(monkeypatch, sample_players):
+    from utils.database import upsert_players
+
+    calls = []
+    monkeypatch.setattr(ranks_service, "load_ranks", lambda: calls.append(1) or sample_players)
+
+    first = ranks_service.get_search_index()
+    assert ranks_service.get_search_index() is first
+    upsert_players({"new_player": {"last_ehb": 1.0, "rank": "Goblin"}})
+
+    assert ranks_service.get_search_index() is not first
+    assert len(calls) == 2
+
+
+def test_get_rank_snapshot_reads_the_embedded_roster_while_it_is_current(monkeypatch):
+    from utils.database import read_data_versions, upsert_players
+    from utils.roster import Roster
+    from web.services.bot_state import BotState
+
+    roster = Roster({"in_memory": {"last_ehb": 50.0, "rank": "Opal"}})
+    state = BotState(roster=roster, roster_version=read_data_versions(["players"])["players"])
+    calls = []
+    monkeypatch.setattr(ranks_service, "load_ranks", lambda: calls.append(1) or {"stored": {"last_ehb": 1.0}})
+    monkeypatch.setattr(ranks_service, "_bot_state", state)
+
+    assert [p["username"] for p in ranks_service.get_all_players_sorted()] == ["in_memory"]
+    assert calls == []
+
+    # Another writer changed ``players``; the roster is stale until the rank check reloads it.
+    upsert_players({"stored": {"last_ehb": 1.0, "rank": "Goblin"}})
+    assert [p["username"] for p in ranks_service.get_all_players_sorted()] == ["stored"]
+
+    # Split mode (or no app) has no roster.
+    ranks_service.use_bot_state(None)
+    assert [p["username"] for p in ranks_service.get_all_players_sorted()] == ["stored"]
+    assert len(calls) == 2
+
+
 # ---------------------------------------------------------------------------
 # get_rank_thresholds
 # ---------------------------------------------------------------------------
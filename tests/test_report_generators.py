@@ -13,6 +13,7 @@ from python.weeklyupdater import weekly_reporter
 from python.weeklyupdater import monthly_reporter
 from python.weeklyupdater import yearly_reporter
 from python.weeklyupdater import achievement_retention
+from python.weeklyupdater import period_rollups
 
 
 # ---------------------------------------------------------------------------
@@ -409,7 +410,7 @@ def test_additional_achievement_categories_exclude_99s():
 
 
 # ---------------------------------------------------------------------------
-# weekly_reporter._get_group_gains — regression test for the offset/pagination
+# period_rollups._fetch_gains — regression test for the offset/pagination
 # incident (WOM's gains endpoint ignores `offset` and always returns the full
 # member list, so a paginating `while True` loop against it never terminates).
 # ---------------------------------------------------------------------------
@@ -422,7 +423,7 @@ def test_get_group_gains_fetches_full_group_in_a_single_request(fake_wom_client)
     client = fake_wom_client(gains={"overall": entries})
 
     gains = asyncio.run(
-        weekly_reporter._get_group_gains(
+        period_rollups._fetch_gains(
             client,
             group_id=7,
             metric=enums.Metric.Overall,
@@ -435,6 +436,17 @@ def test_get_group_gains_fetches_full_group_in_a_single_request(fake_wom_client)
     assert client.groups.calls == [("get_gains", enums.Metric.Overall, None, None)]
 
 
+def _patch_rollup_fetches(monkeypatch, achievements):
+    async def no_gains(*_args, **_kwargs):
+        return []
+
+    async def dated_pages(*_args, **kwargs):
+        return list(achievements) if kwargs["label"] == "achievements" else []
+
+    monkeypatch.setattr(period_rollups, "_fetch_gains", no_gains)
+    monkeypatch.setattr(period_rollups, "_fetch_dated_pages", dated_pages)
+
+
 def test_weekly_report_renders_and_persists_boss_kc_from_existing_fetch(monkeypatch):
     dt = datetime(2025, 6, 4, tzinfo=timezone.utc)
     achievement = _fake_achievement(
@@ -450,27 +462,16 @@ def test_weekly_report_renders_and_persists_boss_kc_from_existing_fetch(monkeypa
     # the stable identity/alias in that case.
     achievement.player = None
 
-    async def no_gains(*_args, **_kwargs):
-        return []
-
     async def member_map(*_args, **_kwargs):
         return {42: "Hero Player"}
 
-    async def no_changes(*_args, **_kwargs):
-        return []
-
-    async def achievements(*_args, **_kwargs):
-        return [achievement]
-
-    monkeypatch.setattr(weekly_reporter, "_get_group_gains", no_gains)
+    _patch_rollup_fetches(monkeypatch, [achievement])
     monkeypatch.setattr(weekly_reporter, "_get_group_member_map", member_map)
-    monkeypatch.setattr(weekly_reporter, "_get_group_name_changes", no_changes)
-    monkeypatch.setattr(weekly_reporter, "_get_group_achievements", achievements)
 
     report = "\n".join(
         asyncio.run(
             weekly_reporter._generate_weekly_report(
-                wom_client=object(),
+                wom_client=types.SimpleNamespace(groups=object()),
                 group_id=7,
                 end_date=datetime(2025, 6, 8, 18, 0, tzinfo=timezone.utc),
                 log=lambda _message: None,
@@ -507,49 +508,30 @@ def test_longer_reports_persist_existing_achievement_fetches(monkeypatch, report
         name="50m Agility",
     )
 
-    async def no_gains(*_args, **_kwargs):
-        return []
-
     async def member_map(*_args, **_kwargs):
         return {42: "Hero Player"}
 
+    _patch_rollup_fetches(monkeypatch, [achievement])
+    client = types.SimpleNamespace(groups=object())
     if reporter_name == "monthly":
-        async def dated_pages(*_args, **kwargs):
-            return [achievement] if kwargs["label"] == "achievements" else []
-
-        monkeypatch.setattr(monthly_reporter, "_get_group_gains", no_gains)
         monkeypatch.setattr(monthly_reporter, "_get_group_member_map", member_map)
-        monkeypatch.setattr(monthly_reporter, "_get_dated_pages", dated_pages)
         messages = asyncio.run(
             monthly_reporter._generate_monthly_report(
-                wom_client=types.SimpleNamespace(groups=object()),
+                wom_client=client,
                 group_id=7,
                 end_date=datetime(2024, 7, 1, 18, 0, tzinfo=timezone.utc),
                 log=lambda _message: None,
             )
         )
     else:
-        async def no_changes(*_args, **_kwargs):
-            return []
-
-        async def achievements(*_args, **_kwargs):
-            return [achievement]
-
         async def no_stats(*_args, **_kwargs):
             return None
 
-        async def no_sleep(*_args, **_kwargs):
-            return None
-
-        monkeypatch.setattr(yearly_reporter, "_get_group_gains", no_gains)
         monkeypatch.setattr(yearly_reporter, "_get_group_member_map", member_map)
-        monkeypatch.setattr(yearly_reporter, "_get_group_name_changes", no_changes)
-        monkeypatch.setattr(yearly_reporter, "_get_group_achievements", achievements)
         monkeypatch.setattr(yearly_reporter, "_get_group_statistics", no_stats)
-        monkeypatch.setattr(yearly_reporter.asyncio, "sleep", no_sleep)
         messages = asyncio.run(
             yearly_reporter._generate_yearly_report(
-                wom_client=object(),
+                wom_client=client,
                 group_id=7,
                 end_date=datetime(2025, 1, 1, 18, 0, tzinfo=timezone.utc),
                 log=lambda _message: None,
@@ -0,0 +1,117 @@
+"""Tests for the array-backed rank state (utils.roster)."""
+
+import random
+
+from python.utils import rank_utils
+from python.utils.roster import Roster
+
+
+def _roster_from_db_rows():
+    return Roster.from_rows([
+        ("alice", 42.5, "Silver", 300.0, "Adept", 123456789),
+        ("bob", 10.0, "Bronze", 0.0, "Unknown", None),
+    ])
+
+
+def test_from_rows_matches_snapshot_entry_shape():
+    roster = _roster_from_db_rows()
+
+    assert roster == {
+        "alice": {"last_ehb": 42.5, "rank": "Silver", "last_ehp": 300.0, "ehp_rank": "Adept", "total_xp": 123456789},
+        "bob": {"last_ehb": 10.0, "rank": "Bronze"},
+    }
+    assert list(roster) == ["alice", "bob"]
+    assert "carol" not in roster
+    assert roster.changed_rows() == []
+
+
+def test_records_read_columns_without_entry_dicts():
+    records = list(_roster_from_db_rows().records())
+
+    assert records[0].ehp_rank == "Adept"
+    assert records[1].ehp is None and records[1].ehp_rank is None and records[1].total_xp is None
+
+
+def test_setitem_marks_only_real_changes():
+    roster = _roster_from_db_rows()
+
+    roster["bob"] = {"last_ehb": 10, "rank": "Bronze", "note": "ignored"}
+    assert roster.changed_rows() == []
+
+    roster["bob"] = rank_utils.merge_manual_rank_update(roster["bob"], 50, "Silver")
+    roster["carol"] = {"last_ehb": 1, "rank": "Stone"}
+    assert roster.changed_entries() == {
+        "bob": {"last_ehb": 50.0, "rank": "Silver"},
+        "carol": {"last_ehb": 1.0, "rank": "Stone"},
+    }
+
+
+def test_delete_keeps_remaining_rows_addressable():
+    roster = _roster_from_db_rows()
+    roster["carol"] = {"last_ehb": 1, "rank": "Stone"}
+
+    del roster["alice"]
+
+    assert list(roster) == ["bob", "carol"]
+    assert roster["carol"]["rank"] == "Stone"
+    assert len(roster) == 2
+
+
+def test_update_member_matches_compute_member_update():
+    rng = random.Random(7)
+    ranks = ["Unknown", "Stone", "Bronze", "Silver"]
+    for _ in range(500):
+        last_data = {}
+        if rng.random() < 0.8:
+            last_data = {"last_ehb": rng.choice([0.0, 5.0, 10.0]), "rank": rng.choice(ranks)}
+            if rng.random() < 0.5:
+                last_data.update(last_ehp=rng.choice([0.0, 5.0, 10.0]), ehp_rank=rng.choice(ranks))
+            if rng.random() < 0.5:
+                last_data["total_xp"] = rng.choice([100, 200])
+        ehb, rank = rng.choice([0.0, 5.0, 10.0]), rng.choice(ranks)
+        ehp, ehp_rank = rng.choice([0.0, 5.0, 10.0]), rng.choice(ranks)
+        track_ehp = rng.random() < 0.5
+        total_xp = rng.choice([None, 100, 300])
+
+        roster = Roster({"p": last_data} if last_data else None)
+        roster.mark_clean()
+        update = roster.update_member(
+            "p", ehb, rank, ehp=ehp, ehp_rank=ehp_rank, track_ehp=track_ehp, total_xp=total_xp
+        )
+        expected = rank_utils.compute_member_update(
+            last_data, ehb, rank, ehp=ehp, ehp_rank=ehp_rank, track_ehp=track_ehp, total_xp=total_xp
+        )
+        expected_entry = rank_utils._sanitize_player_entry(expected["entry"])
+
+        assert roster["p"] == expected_entry
+        assert update.ehb_increase == expected["ehb_increase"]
+        assert update.ehb_old_rank == expected["ehb_old_rank"]
+        assert update.ehp_increase == expected["ehp_increase"]
+        assert update.ehp_old_rank == expected["ehp_old_rank"]
+        assert bool(roster.changed_rows()) == (
+            not last_data or rank_utils._sanitize_player_entry(last_data) != expected_entry
+        )
+
+
+def test_save_ranks_writes_only_changed_rows(monkeypatch):
+    calls = []
+    monkeypatch.setattr(rank_utils, "upsert_players", lambda players: calls.append(players))
+    roster = _roster_from_db_rows()
+
+    roster.update_member("alice", 42.5, "Silver", total_xp=123456789)
+    roster.update_member("bob", 12.0, "Bronze")
+    rank_utils.save_ranks(roster)
+    rank_utils.save_ranks(roster)
+
+    assert calls == [{"bob": {"last_ehb": 12.0, "rank": "Bronze"}}, {}]
+
+
+def test_load_ranks_round_trips_through_sqlite():
+    rank_utils.save_ranks({"alice": {"last_ehb": 42.5, "rank": "Silver", "total_xp": 99}})
+
+    roster = rank_utils.load_ranks()
+    roster.update_member("alice", 50.0, "Gold")
+    rank_utils.save_ranks(roster)
+
+    assert isinstance(rank_utils.load_ranks(), Roster)
+    assert rank_utils.load_ranks() == {"alice": {"last_ehb": 50.0, "rank": "Gold", "total_xp": 99}}
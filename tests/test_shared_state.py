@@ -0,0 +1,168 @@
+"""Tests for the split-mode dashboard: shared state tables and read-only access."""
+
+import asyncio
+import sqlite3
+from datetime import datetime, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+
+from utils import api_usage, database
+from web.app import create_app
+from web.routers import admin
+from web.services import ranks_service
+from web.services.bot_state import BotState
+from web.services.shared_state import (
+    PolledEventFeed,
+    SharedApiUsage,
+    SharedBotState,
+    SharedStatePublisher,
+)
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def _tracker():
+    return api_usage.ApiUsageTracker(rate_limit_per_minute=5, cooldown_seconds=60, log=lambda m: None)
+
+
+def _bot_state(**kwargs) -> BotState:
+    state = BotState(
+        check_interval=1800,
+        silent=True,
+        bot_started_at=datetime(2025, 1, 1, 0, 0, tzinfo=timezone.utc),
+        last_rank_check=datetime(2025, 6, 1, 12, 0, tzinfo=timezone.utc),
+        **kwargs,
+    )
+    state.log_buffer.append("2025-06-01 12:00:00 - first")
+    return state
+
+
+# ---------------------------------------------------------------------------
+# Publisher (bot side)
+# ---------------------------------------------------------------------------
+
+def test_publisher_writes_only_changes_and_new_log_lines():
+    state = _bot_state()
+    publisher = SharedStatePublisher(state, usage=_tracker())
+
+    assert publisher.publish_once() > 1
+    assert publisher.publish_once() == 0
+
+    state.check_interval = 600
+    state.log_buffer.append("2025-06-01 12:00:05 - second")
+    assert publisher.publish_once() == 2
+
+    values = database.read_bot_runtime_state()
+    assert values["check_interval"] == 600
+    assert values["bot_started_at"] == "2025-01-01T00:00:00+00:00"
+    assert [line for _, line in database.read_bot_log_lines()] == [
+        "2025-06-01 12:00:00 - first",
+        "2025-06-01 12:00:05 - second",
+    ]
+
+
+def test_log_lines_are_trimmed_to_keep():
+    database.append_bot_log_lines([f"line {index}" for index in range(5)], keep=3)
+
+    assert [line for _, line in database.read_bot_log_lines()] == ["line 2", "line 3", "line 4"]
+    assert database.read_last_bot_log_seq() == 5
+
+
+# ---------------------------------------------------------------------------
+# Readers (dashboard side)
+# ---------------------------------------------------------------------------
+
+def test_shared_bot_state_reads_published_values():
+    SharedStatePublisher(_bot_state(), usage=_tracker()).publish_once()
+    shared = SharedBotState(ttl_seconds=0)
+
+    assert shared.bot_started_at == datetime(2025, 1, 1, 0, 0, tzinfo=timezone.utc)
+    assert shared.last_group_refresh is None
+    assert shared.check_interval == 1800
+    assert shared.silent is True
+    assert shared.debug is False
+    assert shared.read_only and shared.list_all_members_and_ranks is None
+    assert list(shared.log_buffer) == ["2025-06-01 12:00:00 - first"]
+    with pytest.raises(AttributeError):
+        shared.not_a_field
+
+
+def test_polled_feed_returns_new_rows_and_times_out():
+    database.append_bot_log_lines(["a", "b"])
+    feed = PolledEventFeed(
+        lambda after, limit: database.read_bot_log_lines(after, limit),
+        database.read_last_bot_log_seq,
+        poll_seconds=0.01,
+    )
+
+    assert feed.last_seq == 2
+    assert feed.since(1) == [(2, "b")]
+    assert run(feed.wait(2, timeout=0.02)) == []
+    with pytest.raises(RuntimeError):
+        feed.append("c")
+
+
+def test_shared_api_usage_reads_breaker_and_calls():
+    tracker = _tracker()
+    database.log_api_call(method="GET", endpoint="groups/1", status_code=200, duration_ms=5, outcome="ok")
+    database.log_api_call(method="GET", endpoint="groups/1", status_code=429, duration_ms=5, outcome="rate_limited")
+    for _ in range(5):
+        tracker.before_request("GET", "groups/{id}")
+    with pytest.raises(api_usage.ApiCircuitOpenError):
+        tracker.before_request("GET", "groups/{id}")
+    SharedStatePublisher(BotState(), usage=tracker).publish_once()
+
+    usage = SharedApiUsage(SharedBotState(ttl_seconds=0))
+
+    assert usage.rate_limit_per_minute == 5
+    assert usage.breaker_status()["open"] is True
+    assert usage.calls_in_last(60) == usage.events.last_seq
+    assert usage.events.since(1)[0][1]["status_code"] == 429
+
+
+# ---------------------------------------------------------------------------
+# Read-only database role
+# ---------------------------------------------------------------------------
+
+def test_read_only_connections_reject_writes(monkeypatch):
+    database.append_bot_log_lines(["before"])
+    monkeypatch.setenv(database.READ_ONLY_ENV, "1")
+
+    assert [line for _, line in database.read_bot_log_lines()] == ["before"]
+    with pytest.raises(sqlite3.OperationalError):
+        database.append_bot_log_lines(["after"])
+
+
+def test_standalone_app_serves_admin_read_only(monkeypatch):
+    monkeypatch.setattr(ranks_service, "load_ranks", lambda: {})
+    SharedStatePublisher(_bot_state(), usage=_tracker()).publish_once()
+    monkeypatch.setenv(database.READ_ONLY_ENV, "1")
+    shared = SharedBotState(ttl_seconds=0)
+    app = create_app(shared, api_usage=SharedApiUsage(shared))
+
+    with TestClient(app) as client:
+        status = client.get("/admin/status")
+        usage = client.get("/admin/api-usage")
+        config = client.post("/admin/config", data={"silent": "false"})
+
+    assert status.status_code == 200 and "1800" in status.text
+    assert usage.status_code == 200
+    assert "only be changed in the bot process" in config.text
+
+
+def test_admin_stream_uses_shared_usage(monkeypatch):
+    monkeypatch.setattr(admin, "api_usage_tracker", _tracker())
+    database.log_api_call(method="GET", endpoint="groups/7", status_code=200, duration_ms=9, outcome="ok")
+    shared = SharedBotState(ttl_seconds=0)
+
+    async def scenario():
+        stream = admin.admin_event_stream(shared, "0.0", SharedApiUsage(shared))
+        message = await anext(stream)
+        await stream.aclose()
+        return message
+
+    message = run(scenario())
+    assert message.startswith("event: usage-calls\nid: 0.1\n") and "groups/7" in message
@@ -0,0 +1,50 @@
+"""Tests for the boot phase profile and the lazily imported web stack."""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+from utils.startup_profile import StartupProfile
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_profile_records_phases_and_reports_once():
+    clock = FakeClock()
+    profile = StartupProfile(started_at=99.5, clock=clock)
+    profile.record_since("imports", 99.5)
+    with profile.phase("database init"):
+        clock.now += 0.012
+    clock.now += 2.5
+
+    assert profile.phases == [("imports", 0.5), ("database init", pytest.approx(0.012))]
+    assert profile.report() == "Startup profile: imports 500 ms, database init 12 ms; ready after 3.01 s."
+    assert profile.report() is None
+
+
+def test_profile_phase_is_recorded_when_block_raises():
+    profile = StartupProfile(clock=FakeClock())
+    with pytest.raises(RuntimeError):
+        with profile.phase("legacy import"):
+            raise RuntimeError("boom")
+    assert [name for name, _ in profile.phases] == ["legacy import"]
+
+
+def test_bot_state_import_does_not_load_web_stack():
+    python_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "python")
+    code = (
+        "import sys; import web.services.bot_state; "
+        "print(any(name in sys.modules for name in ('fastapi', 'uvicorn', 'jinja2', 'web.app')))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=python_dir, capture_output=True, text=True, check=True,
+    )
+    assert result.stdout.strip() == "False"
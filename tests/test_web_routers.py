@@ -3,6 +3,7 @@
 from contextlib import asynccontextmanager
 from datetime import datetime, timezone
 import re
+import sqlite3
 
 import pytest
 from fastapi import FastAPI
@@ -10,8 +11,7 @@ from fastapi.testclient import TestClient
 
 from web import create_app
 from web.services.bot_state import BotState
-from web.routers import admin, charts, dashboard, group, players, reports
-from web.services.csv_service import CsvReadResult
+from web.routers import admin, charts, competitions, dashboard, group, players, reports
 from utils import database
 
 
@@ -47,6 +47,7 @@ def _make_app(bot_state: BotState) -> FastAPI:
     app.include_router(charts.router, prefix="/charts")
     app.include_router(group.router, prefix="/group")
     app.include_router(players.router, prefix="/players")
+    app.include_router(competitions.router, prefix="/competitions")
     return app
 
 
@@ -165,6 +166,32 @@ def test_admin_config_sets_debug_without_silent():
     assert state.debug is True
 
 
+# ---------------------------------------------------------------------------
+# POST /admin/achievement-backfill
+# ---------------------------------------------------------------------------
+
+def test_admin_backfill_request_and_cancel():
+    """The panel stores the requested window; the bot process does the fetching."""
+    with TestClient(_make_app(_make_bot_state())) as client:
+        response = client.post("/admin/achievement-backfill", data={"start": "2025-01-01", "end": "2025-02-01"})
+        assert "2025-01-01 00:00:00 - 2025-02-01 00:00:00 UTC: pending" in response.text
+        client.post("/admin/achievement-backfill", data={"cancel": "1"})
+
+    assert database.read_achievement_backfill()["status"] == "cancelled"
+
+
+def test_admin_backfill_rejects_bad_window_and_read_only_dashboard():
+    state = _make_bot_state()
+    with TestClient(_make_app(state)) as client:
+        response = client.post("/admin/achievement-backfill", data={"start": "2025-02-01", "end": "2025-01-01"})
+        assert "feedback error" in response.text
+        state.read_only = True
+        response = client.post("/admin/achievement-backfill", data={"start": "2025-01-01", "end": "2025-02-01"})
+        assert "feedback error" in response.text
+
+    assert database.read_achievement_backfill() is None
+
+
 # ---------------------------------------------------------------------------
 # GET /charts/api/rank-distribution
 # ---------------------------------------------------------------------------
@@ -309,26 +336,26 @@ def test_group_stats_zero_avg_when_no_players(monkeypatch):
 # GET /players/{username}/history
 # ---------------------------------------------------------------------------
 
-def test_player_history_returns_json_list(monkeypatch, sample_csv_file):
-    """Player history endpoint returns a JSON array."""
-    from web.services import csv_service
-    monkeypatch.setattr(csv_service, "_resolve_csv_path", lambda _: str(sample_csv_file))
+def test_player_history_follows_renames():
+    """Player history reads SQLite by player ID, so a rename does not split the series."""
+    database.log_ehb_history("OldName", 1.0, timestamp="2025-01-01 00:00:00", player_id=7)
+    database.log_ehb_history("NewName", 2.0, timestamp="2025-02-01 00:00:00", player_id=7)
 
     state = _make_bot_state()
     with TestClient(_make_app(state)) as client:
-        response = client.get("/players/goblin_gaz/history")
+        response = client.get("/players/NewName/history")
+        cached = client.get("/players/NewName/history", headers={"If-None-Match": response.headers["ETag"]})
 
     assert response.status_code == 200
-    data = response.json()
-    assert isinstance(data, list)
-    assert len(data) == 2
+    assert response.json() == [
+        {"timestamp": "2025-01-01 00:00:00", "ehb": 1.0},
+        {"timestamp": "2025-02-01 00:00:00", "ehb": 2.0},
+    ]
+    assert cached.status_code == 304
 
 
-def test_player_history_empty_for_unknown_player(monkeypatch, sample_csv_file):
+def test_player_history_empty_for_unknown_player():
     """Unknown player returns an empty JSON array (not 404)."""
-    from web.services import csv_service
-    monkeypatch.setattr(csv_service, "_resolve_csv_path", lambda _: str(sample_csv_file))
-
     state = _make_bot_state()
     with TestClient(_make_app(state)) as client:
         response = client.get("/players/no_such_player/history")
@@ -387,7 +414,7 @@ def test_database_history_endpoints_surface_read_errors(
     monkeypatch, endpoint, reader_name, expected_error
 ):
     """SQLite chart failures use a consistent status, payload, and error header."""
-    def explode(*args):
+    def explode(*args, **kwargs):
         raise OSError("database unavailable")
 
     monkeypatch.setattr(charts, reader_name, explode)
@@ -400,20 +427,153 @@ def test_database_history_endpoints_surface_read_errors(
     assert response.headers["X-Data-Error"].startswith(expected_error)
 
 
-def test_ehb_history_endpoint_normalizes_service_errors(monkeypatch):
-    """CSV chart failures use the same 503 + error-header contract."""
-    monkeypatch.setattr(
-        charts,
-        "read_player_ehb_history",
-        lambda player: CsvReadResult([], "EHB history could not be loaded."),
-    )
+def test_history_endpoints_filter_range_and_downsample():
+    """``from``/``to`` bound the series and ``points`` caps it, keeping both ends."""
+    for day in range(1, 31):
+        database.log_ehp_history("alice", 100.0 + day, timestamp=f"2025-01-{day:02d} 12:00:00")
+
+    with TestClient(_make_app(_make_bot_state())) as client:
+        ranged = client.get(
+            "/charts/api/ehp-history?player=alice&from=2025-01-10&to=2025-01-20T23:59:59"
+        ).json()
+        sampled = client.get("/charts/api/ehp-history?player=alice&points=10").json()
+        invalid = client.get("/charts/api/ehp-history?player=alice&points=1")
+
+    assert [row["timestamp"][:10] for row in ranged] == [f"2025-01-{day}" for day in range(10, 21)]
+    assert len(sampled) == 10
+    assert sampled[0]["timestamp"] == "2025-01-01 12:00:00"
+    assert sampled[-1]["timestamp"] == "2025-01-30 12:00:00"
+    assert invalid.status_code == 422
+
+
+def test_history_endpoint_answers_matching_etag_with_304():
+    """A repeat request with the current ETag is a bodyless 304 until data changes."""
+    database.log_ehp_history("alice", 120.0, timestamp="2025-01-01 12:00:00")
+    url = "/charts/api/ehp-history?player=alice"
+
+    with TestClient(_make_app(_make_bot_state())) as client:
+        first = client.get(url)
+        etag = first.headers["ETag"]
+        repeat = client.get(url, headers={"If-None-Match": etag})
+        other_query = client.get(url + "&points=10", headers={"If-None-Match": etag})
+        database.log_ehp_history("alice", 130.0, timestamp="2025-02-01 12:00:00")
+        after_write = client.get(url, headers={"If-None-Match": etag})
+
+    assert first.status_code == 200
+    assert etag.startswith('W/"')
+    assert repeat.status_code == 304
+    assert repeat.content == b""
+    assert other_query.status_code == 200
+    assert after_write.status_code == 200
+    assert after_write.headers["ETag"] != etag
+    assert len(after_write.json()) == 2
+
+
+def test_group_stats_etag_tracks_rank_snapshot(monkeypatch, sample_players):
+    from web.services import ranks_service
+
+    monkeypatch.setattr(ranks_service, "load_ranks", lambda: sample_players)
+
+    with TestClient(_make_app(_make_bot_state())) as client:
+        etag = client.get("/group/api/stats").headers["ETag"]
+        unchanged = client.get("/group/api/stats", headers={"If-None-Match": etag})
+        database.upsert_players({"alice": {"last_ehb": 1.0, "rank": "Goblin"}})
+        changed = client.get("/group/api/stats", headers={"If-None-Match": etag})
+
+    assert unchanged.status_code == 304
+    assert changed.status_code == 200
+
+
+def test_history_error_responses_carry_no_etag(monkeypatch):
+    def explode(*args, **kwargs):
+        raise OSError("database unavailable")
+
+    monkeypatch.setattr(charts, "read_player_ehp_history", explode)
+
+    with TestClient(_make_app(_make_bot_state())) as client:
+        response = client.get("/charts/api/ehp-history?player=alice")
+
+    assert response.status_code == 503
+    assert "ETag" not in response.headers
+
+
+def test_history_batch_returns_all_series_in_one_query(monkeypatch):
+    """Several players come back grouped from one SQLite read, keyed as requested."""
+    database.log_ehb_history("Alice", 10.0, timestamp="2025-01-01 12:00:00")
+    database.log_ehb_history("Alice", 12.0, timestamp="2025-01-02 12:00:00")
+    database.log_ehb_history("bob", 5.0, timestamp="2025-01-01 12:00:00")
+    calls = []
+    real_reader = charts.read_history_batch
+
+    def counting_reader(*args, **kwargs):
+        calls.append(args)
+        return real_reader(*args, **kwargs)
+
+    monkeypatch.setattr(charts, "read_history_batch", counting_reader)
+
+    with TestClient(_make_app(_make_bot_state())) as client:
+        data = client.get("/charts/api/history-batch?players=alice,bob&players=nobody&series=ehb").json()
+
+    assert len(calls) == 1
+    assert data == {
+        "alice": [
+            {"timestamp": "2025-01-01 12:00:00", "ehb": 10.0},
+            {"timestamp": "2025-01-02 12:00:00", "ehb": 12.0},
+        ],
+        "bob": [{"timestamp": "2025-01-01 12:00:00", "ehb": 5.0}],
+        "nobody": [],
+    }
+
+
+def test_single_and_batch_ehb_endpoints_return_the_same_series():
+    database.log_ehb_history("OldName", 1.0, timestamp="2025-01-01 00:00:00", player_id=7)
+    database.log_ehb_history("NewName", 2.0, timestamp="2025-02-01 00:00:00", player_id=7)
+    database.log_ehb_history("Legacy", 3.0, timestamp="2025-01-15 00:00:00")
+    bounds = "from=2025-01-01T00:00:00&to=2025-03-01T00:00:00"
+
+    with TestClient(_make_app(_make_bot_state())) as client:
+        single = {
+            name: client.get(f"/charts/api/ehb-history?player={name}&{bounds}").json()
+            for name in ("NewName", "Legacy")
+        }
+        batch = client.get(f"/charts/api/history-batch?players=NewName,Legacy&series=ehb&{bounds}").json()
+
+    assert batch == single
+    assert len(single["NewName"]) == 2
+
+
+def test_history_batch_reads_gains_metric_and_caps_players():
+    database.log_gains_snapshot([
+        {"snapshot_time": "2025-01-08 00:00:00", "period_start": "2025-01-01 00:00:00",
+         "period_end": "2025-01-08 00:00:00", "username": "alice", "metric": "overall", "gained": 5000.0},
+        {"snapshot_time": "2025-01-08 00:00:00", "period_start": "2025-01-01 00:00:00",
+         "period_end": "2025-01-08 00:00:00", "username": "alice", "metric": "ehb", "gained": 3.0},
+    ])
+    too_many = ",".join(f"p{index}" for index in range(charts.MAX_BATCH_PLAYERS + 1))
+
+    with TestClient(_make_app(_make_bot_state())) as client:
+        gains = client.get("/charts/api/history-batch?players=alice&series=gains&metric=overall").json()
+        rejected = client.get(f"/charts/api/history-batch?players={too_many}")
+        unknown_series = client.get("/charts/api/history-batch?players=alice&series=kills")
+
+    assert unknown_series.status_code == 422
+    assert gains == {"alice": [{"timestamp": "2025-01-08 00:00:00", "gained": 5000.0}]}
+    assert rejected.status_code == 422
+
+
+def test_ehb_history_endpoint_normalizes_read_errors(monkeypatch):
+    """EHB chart failures use the same 503 + error-header contract as the other series."""
+    def fail(*_args, **_kwargs):
+        raise sqlite3.OperationalError("disk I/O error")
+
+    monkeypatch.setattr(charts, "read_player_ehb_history", fail)
 
     with TestClient(_make_app(_make_bot_state())) as client:
         response = client.get("/charts/api/ehb-history?player=alice")
 
     assert response.status_code == 503
     assert response.json() == []
-    assert response.headers["X-Data-Error"] == "EHB history could not be loaded."
+    assert response.headers["X-Data-Error"].startswith("EHB history could not be loaded.")
 
 
 def test_players_page_shows_ehp_columns(monkeypatch, sample_players):
@@ -455,6 +615,42 @@ def test_legacy_player_uses_not_tracked_ehp_fallback(monkeypatch):
 # HTML routes
 # ---------------------------------------------------------------------------
 
+def test_full_app_gzips_large_json_bodies():
+    for day in range(1, 29):
+        database.log_ehp_history("alice", 100.0 + day, timestamp=f"2025-02-{day:02d} 12:00:00")
+
+    app = create_app(_make_bot_state(), log_func=lambda message: None)
+    with TestClient(app) as client:
+        response = client.get(
+            "/charts/api/ehp-history?player=alice", headers={"Accept-Encoding": "gzip"}
+        )
+
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert len(response.json()) == 28
+
+
+def test_full_app_serves_ranks_from_the_rank_check_roster(monkeypatch):
+    from utils.roster import Roster
+    from web.services import ranks_service
+
+    def no_sqlite():
+        raise AssertionError("embedded dashboard reloaded the roster from SQLite")
+
+    monkeypatch.setattr(ranks_service, "load_ranks", no_sqlite)
+    state = _make_bot_state(
+        roster=Roster({"alice": {"last_ehb": 120.0, "rank": "Opal"}}),
+        roster_version=database.read_data_versions(["players"])["players"],
+    )
+
+    with TestClient(create_app(state, log_func=lambda message: None)) as client:
+        data = client.get("/group/api/stats").json()
+
+    assert data["total_players"] == 1
+    assert data["total_ehb"] == 120.0
+    assert ranks_service._bot_state is None
+
+
 def test_robots_txt_exposes_crawler_policy():
     """Crawler policy is served from the required root URL."""
     with TestClient(_make_app(_make_bot_state())) as client:
@@ -585,6 +781,41 @@ def test_players_search_empty_state(monkeypatch, sample_players):
     assert "No players matched" in response.text
 
 
+def test_players_search_pages_with_load_more_row(monkeypatch):
+    from web.services import ranks_service
+
+    ranks = {f"player{i:02d}": {"last_ehb": float(100 - i), "rank": "Goblin"} for i in range(5)}
+    monkeypatch.setattr(ranks_service, "load_ranks", lambda: ranks)
+
+    with TestClient(_make_app(_make_bot_state())) as client:
+        first = client.get("/players/search?q=player&limit=2")
+        last = client.get("/players/search?q=player&limit=2&offset=4")
+        listing = client.get("/players/api/list?sort=name&offset=2&limit=2")
+
+    assert first.text.count("<tr") == 3
+    assert 'hx-get="/players/search?q=player&amp;sort=ehb&amp;offset=2&amp;limit=2"' in first.text
+    assert "player04" in last.text and "load-more" not in last.text
+    assert "No players matched" not in last.text
+    body = listing.json()
+    assert [row["username"] for row in body["players"]] == ["player02", "player03"]
+    assert (body["total"], body["next_offset"]) == (5, 4)
+
+
+def test_players_typeahead_returns_suggestions_with_etag(monkeypatch, sample_players):
+    from web.services import ranks_service
+
+    monkeypatch.setattr(ranks_service, "load_ranks", lambda: sample_players)
+
+    with TestClient(_make_app(_make_bot_state())) as client:
+        response = client.get("/players/api/search?q=E&limit=5")
+        cached = client.get("/players/api/search?q=E&limit=5", headers={"If-None-Match": response.headers["ETag"]})
+
+    assert response.status_code == 200
+    assert [row["username"] for row in response.json()] == ["zenyte_zoe", "silver_sam"]
+    assert set(response.json()[0]) == {"username", "rank", "ehb"}
+    assert cached.status_code == 304
+
+
 def test_player_detail_not_found_page(monkeypatch, sample_players):
     """Missing player detail renders the themed 404 state."""
     from web.services import ranks_service
@@ -610,3 +841,109 @@ def test_dashboard_empty_rank_data(monkeypatch, sample_csv_file):
 
     assert response.status_code == 200
     assert "No rank data is available yet." in response.text
+
+
+# ---------------------------------------------------------------------------
+# Rendered fragment cache
+# ---------------------------------------------------------------------------
+
+def test_fragment_cache_keeps_one_version_per_key_and_evicts_lru():
+    from web.ui import FragmentCache
+
+    cache = FragmentCache(max_entries=2)
+    cache.put("a.html", (), "v1", "old")
+    cache.put("a.html", (), "v2", "new")
+    assert cache.get("a.html", (), "v1") is None
+    assert cache.get("a.html", (), "v2") == "new"
+
+    cache.put("b.html", (), "v1", "b")
+    cache.get("a.html", (), "v2")
+    cache.put("c.html", (), "v1", "c")
+    assert len(cache) == 2
+    assert cache.get("b.html", (), "v1") is None
+    assert cache.get("a.html", (), "v2") == "new"
+
+
+def test_dashboard_fragments_are_served_from_cache_until_data_changes(monkeypatch, sample_players, sample_csv_file):
+    from web import ui
+    from web.services import ranks_service, csv_service
+
+    ranks = dict(sample_players)
+    monkeypatch.setattr(ranks_service, "load_ranks", lambda: ranks)
+    monkeypatch.setattr(csv_service, "_resolve_csv_path", lambda _: str(sample_csv_file))
+    rendered = []
+    original = ui.templates.get_template
+    monkeypatch.setattr(
+        ui.templates, "get_template",
+        lambda name, *a, **kw: rendered.append(name) or original(name, *a, **kw),
+    )
+
+    with TestClient(_make_app(_make_bot_state())) as client:
+        first = client.get("/")
+        second = client.get("/")
+        ranks["new_nina"] = {"last_ehb": 1.0, "rank": "Goblin"}
+        database.upsert_players({"new_nina": ranks["new_nina"]})
+        third = client.get("/")
+
+    assert first.text == second.text
+    assert rendered.count("partials/rank_spread.html") == 2
+    assert "2 players" not in first.text
+    assert "2 players" in third.text
+
+
+def test_players_rows_fragment_is_cached_per_query(monkeypatch, sample_players):
+    from web import ui
+    from web.services import ranks_service
+
+    monkeypatch.setattr(ranks_service, "load_ranks", lambda: sample_players)
+    ui.fragment_cache.clear()
+
+    with TestClient(_make_app(_make_bot_state())) as client:
+        listing = client.get("/players/?q=sam")
+        search = client.get("/players/search?q=sam")
+        other = client.get("/players/search?q=zoe")
+
+    assert "silver_sam" in listing.text and "silver_sam" in search.text
+    assert "silver_sam" not in other.text
+    assert ui.fragment_cache.hits == 1
+
+
+# ---------------------------------------------------------------------------
+# /competitions
+# ---------------------------------------------------------------------------
+
+def _store_competition(competition_id, title, starts_at, ends_at):
+    database.upsert_competitions(
+        7,
+        [{
+            "id": competition_id, "title": title, "metric": "zulrah", "type": "classic",
+            "starts_at": starts_at, "ends_at": ends_at, "participant_count": 2, "next_poll_at": None,
+        }],
+        now="2025-06-01 00:00:00",
+    )
+
+
+def test_competitions_page_groups_by_status_and_shows_leaderboard():
+    _store_competition(1, "Snake season", "2025-01-01 00:00:00", "2099-01-01 00:00:00")
+    _store_competition(2, "Old grind", "2025-01-01 00:00:00", "2025-01-08 00:00:00")
+    database.store_competition_poll(
+        1,
+        polled_at="2025-06-01 12:00:00",
+        next_poll_at="2025-06-01 18:00:00",
+        standings=[
+            {"player_id": 1, "username": "Alice", "rank": 1, "gained": 1520},
+            {"player_id": 2, "username": "Bob", "rank": 2, "gained": 40},
+        ],
+    )
+
+    with TestClient(_make_app(_make_bot_state())) as client:
+        listing = client.get("/competitions/")
+        detail = client.get("/competitions/1")
+        missing = client.get("/competitions/99")
+
+    assert listing.status_code == 200
+    assert listing.text.index("Snake season") < listing.text.index("Old grind")
+    assert detail.status_code == 200
+    assert "1,520 zulrah" in detail.text and detail.text.index("Alice") < detail.text.index("Bob")
+    assert missing.status_code == 404
+